@@ -9,6 +9,7 @@ import scipy.sparse as sp
 from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.externals import six
 
+from auto_ml import utils
 from auto_ml.utils import CustomLabelEncoder
 
 
@@ -23,7 +24,7 @@ def strip_non_ascii(string):
 
 class DataFrameVectorizer(BaseEstimator, TransformerMixin):
 
-    def __init__(self, column_descriptions=None, dtype=np.float32, separator="=", sparse=True, keep_cat_features=False):
+    def __init__(self, column_descriptions=None, dtype=np.float32, separator="=", sparse=True, keep_cat_features=False, min_category_frequency=None, max_categories_per_column=None, num_hash_buckets=None):
         self.dtype = dtype
         self.separator = separator
         self.sparse = sparse
@@ -39,6 +40,14 @@ class DataFrameVectorizer(BaseEstimator, TransformerMixin):
         self.categorical_columns = None
         self.numeric_col_types = ['int8', 'int16', 'int32', 'int64', 'float16', 'float32', 'float64']
         self.additional_numerical_cols = []
+        # Categorical values that appear in fewer than min_category_frequency rows (or a fraction of rows, if less than 1), or fall outside the max_categories_per_column most common values in their column, all share a single utils.other_category feature
+        self.min_category_frequency = min_category_frequency
+        self.max_categories_per_column = max_categories_per_column
+        # Maps each categorical column that has an other_category feature to that feature's name
+        self.other_feature_names = {}
+        # If set, each one-hot encoded categorical column also gets this many shared slots. Values we did not keep a feature for (including values we only see after training) go into one of these slots by a stable hash of the value, rather than being dropped
+        # That gives models that keep learning after training (through partial_fit) somewhere to put new values
+        self.num_hash_buckets = num_hash_buckets
 
 
 
@@ -84,19 +93,28 @@ class DataFrameVectorizer(BaseEstimator, TransformerMixin):
                 # All of these values will go in the same column, but they must be turned into ints first
                 self.label_encoders[col_name] = CustomLabelEncoder()
                 # Then, we will use the same flow below to make sure they appear in the vocab correctly
-                self.label_encoders[col_name].fit(X[col_name])
+                self.label_encoders[col_name].fit(X[col_name], min_frequency=self.get('min_category_frequency'), max_categories=self.get('max_categories_per_column'))
 
 
             # We can't do elif here- it has to be inclusive of the logic above
             if self.column_descriptions.get(col_name, False) == 'categorical' and self.keep_cat_features == False:
-                # If this is a categorical column, iterate through each row to get all the possible values that we are one-hot-encoding.
-                for val in set(X[col_name]):
-                    if not isinstance(val, str):
-                        if isinstance(val, numbers.Number) or val is None:
-                            val = str(val)
-                        else:
-                            val = val.encode('utf-8').decode('utf-8')
-
+                # If this is a categorical column, get all the possible values that we are one-hot-encoding.
+                has_other = False
+                if self.get('min_category_frequency') is None and self.get('max_categories_per_column') is None:
+                    category_vals = [utils.get_category_key(val) for val in X[col_name].unique()]
+                else:
+                    category_vals, has_other = utils.get_frequent_categories(X[col_name], min_frequency=self.min_category_frequency, max_categories=self.max_categories_per_column)
+
+                if self.get('num_hash_buckets') is not None:
+                    # Rare values go into the hashed slots along with every other value we did not keep, so we do not need an other_category feature as well
+                    # Added right after the column's other values, since each categorical column's features have to be contiguous
+                    category_vals.extend(utils.hash_bucket_category.format(bucket_idx) for bucket_idx in range(self.num_hash_buckets))
+                elif has_other:
+                    # Added right after the column's other values, since each categorical column's features have to be contiguous
+                    category_vals.append(utils.other_category)
+                    self.other_feature_names[col_name] = col_name + self.separator + utils.other_category
+
+                for val in category_vals:
                     feature_name = col_name + self.separator + val
 
                     if feature_name not in vocab:
@@ -134,7 +152,13 @@ class DataFrameVectorizer(BaseEstimator, TransformerMixin):
                                 val = str(val)
                             else:
                                 val = val.encode('utf-8').decode('utf-8')
+                        col_name = f
                         f = f + self.separator + val
+                        if f not in vocab:
+                            if self.get('num_hash_buckets') is not None:
+                                f = col_name + self.separator + utils.get_hash_bucket_category(val, self.num_hash_buckets)
+                            elif col_name in self.get('other_feature_names', {}):
+                                f = self.other_feature_names[col_name]
                         val = 1
                     else:
                         if val in bad_vals:
@@ -166,6 +190,17 @@ class DataFrameVectorizer(BaseEstimator, TransformerMixin):
 
         else:
 
+            # fillna cannot put a new value into a pandas categorical column, so we go back to plain object columns for any categoricals from here on
+            category_cols = [col for col in self.categorical_columns if col in X.columns and X[col].dtype.name == 'category']
+            if len(category_cols) > 0:
+                X = X.astype(dict((col, object) for col in category_cols))
+
+            if self.get('frozen', False) == True:
+                # A frozen vectorizer never modifies the DataFrame it was handed, so we make all of our changes on a new DataFrame
+                X = X.fillna(0)
+            else:
+                X.fillna(0, inplace=True)
+
             for col in self.numerical_columns:
                 if col not in X.columns:
                     X[col] = 0
@@ -176,8 +211,6 @@ class DataFrameVectorizer(BaseEstimator, TransformerMixin):
                 if col not in X.columns:
                     X[col] = 0
 
-            X.fillna(0, inplace=True)
-
             for idx, col in enumerate(self.numerical_columns):
                 if X[col].dtype not in self.numeric_col_types:
                     X[col] = X[col].astype(np.float32)
@@ -235,6 +268,13 @@ class DataFrameVectorizer(BaseEstimator, TransformerMixin):
                     elif col_idx < min_transformed_idx:
                         min_transformed_idx = col_idx
 
+            other_col_idx = None
+            other_feature_name = self.get('other_feature_names', {}).get(col_name)
+            if other_feature_name is not None and other_feature_name in self.vocabulary_:
+                other_col_idx = self.vocabulary_[other_feature_name] - min_transformed_idx
+
+            num_hash_buckets = self.get('num_hash_buckets')
+
             encoded_col_names = sorted(encoded_col_names, key=lambda tup: tup[1])
             encoded_col_names = [tup[0] for tup in encoded_col_names]
 
@@ -257,11 +297,16 @@ class DataFrameVectorizer(BaseEstimator, TransformerMixin):
                         val = val.encode('utf-8').decode('utf-8')
 
                 feature_name = col_name + self.separator + val
+                if feature_name not in self.vocabulary_ and num_hash_buckets is not None:
+                    feature_name = col_name + self.separator + utils.get_hash_bucket_category(val, num_hash_buckets)
+
                 if feature_name in self.vocabulary_:
                     col_idx = self.vocabulary_[feature_name]
                     col_idx = col_idx - min_transformed_idx
 
                     result[row_idx, col_idx] = 1
+                elif other_col_idx is not None:
+                    result[row_idx, other_col_idx] = 1
 
 
             df_result = pd.DataFrame(result.toarray(), columns=encoded_col_names)
@@ -270,6 +315,14 @@ class DataFrameVectorizer(BaseEstimator, TransformerMixin):
     def transform(self, X, y=None):
         return self._transform(X)
 
+    # Stops our label_encoders from learning new values at prediction time, and stops transform from modifying the data it is passed
+    def freeze(self):
+        for col_name, label_encoder in self.get('label_encoders', {}).items():
+            label_encoder.freeze()
+
+        self.frozen = True
+        return self
+
     def get_feature_names(self):
         """Returns a list of feature names, ordered by their indices.
 
@@ -279,6 +332,66 @@ class DataFrameVectorizer(BaseEstimator, TransformerMixin):
         return self.feature_names_
 
 
+    # The categorical column a one-hot encoded feature came from, or None for every other kind of feature
+    def _get_categorical_column(self, feature_name, categorical_columns):
+        if self.separator not in feature_name:
+            return None
+        col_name = feature_name[:feature_name.rfind(self.separator)]
+        if col_name in categorical_columns:
+            return col_name
+        return None
+
+
+    # Adds the categorical values in X that we have not seen before, so that a pipeline warm-started from this one can use them
+    # Each categorical column's features have to stay contiguous, so new values go at the end of their own column's block, and every feature after them shifts over
+    # Returns the names of the features we added
+    def extend_vocabulary(self, X):
+        min_frequency = self.get('min_category_frequency')
+        max_categories = self.get('max_categories_per_column')
+        categorical_columns = set(self.categorical_columns)
+
+        if self.get('keep_cat_features', False) == True:
+            # Label encoded columns stay a single feature no matter how many values they hold, so our vocabulary itself does not change
+            for col_name, label_encoder in self.get('label_encoders', {}).items():
+                if col_name in categorical_columns and col_name in X.columns:
+                    label_encoder.extend(X[col_name], min_frequency=min_frequency, max_categories=max_categories)
+            return []
+
+        known_vals_by_col = dict((col_name, set()) for col_name in categorical_columns)
+        for feature_name in self.feature_names_:
+            col_name = self._get_categorical_column(feature_name, categorical_columns)
+            if col_name is not None:
+                known_vals_by_col[col_name].add(feature_name[len(col_name) + len(self.separator):])
+
+        new_features_by_col = {}
+        for col_name in self.categorical_columns:
+            if col_name not in X.columns:
+                continue
+            new_vals = utils.get_new_categories(X[col_name], known_vals_by_col[col_name], min_frequency=min_frequency, max_categories=max_categories)
+            if len(new_vals) > 0:
+                new_features_by_col[col_name] = [col_name + self.separator + val for val in new_vals]
+
+        if len(new_features_by_col) == 0:
+            return []
+
+        new_feature_names = []
+        feature_names = []
+        for idx, feature_name in enumerate(self.feature_names_):
+            feature_names.append(feature_name)
+            col_name = self._get_categorical_column(feature_name, categorical_columns)
+            if col_name not in new_features_by_col:
+                continue
+
+            # Once we reach the end of this column's block, add its new features
+            if idx + 1 == len(self.feature_names_) or self._get_categorical_column(self.feature_names_[idx + 1], categorical_columns) != col_name:
+                feature_names.extend(new_features_by_col[col_name])
+                new_feature_names.extend(new_features_by_col[col_name])
+
+        self.feature_names_ = feature_names
+        self.vocabulary_ = dict((feature_name, idx) for idx, feature_name in enumerate(feature_names))
+        return new_feature_names
+
+
     # This is for cases where we want to add in new features, such as for feature_learning
     def add_new_numerical_cols(self, new_feature_names):
         # add to our vocabulary
@@ -326,6 +439,7 @@ class DataFrameVectorizer(BaseEstimator, TransformerMixin):
         self.numerical_columns = new_numerical_cols
         self.categorical_columns = new_categorical_cols
         self.additional_numerical_cols = new_additional_numerical_cols
+        self.other_feature_names = dict((col_name, feature_name) for col_name, feature_name in self.get('other_feature_names', {}).items() if feature_name in new_vocab)
 
         self.has_been_restricted = True
         return self
@@ -1,3 +1,18 @@
-from auto_ml.predictor import Predictor
+import sys
+
 from auto_ml._version import __version__
-from auto_ml.utils_models import load_ml_model
+
+if sys.version_info >= (3, 7):
+    # Importing Predictor pulls in every library we use for training. Processes that only need to get predictions (see auto_ml.serving) should not have to pay for that, so we only import it the first time someone asks for it
+    def __getattr__(name):
+        if name == 'Predictor':
+            from auto_ml.predictor import Predictor
+            return Predictor
+        elif name == 'load_ml_model':
+            from auto_ml.utils_models import load_ml_model
+            return load_ml_model
+        raise AttributeError('module "auto_ml" has no attribute "{}"'.format(name))
+
+else:
+    from auto_ml.predictor import Predictor
+    from auto_ml.utils_models import load_ml_model
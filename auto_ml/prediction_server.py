@@ -0,0 +1,324 @@
+# A small, dependency-free prediction server for a saved auto_ml pipeline
+# Getting a prediction for a single dictionary is dominated by per-call overhead, not by the math itself
+# So rather than running each request through the pipeline on its own, we collect the requests that arrive within a few milliseconds of each other, run them all through the (much more efficient) batch DataFrame path at once, and then hand each caller back its own result
+# Usage: python -m auto_ml.prediction_server path/to/saved_pipeline.dill --port 8000
+import argparse
+import json
+import os
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn, UnixStreamServer
+    import queue
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn, UnixStreamServer
+    import Queue as queue
+
+import numpy as np
+import pandas as pd
+
+from auto_ml.serving import load_ml_model
+from auto_ml.utils_instrumentation import latency_buckets_ms, get_bucket_idx, get_histogram_percentile, format_histogram
+
+
+# Upper bounds for each of our batch size histogram buckets
+batch_size_buckets = [1, 2, 4, 8, 16, 32, 64, 128, 256, float('inf')]
+
+
+def make_json_safe(val):
+    if isinstance(val, np.ndarray):
+        return val.tolist()
+    elif isinstance(val, np.generic):
+        return val.item()
+    elif isinstance(val, (list, tuple)):
+        return [make_json_safe(item) for item in val]
+    elif isinstance(val, dict):
+        return dict((k, make_json_safe(v)) for k, v in val.items())
+    return val
+
+
+class ServerMetrics(object):
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.start_time = time.time()
+        self.num_requests = 0
+        self.num_errors = 0
+        self.num_batches = 0
+        self.num_rows = 0
+        self.total_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self.latency_counts = [0 for bucket in latency_buckets_ms]
+        self.batch_size_counts = [0 for bucket in batch_size_buckets]
+
+
+    def record_latency(self, latency_ms, is_error=False):
+        with self.lock:
+            self.num_requests += 1
+            if is_error:
+                self.num_errors += 1
+            self.total_latency_ms += latency_ms
+            self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+            self.latency_counts[get_bucket_idx(latency_buckets_ms, latency_ms)] += 1
+
+
+    def record_batch(self, batch_size):
+        with self.lock:
+            self.num_batches += 1
+            self.num_rows += batch_size
+            self.batch_size_counts[get_bucket_idx(batch_size_buckets, batch_size)] += 1
+
+
+    def get_metrics(self):
+        with self.lock:
+            num_requests = max(self.num_requests, 1)
+            num_batches = max(self.num_batches, 1)
+
+            return {
+                'uptime_seconds': time.time() - self.start_time
+                , 'num_requests': self.num_requests
+                , 'num_errors': self.num_errors
+                , 'num_batches': self.num_batches
+                , 'num_rows': self.num_rows
+                , 'avg_latency_ms': self.total_latency_ms / num_requests
+                , 'max_latency_ms': self.max_latency_ms
+                , 'p50_latency_ms': get_histogram_percentile(latency_buckets_ms, self.latency_counts, 0.5)
+                , 'p95_latency_ms': get_histogram_percentile(latency_buckets_ms, self.latency_counts, 0.95)
+                , 'p99_latency_ms': get_histogram_percentile(latency_buckets_ms, self.latency_counts, 0.99)
+                , 'latency_histogram_ms': format_histogram(latency_buckets_ms, self.latency_counts)
+                , 'avg_batch_size': float(self.num_rows) / num_batches
+                , 'batch_size_histogram': format_histogram(batch_size_buckets, self.batch_size_counts)
+            }
+
+
+class PendingPrediction(object):
+
+    def __init__(self, row, method):
+        self.row = row
+        self.method = method
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+# Collects individual rows from many concurrent callers, and runs them through the pipeline together
+# A batch is sent off as soon as it has max_batch_size rows, or max_wait_ms after the first row in it arrived, whichever comes first
+# All predictions happen on a single worker thread, so the trained pipeline itself is never shared across threads
+class MicroBatcher(object):
+
+    def __init__(self, trained_pipeline, max_batch_size=64, max_wait_ms=2, metrics=None):
+        self.trained_pipeline = trained_pipeline
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        if metrics is None:
+            metrics = ServerMetrics()
+        self.metrics = metrics
+        self.pending_queue = queue.Queue()
+        self.worker = None
+
+
+    def start(self):
+        if self.worker is None:
+            self.worker = threading.Thread(target=self._run)
+            self.worker.daemon = True
+            self.worker.start()
+        return self
+
+
+    def submit(self, row, method='predict'):
+        return self.submit_many([row], method=method)[0]
+
+
+    # Queues up every row before waiting on any of them, so that all the rows from a single request can share a batch
+    def submit_many(self, rows, method='predict'):
+        if method not in ['predict', 'predict_proba']:
+            raise ValueError('method must be one of ["predict", "predict_proba"]')
+
+        pending_predictions = [PendingPrediction(row, method) for row in rows]
+        for pending_prediction in pending_predictions:
+            self.pending_queue.put(pending_prediction)
+
+        results = []
+        for pending_prediction in pending_predictions:
+            pending_prediction.done.wait()
+            if pending_prediction.error is not None:
+                raise pending_prediction.error
+            results.append(pending_prediction.result)
+
+        return results
+
+
+    def _collect_batch(self):
+        batch = [self.pending_queue.get()]
+        deadline = time.time() + self.max_wait_ms / 1000.0
+
+        while len(batch) < self.max_batch_size:
+            time_remaining = deadline - time.time()
+            if time_remaining <= 0:
+                break
+            try:
+                batch.append(self.pending_queue.get(timeout=time_remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+
+            for method in ['predict', 'predict_proba']:
+                method_batch = [pending for pending in batch if pending.method == method]
+                if len(method_batch) > 0:
+                    self._predict_batch(method_batch, method)
+
+
+    def _predict_rows(self, batch, method):
+        df_batch = pd.DataFrame([pending.row for pending in batch])
+        predictions = getattr(self.trained_pipeline, method)(df_batch)
+
+        # For a single row, our pipelines hand back just that row's prediction, rather than a list of predictions
+        if len(batch) == 1:
+            predictions = [predictions]
+        predictions = list(predictions)
+
+        if len(predictions) != len(batch):
+            raise ValueError('The trained pipeline returned {} predictions for a batch of {} rows'.format(len(predictions), len(batch)))
+
+        for pending, prediction in zip(batch, predictions):
+            pending.result = make_json_safe(prediction)
+
+
+    def _predict_batch(self, batch, method):
+        self.metrics.record_batch(len(batch))
+        try:
+            self._predict_rows(batch, method)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0].error = e
+            else:
+                # A single malformed row should not fail every other caller who happened to share its batch
+                # So we fall back to predicting each row on its own, and only the rows that fail on their own get an error
+                for pending in batch:
+                    try:
+                        self._predict_rows([pending], method)
+                    except Exception as row_error:
+                        pending.error = row_error
+
+        for pending in batch:
+            pending.done.set()
+
+
+class PredictionRequestHandler(BaseHTTPRequestHandler):
+
+    def _send_json(self, status_code, response_obj):
+        response_body = json.dumps(response_obj).encode('utf-8')
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response_body)))
+        self.end_headers()
+        self.wfile.write(response_body)
+
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            self._send_json(200, self.server.batcher.metrics.get_metrics())
+        elif self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        else:
+            self._send_json(404, {'error': 'Unknown path. Try POST /predict, POST /predict_proba, GET /metrics, or GET /health'})
+
+
+    def do_POST(self):
+        start_time = time.time()
+        method = self.path.strip('/')
+        is_error = False
+
+        if method not in ['predict', 'predict_proba']:
+            self.server.batcher.metrics.record_latency((time.time() - start_time) * 1000, is_error=True)
+            self._send_json(404, {'error': 'Unknown path. Try POST /predict or POST /predict_proba'})
+            return
+
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+            request_obj = json.loads(self.rfile.read(content_length).decode('utf-8'))
+
+            # Accept either a single row (a dictionary), or a list of rows
+            if isinstance(request_obj, dict):
+                response_obj = {'prediction': self.server.batcher.submit(request_obj, method=method)}
+            else:
+                response_obj = {'predictions': self.server.batcher.submit_many(request_obj, method=method)}
+            status_code = 200
+        except Exception as e:
+            is_error = True
+            response_obj = {'error': str(e)}
+            status_code = 400 if isinstance(e, ValueError) else 500
+
+        # Record this request before we respond, so that a client who checks /metrics right after getting its response always sees it counted
+        self.server.batcher.metrics.record_latency((time.time() - start_time) * 1000, is_error=is_error)
+        self._send_json(status_code, response_obj)
+
+
+    # Unix socket connections do not have a client address, and per-request logging is far too noisy for a prediction server anyways
+    def log_message(self, format, *args):
+        pass
+
+
+# The default listen backlog of 5 connections is far too small for many concurrent callers
+class ThreadingPredictionServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class ThreadingUnixPredictionServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def make_server(trained_pipeline, host='127.0.0.1', port=8000, unix_socket=None, max_batch_size=64, max_wait_ms=2):
+    if unix_socket is not None:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        server = ThreadingUnixPredictionServer(unix_socket, PredictionRequestHandler)
+    else:
+        server = ThreadingPredictionServer((host, port), PredictionRequestHandler)
+
+    server.batcher = MicroBatcher(trained_pipeline, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms).start()
+    return server
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Serve predictions from a saved auto_ml pipeline over HTTP')
+    parser.add_argument('file_name', help='The saved pipeline, as written by ml_predictor.save()')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--unix-socket', default=None, help='Listen on this Unix socket path instead of a TCP port')
+    parser.add_argument('--max-batch-size', type=int, default=64, help='The most rows we will run through the pipeline at once')
+    parser.add_argument('--max-wait-ms', type=float, default=2, help='How long to wait for more rows to arrive before running a batch')
+    args = parser.parse_args(args)
+
+    trained_pipeline = load_ml_model(args.file_name)
+    server = make_server(trained_pipeline, host=args.host, port=args.port, unix_socket=args.unix_socket, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+
+    if args.unix_socket is not None:
+        print('Serving predictions on the Unix socket ' + args.unix_socket)
+    else:
+        print('Serving predictions on http://{}:{}'.format(args.host, args.port))
+    print('POST rows to /predict or /predict_proba. Latency and batch size metrics are available at /metrics')
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print('Heard KeyboardInterrupt. Shutting down the prediction server')
+    finally:
+        server.server_close()
+        if args.unix_socket is not None and os.path.exists(args.unix_socket):
+            os.remove(args.unix_socket)
+
+
+if __name__ == '__main__':
+    main()
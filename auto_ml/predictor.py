@@ -1,5 +1,5 @@
 from collections import OrderedDict
-import datetime
+from copy import deepcopy
 import math
 import multiprocessing
 import os
@@ -23,6 +23,7 @@ warnings.filterwarnings("ignore", category=DeprecationWarning)
 pd.options.mode.chained_assignment = None  # default='warn'
 
 import scipy
+from sklearn.base import clone
 from sklearn.calibration import CalibratedClassifierCV
 from sklearn.feature_extraction import DictVectorizer
 from sklearn.model_selection import GridSearchCV, KFold, train_test_split
@@ -33,14 +34,22 @@ from sklearn.preprocessing import FunctionTransformer, StandardScaler
 from auto_ml._version import __version__ as auto_ml_version
 from auto_ml import DataFrameVectorizer
 from auto_ml import utils
+from auto_ml import utils_arrow
 from auto_ml import utils_categorical_ensembling
+from auto_ml import utils_conformal
 from auto_ml import utils_data_cleaning
 from auto_ml import utils_ensembling
 from auto_ml import utils_feature_selection
+from auto_ml import utils_model_artifacts
 from auto_ml import utils_model_training
 from auto_ml import utils_models
+from auto_ml import utils_multi_target
 from auto_ml import utils_scaling
 from auto_ml import utils_scoring
+from auto_ml import utils_search
+from auto_ml import utils_search_journal
+from auto_ml import utils_target_encoding
+from auto_ml import utils_telemetry
 
 from evolutionary_search import EvolutionaryAlgorithmSearchCV
 
@@ -82,6 +91,22 @@ class Predictor(object):
         self._validate_input_col_descriptions()
 
         self.name = name
+        self.telemetry = None
+        self.time_budget = None
+
+
+    # A time.time() timestamp that training has to wrap up by, or None if we are not training on a time budget
+    def get_training_deadline(self):
+        if getattr(self, 'time_budget', None) is None:
+            return None
+        return self.time_budget.deadline
+
+
+    # Training reports each phase it goes through to this, which in turn hands those events to the training_callback and telemetry_file passed into .train()
+    def get_telemetry(self):
+        if getattr(self, 'telemetry', None) is None:
+            self.telemetry = utils_telemetry.TrainingTelemetry(name=self.name)
+        return self.telemetry
 
 
     def _validate_input_col_descriptions(self):
@@ -140,6 +165,12 @@ class Predictor(object):
         else:
             pipeline_list.append(('basic_transform', utils_data_cleaning.BasicDataCleaning(column_descriptions=self.column_descriptions)))
 
+        if trained_pipeline is not None:
+            if 'target_encoder' in trained_pipeline.named_steps:
+                pipeline_list.append(('target_encoder', trained_pipeline.named_steps['target_encoder']))
+        elif self.target_encode_columns is not None:
+            pipeline_list.append(('target_encoder', utils_target_encoding.TargetEncoder(column_descriptions=self.column_descriptions, cols_to_encode=self.target_encode_columns, type_of_estimator=self.type_of_estimator, smoothing=self.target_encoding_smoothing)))
+
         if self.perform_feature_scaling is True:
             if trained_pipeline is not None:
                 pipeline_list.append(('scaler', trained_pipeline.named_steps['scaler']))
@@ -155,7 +186,7 @@ class Predictor(object):
         if trained_pipeline is not None:
             pipeline_list.append(('dv', trained_pipeline.named_steps['dv']))
         else:
-            pipeline_list.append(('dv', DataFrameVectorizer.DataFrameVectorizer(sparse=True, column_descriptions=self.column_descriptions, keep_cat_features=keep_cat_features)))
+            pipeline_list.append(('dv', DataFrameVectorizer.DataFrameVectorizer(sparse=True, column_descriptions=self.column_descriptions, keep_cat_features=keep_cat_features, min_category_frequency=self.min_category_frequency, max_categories_per_column=self.max_categories_per_column, num_hash_buckets=self.categorical_hash_buckets)))
 
 
         if self.perform_feature_selection == True:
@@ -163,7 +194,7 @@ class Predictor(object):
                 # This is the step we are trying to remove from the trained_pipeline, since it has already been combined with dv using dv.restrict
                 pass
             else:
-                pipeline_list.append(('feature_selection', utils_feature_selection.FeatureSelectionTransformer(type_of_estimator=self.type_of_estimator, column_descriptions=self.column_descriptions, feature_selection_model='SelectFromModel') ))
+                pipeline_list.append(('feature_selection', utils_feature_selection.FeatureSelectionTransformer(type_of_estimator=self.type_of_estimator, column_descriptions=self.column_descriptions, feature_selection_model='SelectFromModel', **self.feature_selection_params) ))
 
         if trained_pipeline is not None:
             # First, check and see if we have any steps with some version of keyword matching on something like 'intermediate_model_predictions' or 'feature_learning_model' or 'ensemble_model' or something like that in them.
@@ -202,7 +233,7 @@ class Predictor(object):
                 params = self.training_params
 
             final_model = utils_models.get_model_from_name(model_name, training_params=params)
-            pipeline_list.append(('final_model', utils_model_training.FinalModelATC(model=final_model, type_of_estimator=self.type_of_estimator, ml_for_analytics=self.ml_for_analytics, name=self.name, _scorer=self._scorer, feature_learning=feature_learning, uncertainty_model=self.need_to_train_uncertainty_model, training_prediction_intervals=training_prediction_intervals, column_descriptions=self.column_descriptions, training_features=training_features, keep_cat_features=keep_cat_features, is_hp_search=is_hp_search, X_test=self.X_test, y_test=self.y_test)))
+            pipeline_list.append(('final_model', utils_model_training.FinalModelATC(model=final_model, type_of_estimator=self.type_of_estimator, ml_for_analytics=self.ml_for_analytics, name=self.name, _scorer=self._scorer, feature_learning=feature_learning, uncertainty_model=self.need_to_train_uncertainty_model, training_prediction_intervals=training_prediction_intervals, column_descriptions=self.column_descriptions, training_features=training_features, keep_cat_features=keep_cat_features, is_hp_search=is_hp_search, X_test=self.X_test, y_test=self.y_test, training_deadline=self.get_training_deadline(), search_journal=self.search_journal if is_hp_search else None)))
 
         constructed_pipeline = utils.ExtendedPipeline(pipeline_list, keep_cat_features=keep_cat_features, name=self.name, training_features=self.training_features)
         return constructed_pipeline
@@ -241,14 +272,18 @@ class Predictor(object):
 
         # We accept input as either a DataFrame, or as a list of dictionaries. Internally, we use DataFrames. So if the user gave us a list, convert it to a DataFrame here.
         if isinstance(X, list):
-            X_df = pd.DataFrame(X)
-            del X
-        else:
-            X_df = X.copy()
+            X = pd.DataFrame(X)
+        elif utils_arrow.is_arrow_input(X):
+            # Columns the user told us to ignore never get read in at all
+            X = utils_arrow.to_dataframe(X, exclude_columns=self.cols_to_ignore)
+
+        # Remove the output column from the dataset, and store it into the y varaible
+        y = X[self.output_column].values
 
-        # To keep this as light in memory as possible, immediately remove any columns that the user has already told us should be ignored
-        if len(self.cols_to_ignore) > 0:
-            X_df = utils.safely_drop_columns(X_df, self.cols_to_ignore)
+        # To keep this as light in memory as possible, our one copy of the data leaves out the output column, and any columns that the user has already told us should be ignored
+        cols_to_drop = [col for col in X.columns if col == self.output_column or col in self.cols_to_ignore]
+        X_df = X.drop(cols_to_drop, axis=1)
+        del X
 
         # Having duplicate columns can really screw things up later. Remove them here, with user logging to tell them what we're doing
         X_df = utils.drop_duplicate_columns(X_df)
@@ -261,10 +296,21 @@ class Predictor(object):
             except:
                 pass
 
-        # Remove the output column from the dataset, and store it into the y varaible
-        y = list(X_df[self.output_column])
-        X_df.drop(self.output_column, axis=1, inplace=True)
+        X_df, y = self._clean_y_vals(X_df, y)
+
+        X_df = utils.downcast_dtypes(X_df, self.column_descriptions)
 
+        clean_descriptions = {}
+        col_names = set(X_df.columns)
+        for k, v in self.column_descriptions.items():
+            if k in col_names or '_day_part' in k or v == 'output':
+                clean_descriptions[k] = v
+        self.column_descriptions = clean_descriptions
+
+        return X_df, y
+
+
+    def _clean_y_vals(self, X_df, y):
         # Drop all rows that have an empty value for our output column
         # User logging so they can adjust if they pass in a bunch of bad values:
         X_df, y = utils.drop_missing_y_vals(X_df, y, self.output_column)
@@ -272,44 +318,27 @@ class Predictor(object):
         # If this is a classifier, try to turn all the y values into proper ints
         # Some classifiers play more nicely if you give them category labels as ints rather than strings, so we'll make our jobs easier here if we can.
         if self.type_of_estimator == 'classifier':
-            # The entire column must be turned into floats. If any value fails, don't convert anything in the column to floats
+            # The entire column must be turned into ints. If any value fails, don't convert anything in the column to ints
             try:
-                y_ints = []
-                for val in y:
-                    y_ints.append(int(val))
-                y = y_ints
-            except:
+                y = y.astype(np.int64)
+            except (ValueError, TypeError, OverflowError):
                 pass
         else:
             # If this is a regressor, turn all the values into floats if possible, and remove this row if they cannot be turned into floats
-            indices_to_delete = []
-            y_floats = []
-            bad_vals = []
-            for idx, val in enumerate(y):
-                try:
-                    float_val = utils_data_cleaning.clean_val(val)
-                    y_floats.append(float_val)
-                except ValueError as err:
-                    indices_to_delete.append(idx)
-                    bad_vals.append(val)
-
-            y = y_floats
+            y_floats = utils_data_cleaning.clean_vals(y)
+            bad_vals_mask = np.isnan(y_floats)
 
             # Even more verbose logging here since these values are not just missing, they're strings for a regression problem
-            if len(indices_to_delete) > 0:
+            if bad_vals_mask.any():
                 print('The y values given included some bad values that the machine learning algorithms will not be able to train on.')
                 print('The rows at these indices have been deleted because their y value could not be turned into a float:')
-                print(indices_to_delete)
+                print(np.flatnonzero(bad_vals_mask).tolist())
                 print('These were the bad values')
-                print(bad_vals)
-                X_df.drop(X_df.index[indices_to_delete], axis=0, inplace=True)
+                print(y[bad_vals_mask].tolist())
+                X_df = utils.drop_rows(X_df, bad_vals_mask)
+                y_floats = y_floats[~bad_vals_mask]
 
-        clean_descriptions = {}
-        col_names = set(X_df.columns)
-        for k, v in self.column_descriptions.items():
-            if k in col_names or '_day_part' in k or v == 'output':
-                clean_descriptions[k] = v
-        self.column_descriptions = clean_descriptions
+            y = y_floats
 
         return X_df, y
 
@@ -333,7 +362,7 @@ class Predictor(object):
 
         return trained_pipeline_without_feature_selection
 
-    def set_params_and_defaults(self, X_df, user_input_func=None, optimize_final_model=None, write_gs_param_results_to_file=True, perform_feature_selection=None, verbose=True, X_test=None, y_test=None, ml_for_analytics=True, take_log_of_y=None, model_names=None, perform_feature_scaling=True, calibrate_final_model=False, _scorer=None, scoring=None, verify_features=False, training_params=None, grid_search_params=None, compare_all_models=False, cv=2, feature_learning=False, fl_data=None, optimize_feature_learning=False, train_uncertainty_model=None, uncertainty_data=None, uncertainty_delta=None, uncertainty_delta_units=None, calibrate_uncertainty=False, uncertainty_calibration_settings=None, uncertainty_calibration_data=None, uncertainty_delta_direction='both', advanced_analytics=True, analytics_config=None, prediction_intervals=None, predict_intervals=None, ensemble_config=None, trained_transformation_pipeline=None, transformed_X=None, transformed_y=None, return_transformation_pipeline=False, X_test_already_transformed=False, skip_feature_responses=None, prediction_interval_params=None):
+    def set_params_and_defaults(self, X_df, user_input_func=None, optimize_final_model=None, write_gs_param_results_to_file=True, perform_feature_selection=None, verbose=True, X_test=None, y_test=None, ml_for_analytics=True, take_log_of_y=None, model_names=None, perform_feature_scaling=True, calibrate_final_model=False, _scorer=None, scoring=None, verify_features=False, training_params=None, grid_search_params=None, compare_all_models=False, cv=2, feature_learning=False, fl_data=None, optimize_feature_learning=False, train_uncertainty_model=None, uncertainty_data=None, uncertainty_delta=None, uncertainty_delta_units=None, calibrate_uncertainty=False, uncertainty_calibration_settings=None, uncertainty_calibration_data=None, uncertainty_delta_direction='both', advanced_analytics=True, analytics_config=None, prediction_intervals=None, predict_intervals=None, ensemble_config=None, trained_transformation_pipeline=None, transformed_X=None, transformed_y=None, return_transformation_pipeline=False, X_test_already_transformed=False, skip_feature_responses=None, prediction_interval_params=None, prediction_interval_method=None, min_category_frequency=None, max_categories_per_column=None, target_encode_columns=None, target_encoding_smoothing=20, feature_selection_params=None, warm_start_from=None, categorical_hash_buckets=None, search_strategy=None, search_strategy_params=None, search_journal=None):
 
         self.user_input_func = user_input_func
         self.optimize_final_model = optimize_final_model
@@ -359,6 +388,16 @@ class Predictor(object):
         else:
             self.model_names = model_names
 
+        # Retraining from a previously trained pipeline reuses its transformation pipeline, and (unless told otherwise) its model type and hyperparameters
+        self.warm_start_pipeline = None
+        self.warm_start_params = {}
+        self.warm_start_num_new_features = None
+        if warm_start_from is not None:
+            self.warm_start_pipeline = self._load_warm_start_pipeline(warm_start_from)
+            self.warm_start_params = self._get_warm_start_params()
+            if self.model_names is None or (len(self.model_names) == 1 and self.model_names[0] is None):
+                self.model_names = [self.warm_start_pipeline.named_steps['final_model'].model_name]
+
         # If the user passed in a valid value for model_names (not None, and not a list where the only thing is None)
         if self.model_names is None or (len(self.model_names) == 1 and self.model_names[0] is None):
             self.model_names = self._get_estimator_names()
@@ -390,6 +429,12 @@ class Predictor(object):
         self.user_gs_params = grid_search_params
         if self.user_gs_params is not None:
             self.optimize_final_model = True
+
+        # Unless we are searching for new hyperparameters, we start from the ones that worked last time. Any training_params the user passed in still win
+        if self.warm_start_pipeline is not None and self.optimize_final_model != True and self.model_names == [self.warm_start_pipeline.named_steps['final_model'].model_name]:
+            warm_start_training_params = dict(self.warm_start_params)
+            warm_start_training_params.update(self.training_params)
+            self.training_params = warm_start_training_params
         self.cv = cv
         if ensemble_config is None:
             self.ensemble_config = []
@@ -433,6 +478,11 @@ class Predictor(object):
 
 
         self.perform_feature_selection = perform_feature_selection
+        # Passed straight through to FeatureSelectionTransformer: max_rows, importance_backend, importance_type, and random_state
+        if feature_selection_params is None:
+            self.feature_selection_params = {}
+        else:
+            self.feature_selection_params = feature_selection_params
         if skip_feature_responses != True:
             self.skip_feature_responses = False
         else:
@@ -461,6 +511,48 @@ class Predictor(object):
             else:
                 self.prediction_intervals = prediction_intervals
 
+        # 'quantile_models' trains one extra quantile regressor per percentile. 'conformal' calibrates the base model's residuals on held-out data, and trains no extra models
+        if prediction_interval_method is None:
+            prediction_interval_method = 'quantile_models'
+        if prediction_interval_method not in ['quantile_models', 'conformal']:
+            print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+            print('prediction_interval_method must be one of "quantile_models" or "conformal". We received:')
+            print(prediction_interval_method)
+            print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+            raise ValueError('Invalid value for prediction_interval_method')
+        self.prediction_interval_method = prediction_interval_method
+
+        self.min_category_frequency = min_category_frequency
+        self.max_categories_per_column = max_categories_per_column
+
+        # Either 'auto', or a list of categorical columns to replace with their out-of-fold target encodings
+        if target_encode_columns is not None and target_encode_columns != 'auto' and not isinstance(target_encode_columns, list):
+            print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+            print('target_encode_columns must be either "auto", or a list of categorical column names. We received:')
+            print(target_encode_columns)
+            print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+            raise ValueError('Invalid value for target_encode_columns')
+        # Shared slots for categorical values we have not seen before, mostly useful for models we keep updating with partial_fit
+        self.categorical_hash_buckets = categorical_hash_buckets
+
+        # None keeps our usual choice between GridSearchCV and EvolutionaryAlgorithmSearchCV, based on the size of the search space
+        if search_strategy not in [None, 'grid', 'evolutionary', 'tpe']:
+            print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+            print('search_strategy must be one of None, "grid", "evolutionary", or "tpe". We received:')
+            print(search_strategy)
+            print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+            raise ValueError('Invalid value for search_strategy')
+        self.search_strategy = search_strategy
+        # Passed straight through to TPESearchCV: n_iter, n_initial_points, gamma, n_ei_candidates, and random_state
+        if search_strategy_params is None:
+            self.search_strategy_params = {}
+        else:
+            self.search_strategy_params = search_strategy_params
+        # The file name of a JSON-lines journal of every hyperparameter search candidate we have scored. Searches skip any candidate already in it, so a search that gets killed can pick up where it left off
+        self.search_journal = search_journal
+        self.target_encode_columns = target_encode_columns
+        self.target_encoding_smoothing = target_encoding_smoothing
+
         self.train_uncertainty_model = train_uncertainty_model
         if self.train_uncertainty_model == True and self.type_of_estimator == 'classifier':
             print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
@@ -542,14 +634,19 @@ class Predictor(object):
     # We are taking in scoring here to deal with the unknown behavior around multilabel classification below
     def _clean_data_and_prepare_for_training(self, data, scoring):
 
-        X_df, y = self._prepare_for_training(data)
+        with self.get_telemetry().phase('clean_data', **utils_telemetry.get_data_shape(data)) as phase_info:
+            X_df, y = self._prepare_for_training(data)
 
-        if self.take_log_of_y:
-            y = [math.log(val) for val in y]
-            self.took_log_of_y = True
+            if self.take_log_of_y:
+                if np.any(y <= 0):
+                    print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+                    print('take_log_of_y=True requires every y value to be greater than 0')
+                    print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+                    raise ValueError('take_log_of_y=True requires every y value to be greater than 0')
+                y = np.log(y)
+                self.took_log_of_y = True
 
-        self.X_df = X_df
-        self.y = y
+            phase_info['num_rows_after_cleaning'] = len(X_df)
 
         # Unless the user has told us to, don't perform feature selection unless we have a pretty decent amount of data
         if self.perform_feature_selection is None:
@@ -584,7 +681,7 @@ class Predictor(object):
 
         len_X_df = len(X_df)
         combined_training_data = pd.concat([X_df, fl_data_cleaned], axis=0)
-        combined_y = y + fl_y
+        combined_y = np.concatenate([y, fl_y])
 
         if self.type_of_estimator == 'classifier':
             fl_estimator_names = ['DeepLearningClassifier']
@@ -625,89 +722,171 @@ class Predictor(object):
         return X_df
 
 
-    def train(self, raw_training_data, user_input_func=None, optimize_final_model=None, write_gs_param_results_to_file=True, perform_feature_selection=None, verbose=True, X_test=None, y_test=None, ml_for_analytics=True, take_log_of_y=None, model_names=None, perform_feature_scaling=None, calibrate_final_model=False, _scorer=None, scoring=None, verify_features=False, training_params=None, grid_search_params=None, compare_all_models=False, cv=2, feature_learning=False, fl_data=None, optimize_feature_learning=False, train_uncertainty_model=False, uncertainty_data=None, uncertainty_delta=None, uncertainty_delta_units=None, calibrate_uncertainty=False, uncertainty_calibration_settings=None, uncertainty_calibration_data=None, uncertainty_delta_direction=None, advanced_analytics=None, analytics_config=None, prediction_intervals=None, predict_intervals=None, ensemble_config=None, trained_transformation_pipeline=None, transformed_X=None, transformed_y=None, return_transformation_pipeline=False, X_test_already_transformed=False, skip_feature_responses=None, prediction_interval_params=None):
+    def train(self, raw_training_data, user_input_func=None, optimize_final_model=None, write_gs_param_results_to_file=True, perform_feature_selection=None, verbose=True, X_test=None, y_test=None, ml_for_analytics=True, take_log_of_y=None, model_names=None, perform_feature_scaling=None, calibrate_final_model=False, _scorer=None, scoring=None, verify_features=False, training_params=None, grid_search_params=None, compare_all_models=False, cv=2, feature_learning=False, fl_data=None, optimize_feature_learning=False, train_uncertainty_model=False, uncertainty_data=None, uncertainty_delta=None, uncertainty_delta_units=None, calibrate_uncertainty=False, uncertainty_calibration_settings=None, uncertainty_calibration_data=None, uncertainty_delta_direction=None, advanced_analytics=None, analytics_config=None, prediction_intervals=None, predict_intervals=None, ensemble_config=None, trained_transformation_pipeline=None, transformed_X=None, transformed_y=None, return_transformation_pipeline=False, X_test_already_transformed=False, skip_feature_responses=None, prediction_interval_params=None, prediction_interval_method=None, min_category_frequency=None, max_categories_per_column=None, target_encode_columns=None, target_encoding_smoothing=20, feature_selection_params=None, warm_start_from=None, categorical_hash_buckets=None, search_strategy=None, search_strategy_params=None, search_journal=None, training_callback=None, telemetry_file=None, time_budget=None):
 
-        self.set_params_and_defaults(raw_training_data, user_input_func=user_input_func, optimize_final_model=optimize_final_model, write_gs_param_results_to_file=write_gs_param_results_to_file, perform_feature_selection=perform_feature_selection, verbose=verbose, X_test=X_test, y_test=y_test, ml_for_analytics=ml_for_analytics, take_log_of_y=take_log_of_y, model_names=model_names, perform_feature_scaling=perform_feature_scaling, calibrate_final_model=calibrate_final_model, _scorer=_scorer, scoring=scoring, verify_features=verify_features, training_params=training_params, grid_search_params=grid_search_params, compare_all_models=compare_all_models, cv=cv, feature_learning=feature_learning, fl_data=fl_data, optimize_feature_learning=False, train_uncertainty_model=train_uncertainty_model, uncertainty_data=uncertainty_data, uncertainty_delta=uncertainty_delta, uncertainty_delta_units=uncertainty_delta_units, calibrate_uncertainty=calibrate_uncertainty, uncertainty_calibration_settings=uncertainty_calibration_settings, uncertainty_calibration_data=uncertainty_calibration_data, uncertainty_delta_direction=uncertainty_delta_direction, prediction_intervals=prediction_intervals, predict_intervals=predict_intervals, ensemble_config=ensemble_config, trained_transformation_pipeline=trained_transformation_pipeline, transformed_X=transformed_X, transformed_y=transformed_y, return_transformation_pipeline=return_transformation_pipeline, X_test_already_transformed=X_test_already_transformed, skip_feature_responses=skip_feature_responses, prediction_interval_params=prediction_interval_params)
+        if time_budget is not None:
+            # We hold back part of the budget for refitting the best model on all of our data once our searches are over
+            self.time_budget = utils_search.TimeBudget(time_budget, reserve_fraction=0.25)
+        else:
+            self.time_budget = None
 
-        if verbose:
-            print('Welcome to auto_ml! We\'re about to go through and make sense of your data using machine learning, and give you a production-ready pipeline to get predictions with.\n')
-            print('If you have any issues, or new feature ideas, let us know at http://auto.ml')
-            print('You are running on version {}'.format(auto_ml_version))
+        self.telemetry = utils_telemetry.TrainingTelemetry(callback=training_callback, telemetry_file=telemetry_file, name=self.name, verbose=verbose)
+        with utils_telemetry.use_telemetry(self.telemetry), self.telemetry.phase('train', **utils_telemetry.get_data_shape(raw_training_data if transformed_X is None else transformed_X)):
+            self.set_params_and_defaults(raw_training_data, user_input_func=user_input_func, optimize_final_model=optimize_final_model, write_gs_param_results_to_file=write_gs_param_results_to_file, perform_feature_selection=perform_feature_selection, verbose=verbose, X_test=X_test, y_test=y_test, ml_for_analytics=ml_for_analytics, take_log_of_y=take_log_of_y, model_names=model_names, perform_feature_scaling=perform_feature_scaling, calibrate_final_model=calibrate_final_model, _scorer=_scorer, scoring=scoring, verify_features=verify_features, training_params=training_params, grid_search_params=grid_search_params, compare_all_models=compare_all_models, cv=cv, feature_learning=feature_learning, fl_data=fl_data, optimize_feature_learning=False, train_uncertainty_model=train_uncertainty_model, uncertainty_data=uncertainty_data, uncertainty_delta=uncertainty_delta, uncertainty_delta_units=uncertainty_delta_units, calibrate_uncertainty=calibrate_uncertainty, uncertainty_calibration_settings=uncertainty_calibration_settings, uncertainty_calibration_data=uncertainty_calibration_data, uncertainty_delta_direction=uncertainty_delta_direction, prediction_intervals=prediction_intervals, predict_intervals=predict_intervals, ensemble_config=ensemble_config, trained_transformation_pipeline=trained_transformation_pipeline, transformed_X=transformed_X, transformed_y=transformed_y, return_transformation_pipeline=return_transformation_pipeline, X_test_already_transformed=X_test_already_transformed, skip_feature_responses=skip_feature_responses, prediction_interval_params=prediction_interval_params, prediction_interval_method=prediction_interval_method, min_category_frequency=min_category_frequency, max_categories_per_column=max_categories_per_column, target_encode_columns=target_encode_columns, target_encoding_smoothing=target_encoding_smoothing, feature_selection_params=feature_selection_params, warm_start_from=warm_start_from, categorical_hash_buckets=categorical_hash_buckets, search_strategy=search_strategy, search_strategy_params=search_strategy_params, search_journal=search_journal)
 
-        if transformed_X is None:
-            X_df, y = self._clean_data_and_prepare_for_training(raw_training_data, scoring)
-            del raw_training_data
-            self.training_features = list(X_df.columns)
+            if verbose:
+                print('Welcome to auto_ml! We\'re about to go through and make sense of your data using machine learning, and give you a production-ready pipeline to get predictions with.\n')
+                print('If you have any issues, or new feature ideas, let us know at http://auto.ml')
+                print('You are running on version {}'.format(auto_ml_version))
 
-            if self.transformation_pipeline is None:
-                if self.feature_learning == True:
-                    X_df = self.fit_feature_learning_and_transformation_pipeline(X_df, fl_data, y)
-                else:
-                    # If the user passed in a valid value for model_names (not None, and not a list where the only thing is None)
-                    if self.model_names is not None and not (len(self.model_names) == 1 and self.model_names[0] is None):
-                        estimator_names = self.model_names
+            if transformed_X is None:
+                X_df, y = self._clean_data_and_prepare_for_training(raw_training_data, scoring)
+                del raw_training_data
+                self.training_features = list(X_df.columns)
+
+                if self.transformation_pipeline is None:
+                    if self.warm_start_pipeline is not None:
+                        X_df = self.fit_warm_start_transformation_pipeline(X_df, y)
+                    elif self.feature_learning == True:
+                        X_df = self.fit_feature_learning_and_transformation_pipeline(X_df, fl_data, y)
                     else:
-                        estimator_names = self._get_estimator_names()
+                        # If the user passed in a valid value for model_names (not None, and not a list where the only thing is None)
+                        if self.model_names is not None and not (len(self.model_names) == 1 and self.model_names[0] is None):
+                            estimator_names = self.model_names
+                        else:
+                            estimator_names = self._get_estimator_names()
 
-                    X_df = self.fit_transformation_pipeline(X_df, y, estimator_names)
+                        X_df = self.fit_transformation_pipeline(X_df, y, estimator_names)
+                else:
+                    X_df = self.transformation_pipeline.transform(X_df)
             else:
-                X_df = self.transformation_pipeline.transform(X_df)
-        else:
-            X_df, y = utils.drop_missing_y_vals(transformed_X, transformed_y)
-            del transformed_X
-            del transformed_y
-            try:
-                self.training_features = list(X_df.columns)
-            except:
-                pass
+                X_df, y = utils.drop_missing_y_vals(transformed_X, transformed_y)
+                del transformed_X
+                del transformed_y
+                try:
+                    self.training_features = list(X_df.columns)
+                except:
+                    pass
 
-            self.set_scoring(y)
+                self.set_scoring(y)
 
-        if self.X_test is not None and self.X_test_already_transformed == False:
-            self.X_test = self.transformation_pipeline.transform(self.X_test)
+            if self.X_test is not None and self.X_test_already_transformed == False:
+                with self.telemetry.phase('transform_X_test', **utils_telemetry.get_data_shape(self.X_test)):
+                    self.X_test = self.transformation_pipeline.transform(self.X_test)
 
-        # This is our main logic for how we train the final model
-        self.trained_final_model = self.train_ml_estimator(self.model_names, self._scorer, X_df, y)
+            # This is our main logic for how we train the final model
+            self.trained_final_model = self.train_ml_estimator(self.model_names, self._scorer, X_df, y)
 
-        if self.ensemble_config is not None and len(self.ensemble_config) > 0:
-            self._train_ensemble(X_df, y)
+            if self.ensemble_config is not None and len(self.ensemble_config) > 0:
+                with self.telemetry.phase('train_ensemble', num_ensemble_models=len(self.ensemble_config)):
+                    self._train_ensemble(X_df, y)
 
-        if self.need_to_train_uncertainty_model == True:
-            self._create_uncertainty_model(uncertainty_data, scoring, y, uncertainty_calibration_data)
+            if self.need_to_train_uncertainty_model == True:
+                with self.telemetry.phase('train_uncertainty_model'):
+                    self._create_uncertainty_model(uncertainty_data, scoring, y, uncertainty_calibration_data)
 
-        # Calibrate the probability predictions from our final model
-        if self.calibrate_final_model is True:
-            self.trained_final_model.model = self._calibrate_final_model(self.trained_final_model.model, X_test, y_test)
+            # Calibrate the probability predictions from our final model
+            if self.calibrate_final_model is True:
+                with self.telemetry.phase('calibrate_final_model'):
+                    self.trained_final_model.model = self._calibrate_final_model(self.trained_final_model.model, X_test, y_test)
 
-        if self.calculate_prediction_intervals is True:
-            # TODO: parallelize these!
-            interval_predictors = []
-            for percentile in self.prediction_intervals:
-                interval_predictor = self.train_ml_estimator(['GradientBoostingRegressor'], self._scorer, X_df, y, prediction_interval=percentile)
-                predictor_tup = ('interval_{}'.format(percentile), interval_predictor)
-                interval_predictors.append(predictor_tup)
+            if self.calculate_prediction_intervals is True and self.prediction_interval_method == 'conformal':
+                with self.telemetry.phase('train_prediction_interval', method='conformal', percentiles=self.prediction_intervals):
+                    self.trained_final_model.conformal_intervals = self._fit_conformal_intervals(X_df, y)
 
-            self.trained_final_model.interval_predictors = interval_predictors
+            elif self.calculate_prediction_intervals is True:
+                # TODO: parallelize these!
+                interval_predictors = []
+                for percentile in self.prediction_intervals:
+                    with self.telemetry.phase('train_prediction_interval', percentile=percentile):
+                        interval_predictor = self.train_ml_estimator(['GradientBoostingRegressor'], self._scorer, X_df, y, prediction_interval=percentile)
+                    predictor_tup = ('interval_{}'.format(percentile), interval_predictor)
+                    interval_predictors.append(predictor_tup)
 
+                self.trained_final_model.interval_predictors = interval_predictors
 
-        self.trained_pipeline = self._consolidate_pipeline(self.transformation_pipeline, self.trained_final_model)
 
-        # verify_features is not enabled by default. It adds a significant amount to the file size of the saved pipelines.
-        # If you are interested in submitting a PR to reduce the saved file size, there are definitely some optimizations you can make!
-        if verify_features == True:
-            self._prepare_for_verify_features()
+            self.trained_pipeline = self._consolidate_pipeline(self.transformation_pipeline, self.trained_final_model)
 
-        # Delete values that we no longer need that are just taking up space.
-        del self.X_test
-        del self.y_test
-        del self.X_test_already_transformed
-        del X_df
+            # verify_features is not enabled by default. It adds a significant amount to the file size of the saved pipelines.
+            # If you are interested in submitting a PR to reduce the saved file size, there are definitely some optimizations you can make!
+            if verify_features == True:
+                self._prepare_for_verify_features()
+
+            # Delete values that we no longer need that are just taking up space.
+            del self.X_test
+            del self.y_test
+            del self.X_test_already_transformed
+            del X_df
 
         if self.return_transformation_pipeline:
             return self.transformation_pipeline
         return self
 
 
+    # Split-conformal prediction intervals. We only need residuals from data the model was not trained on
+    # If the user passed in calibration_data through prediction_interval_params, we use the final model as-is, and train nothing extra
+    # Otherwise, we train one more copy of the final model on all but a holdout_fraction of the training data, and use that copy's residuals on the holdout
+    def _fit_conformal_intervals(self, X_df, y):
+        if self.type_of_estimator != 'regressor':
+            print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+            print('Conformal prediction intervals are only supported for regressors')
+            print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+            raise ValueError('Conformal prediction intervals are only supported for regressors')
+
+        bin_by = self.prediction_interval_params.get('bin_by', 'prediction')
+        if bin_by not in ['prediction', 'uncertainty']:
+            print('bin_by must be one of "prediction" or "uncertainty". We received:')
+            print(bin_by)
+            raise ValueError('Invalid value for bin_by in prediction_interval_params')
+        if bin_by == 'uncertainty' and not isinstance(self.trained_final_model.uncertainty_model, utils_model_training.FinalModelATC):
+            print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+            print('To bin conformal prediction intervals by uncertainty, please also pass in train_uncertainty_model=True and uncertainty_data')
+            print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+            raise ValueError('bin_by="uncertainty" requires a trained uncertainty_model')
+
+        calibration_data = self.prediction_interval_params.get('calibration_data')
+        if calibration_data is not None:
+            X_calibration, y_calibration = self._clean_data_and_prepare_for_training(calibration_data, self.scoring)
+            X_calibration = self.transformation_pipeline.transform(X_calibration)
+            calibration_predictions = self.trained_final_model.predict(X_calibration)
+        else:
+            # A holdout model that early stopping cut off after a round or two would have much wider residuals than our final model, which would leave our intervals badly miscalibrated
+            # So if our time_budget has already run out, we skip the conformal intervals entirely, rather than fitting a holdout model we have no time for
+            if self.time_budget is not None and self.time_budget.is_expired():
+                print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+                print('We have run out of our time_budget, so we are skipping the conformal prediction intervals. This model will not be able to predict intervals.')
+                print('To get intervals without training an extra holdout model, pass in calibration_data through prediction_interval_params, or give training a larger time_budget')
+                print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+                warnings.warn('Skipped the conformal prediction intervals because the time_budget ran out')
+                return None
+
+            holdout_fraction = self.prediction_interval_params.get('holdout_fraction', 0.2)
+            fit_indices, calibration_indices = train_test_split(np.arange(X_df.shape[0]), test_size=holdout_fraction, random_state=self.prediction_interval_params.get('random_state', 0))
+            y = np.asarray(y)
+
+            holdout_model = clone(self.trained_final_model)
+            # If the deadline passes partway through fitting this holdout model, we still want it trained as fully as our final model was
+            holdout_model.set_params(uncertainty_model=None, interval_predictors=None, training_deadline=None)
+            with self.telemetry.phase('fit_model', model_name=self.trained_final_model.model_name, conformal_holdout=True, num_rows=len(fit_indices)):
+                holdout_model.fit(utils_search.get_rows(X_df, fit_indices), y[fit_indices])
+
+            X_calibration = utils_search.get_rows(X_df, calibration_indices)
+            y_calibration = y[calibration_indices]
+            calibration_predictions = holdout_model.predict(X_calibration)
+
+        bin_values = None
+        if bin_by == 'uncertainty':
+            bin_values = self.trained_final_model.get_uncertainty_probas(X_calibration, calibration_predictions)
+
+        conformal_intervals = utils_conformal.fit_conformal_intervals(calibration_predictions, y_calibration, self.prediction_intervals, bin_values=bin_values, num_bins=self.prediction_interval_params.get('num_bins', 1), bin_by=bin_by)
+
+        if self.verbose:
+            utils_conformal.print_conformal_intervals(conformal_intervals)
+
+        return conformal_intervals
+
+
     def _create_uncertainty_model(self, uncertainty_data, scoring, y, uncertainty_calibration_data):
         # 1. Add base_prediction to our dv for analytics purposes
         # Note that we will have to be cautious that things all happen in the exact same order as we expand what we do post-DV over time
@@ -719,8 +898,7 @@ class Predictor(object):
         uncertainty_data_transformed = self.transformation_pipeline.transform(uncertainty_data)
 
         base_predictions = self.trained_final_model.predict(uncertainty_data_transformed)
-        base_predictions = [[val] for val in base_predictions]
-        base_predictions = np.array(base_predictions)
+        base_predictions = np.asarray(base_predictions, dtype=float).reshape(-1, 1)
         uncertainty_data_transformed = scipy.sparse.hstack([uncertainty_data_transformed, base_predictions], format='csr')
 
         # 2A. Grab the user's definition of uncertainty, and create the output values 'is_uncertain_prediction'
@@ -860,24 +1038,13 @@ class Predictor(object):
 
         full_pipeline = self._construct_pipeline(model_name=model_name, feature_learning=feature_learning, prediction_interval=prediction_interval, keep_cat_features=self.transformation_pipeline.keep_cat_features)
         ppl = full_pipeline.named_steps['final_model']
-        if self.verbose:
-            print('\n\n********************************************************************************************')
-            if self.name is not None:
-                print(self.name)
-            if prediction_interval is not False:
-                print('About to fit a {} quantile regressor to predict the prediction_interval for the {}th percentile'.format(model_name, int(prediction_interval * 100)))
-            else:
-                print('About to fit the pipeline for the model ' + model_name + ' to predict ' + self.output_column)
-            print('Started at:')
-            start_time = datetime.datetime.now().replace(microsecond=0)
-            print(start_time)
 
-        ppl.fit(X_df, y)
+        if feature_learning == False and prediction_interval is False:
+            ppl.warm_start_model = self._get_warm_start_model(model_name, y)
 
-        if self.verbose:
-            print('Finished training the pipeline!')
-            print('Total training time:')
-            print(datetime.datetime.now().replace(microsecond=0) - start_time)
+        # With verbose=True, the telemetry's print_progress listener prints when we start and finish fitting this model
+        with self.get_telemetry().phase('fit_model', model_name=model_name, output_column=self.output_column, feature_learning=feature_learning, prediction_interval=prediction_interval, **utils_telemetry.get_data_shape(X_df)):
+            ppl.fit(X_df, y)
 
         # Don't report feature_responses (or nearly anything else) if this is just the feature_learning stage
         # That saves a considerable amount of time
@@ -887,6 +1054,93 @@ class Predictor(object):
         return ppl
 
 
+    def _load_warm_start_pipeline(self, warm_start_from):
+        if isinstance(warm_start_from, str):
+            from auto_ml.utils_models import load_ml_model
+            warm_start_from = load_ml_model(warm_start_from)
+
+        named_steps = getattr(warm_start_from, 'named_steps', {})
+        if 'dv' not in named_steps or 'final_model' not in named_steps:
+            print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+            print('warm_start_from must be a pipeline trained by Predictor.train (or the name of the file it was saved to). Pipelines from train_categorical_ensemble are not supported. We received:')
+            print(warm_start_from)
+            print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+            raise ValueError('Invalid value for warm_start_from')
+
+        if named_steps['final_model'].type_of_estimator != self.type_of_estimator:
+            print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+            print('The pipeline in warm_start_from is a {}, but this Predictor is a {}'.format(named_steps['final_model'].type_of_estimator, self.type_of_estimator))
+            print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+            raise ValueError('warm_start_from must be the same type_of_estimator as this Predictor')
+
+        return warm_start_from
+
+
+    # The hyperparameters the old model was trained with, limited to the ones we would search over for that model
+    def _get_warm_start_params(self):
+        warm_start_final_model = self.warm_start_pipeline.named_steps['final_model']
+        model_name = warm_start_final_model.model_name
+        if model_name[:12] == 'DeepLearning':
+            return {}
+
+        try:
+            search_params = utils_models.get_search_params(model_name)
+        except KeyError:
+            return {}
+
+        old_params = warm_start_final_model.model.get_params()
+        return dict((param_name, old_params[param_name]) for param_name in search_params if param_name in old_params)
+
+
+    # Reuses every fitted step of the old transformation pipeline as-is, except that dv learns any new categorical values in X_df
+    def fit_warm_start_transformation_pipeline(self, X_df, y):
+        steps = [(step_name, deepcopy(step)) for step_name, step in self.warm_start_pipeline.steps if step_name != 'final_model']
+        ppl = utils.ExtendedPipeline(steps, keep_cat_features=self.warm_start_pipeline.keep_cat_features, name=self.name, training_features=self.training_features)
+        self.keep_cat_features = ppl.keep_cat_features
+
+        telemetry = self.get_telemetry()
+        for step_name, step in ppl.steps:
+            if step is None:
+                continue
+            with telemetry.phase('warm_start_' + step_name, **utils_telemetry.get_data_shape(X_df)):
+                if step_name == 'dv':
+                    new_feature_names = step.extend_vocabulary(X_df)
+                    self.warm_start_num_new_features = len(new_feature_names)
+                    print('Warm-starting from the previous pipeline. Found {} new categorical features'.format(len(new_feature_names)))
+                X_df = step.transform(X_df)
+
+        self.transformation_pipeline = ppl
+        return X_df
+
+
+    # The old model, if we can keep boosting from it. That takes the same kind of boosted model, trained on exactly the same features (and classes)
+    def _get_warm_start_model(self, model_name, y):
+        if self.warm_start_pipeline is None:
+            return None
+
+        warm_start_final_model = self.warm_start_pipeline.named_steps['final_model']
+        if model_name not in ['GradientBoostingRegressor', 'GradientBoostingClassifier', 'LGBMRegressor', 'LGBMClassifier', 'XGBRegressor', 'XGBClassifier']:
+            return None
+        if utils_models.get_name_from_model(warm_start_final_model.model) != model_name:
+            return None
+
+        # If the transformation pipeline did not come from the warm-started pipeline, we cannot be sure the features line up
+        num_new_features = getattr(self, 'warm_start_num_new_features', None)
+        if num_new_features is None:
+            return None
+        if num_new_features > 0:
+            print('We found new categorical values, which changes the features our model is trained on. We will train a new {} using the previous hyperparameters, rather than continuing to boost from the old model'.format(model_name))
+            return None
+
+        if self.type_of_estimator == 'classifier':
+            old_classes = getattr(warm_start_final_model.model, 'classes_', None)
+            if old_classes is not None and list(old_classes) != list(np.unique(y)):
+                print('The classes in this training data are different from the ones the old model was trained on. We will train a new {} using the previous hyperparameters, rather than continuing to boost from the old model'.format(model_name))
+                return None
+
+        return warm_start_final_model.model
+
+
     # We have broken our model training into separate components. The first component is always going to be fitting a transformation pipeline. The great part about separating the feature transformation step is that now we can perform other work on the final step, and not have to repeat the sometimes time-consuming step of the transformation pipeline.
     # NOTE: if included, we will be fitting a feature selection step here. This can get messy later on with ensembling if we end up training on different y values.
     def fit_transformation_pipeline(self, X_df, y, model_names):
@@ -899,13 +1153,55 @@ class Predictor(object):
         ppl = self._construct_pipeline(model_name=model_names[0], keep_cat_features=self.keep_cat_features)
         ppl.steps.pop()
 
+        # We fit each step on its own, so we can report how long each step took, and how much memory it needed
         # We are intentionally overwriting X_df here to try to save some memory space
-        X_df = ppl.fit_transform(X_df, y)
+        telemetry = self.get_telemetry()
+        feature_selection = ppl.named_steps.get('feature_selection')
+        for step_name, step in ppl.steps:
+            if step is None:
+                continue
+            if step_name == 'feature_selection':
+                # Already fit, and applied through dv.restrict, while we were fitting dv
+                continue
+            if step_name == 'dv' and feature_selection is not None:
+                with telemetry.phase('fit_transform_feature_selection', **utils_telemetry.get_data_shape(X_df)):
+                    self._fit_feature_selection(step, feature_selection, X_df, y)
+
+            with telemetry.phase('fit_transform_' + step_name, **utils_telemetry.get_data_shape(X_df)) as phase_info:
+                if step_name == 'dv' and feature_selection is not None:
+                    # dv has already been fit and restricted, so it only ever builds the columns we are keeping
+                    X_df = step.transform(X_df)
+                else:
+                    X_df = step.fit_transform(X_df, y)
+                output_shape = utils_telemetry.get_data_shape(X_df)
+                phase_info['output_num_rows'] = output_shape.get('num_rows')
+                phase_info['output_num_cols'] = output_shape.get('num_cols')
 
         self.transformation_pipeline = self._consolidate_pipeline(ppl)
 
         return X_df
 
+    # Fits dv, then fits feature_selection on (a sample of) dv's output, and restricts dv to just the features we are keeping
+    # That way, we never build (or slice) the full-width matrix for every row, which is what used to make feature selection cost more than training the final model on large datasets
+    def _fit_feature_selection(self, vectorizer, feature_selection, X_df, y):
+        vectorizer.fit(X_df)
+
+        sample_indices = feature_selection.get_sample_indices(len(X_df), y)
+        if sample_indices is None:
+            X_sample = vectorizer.transform(X_df)
+            y_sample = y
+        else:
+            print('Performing feature selection on a sample of {} of our {} rows'.format(len(sample_indices), len(X_df)))
+            X_sample = vectorizer.transform(X_df.iloc[sample_indices].reset_index(drop=True))
+            y_sample = np.asarray(y)[sample_indices]
+
+        feature_selection.fit(X_sample, y_sample, num_training_rows=len(X_df))
+        del X_sample
+
+        vectorizer.restrict(feature_selection.support_mask)
+        print('Feature selection kept {} of {} features'.format(sum(feature_selection.support_mask), len(feature_selection.support_mask)))
+
+
     def create_feature_responses(self, model, X_transformed, y, top_features=None):
         print('Calculating feature responses, for advanced analytics.')
 
@@ -1032,6 +1328,15 @@ class Predictor(object):
 
 
     def print_results(self, model_name, model, X, y):
+        if self.time_budget is not None and self.time_budget.is_expired():
+            print('We have run out of our time_budget, so we are skipping the analytics for ' + model_name)
+            return
+
+        with self.get_telemetry().phase('analytics', model_name=model_name, **utils_telemetry.get_data_shape(X)):
+            self._print_results(model_name, model, X, y)
+
+
+    def _print_results(self, model_name, model, X, y):
         # This apparently fails in some cases. I'm not sure what those edge cases are, but the try/except block should at least allow the rest of the script to continue
         try:
             if self.ml_for_analytics and model_name in ('LogisticRegression', 'RidgeClassifier', 'LinearRegression', 'Ridge'):
@@ -1077,7 +1382,7 @@ class Predictor(object):
             pass
 
 
-    def fit_grid_search(self, X_df, y, gs_params, feature_learning=False, refit=False):
+    def fit_grid_search(self, X_df, y, gs_params, feature_learning=False, refit=False, time_budget=None):
 
         model = gs_params['model']
         # Sometimes we're optimizing just one model, sometimes we're comparing a bunch of non-optimized models.
@@ -1095,6 +1400,13 @@ class Predictor(object):
 
         ppl = full_pipeline.named_steps['final_model']
 
+        scoring = self._scorer.score
+        if self.search_journal is not None:
+            # Candidates we have already scored come straight from the journal, and every candidate we do score gets added to it
+            scoring = utils_search_journal.JournaledScorer(scoring)
+            if self.verbose:
+                print('Found {} cross-validation scores in the search journal at {}'.format(utils_search_journal.get_search_journal(self.search_journal).get_num_entries(), self.search_journal))
+
         if self.verbose:
             grid_search_verbose = 5
         else:
@@ -1103,9 +1415,7 @@ class Predictor(object):
 
 
         # We only want to run EASCV when we have more than 50 parameter combinations (it efficiently searches very large spaces, but offers no benefits in small search spaces)
-        total_combinations = 1
-        for k, v in gs_params.items():
-            total_combinations *= len(v)
+        total_combinations = utils_search.count_combinations(gs_params)
 
         n_jobs = -1
         population_size = 35
@@ -1127,10 +1437,56 @@ class Predictor(object):
             n_jobs = multiprocessing.cpu_count()
 
         fit_evolutionary_search = False
-        if total_combinations >= 50 and model_name not in ['CatBoostClassifier', 'CatBoostRegressor']:
+        if self.search_strategy == 'evolutionary':
+            fit_evolutionary_search = True
+        elif self.search_strategy is None and total_combinations >= 50 and model_name not in ['CatBoostClassifier', 'CatBoostRegressor']:
             fit_evolutionary_search = True
+
+        tpe_params = dict(self.search_strategy_params)
+        if os.environ.get('is_test_suite', 0) == 'True':
+            tpe_params.setdefault('n_iter', 6)
+        else:
+            tpe_params.setdefault('n_iter', 20)
+
+        # A search space small enough to try every combination in n_iter candidates is better off with GridSearchCV
+        fit_tpe_search = self.search_strategy == 'tpe' and total_combinations > tpe_params['n_iter']
+
+        if fit_tpe_search == True:
+            fit_evolutionary_search = False
+            gs = utils_search.TPESearchCV(
+                ppl,
+                param_distributions=gs_params,
+                scoring=scoring,
+                # Each worker gets a new candidate as soon as it finishes its last one, based on every result we have so far
+                n_jobs=multiprocessing.cpu_count() if n_jobs == -1 else n_jobs,
+                cv=self.cv,
+                refit=refit,
+                # TPESearchCV stops starting new candidates once our slice of the time budget runs out
+                time_budget=time_budget,
+                refit_deadline=self.get_training_deadline(),
+                error_score=-1000000000,
+                verbose=grid_search_verbose,
+                **tpe_params
+            )
+
+        # Neither GridSearchCV nor EASCV can be stopped partway through, so when we are on a time budget, we try parameter combinations one at a time until our slice of the budget runs out
+        elif time_budget is not None:
+            fit_evolutionary_search = False
+            gs = utils_search.TimeBudgetedSearchCV(
+                ppl,
+                param_grid=gs_params,
+                time_budget=time_budget,
+                scoring=scoring,
+                cv=self.cv,
+                refit=refit,
+                # The final model gets whatever is left of the overall budget
+                refit_deadline=self.get_training_deadline(),
+                error_score=-1000000000,
+                verbose=grid_search_verbose
+            )
+
         # For some reason, EASCV doesn't play nicely with CatBoost. It blows up the memory hugely, and takes forever to train
-        if fit_evolutionary_search == True:
+        elif fit_evolutionary_search == True:
             gs = EvolutionaryAlgorithmSearchCV(
                 # Fit on the pipeline.
                 ppl,
@@ -1144,7 +1500,7 @@ class Predictor(object):
                 # Print warnings when we fail to fit a given combination of parameters, but do not raise an error.
                 # Set the score on this partition to some very negative number, so that we do not choose this estimator.
                 error_score=-1000000000,
-                scoring=self._scorer.score,
+                scoring=scoring,
                 # Don't allocate memory for all jobs upfront. Instead, only allocate enough memory to handle the current jobs plus an additional 50%
                 pre_dispatch='1.5*n_jobs',
                 # The number of
@@ -1171,27 +1527,25 @@ class Predictor(object):
                 # Print warnings when we fail to fit a given combination of parameters, but do not raise an error.
                 # Set the score on this partition to some very negative number, so that we do not choose this estimator.
                 error_score=-1000000000,
-                scoring=self._scorer.score,
+                scoring=scoring,
                 # Don't allocate memory for all jobs upfront. Instead, only allocate enough memory to handle the current jobs plus an additional 50%
                 pre_dispatch='1.5*n_jobs',
                 refit=refit
             )
 
-        if self.verbose:
-            print('\n\n********************************************************************************************')
-            if self.optimize_final_model == True:
-                print('Optimizing the hyperparameters for your model now')
-                if fit_evolutionary_search == False:
-                    print('About to run GridSearchCV to find the optimal hyperparameters for the model ' + model_name + ' to predict ' + self.output_column)
-                else:
-                    print('About to run EvolutionaryAlgorithmSearchCV to find the optimal hyperparameters for the model ' + model_name + ' to predict ' + self.output_column)
-                    print('Population size each generation: ' + str(population_size))
-                    print('Number of generations: ' + str(generations_number))
-            else:
-                print('About to run GridSearchCV on the pipeline for several models to predict ' + self.output_column)
-                # Note that we will only report analytics results on the final model that ultimately gets selected, and trained on the entire dataset
+        # These describe the search to the print_progress listener (for verbose=True), as well as to the training_callback and telemetry_file
+        search_info = {}
+        if fit_tpe_search == True:
+            search_info['n_iter'] = tpe_params['n_iter']
+        elif time_budget is not None:
+            search_info['time_budget_seconds'] = time_budget.total_seconds
+        elif fit_evolutionary_search == True:
+            search_info['population_size'] = population_size
+            search_info['generations_number'] = generations_number
 
-        gs.fit(X_df, y)
+        with self.get_telemetry().phase('hyperparameter_search', model_name=model_name, output_column=self.output_column, optimize_final_model=self.optimize_final_model, search_method=gs.__class__.__name__, total_combinations=total_combinations, **dict(search_info, **utils_telemetry.get_data_shape(X_df))):
+            gs.fit(X_df, y)
+            self.get_telemetry().emit_search_candidates(gs, model_name=model_name)
 
         if self.verbose:
             self.print_training_summary(gs)
@@ -1207,7 +1561,15 @@ class Predictor(object):
     def create_gs_params(self, model_name):
         grid_search_params = {}
 
-        raw_search_params = utils_models.get_search_params(model_name)
+        if self.search_strategy == 'tpe':
+            # TPE can search continuous ranges (and params that only apply for some values of another param), rather than just lists of values
+            raw_search_params = utils_models.get_search_distributions(model_name)
+        else:
+            raw_search_params = utils_models.get_search_params(model_name)
+
+        # When warm-starting, we search the neighborhood around the hyperparameters that worked best last time
+        if self.warm_start_pipeline is not None and self.warm_start_pipeline.named_steps['final_model'].model_name == model_name:
+            raw_search_params = utils_models.center_search_params(raw_search_params, self.warm_start_params)
 
         for param_name, param_list in raw_search_params.items():
             # We need to tell GS where to set these params. In our case, it is on the "final_model" object, and specifically the "model" attribute on that object
@@ -1246,7 +1608,11 @@ class Predictor(object):
 
             self.grid_search_params = grid_search_params
 
-            gscv_results = self.fit_grid_search(X_df, y, grid_search_params, refit=True)
+            search_time_budget = None
+            if self.time_budget is not None:
+                search_time_budget = self.time_budget.get_slice(1)
+
+            gscv_results = self.fit_grid_search(X_df, y, grid_search_params, refit=True, time_budget=search_time_budget)
 
             trained_final_model = gscv_results.best_estimator_
 
@@ -1258,7 +1624,7 @@ class Predictor(object):
             all_gs_results = []
 
             # If we just have one model, this will obviously be a very simple loop :)
-            for model_name in estimator_names:
+            for model_idx, model_name in enumerate(estimator_names):
 
                 grid_search_params = self.create_gs_params(model_name)
                 # Adding model name to gs params just to help with logging
@@ -1266,7 +1632,12 @@ class Predictor(object):
                 # grid_search_params['model_name'] = model_name
                 self.grid_search_params = grid_search_params
 
-                gscv_results = self.fit_grid_search(X_df, y, grid_search_params, feature_learning=feature_learning)
+                # Each model gets an equal share of whatever time is left, so time that one model's search did not need rolls over to the models after it
+                search_time_budget = None
+                if self.time_budget is not None:
+                    search_time_budget = self.time_budget.get_slice(len(estimator_names) - model_idx)
+
+                gscv_results = self.fit_grid_search(X_df, y, grid_search_params, feature_learning=feature_learning, time_budget=search_time_budget)
 
                 all_gs_results.append(gscv_results)
 
@@ -1331,177 +1702,336 @@ class Predictor(object):
         return relevant_X, relevant_y
 
 
-    def train_categorical_ensemble(self, data, categorical_column, default_category=None, min_category_size=5, **kwargs):
-        self.categorical_column = categorical_column
-        self.trained_category_models = {}
-        self.column_descriptions[categorical_column] = 'ignore'
-        try:
-            self.cols_to_ignore.remove(categorical_column)
-        except:
-            pass
-        self.min_category_size = min_category_size
+    def train_categorical_ensemble(self, data, categorical_column, default_category=None, min_category_size=5, training_callback=None, telemetry_file=None, **kwargs):
+        self.telemetry = utils_telemetry.TrainingTelemetry(callback=training_callback, telemetry_file=telemetry_file, name=self.name, verbose=kwargs.get('verbose', True))
+        with utils_telemetry.use_telemetry(self.telemetry), self.telemetry.phase('train_categorical_ensemble', categorical_column=categorical_column, **utils_telemetry.get_data_shape(data)):
+            self.categorical_column = categorical_column
+            self.trained_category_models = {}
+            self.column_descriptions[categorical_column] = 'ignore'
+            try:
+                self.cols_to_ignore.remove(categorical_column)
+            except:
+                pass
+            self.min_category_size = min_category_size
 
-        self.default_category = default_category
-        if self.default_category is None:
-            self.search_for_default_category = True
-            self.len_largest_category = 0
-        else:
-            self.search_for_default_category = False
+            self.default_category = default_category
+            if self.default_category is None:
+                self.search_for_default_category = True
+                self.len_largest_category = 0
+            else:
+                self.search_for_default_category = False
 
-        self.set_params_and_defaults(data, **kwargs)
+            self.set_params_and_defaults(data, **kwargs)
 
 
-        X_df, y = self._clean_data_and_prepare_for_training(data, self.scoring)
-        X_df = X_df.reset_index(drop=True)
-        X_df = utils_categorical_ensembling.clean_categorical_definitions(X_df, categorical_column)
+            X_df, y = self._clean_data_and_prepare_for_training(data, self.scoring)
+            X_df = X_df.reset_index(drop=True)
+            X_df = utils_categorical_ensembling.clean_categorical_definitions(X_df, categorical_column)
 
-        print('Now fitting a single feature transformation pipeline that will be shared by all of our categorical estimators for the sake of space efficiency when saving the model')
-        if self.feature_learning == True:
-            # For simplicity's sake, we are training one feature_learning model on all of the data, across all categories
-            # Deep Learning models love a ton of data, so we're giving all of it to the model
-            # This also makes stuff like serializing the model and the transformation pipeline and the saved file size all better
-            # Then, each categorical model will determine which features (if any) are useful for it's particular category
-            X_df_transformed = self.fit_feature_learning_and_transformation_pipeline(X_df, kwargs['fl_data'], y)
-        else:
-            # If the user passed in a valid value for model_names (not None, and not a list where the only thing is None)
-            if self.model_names is not None and not (len(self.model_names) == 1 and self.model_names[0] is None):
-                estimator_names = self.model_names
+            print('Now fitting a single feature transformation pipeline that will be shared by all of our categorical estimators for the sake of space efficiency when saving the model')
+            if self.feature_learning == True:
+                # For simplicity's sake, we are training one feature_learning model on all of the data, across all categories
+                # Deep Learning models love a ton of data, so we're giving all of it to the model
+                # This also makes stuff like serializing the model and the transformation pipeline and the saved file size all better
+                # Then, each categorical model will determine which features (if any) are useful for it's particular category
+                X_df_transformed = self.fit_feature_learning_and_transformation_pipeline(X_df, kwargs['fl_data'], y)
             else:
-                estimator_names = self._get_estimator_names()
-
-            X_df_transformed = self.fit_transformation_pipeline(X_df, y, estimator_names)
-
-        unique_categories = X_df[categorical_column].unique()
-
-        # Iterate through categories to find:
-        # 1. index positions of that category within X_df (and thus, X_df_transformed, and y)
-        # 2. some sorting (either alphabetical, size of category, or ideally, sorted by magnitude of y value)
-            # 3. size of category would be most efficient. if we have 8 cores and 13 categories, we don't want to save the largest category for the last one, even if from an analytics perspective that's the one we would want last
-        # 4. create a map from category name to indexes
-        # 5. sort by len(indices)
-        # 6. iterate through that, creating a new mapping from category_name to the relevant data for that category
-            # pull that data from X_df_transformed
-        # 7. map over that list to train a new predictor for each category!
-
-        categories_and_indices = []
-        for category in unique_categories:
-            rel_column = X_df[self.categorical_column]
-            indices = list(np.flatnonzero(X_df[self.categorical_column] == category))
-            categories_and_indices.append([category, indices])
-
-        categories_and_data = []
-        all_small_categories = {
-            'relevant_transformed_rows': []
-            , 'relevant_y': []
-        }
-        for pair in sorted(categories_and_indices, key=lambda x: len(x[1]), reverse=True):
-            category = pair[0]
-            indices = pair[1]
+                # If the user passed in a valid value for model_names (not None, and not a list where the only thing is None)
+                if self.model_names is not None and not (len(self.model_names) == 1 and self.model_names[0] is None):
+                    estimator_names = self.model_names
+                else:
+                    estimator_names = self._get_estimator_names()
+
+                X_df_transformed = self.fit_transformation_pipeline(X_df, y, estimator_names)
+
+            unique_categories = X_df[categorical_column].unique()
+
+            # Iterate through categories to find:
+            # 1. index positions of that category within X_df (and thus, X_df_transformed, and y)
+            # 2. some sorting (either alphabetical, size of category, or ideally, sorted by magnitude of y value)
+                # 3. size of category would be most efficient. if we have 8 cores and 13 categories, we don't want to save the largest category for the last one, even if from an analytics perspective that's the one we would want last
+            # 4. create a map from category name to indexes
+            # 5. sort by len(indices)
+            # 6. iterate through that, creating a new mapping from category_name to the relevant data for that category
+                # pull that data from X_df_transformed
+            # 7. map over that list to train a new predictor for each category!
+
+            categories_and_indices = []
+            for category in unique_categories:
+                rel_column = X_df[self.categorical_column]
+                indices = list(np.flatnonzero(X_df[self.categorical_column] == category))
+                categories_and_indices.append([category, indices])
+
+            categories_and_data = []
+            all_small_categories = {
+                'relevant_transformed_rows': []
+                , 'relevant_y': []
+            }
+            for pair in sorted(categories_and_indices, key=lambda x: len(x[1]), reverse=True):
+                category = pair[0]
+                indices = pair[1]
 
-            relevant_transformed_rows = X_df_transformed[indices]
-            relevant_y = [y[idx_val] for idx_val in indices]
+                relevant_transformed_rows = X_df_transformed[indices]
+                relevant_y = [y[idx_val] for idx_val in indices]
 
-            # If this category is larger than our min_category_size filter, train a model for it
-            if len(indices) > self.min_category_size:
-                categories_and_data.append([category, relevant_transformed_rows, relevant_y])
+                # If this category is larger than our min_category_size filter, train a model for it
+                if len(indices) > self.min_category_size:
+                    categories_and_data.append([category, relevant_transformed_rows, relevant_y])
 
-            # Otherwise, add it to our "all_small_categories" category, and train a model on all our small categories combined
-            else:
-                # Slightly complicated because we're dealing with sparse matrices
-                if isinstance(all_small_categories['relevant_transformed_rows'], list):
-                    all_small_categories['relevant_transformed_rows'] = relevant_transformed_rows
+                # Otherwise, add it to our "all_small_categories" category, and train a model on all our small categories combined
                 else:
-                    all_small_categories['relevant_transformed_rows'] = scipy.sparse.vstack([all_small_categories['relevant_transformed_rows'], relevant_transformed_rows], format='csr')
-                all_small_categories['relevant_y'] += relevant_y
+                    # Slightly complicated because we're dealing with sparse matrices
+                    if isinstance(all_small_categories['relevant_transformed_rows'], list):
+                        all_small_categories['relevant_transformed_rows'] = relevant_transformed_rows
+                    else:
+                        all_small_categories['relevant_transformed_rows'] = scipy.sparse.vstack([all_small_categories['relevant_transformed_rows'], relevant_transformed_rows], format='csr')
+                    all_small_categories['relevant_y'] += relevant_y
 
-        if len(all_small_categories['relevant_y']) > self.min_category_size:
-            categories_and_data.insert(0, ['_all_small_categories', all_small_categories['relevant_transformed_rows'], all_small_categories['relevant_y']])
+            if len(all_small_categories['relevant_y']) > self.min_category_size:
+                categories_and_data.insert(0, ['_all_small_categories', all_small_categories['relevant_transformed_rows'], all_small_categories['relevant_y']])
 
-        def train_one_categorical_model(category, relevant_X, relevant_y):
-            print('\n\nNow training a new estimator for the category: ' + str(category))
+            def train_one_categorical_model(category, relevant_X, relevant_y):
+                print('\n\nNow training a new estimator for the category: ' + str(category))
 
-            print('Some stats on the y values for this category: ' + str(category))
-            print(pd.Series(relevant_y).describe(include='all'))
+                print('Some stats on the y values for this category: ' + str(category))
+                print(pd.Series(relevant_y).describe(include='all'))
 
 
-            try:
-                category_trained_final_model = self.train_ml_estimator(self.model_names, self._scorer, relevant_X, relevant_y)
-            except ValueError as e:
-                if 'BinomialDeviance requires 2 classes' in str(e) or 'BinomialDeviance requires 2 classes' in e or 'BinomialDeviance requires 2 classes':
-                    print('Found a category with only one label')
-                    print('category: ' + str(category) + ', label: ' + str(relevant_y[0]))
-                    print('We will put in place a weak estimator trained on only this category/single-label, but consider some feature engineering work to combine this with a different category, or remove it altogether and use the default category when getting predictions for this category.')
-                    # This handles the edge case of having only one label for a given category
-                    # In that case, some models are perfectly fine being 100% correct, while others freak out
-                    # RidgeClassifier seems ok at just picking the same value each time. And using it instead of a custom function means we don't need to add in any custom logic for predict_proba or anything
-                    category_trained_final_model = self.train_ml_estimator(['RidgeClassifier'], self._scorer, relevant_X, relevant_y)
+                try:
+                    with self.get_telemetry().phase('fit_category_model', category=category, num_rows=len(relevant_y)):
+                        category_trained_final_model = self.train_ml_estimator(self.model_names, self._scorer, relevant_X, relevant_y)
+                except ValueError as e:
+                    if 'BinomialDeviance requires 2 classes' in str(e) or 'BinomialDeviance requires 2 classes' in e or 'BinomialDeviance requires 2 classes':
+                        print('Found a category with only one label')
+                        print('category: ' + str(category) + ', label: ' + str(relevant_y[0]))
+                        print('We will put in place a weak estimator trained on only this category/single-label, but consider some feature engineering work to combine this with a different category, or remove it altogether and use the default category when getting predictions for this category.')
+                        # This handles the edge case of having only one label for a given category
+                        # In that case, some models are perfectly fine being 100% correct, while others freak out
+                        # RidgeClassifier seems ok at just picking the same value each time. And using it instead of a custom function means we don't need to add in any custom logic for predict_proba or anything
+                        category_trained_final_model = self.train_ml_estimator(['RidgeClassifier'], self._scorer, relevant_X, relevant_y)
+                    else:
+                        raise
+
+                self.trained_category_models[category] = category_trained_final_model
+
+                try:
+                    category_length = len(relevant_X)
+                except TypeError:
+                    category_length = relevant_X.shape[0]
+
+                result = {
+                    'trained_category_model': category_trained_final_model
+                    , 'category': category
+                    , 'len_relevant_X': category_length
+                }
+                return result
+
+
+            if os.environ.get('is_test_suite', False) == 'True':
+                # If this is the test_suite, do not run things in parallel
+                results = list(map(lambda x: train_one_categorical_model(x[0], x[1], x[2]), categories_and_data))
+            else:
+
+                pool = pathos.multiprocessing.ProcessPool()
+
+                # Since we may have already closed the pool, try to restart it
+                try:
+                    pool.restart()
+                except AssertionError as e:
+                    pass
+
+                try:
+                    results = list(pool.map(lambda x: train_one_categorical_model(x[0], x[1], x[2]), categories_and_data))
+                except RuntimeError:
+                    # Deep Learning models require a ton of recursion. I've tried to work around it, but sometimes we just need to brute force the solution here
+                    original_recursion_limit = sys.getrecursionlimit()
+                    sys.setrecursionlimit(10000)
+                    results = list(pool.map(lambda x: train_one_categorical_model(x[0], x[1], x[2]), categories_and_data))
+                    sys.setrecursionlimit(original_recursion_limit)
+
+                # Once we have gotten all we need from the pool, close it so it's not taking up unnecessary memory
+                pool.close()
+                try:
+                    pool.join()
+                except AssertionError:
+                    pass
+
+            for result in results:
+                if result['trained_category_model'] is not None:
+                    category = result['category']
+                    self.trained_category_models[category] = result['trained_category_model']
+                    if self.search_for_default_category == True and result['len_relevant_X'] > self.len_largest_category:
+                        self.default_category = category
+                        self.len_largest_category = result['len_relevant_X']
+
+            print('Finished training all the category models!')
+
+            if self.search_for_default_category == True:
+                print('By default, auto_ml finds the largest category, and uses that if asked to get predictions for any rows which come from a category that was not included in the training data (i.e., if you launch a new market and ask us to get predictions for it, we will default to using your largest market to get predictions for the market that was not included in the training data')
+                print('To avoid this behavior, you can either choose your own default category (the "default_category" parameter to train_categorical_ensemble), or pass in "_RAISE_ERROR" as the value for default_category, and we will raise an error when trying to get predictions for a row coming from a category that was not included in the training data.')
+                print('\n\nHere is the default category we selected:')
+                print(self.default_category)
+                if self.default_category == '_all_small_categories':
+                    print('In this case, it is all the categories that did not meet the min_category_size threshold, combined together into their own "_all_small_categories" category.')
+
+            categorical_ensembler = utils_categorical_ensembling.CategoricalEnsembler(self.trained_category_models, self.transformation_pipeline, self.categorical_column, self.default_category)
+            self.trained_pipeline = categorical_ensembler
+
+
+    # Trains one final model for each of several output columns, all on top of a single transformation pipeline that we only fit (and run over the training data) once
+    # outputs maps each extra output column to either 'regressor' or 'classifier'. Our own output column from column_descriptions is always trained as well, and is the target that target encoding and feature selection get fit against
+    def train_multi(self, data, outputs, training_callback=None, telemetry_file=None, **kwargs):
+        # Each of these depends on having a single output column
+        # time_budget is shared out between the models we train one after another, which does not fit training several targets at once
+        unsupported_params = ['X_test', 'y_test', 'take_log_of_y', 'feature_learning', 'train_uncertainty_model', 'calibrate_final_model', 'prediction_intervals', 'predict_intervals', 'ensemble_config', 'trained_transformation_pipeline', 'transformed_X', 'warm_start_from', 'return_transformation_pipeline', 'time_budget']
+        for param in unsupported_params:
+            if kwargs.get(param) not in [None, False]:
+                print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+                print('train_multi does not support ' + param + '. Please train a separate predictor for any output column that needs it.')
+                print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+                raise ValueError('train_multi does not support ' + param)
+
+        # time_budget is a param of train() itself, rather than of set_params_and_defaults
+        kwargs.pop('time_budget', None)
+        # Make sure a time_budget left over from an earlier call to train() does not apply here
+        self.time_budget = None
+
+        self.telemetry = utils_telemetry.TrainingTelemetry(callback=training_callback, telemetry_file=telemetry_file, name=self.name, verbose=kwargs.get('verbose', True))
+        with utils_telemetry.use_telemetry(self.telemetry), self.telemetry.phase('train_multi', num_outputs=len(outputs) + 1, **utils_telemetry.get_data_shape(data)):
+            if isinstance(outputs, list):
+                outputs = OrderedDict((output_column, self.type_of_estimator) for output_column in outputs)
+
+            self.target_types = OrderedDict()
+            self.target_types[self.output_column] = self.type_of_estimator
+            for output_column, type_of_estimator in outputs.items():
+                if type_of_estimator not in ['regressor', 'classifier']:
+                    print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+                    print('Each value in outputs must be either "regressor" or "classifier". For the output column ' + str(output_column) + ', we received:')
+                    print(type_of_estimator)
+                    print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+                    raise ValueError('Invalid type_of_estimator in outputs for ' + str(output_column))
+                self.target_types[output_column] = type_of_estimator
+            self.type_of_estimator = self.target_types[self.output_column]
+
+            if isinstance(data, list):
+                data = pd.DataFrame(data)
+            elif utils_arrow.is_arrow_input(data):
+                data = utils_arrow.to_dataframe(data, exclude_columns=self.cols_to_ignore)
+
+            missing_output_columns = [output_column for output_column in self.target_types if output_column not in data.columns]
+            if len(missing_output_columns) > 0:
+                print('These output columns are not in the training data:')
+                print(missing_output_columns)
+                raise ValueError('Every output column passed to train_multi must be in the training data')
+
+            # The other output columns are pulled out here, so they never become features. Once data cleaning has dropped whatever rows it needs to, we look up each remaining row's values by its original position
+            data = data.reset_index(drop=True)
+            other_output_columns = [output_column for output_column in self.target_types if output_column != self.output_column]
+            other_target_vals = dict((output_column, data[output_column].values) for output_column in other_output_columns)
+            data = data.drop(other_output_columns, axis=1)
+            # Copy column_descriptions before removing the other output columns, so we do not change the dictionary the user passed in
+            self.column_descriptions = dict(self.column_descriptions)
+            for output_column in other_output_columns:
+                self.column_descriptions.pop(output_column, None)
+
+            self.set_params_and_defaults(data, **kwargs)
+
+            X_df, y = self._clean_data_and_prepare_for_training(data, self.scoring)
+            del data
+            row_indices = np.asarray(X_df.index)
+            X_df = X_df.reset_index(drop=True)
+            self.training_features = list(X_df.columns)
+
+            primary_output_column = self.output_column
+            primary_type_of_estimator = self.type_of_estimator
+            original_scoring = kwargs.get('scoring')
+            original_training_params = self.training_params
+            primary_scorer = self._scorer
+
+            # model_names applies to every target of the same type as this predictor. Targets of the other type use our default models
+            target_model_names = OrderedDict()
+            for output_column, type_of_estimator in self.target_types.items():
+                if type_of_estimator == primary_type_of_estimator:
+                    target_model_names[output_column] = self.model_names
+                else:
+                    self.type_of_estimator = type_of_estimator
+                    target_model_names[output_column] = self._get_estimator_names()
+            self.type_of_estimator = primary_type_of_estimator
+
+            print('Now fitting a single feature transformation pipeline that will be shared by the models for all ' + str(len(self.target_types)) + ' output columns')
+            all_model_names = [model_name for model_names in target_model_names.values() for model_name in model_names]
+            X_transformed = self.fit_transformation_pipeline(X_df, y, all_model_names)
+            del X_df
+
+            targets_and_data = []
+            for output_column, type_of_estimator in self.target_types.items():
+                if output_column == primary_output_column:
+                    target_y = y
                 else:
-                    raise
+                    target_y = other_target_vals[output_column][row_indices]
+                targets_and_data.append([output_column, type_of_estimator, target_y])
 
-            self.trained_category_models[category] = category_trained_final_model
+            def train_one_target_model(output_column, type_of_estimator, target_y):
+                print('\n\nNow training a new estimator for the output column: ' + str(output_column))
 
-            try:
-                category_length = len(relevant_X)
-            except TypeError:
-                category_length = relevant_X.shape[0]
+                self.output_column = output_column
+                self.type_of_estimator = type_of_estimator
+                self.scoring = original_scoring
+                self.training_params = deepcopy(original_training_params)
 
-            result = {
-                'trained_category_model': category_trained_final_model
-                , 'category': category
-                , 'len_relevant_X': category_length
-            }
-            return result
+                # Rows missing a value for this output column are only dropped for this output column's model
+                target_X, target_y = self._clean_y_vals(X_transformed, target_y)
+                self.set_scoring(target_y, scoring=original_scoring)
 
+                with self.get_telemetry().phase('fit_target_model', output_column=output_column, num_rows=len(target_y)):
+                    trained_target_model = self.train_ml_estimator(target_model_names[output_column], self._scorer, target_X, target_y)
 
-        if os.environ.get('is_test_suite', False) == 'True':
-            # If this is the test_suite, do not run things in parallel
-            results = list(map(lambda x: train_one_categorical_model(x[0], x[1], x[2]), categories_and_data))
-        else:
+                return {
+                    'output_column': output_column
+                    , 'trained_target_model': trained_target_model
+                }
 
-            pool = pathos.multiprocessing.ProcessPool()
 
-            # Since we may have already closed the pool, try to restart it
             try:
-                pool.restart()
-            except AssertionError as e:
-                pass
+                if os.environ.get('is_test_suite', False) == 'True':
+                    # If this is the test_suite, do not run things in parallel
+                    results = list(map(lambda x: train_one_target_model(x[0], x[1], x[2]), targets_and_data))
+                else:
 
-            try:
-                results = list(pool.map(lambda x: train_one_categorical_model(x[0], x[1], x[2]), categories_and_data))
-            except RuntimeError:
-                # Deep Learning models require a ton of recursion. I've tried to work around it, but sometimes we just need to brute force the solution here
-                original_recursion_limit = sys.getrecursionlimit()
-                sys.setrecursionlimit(10000)
-                results = list(pool.map(lambda x: train_one_categorical_model(x[0], x[1], x[2]), categories_and_data))
-                sys.setrecursionlimit(original_recursion_limit)
-
-            # Once we have gotten all we need from the pool, close it so it's not taking up unnecessary memory
-            pool.close()
-            try:
-                pool.join()
-            except AssertionError:
-                pass
+                    pool = pathos.multiprocessing.ProcessPool()
 
-        for result in results:
-            if result['trained_category_model'] is not None:
-                category = result['category']
-                self.trained_category_models[category] = result['trained_category_model']
-                if self.search_for_default_category == True and result['len_relevant_X'] > self.len_largest_category:
-                    self.default_category = category
-                    self.len_largest_category = result['len_relevant_X']
+                    # Since we may have already closed the pool, try to restart it
+                    try:
+                        pool.restart()
+                    except AssertionError as e:
+                        pass
 
-        print('Finished training all the category models!')
+                    results = list(pool.map(lambda x: train_one_target_model(x[0], x[1], x[2]), targets_and_data))
 
-        if self.search_for_default_category == True:
-            print('By default, auto_ml finds the largest category, and uses that if asked to get predictions for any rows which come from a category that was not included in the training data (i.e., if you launch a new market and ask us to get predictions for it, we will default to using your largest market to get predictions for the market that was not included in the training data')
-            print('To avoid this behavior, you can either choose your own default category (the "default_category" parameter to train_categorical_ensemble), or pass in "_RAISE_ERROR" as the value for default_category, and we will raise an error when trying to get predictions for a row coming from a category that was not included in the training data.')
-            print('\n\nHere is the default category we selected:')
-            print(self.default_category)
-            if self.default_category == '_all_small_categories':
-                print('In this case, it is all the categories that did not meet the min_category_size threshold, combined together into their own "_all_small_categories" category.')
+                    # Once we have gotten all we need from the pool, close it so it's not taking up unnecessary memory
+                    pool.close()
+                    try:
+                        pool.join()
+                    except AssertionError:
+                        pass
+            finally:
+                # When we train the targets one after another, each one has overwritten these on this predictor
+                self.output_column = primary_output_column
+                self.type_of_estimator = primary_type_of_estimator
+                self.scoring = original_scoring
+                self.training_params = original_training_params
+                self._scorer = primary_scorer
 
-        categorical_ensembler = utils_categorical_ensembling.CategoricalEnsembler(self.trained_category_models, self.transformation_pipeline, self.categorical_column, self.default_category)
-        self.trained_pipeline = categorical_ensembler
+            self.trained_target_models = OrderedDict()
+            for result in results:
+                self.trained_target_models[result['output_column']] = result['trained_target_model']
+
+            print('Finished training models for all ' + str(len(self.trained_target_models)) + ' output columns!')
+            print('Calling .predict() now returns a dictionary from each output column to its predictions')
+
+            self.trained_pipeline = utils_multi_target.MultiTargetPipeline(self.trained_target_models, self.transformation_pipeline, dict(self.target_types))
+
+        return self
 
 
     def _join_and_print_analytics_results(self, df_feature_responses, df_features, sort_field):
@@ -1697,10 +2227,57 @@ class Predictor(object):
                     raise(e)
 
 
-    def predict(self, prediction_data):
+    # Updates the trained final model with new rows, without retraining on the whole history
+    # The new rows go through the already trained transformation pipeline unchanged. Only the final model learns anything, which requires a model with a partial_fit method (SGDRegressor, SGDClassifier, PassiveAggressiveRegressor, PassiveAggressiveClassifier, Perceptron)
+    # Categorical values we did not see during training are dropped, unless we trained with categorical_hash_buckets, in which case they each go into one of their column's shared slots
+    def partial_fit(self, data):
+        final_model = self.trained_pipeline.named_steps['final_model']
+        if not hasattr(final_model.model, 'partial_fit'):
+            print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+            print('partial_fit requires a final model that supports partial_fit, such as SGDRegressor, SGDClassifier, PassiveAggressiveRegressor, PassiveAggressiveClassifier, or Perceptron. This pipeline was trained with:')
+            print(final_model.model_name)
+            print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+            raise ValueError('The final model does not support partial_fit')
+
+        if isinstance(data, dict):
+            data = [data]
+        X_df = self._prepare_prediction_data(data, extra_columns=[self.output_column])
+
+        y = X_df[self.output_column].values
+        X_df = X_df.drop([col for col in X_df.columns if col == self.output_column or col in self.cols_to_ignore], axis=1)
+        X_df, y = self._clean_y_vals(X_df, y)
+        if len(y) == 0:
+            return self
+
+        if self.took_log_of_y:
+            y = np.log(y)
+
+        with self.get_telemetry().phase('partial_fit', model_name=final_model.model_name, **utils_telemetry.get_data_shape(X_df)):
+            for step_name, step in self.trained_pipeline.steps[:-1]:
+                if step is not None:
+                    X_df = step.transform(X_df)
+
+            final_model.partial_fit(X_df, y)
+
+        # Anything we cached came from the model before this update
+        prediction_cache = getattr(self.trained_pipeline, 'prediction_cache', None)
+        if prediction_cache is not None:
+            prediction_cache.clear()
+
+        return self
+
+
+    # Arrow tables and Parquet files only have the raw columns our trained pipeline actually uses read in. Everything else gets copied, so we never modify the user's data
+    def _prepare_prediction_data(self, prediction_data, extra_columns=None):
+        if utils_arrow.is_arrow_input(prediction_data):
+            return utils_arrow.to_dataframe(prediction_data, columns=utils_arrow.get_columns_for_pipeline(self.trained_pipeline, extra_columns=extra_columns))
         if isinstance(prediction_data, list):
-            prediction_data = pd.DataFrame(prediction_data)
-        prediction_data = prediction_data.copy()
+            return pd.DataFrame(prediction_data)
+        return prediction_data.copy()
+
+
+    def predict(self, prediction_data):
+        prediction_data = self._prepare_prediction_data(prediction_data)
 
         predicted_vals = self.trained_pipeline.predict(prediction_data)
         if self.took_log_of_y:
@@ -1710,7 +2287,7 @@ class Predictor(object):
         return predicted_vals
 
     def predict_uncertainty(self, prediction_data):
-        prediction_data = prediction_data.copy()
+        prediction_data = self._prepare_prediction_data(prediction_data)
 
         predicted_vals = self.trained_pipeline.predict_uncertainty(prediction_data)
 
@@ -1718,23 +2295,27 @@ class Predictor(object):
 
     def predict_intervals(self, prediction_data, return_type=None):
 
-        prediction_data = prediction_data.copy()
+        prediction_data = self._prepare_prediction_data(prediction_data)
 
         return self.trained_pipeline.predict_intervals(prediction_data, return_type=return_type)
 
 
     def predict_proba(self, prediction_data):
-        if isinstance(prediction_data, list):
-            prediction_data = pd.DataFrame(prediction_data)
-        prediction_data = prediction_data.copy()
+        prediction_data = self._prepare_prediction_data(prediction_data)
 
         return self.trained_pipeline.predict_proba(prediction_data)
 
 
-    def score(self, X_test, y_test, advanced_scoring=True, verbose=2):
+    # If y_test is not passed in, we use the output column from X_test
+    def score(self, X_test, y_test=None, advanced_scoring=True, verbose=2):
 
         if isinstance(X_test, list):
             X_test = pd.DataFrame(X_test)
+        elif utils_arrow.is_arrow_input(X_test):
+            X_test = self._prepare_prediction_data(X_test, extra_columns=[self.output_column])
+
+        if y_test is None:
+            y_test = X_test[self.output_column]
         y_test = list(y_test)
 
         X_test, y_test = utils.drop_missing_y_vals(X_test, y_test, self.output_column)
@@ -1758,61 +2339,98 @@ class Predictor(object):
             return self.trained_pipeline.score(X_test, y_test)
 
 
-    def define_uncertain_predictions(self, base_predictions, y):
-        if not (isinstance(base_predictions[0], float) or isinstance(base_predictions[0], int)):
-            base_predictions = [row[0] for row in base_predictions]
+    # Scores the trained pipeline on a stream of chunks (for instance, pd.read_csv(file_name, chunksize=100000)), so we never need the whole test set in memory at once
+    # Each chunk is either a DataFrame (or list of dictionaries) that includes the output column, or an (X, y) tuple
+    # chunks can also be an Arrow table, or the path to a Parquet file, which we read in batches of batch_size rows, only reading the columns we need
+    # Medians and deciles are approximate: they come from a fixed-size sketch, whose size is set by sketch_size
+    def score_chunks(self, chunks, advanced_scoring=True, verbose=2, sketch_size=5000, batch_size=100000):
+        scoring_method = getattr(self._scorer, 'scoring_method', None)
+        if scoring_method is None:
+            scoring_method = 'rmse' if self.type_of_estimator == 'regressor' else 'brier_score_loss'
 
-        base_predictions = list(base_predictions)
+        if scoring_method not in utils_scoring.streaming_scoring_methods:
+            print('score_chunks can only calculate these scoring methods:')
+            print(sorted(utils_scoring.streaming_scoring_methods.keys()))
+            print('This predictor was trained to optimize for:')
+            print(scoring_method)
+            raise ValueError('score_chunks does not support the scoring method ' + str(scoring_method) + '. Please use .score() instead.')
 
-        is_uncertain_predictions = []
+        if self.type_of_estimator == 'regressor':
+            accumulator = utils_scoring.RegressionScoreAccumulator(sketch_size=sketch_size)
+        else:
+            accumulator = utils_scoring.ClassificationScoreAccumulator(sketch_size=sketch_size)
 
-        for idx, y_val in enumerate(y):
+        if utils_arrow.is_arrow_input(chunks):
+            columns = utils_arrow.get_columns_for_pipeline(self.trained_pipeline, extra_columns=[self.output_column])
+            chunks = utils_arrow.iter_dataframes(chunks, columns=columns, batch_size=batch_size)
 
-            base_prediction_for_row = base_predictions[idx]
-            delta = base_prediction_for_row - y_val
+        for chunk in chunks:
+            if isinstance(chunk, tuple):
+                X_chunk, y_chunk = chunk
+            else:
+                if isinstance(chunk, list):
+                    chunk = pd.DataFrame(chunk)
+                X_chunk = chunk
+                y_chunk = chunk[self.output_column]
 
-            if self.uncertainty_delta_units == 'absolute':
-                if self.uncertainty_delta_direction == 'both':
-                    if abs(delta) > self.uncertainty_delta:
-                        is_uncertain_predictions.append(1)
-                    else:
-                        is_uncertain_predictions.append(0)
+            if isinstance(X_chunk, list):
+                X_chunk = pd.DataFrame(X_chunk)
 
-                else:
-                    # This is now the case of single-directional deltas (we only care if our predictions are higher, not lower, or lower and not higher)
-                    if self.uncertainty_delta > 0:
-                        if delta > self.uncertainty_delta:
-                            is_uncertain_predictions.append(1)
-                        else:
-                            is_uncertain_predictions.append(0)
-                    else:
-                        # This is the case where we have directional deltas, and the uncertainty_delta < 0
-                        if delta < self.uncertainty_delta:
-                            is_uncertain_predictions.append(1)
-                        else:
-                            is_uncertain_predictions.append(0)
+            X_chunk, y_chunk = utils.drop_missing_y_vals(X_chunk, y_chunk, self.output_column)
+            if len(y_chunk) == 0:
+                continue
 
-            elif self.uncertainty_delta_units == 'percentage':
-                if self.uncertainty_delta_direction == 'both':
-                    if abs(delta) / y_val > self.uncertainty_delta:
-                        is_uncertain_predictions.append(1)
-                    else:
-                        is_uncertain_predictions.append(0)
-                else:
-                    # This is now the case of single-directional deltas (we only care if our predictions are higher, not lower, or lower and not higher)
-                    if self.uncertainty_delta > 0:
-                        if delta / y_val > self.uncertainty_delta:
-                            is_uncertain_predictions.append(1)
-                        else:
-                            is_uncertain_predictions.append(0)
-                    else:
-                        # This is the case where we have directional deltas, and the uncertainty_delta < 0
-                        if delta / y_val < self.uncertainty_delta:
-                            is_uncertain_predictions.append(1)
-                        else:
-                            is_uncertain_predictions.append(0)
+            if self.type_of_estimator == 'regressor':
+                predictions = np.asarray(self.trained_pipeline.predict(X_chunk), dtype=float)
+                if self.took_log_of_y:
+                    predictions = np.exp(predictions)
+                accumulator.update(predictions, y_chunk)
+            else:
+                probas = np.asarray(self.trained_pipeline.predict_proba(X_chunk))
+                if probas.ndim == 2 and probas.shape[1] > 2:
+                    raise ValueError('score_chunks only supports binary classifiers. Please use .score() for multiclass classifiers.')
+                accumulator.update(probas, y_chunk)
+
+        if accumulator.get_count() == 0:
+            raise ValueError('score_chunks did not find any rows with a valid value for ' + str(self.output_column) + ' to score')
+
+        if advanced_scoring:
+            if self.type_of_estimator == 'regressor':
+                accumulator.print_results(verbose=verbose, name=self.name)
+            else:
+                accumulator.print_results(name=self.name)
 
-        return is_uncertain_predictions
+        results = accumulator.get_results()
+        # Matching .score(), higher is always better
+        return -1 * results[utils_scoring.streaming_scoring_methods[scoring_method]]
+
+
+    def define_uncertain_predictions(self, base_predictions, y):
+        base_predictions = np.asarray(base_predictions, dtype=float)
+        if base_predictions.ndim == 2:
+            base_predictions = base_predictions[:, 0]
+
+        y = np.asarray(y, dtype=float)
+        deltas = base_predictions - y
+
+        # For 'both' directions, we care about how far off we are. Otherwise, we care about which direction we are off in (only if our predictions are higher, not lower, or lower and not higher)
+        if self.uncertainty_delta_direction == 'both':
+            deltas = np.abs(deltas)
+
+        if self.uncertainty_delta_units == 'percentage':
+            deltas = deltas / y
+        elif self.uncertainty_delta_units != 'absolute':
+            print('uncertainty_delta_units must be either "absolute" or "percentage". You passed in:')
+            print(self.uncertainty_delta_units)
+            raise ValueError('Invalid value for uncertainty_delta_units: ' + str(self.uncertainty_delta_units))
+
+        if self.uncertainty_delta_direction == 'both' or self.uncertainty_delta > 0:
+            is_uncertain_predictions = deltas > self.uncertainty_delta
+        else:
+            # This is the case where we have directional deltas, and the uncertainty_delta < 0
+            is_uncertain_predictions = deltas < self.uncertainty_delta
+
+        return is_uncertain_predictions.astype(int).tolist()
 
 
 
@@ -1830,7 +2448,17 @@ class Predictor(object):
         return self.transformation_pipeline.transform(X)
 
 
-    def save(self, file_name='auto_ml_saved_pipeline.dill', verbose=True):
+    def save(self, file_name='auto_ml_saved_pipeline.dill', verbose=True, file_format='dill'):
+        with self.get_telemetry().phase('save', file_name=file_name, file_format=file_format):
+            return self._save(file_name, verbose=verbose, file_format=file_format)
+
+
+    def _save(self, file_name='auto_ml_saved_pipeline.dill', verbose=True, file_format='dill'):
+
+        if file_format not in ['dill', 'artifact']:
+            print('file_format must be one of ["dill", "artifact"]. You passed in:')
+            print(file_format)
+            raise ValueError('Unsupported file_format for .save(): ' + str(file_format))
 
         make_feature_importances = True
         try:
@@ -1854,6 +2482,21 @@ class Predictor(object):
             self.trained_pipeline.feature_importances_ = importances_dict
 
 
+        if file_format == 'artifact':
+            # Artifacts store each model in its own native format, so we do not need to pull the Keras models out of the pipeline before saving it
+            utils_model_artifacts.save_artifact(self.trained_pipeline, file_name)
+
+            if verbose:
+                print('\n\nWe have saved the trained pipeline as an artifact directory called "' + file_name + '"')
+                print('It is saved in the directory: ')
+                print(os.getcwd())
+                print('To use it to get predictions, please follow the following flow (adjusting for your own uses as necessary:\n\n')
+                print('`from auto_ml.utils_models import load_ml_model')
+                print('`trained_ml_pipeline = load_ml_model("' + file_name + '")')
+                print('`trained_ml_pipeline.predict(data)`\n\n')
+
+            return os.path.join(os.getcwd(), file_name)
+
         def save_one_step(pipeline_step, used_deep_learning):
             try:
                 if pipeline_step.model_name[:12] == 'DeepLearning':
@@ -1889,7 +2532,7 @@ class Predictor(object):
 
         # This is where we will store all of our Keras models by their name, so we can put them back in place once we've taken them out and saved the rest of the pipeline
         model_name_map = {}
-        if isinstance(self.trained_pipeline, utils_categorical_ensembling.CategoricalEnsembler):
+        if isinstance(self.trained_pipeline, (utils_categorical_ensembling.CategoricalEnsembler, utils_multi_target.MultiTargetPipeline)):
             for step in self.trained_pipeline.transformation_pipeline.named_steps:
                 pipeline_step = self.trained_pipeline.transformation_pipeline.named_steps[step]
 
@@ -1915,7 +2558,7 @@ class Predictor(object):
 
         # If we used deep learning, put the models back in place, so the predictor instance that's already loaded in memory will continue to work like the user expects (rather than forcing them to load it back in from disk again)
         if used_deep_learning == True:
-            if isinstance(self.trained_pipeline, utils_categorical_ensembling.CategoricalEnsembler):
+            if isinstance(self.trained_pipeline, (utils_categorical_ensembling.CategoricalEnsembler, utils_multi_target.MultiTargetPipeline)):
                 for step in self.trained_pipeline.transformation_pipeline.named_steps:
                     pipeline_step = self.trained_pipeline.transformation_pipeline.named_steps[step]
 
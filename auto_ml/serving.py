@@ -0,0 +1,69 @@
+# Everything needed to load a saved pipeline and get predictions from it, and nothing more
+# Importing auto_ml.predictor pulls in every library we use for training (deap, pathos, every scikit-learn estimator, etc.), which adds seconds to the startup time of a process that only ever needs to get predictions
+# Usage: from auto_ml.serving import load_ml_model
+import os
+import warnings
+
+from auto_ml import utils_categorical_ensembling
+from auto_ml import utils_multi_target
+
+
+def insert_deep_learning_model(pipeline_step, file_name):
+    # This is where we saved the random_name for this model
+    random_name = pipeline_step.model
+    # Load the Keras model here
+    keras_file_name = file_name[:-5] + random_name + '_keras_deep_learning_model.h5'
+
+    from keras.models import load_model as keras_load_model
+    model = keras_load_model(keras_file_name)
+
+    # Put the model back in place so that we can still use it to get predictions without having to load it back in from disk
+    return model
+
+
+def load_ml_model(file_name, mmap=False, lazy_categories=False, max_loaded_categories=None, max_loaded_category_mb=None):
+
+    # Pipelines saved with file_format='artifact' are a directory of plain files, rather than a single dill file
+    if os.path.isdir(file_name):
+        from auto_ml import utils_model_artifacts
+        return utils_model_artifacts.load_artifact(file_name, mmap=mmap, lazy_categories=lazy_categories, max_loaded_categories=max_loaded_categories, max_loaded_category_mb=max_loaded_category_mb)
+
+    if mmap == True:
+        warnings.warn('mmap=True only applies to pipelines saved with file_format="artifact". We are loading this dill file into memory as usual.')
+    if lazy_categories == True:
+        warnings.warn('lazy_categories=True only applies to pipelines saved with file_format="artifact". We are loading every category\'s model from this dill file up front.')
+
+    import dill
+    with open(file_name, 'rb') as read_file:
+        base_pipeline = dill.load(read_file)
+
+    if isinstance(base_pipeline, (utils_categorical_ensembling.CategoricalEnsembler, utils_multi_target.MultiTargetPipeline)):
+        for step in base_pipeline.transformation_pipeline.named_steps:
+            pipeline_step = base_pipeline.transformation_pipeline.named_steps[step]
+
+            try:
+                if pipeline_step.get('model_name', 'reallylongnonsensicalstring')[:12] == 'DeepLearning':
+                    pipeline_step.model = insert_deep_learning_model(pipeline_step, file_name)
+            except AttributeError:
+                pass
+
+        for step in base_pipeline.trained_models:
+            pipeline_step = base_pipeline.trained_models[step]
+
+            try:
+                if pipeline_step.get('model_name', 'reallylongnonsensicalstring')[:12] == 'DeepLearning':
+                    pipeline_step.model = insert_deep_learning_model(pipeline_step, file_name)
+            except AttributeError:
+                pass
+
+    else:
+
+        for step in base_pipeline.named_steps:
+            pipeline_step = base_pipeline.named_steps[step]
+            try:
+                if pipeline_step.get('model_name', 'reallylongnonsensicalstring')[:12] == 'DeepLearning':
+                    pipeline_step.model = insert_deep_learning_model(pipeline_step, file_name)
+            except AttributeError:
+                pass
+
+    return base_pipeline
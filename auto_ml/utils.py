@@ -2,13 +2,11 @@ import csv
 import datetime
 import numbers
 import os
-import pkg_resources
+import zlib
 
 import numpy as np
 import pandas as pd
 import scipy
-from sklearn.datasets import load_boston
-from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import LabelEncoder
 from sklearn.utils.metaestimators import if_delegate_has_method
@@ -117,6 +115,9 @@ def drop_duplicate_columns(df):
 
 
 def get_boston_dataset():
+    from sklearn.datasets import load_boston
+    from sklearn.model_selection import train_test_split
+
     boston = load_boston()
     df_boston = pd.DataFrame(boston.data)
     df_boston.columns = boston.feature_names
@@ -139,59 +140,167 @@ def delete_rows_csr(mat, indices):
     return mat[mask]
 
 
-def drop_missing_y_vals(df, y, output_column=None):
+# Returns a boolean mask of every y value that is missing (nan, None, inf, 'NULL', etc.)
+# Numeric arrays only need a single isfinite check. Everything else gets checked with vectorized pandas lookups, rather than turning every value into a string
+def get_missing_y_mask(y):
+    y = np.asarray(y)
+    if y.dtype.kind in ('b', 'i', 'u'):
+        return np.zeros(len(y), dtype=bool)
+    elif y.dtype.kind in ('f', 'c'):
+        return ~np.isfinite(y)
 
-    y = list(y)
-    indices_to_drop = []
-    indices_to_keep = []
-    for idx, val in enumerate(y):
-        if not isinstance(val, str):
-            if isinstance(val, numbers.Number) or val is None or isinstance(val, np.generic):
-                val = str(val)
-            else:
-                val = val.encode('utf-8').decode('utf-8')
+    y_series = pd.Series(y)
+    missing_mask = y_series.isnull() | y_series.isin(bad_vals_as_strings) | y_series.isin([float('inf'), float('-inf')])
+    return missing_mask.values
 
-        if val in bad_vals_as_strings:
-            indices_to_drop.append(idx)
 
-    if len(indices_to_drop) > 0:
-        set_of_indices_to_drop = set(indices_to_drop)
+def drop_rows(data, rows_to_drop_mask):
+    if isinstance(data, pd.DataFrame):
+        return data.drop(data.index[np.flatnonzero(rows_to_drop_mask)], axis=0)
+    elif scipy.sparse.issparse(data):
+        return data.tocsr()[~rows_to_drop_mask]
+    return np.asarray(data)[~rows_to_drop_mask]
+
+
+# Returns y as a numpy array, with the rows for any missing y values removed from both df and y
+def drop_missing_y_vals(df, y, output_column=None):
 
+    y = np.asarray(y)
+    missing_mask = get_missing_y_mask(y)
+    num_missing = int(missing_mask.sum())
+
+    if num_missing > 0:
         print('We encountered a number of missing values for this output column')
         if output_column is not None:
             print(output_column)
         print('And here is the number of missing (nan, None, etc.) values for this column:')
-        print(len(indices_to_drop))
+        print(num_missing)
         print('Here are some example missing values')
-        for idx, df_idx in enumerate(indices_to_drop):
-            if idx >= 5:
-                break
-            print(y[df_idx])
+        for val in y[missing_mask][:5]:
+            print(val)
         print('We will remove these values, and continue with training on the cleaned dataset')
 
-        support_mask = [True if idx not in set_of_indices_to_drop else False for idx in range(df.shape[0]) ]
-        if isinstance(df, pd.DataFrame):
-            df.drop(df.index[indices_to_drop], axis=0, inplace=True)
-            # df = df.loc[support_mask,]
-        elif scipy.sparse.issparse(df):
-            df = delete_rows_csr(df, indices_to_drop)
-        elif isinstance(df, np.ndarray):
-            df = np.delete(df, indices_to_drop, axis=0)
-        y = [val for idx, val in enumerate(y) if idx not in set_of_indices_to_drop]
-
+        df = drop_rows(df, missing_mask)
+        y = y[~missing_mask]
 
     return df, y
 
 
+# Cuts down on how much memory our training data takes up
+# float64 and int64 numerical columns become float32 (which is what DataFrameVectorizer turns them into anyway), and categorical columns with many repeated values become pandas categoricals
+def downcast_dtypes(df, column_descriptions):
+    num_rows = len(df)
+    for col in df.columns:
+        col_desc = column_descriptions.get(col)
+        dtype = df[col].dtype
+
+        if col_desc in (None, 'continuous', 'numerical', 'float', 'int'):
+            if dtype.kind in ('f', 'i', 'u') and dtype.itemsize > 4:
+                df[col] = df[col].astype(np.float32)
+
+        elif col_desc == 'categorical' and dtype == object:
+            # A categorical column stores each distinct value once, plus a small integer code per row. That only saves memory if values repeat
+            if df[col].nunique(dropna=False) < num_rows / 2:
+                df[col] = df[col].astype('category')
+
+    return df
+
+
+# Rare categorical values all share this one value, rather than each getting their own feature
+other_category = '__other__'
+
+
+# The string we use to represent a categorical value, both in feature names, and as a key for label encoding
+def get_category_key(val):
+    if not isinstance(val, str):
+        if isinstance(val, numbers.Number) or val is None or isinstance(val, np.generic):
+            val = str(val)
+        else:
+            val = val.encode('utf-8').decode('utf-8')
+    return val
+
+
+hash_bucket_category = '__hash_{}__'
+
+# Which of num_buckets shared slots a categorical value we have never seen before goes into
+# crc32 (unlike Python's own hash()) gives the same answer in every process, so a saved pipeline keeps routing each value to the same slot
+def get_hash_bucket_category(val, num_buckets):
+    return hash_bucket_category.format(zlib.crc32(get_category_key(val).encode('utf-8')) % num_buckets)
+
+
+# Counts every distinct value in a single vectorized pass, and returns the (string versions of the) values that are common enough to keep, most common first, along with whether we left any values out
+# min_frequency is either a number of rows, or (if it is less than 1) a fraction of all rows
+def get_frequent_categories(col_vals, min_frequency=None, max_categories=None):
+    if not isinstance(col_vals, pd.Series):
+        col_vals = pd.Series(col_vals)
+
+    value_counts = col_vals.value_counts(dropna=False)
+    # pandas categoricals report a count of 0 for categories that do not appear at all
+    value_counts = value_counts[value_counts > 0]
+    num_distinct_vals = len(value_counts)
+
+    if min_frequency is not None:
+        if min_frequency < 1:
+            min_frequency = min_frequency * len(col_vals)
+        value_counts = value_counts[value_counts >= min_frequency]
+    if max_categories is not None:
+        value_counts = value_counts.iloc[:max_categories]
+
+    frequent_vals = []
+    seen_vals = set()
+    for val in value_counts.index:
+        val = get_category_key(val)
+        if val not in seen_vals:
+            seen_vals.add(val)
+            frequent_vals.append(val)
+
+    return frequent_vals, len(value_counts) < num_distinct_vals
+
+
+# The (string versions of the) values in col_vals that are not in known_vals, most common first
+# If we are collapsing rare values, a value has to pass the same min_frequency test it would have during fit, and a column never ends up with more than max_categories values in total
+def get_new_categories(col_vals, known_vals, min_frequency=None, max_categories=None):
+    if min_frequency is None and max_categories is None:
+        if not isinstance(col_vals, pd.Series):
+            col_vals = pd.Series(col_vals)
+        candidate_vals = []
+        seen_vals = set()
+        for val in col_vals.unique():
+            val = get_category_key(val)
+            if val not in seen_vals:
+                seen_vals.add(val)
+                candidate_vals.append(val)
+    else:
+        candidate_vals, has_other = get_frequent_categories(col_vals, min_frequency=min_frequency)
+
+    new_vals = [val for val in candidate_vals if val not in known_vals and val != other_category]
+    if max_categories is not None:
+        num_known_vals = len([val for val in known_vals if val != other_category])
+        new_vals = new_vals[:max(0, max_categories - num_known_vals)]
+    return new_vals
+
+
 class CustomLabelEncoder():
 
     def __init__(self):
         self.label_map = {}
+        # Only set if fit collapsed rare values into a shared other_category. Every value we did not keep (or have never seen before) gets this index
+        self.other_index = None
 
 
-    def fit(self, list_of_labels):
+    def fit(self, list_of_labels, min_frequency=None, max_categories=None):
         if not isinstance(list_of_labels, pd.Series):
             list_of_labels = pd.Series(list_of_labels)
+
+        if min_frequency is not None or max_categories is not None:
+            frequent_labels, has_other = get_frequent_categories(list_of_labels, min_frequency=min_frequency, max_categories=max_categories)
+            for idx, val in enumerate(frequent_labels):
+                self.label_map[val] = idx
+            if has_other:
+                self.other_index = len(self.label_map)
+                self.label_map[other_category] = self.other_index
+            return self
+
         unique_labels = list_of_labels.unique()
         try:
             unique_labels = sorted(unique_labels)
@@ -212,15 +321,43 @@ class CustomLabelEncoder():
                 else:
                     val = val.encode('utf-8').decode('utf-8')
 
-            if val not in self.label_map:
+            if val in self.label_map:
+                return_vals.append(self.label_map[val])
+            elif getattr(self, 'other_index', None) is not None:
+                return_vals.append(self.other_index)
+            elif getattr(self, 'frozen', False) == True:
+                return_vals.append(self.unseen_index)
+            else:
                 self.label_map[val] = len(self.label_map.keys())
-            return_vals.append(self.label_map[val])
+                return_vals.append(self.label_map[val])
 
         if len(in_vals) == 1:
             return return_vals[0]
         else:
             return return_vals
 
+    # Adds labels we have not seen before (that are common enough to keep, if we are collapsing rare values), without changing the index of any label we already know
+    # Used when warm-starting from a previously trained pipeline
+    def extend(self, list_of_labels, min_frequency=None, max_categories=None):
+        new_labels = get_new_categories(list_of_labels, set(self.label_map.keys()), min_frequency=min_frequency, max_categories=max_categories)
+
+        next_index = max(self.label_map.values()) + 1 if len(self.label_map) > 0 else 0
+        for val in new_labels:
+            self.label_map[val] = next_index
+            next_index += 1
+
+        if getattr(self, 'frozen', False) == True:
+            self.unseen_index = next_index
+        return new_labels
+
+
+    # Once frozen, transform no longer learns new labels at prediction time.
+    # Every value we have not seen before gets the same reserved index instead, which keeps transform read-only
+    def freeze(self):
+        self.unseen_index = len(self.label_map)
+        self.frozen = True
+        return self
+
 
 class ExtendedLabelEncoder(LabelEncoder):
 
@@ -237,7 +374,14 @@ class ExtendedLabelEncoder(LabelEncoder):
         return np.searchsorted(self.classes_, y)[0]
 
 
+# Looking up every library's version through pkg_resources is slow, and the answer will not change while this process is running
+versions_cache = {}
+
 def get_versions():
+    if len(versions_cache) > 0:
+        return dict(versions_cache)
+
+    import pkg_resources
 
     libraries_to_check = ['dill', 'h5py', 'keras', 'lightgbm', 'numpy', 'pandas', 'pathos', 'python', 'scikit-learn', 'scipy', 'sklearn-deap2', 'tabulate', 'tensorflow', 'xgboost']
 
@@ -251,7 +395,8 @@ def get_versions():
         except:
             pass
 
-    return versions
+    versions_cache.update(versions)
+    return dict(versions)
 
 
 class ExtendedPipeline(Pipeline):
@@ -265,41 +410,144 @@ class ExtendedPipeline(Pipeline):
         self.training_features = training_features
 
 
-    @if_delegate_has_method(delegate='_final_estimator')
-    def predict_uncertainty(self, X):
+    # Used when loading a saved pipeline, which already knows which versions it was trained with. This skips looking up the versions of every library we might use
+    @classmethod
+    def _from_saved_steps(cls, steps, keep_cat_features=False, name=None, training_features=None, versions=None):
+        pipeline = cls.__new__(cls)
+        Pipeline.__init__(pipeline, steps)
+        pipeline.keep_cat_features = keep_cat_features
+        pipeline.__versions__ = versions
+        pipeline.name = name
+        pipeline.feature_importances_ = None
+        pipeline.training_features = training_features
+        return pipeline
+
+
+    # Makes every step of this trained pipeline read-only and side-effect-free, so that the same pipeline can be shared across threads without any locking
+    # Values we did not see during training get mapped to a reserved index, rather than being added to our encoders at prediction time
+    def freeze(self):
+        for name, step in self.steps:
+            if step is not None and hasattr(step, 'freeze'):
+                step.freeze()
+
+        self.frozen = True
+        return self
+
+
+    # Caches the results of predict, predict_proba, and predict_intervals for single dictionaries
+    # The cache key only includes the raw columns this pipeline actually uses, so two rows that only differ in columns we ignore share a cache entry
+    def enable_prediction_cache(self, max_size=10000, ttl_seconds=None):
+        from auto_ml.utils_prediction_cache import PredictionCache, get_used_raw_columns
+
+        self.prediction_cache = PredictionCache(max_size=max_size, ttl_seconds=ttl_seconds, used_raw_columns=get_used_raw_columns(self))
+        return self
+
+
+    def disable_prediction_cache(self):
+        self.prediction_cache = None
+        return self
+
+
+    # Records the wall time, rows processed, and output shape of every step, for transform and every kind of prediction
+    # Ensembles nested inside this pipeline share the same instrumentation, so their sub-models show up in get_stats() as well
+    def enable_instrumentation(self, callback=None, instrumentation=None, prefix=''):
+        from auto_ml.utils_instrumentation import PipelineInstrumentation
+
+        if instrumentation is None:
+            instrumentation = PipelineInstrumentation(callback=callback)
+        self.instrumentation = instrumentation
+        self.instrumentation_prefix = prefix
+
+        for name, step in self.steps:
+            if step is not None and hasattr(step, 'enable_instrumentation'):
+                step.enable_instrumentation(instrumentation=instrumentation, prefix=prefix + name + '.')
+        return self
+
+
+    def disable_instrumentation(self):
+        self.instrumentation = None
+        for name, step in self.steps:
+            if step is not None and hasattr(step, 'disable_instrumentation'):
+                step.disable_instrumentation()
+        return self
+
+
+    def get_stats(self):
+        instrumentation = getattr(self, 'instrumentation', None)
+        if instrumentation is None:
+            return {}
+        return instrumentation.get_stats()
+
+
+    def _run_transforms(self, X):
+        instrumentation = getattr(self, 'instrumentation', None)
         Xt = X
         for name, transform in self.steps[:-1]:
             if transform is not None:
-                Xt = transform.transform(Xt)
-        return self.steps[-1][-1].predict_uncertainty(Xt)
+                if instrumentation is None:
+                    Xt = transform.transform(Xt)
+                else:
+                    Xt = instrumentation.time_call(self.instrumentation_prefix + name, 'transform', lambda: transform.transform(Xt), Xt)
+        return Xt
+
+
+    # sklearn's Pipeline.transform hands off to _transform
+    def _transform(self, X):
+        instrumentation = getattr(self, 'instrumentation', None)
+        Xt = self._run_transforms(X)
+        name, final_step = self.steps[-1]
+        if final_step is None:
+            return Xt
+        if instrumentation is None:
+            return final_step.transform(Xt)
+        return instrumentation.time_call(self.instrumentation_prefix + name, 'transform', lambda: final_step.transform(Xt), Xt)
+
+
+    def _transform_and_call_final(self, method_name, X, **kwargs):
+        instrumentation = getattr(self, 'instrumentation', None)
+        Xt = self._run_transforms(X)
+        name, final_step = self.steps[-1]
+        if instrumentation is None:
+            return getattr(final_step, method_name)(Xt, **kwargs)
+        return instrumentation.time_call(self.instrumentation_prefix + name, method_name, lambda: getattr(final_step, method_name)(Xt, **kwargs), Xt)
+
+
+    def _predict_with_cache(self, method_name, X, **kwargs):
+        prediction_cache = getattr(self, 'prediction_cache', None)
+        if prediction_cache is None or not isinstance(X, dict):
+            return self._transform_and_call_final(method_name, X, **kwargs)
+
+        return prediction_cache.get_or_compute(X, method_name, lambda: self._transform_and_call_final(method_name, X, **kwargs), method_kwargs=kwargs)
+
+
+    @if_delegate_has_method(delegate='_final_estimator')
+    def predict(self, X):
+        return self._predict_with_cache('predict', X)
+
+
+    @if_delegate_has_method(delegate='_final_estimator')
+    def predict_proba(self, X):
+        return self._predict_with_cache('predict_proba', X)
+
+
+    @if_delegate_has_method(delegate='_final_estimator')
+    def predict_uncertainty(self, X):
+        return self._transform_and_call_final('predict_uncertainty', X)
 
 
     @if_delegate_has_method(delegate='_final_estimator')
     def score_uncertainty(self, X):
-        Xt = X
-        for name, transform in self.steps[:-1]:
-            if transform is not None:
-                Xt = transform.transform(Xt)
-        return self.steps[-1][-1].score_uncertainty(Xt)
+        return self._transform_and_call_final('score_uncertainty', X)
 
 
     @if_delegate_has_method(delegate='_final_estimator')
     def transform_only(self, X):
-        Xt = X
-        for name, transform in self.steps[:-1]:
-            if transform is not None:
-                Xt = transform.transform(Xt)
-        return self.steps[-1][-1].transform_only(Xt)
+        return self._transform_and_call_final('transform_only', X)
 
 
     @if_delegate_has_method(delegate='_final_estimator')
     def predict_intervals(self, X, return_type=None):
-        Xt = X
-        for name, transform in self.steps[:-1]:
-            if transform is not None:
-                Xt = transform.transform(Xt)
-
-        return self.steps[-1][-1].predict_intervals(Xt, return_type=return_type)
+        return self._predict_with_cache('predict_intervals', X, return_type=return_type)
 
 
 def clean_params(params):
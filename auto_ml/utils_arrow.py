@@ -0,0 +1,131 @@
+# Reading Arrow tables and Parquet files directly, rather than requiring a DataFrame or a list of dictionaries
+# The big win is column projection: at prediction time, we only read the raw columns our trained pipeline actually uses. With a wide feature table and a model that only uses a small fraction of its columns, that skips most of the I/O
+# Numeric columns without any missing values are handed to pandas (and from there, NumPy) without copying them
+# pyarrow is only imported once someone actually passes in Arrow or Parquet data
+import os
+
+
+parquet_extensions = ('.parquet', '.parq', '.pq')
+
+
+def get_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+        print('Reading Arrow tables or Parquet files requires pyarrow, which is not installed')
+        print('Please run "pip install pyarrow", or pass in a DataFrame or a list of dictionaries instead')
+        print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+        raise
+    return pyarrow
+
+
+def is_parquet_path(data):
+    if not isinstance(data, str):
+        return False
+    return data.lower().endswith(parquet_extensions) or os.path.isdir(data)
+
+
+# Checked without importing pyarrow, so plain DataFrames and dictionaries never pay for that import
+def is_arrow_table(data):
+    return type(data).__module__.split('.')[0] == 'pyarrow' and hasattr(data, 'schema') and hasattr(data, 'column')
+
+
+def is_arrow_input(data):
+    return is_arrow_table(data) or is_parquet_path(data)
+
+
+def get_column_names(data):
+    if is_arrow_table(data):
+        return list(data.schema.names)
+
+    pyarrow = get_pyarrow()
+    if os.path.isdir(data):
+        return list(pyarrow.parquet.ParquetDataset(data).schema.names)
+    return list(pyarrow.parquet.read_schema(data).names)
+
+
+# Columns that are not in the data at all (the date and text features our pipeline creates, for instance) are skipped, and get filled in by the pipeline the same way any other missing column would
+def get_columns_to_read(data, columns=None, exclude_columns=None):
+    available_columns = get_column_names(data)
+    if columns is not None:
+        columns = set(columns)
+        available_columns = [col for col in available_columns if col in columns]
+    if exclude_columns is not None:
+        exclude_columns = set(exclude_columns)
+        available_columns = [col for col in available_columns if col not in exclude_columns]
+    return available_columns
+
+
+def table_to_df(table):
+    try:
+        # split_blocks keeps each column in its own block, which lets pandas use the Arrow memory directly for numeric columns, rather than consolidating (and copying) them into one large block
+        return table.to_pandas(split_blocks=True)
+    except TypeError:
+        # Older versions of pyarrow do not support split_blocks
+        return table.to_pandas()
+
+
+# Turns an Arrow table (or RecordBatch), or the path to a Parquet file (or directory of Parquet files) into a DataFrame, only reading the columns we ask for
+def to_dataframe(data, columns=None, exclude_columns=None):
+    pyarrow = get_pyarrow()
+    columns_to_read = get_columns_to_read(data, columns=columns, exclude_columns=exclude_columns)
+
+    if is_arrow_table(data):
+        # Selecting columns from an Arrow table does not copy any data
+        if len(columns_to_read) < len(data.schema.names):
+            if isinstance(data, pyarrow.RecordBatch):
+                data = pyarrow.Table.from_batches([data])
+            data = data.select(columns_to_read) if hasattr(data, 'select') else pyarrow.Table.from_arrays([data.column(col) for col in columns_to_read], names=columns_to_read)
+        table = data
+    else:
+        table = pyarrow.parquet.read_table(data, columns=columns_to_read)
+
+    return table_to_df(table)
+
+
+# Yields DataFrames of at most batch_size rows each, so a Parquet file far larger than memory can be scored one batch at a time
+def iter_dataframes(data, columns=None, batch_size=100000):
+    pyarrow = get_pyarrow()
+    columns_to_read = get_columns_to_read(data, columns=columns)
+
+    if is_arrow_table(data):
+        if isinstance(data, pyarrow.RecordBatch):
+            data = pyarrow.Table.from_batches([data])
+        for start_idx in range(0, data.num_rows, batch_size):
+            yield to_dataframe(data.slice(start_idx, batch_size), columns=columns_to_read)
+        return
+
+    if os.path.isdir(data):
+        yield to_dataframe(data, columns=columns_to_read)
+        return
+
+    parquet_file = pyarrow.parquet.ParquetFile(data)
+    if hasattr(parquet_file, 'iter_batches'):
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns_to_read):
+            yield table_to_df(pyarrow.Table.from_batches([batch]))
+    else:
+        # Older versions of pyarrow can only read a Parquet file one row group at a time
+        for row_group_idx in range(parquet_file.num_row_groups):
+            yield table_to_df(parquet_file.read_row_group(row_group_idx, columns=columns_to_read))
+
+
+# The raw columns a trained pipeline needs to get predictions, or None if it might need any column at all (if it has a user_input_func, for instance)
+def get_columns_for_pipeline(trained_pipeline, extra_columns=None):
+    from auto_ml.utils_prediction_cache import get_used_raw_columns
+
+    if hasattr(trained_pipeline, 'named_steps'):
+        used_raw_columns = get_used_raw_columns(trained_pipeline)
+    elif hasattr(trained_pipeline, 'transformation_pipeline') and hasattr(trained_pipeline, 'categorical_column'):
+        # CategoricalEnsembler also needs the column that decides which category's model to use
+        used_raw_columns = get_used_raw_columns(trained_pipeline.transformation_pipeline, extra_columns=[trained_pipeline.categorical_column])
+    elif hasattr(trained_pipeline, 'transformation_pipeline') and hasattr(trained_pipeline, 'type_of_estimators'):
+        # MultiTargetPipeline only needs the columns its one shared transformation_pipeline uses
+        used_raw_columns = get_used_raw_columns(trained_pipeline.transformation_pipeline)
+    else:
+        return None
+
+    if used_raw_columns is not None and extra_columns is not None:
+        used_raw_columns = list(used_raw_columns) + [col for col in extra_columns if col not in used_raw_columns]
+    return used_raw_columns
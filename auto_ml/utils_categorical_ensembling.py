@@ -1,3 +1,11 @@
+from collections import OrderedDict
+import threading
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
 import pandas as pd
 
 class CategoricalEnsembler(object):
@@ -17,7 +25,81 @@ class CategoricalEnsembler(object):
             return default
 
 
-    def predict(self, data):
+    # Makes the shared transformation_pipeline and every category's model read-only, so this ensembler can be shared across threads without any locking
+    def freeze(self):
+        self.transformation_pipeline.freeze()
+        if isinstance(self.trained_models, LazyCategoryModels):
+            # Freeze each model as it gets loaded, rather than loading every category's model just to freeze it
+            self.trained_models.freeze()
+        else:
+            for category, model in self.trained_models.items():
+                if hasattr(model, 'freeze'):
+                    model.freeze()
+
+        self.frozen = True
+        return self
+
+
+    # Caches each row's prediction. The cache key only includes the raw columns the transformation_pipeline actually uses, plus our categorical_column
+    def enable_prediction_cache(self, max_size=10000, ttl_seconds=None):
+        from auto_ml.utils_prediction_cache import PredictionCache, get_used_raw_columns
+
+        used_raw_columns = get_used_raw_columns(self.transformation_pipeline, extra_columns=[self.categorical_column])
+        self.prediction_cache = PredictionCache(max_size=max_size, ttl_seconds=ttl_seconds, used_raw_columns=used_raw_columns)
+        return self
+
+
+    def disable_prediction_cache(self):
+        self.prediction_cache = None
+        return self
+
+
+    # Times the shared transformation_pipeline step by step, along with the per-category models
+    def enable_instrumentation(self, callback=None, instrumentation=None, prefix=''):
+        from auto_ml.utils_instrumentation import PipelineInstrumentation
+
+        if instrumentation is None:
+            instrumentation = PipelineInstrumentation(callback=callback)
+        self.instrumentation = instrumentation
+        self.transformation_pipeline.enable_instrumentation(instrumentation=instrumentation, prefix='transformation_pipeline.')
+        return self
+
+
+    def disable_instrumentation(self):
+        self.instrumentation = None
+        self.transformation_pipeline.disable_instrumentation()
+        return self
+
+
+    def get_stats(self):
+        instrumentation = getattr(self, 'instrumentation', None)
+        if instrumentation is None:
+            return {}
+        return instrumentation.get_stats()
+
+
+    def _predict_one_row(self, row, method_name):
+        category = row[self.categorical_column]
+        if str(category) == 'nan':
+            category = 'nan'
+
+        try:
+            model = self.trained_models[category]
+        except KeyError as e:
+            if self.default_category == '_RAISE_ERROR':
+                raise(e)
+            model = self.trained_models[self.default_category]
+
+        transformed_row = self.transformation_pipeline.transform(row)
+
+        instrumentation = getattr(self, 'instrumentation', None)
+        if instrumentation is None:
+            return getattr(model, method_name)(transformed_row)
+        # We have far too many categories to keep separate stats for each one, but the callback still gets told which category each prediction came from
+        return instrumentation.time_call('category_model', method_name, lambda: getattr(model, method_name)(transformed_row), transformed_row, extra_info={'category': category})
+
+
+    def _predict_rows(self, data, method_name):
         # For now, we are assuming that data is a list of dictionaries, so if we have a single dict, put it in a list
         if isinstance(data, dict):
             data = [data]
@@ -25,20 +107,14 @@ class CategoricalEnsembler(object):
         if isinstance(data, pd.DataFrame):
             data = data.to_dict('records')
 
+        prediction_cache = getattr(self, 'prediction_cache', None)
+
         predictions = []
         for row in data:
-            category = row[self.categorical_column]
-            if str(category) == 'nan':
-                category = 'nan'
-            try:
-                model = self.trained_models[category]
-            except KeyError as e:
-                if self.default_category == '_RAISE_ERROR':
-                    raise(e)
-                model = self.trained_models[self.default_category]
-
-            transformed_row = self.transformation_pipeline.transform(row)
-            prediction = model.predict(transformed_row)
+            if prediction_cache is None:
+                prediction = self._predict_one_row(row, method_name)
+            else:
+                prediction = prediction_cache.get_or_compute(row, method_name, lambda: self._predict_one_row(row, method_name))
             predictions.append(prediction)
 
         if len(predictions) == 1:
@@ -46,35 +122,147 @@ class CategoricalEnsembler(object):
         else:
             return predictions
 
+
+    def predict(self, data):
+        return self._predict_rows(data, 'predict')
+
+
     def predict_proba(self, data):
-        # For now, we are assuming that data is a list of dictionaries, so if we have a single dict, put it in a list
-        if isinstance(data, dict):
-            data = [data]
+        return self._predict_rows(data, 'predict_proba')
 
-        if isinstance(data, pd.DataFrame):
-            data = data.to_dict('records')
 
-        predictions = []
-        for row in data:
-            category = row[self.categorical_column]
-            if str(category) == 'nan':
-                category = 'nan'
-
-            try:
-                model = self.trained_models[category]
-            except KeyError as e:
-                if self.default_category == '_RAISE_ERROR':
-                    raise(e)
-                model = self.trained_models[self.default_category]
-
-            transformed_row = self.transformation_pipeline.transform(row)
-            prediction = model.predict_proba(transformed_row)
-            predictions.append(prediction)
+# Stands in for the trained_models dictionary when we have thousands of categories, and cannot afford to load all of their models up front
+# A category's model is loaded the first time that category is requested, and kept in an LRU cache after that
+# Once we are holding more than max_loaded_models models, or more than max_loaded_mb megabytes of them, the least recently used model is evicted
+# Pinned categories (typically the default_category) are loaded immediately, and never evicted
+class LazyCategoryModels(Mapping):
 
-        if len(predictions) == 1:
-            return predictions[0]
-        else:
-            return predictions
+    def __init__(self, category_loaders, max_loaded_models=None, max_loaded_mb=None, pinned_categories=None, category_sizes=None):
+        # category_loaders maps each category to a function that loads and returns that category's trained model
+        self.category_loaders = category_loaders
+        self.max_loaded_models = max_loaded_models
+        self.max_loaded_mb = max_loaded_mb
+        # We do not know how much memory a model will take up until we have loaded it, so we use its size on disk as an estimate
+        if category_sizes is None:
+            category_sizes = {}
+        self.category_sizes = category_sizes
+
+        self.lock = threading.RLock()
+        self.loaded_models = OrderedDict()
+        # Each category that some thread is loading right now, mapped to an Event that gets set once that load is done
+        # We load from disk without holding self.lock, so a slow load of one category never blocks requests for the categories we already have loaded
+        self.loading_events = {}
+        self.loaded_mb = 0.0
+        self.frozen = False
+        self.num_hits = 0
+        self.num_misses = 0
+        self.num_evictions = 0
+
+        self.pinned_models = {}
+        if pinned_categories is None:
+            pinned_categories = []
+        for category in pinned_categories:
+            if category in self.category_loaders:
+                self.pinned_models[category] = self._load(category)
+
+
+    def _load(self, category):
+        return self.category_loaders[category]()
+
+
+    def _evict(self):
+        while len(self.loaded_models) > 0:
+            too_many_models = self.max_loaded_models is not None and len(self.loaded_models) > self.max_loaded_models
+            too_much_memory = self.max_loaded_mb is not None and self.loaded_mb > self.max_loaded_mb
+            # Always keep the model we just loaded, even if it is bigger than max_loaded_mb all by itself
+            if not (too_many_models or too_much_memory) or len(self.loaded_models) == 1:
+                break
+
+            category, model = self.loaded_models.popitem(last=False)
+            self.loaded_mb -= self.category_sizes.get(category, 0)
+            self.num_evictions += 1
+
+
+    def __getitem__(self, category):
+        if category in self.pinned_models:
+            with self.lock:
+                self.num_hits += 1
+            return self.pinned_models[category]
+
+        while True:
+            with self.lock:
+                if category in self.loaded_models:
+                    self.num_hits += 1
+                    model = self.loaded_models.pop(category)
+                    self.loaded_models[category] = model
+                    return model
+
+                if category not in self.category_loaders:
+                    raise KeyError(category)
+
+                loading_event = self.loading_events.get(category)
+                if loading_event is None:
+                    loading_event = threading.Event()
+                    self.loading_events[category] = loading_event
+                    self.num_misses += 1
+                    break
+
+            # Another thread is already loading this category, so we wait for it rather than loading the same model twice
+            # Once it is done, we go back around and (almost always) find the model in loaded_models. If that load failed, we try loading it ourselves
+            loading_event.wait()
+
+        try:
+            model = self._load(category)
+        except BaseException:
+            with self.lock:
+                del self.loading_events[category]
+            loading_event.set()
+            raise
+
+        with self.lock:
+            # freeze() may have been called while we were loading this model
+            if self.frozen and hasattr(model, 'freeze'):
+                model.freeze()
+            self.loaded_models[category] = model
+            self.loaded_mb += self.category_sizes.get(category, 0)
+            self._evict()
+            del self.loading_events[category]
+        loading_event.set()
+
+        return model
+
+
+    def __contains__(self, category):
+        return category in self.category_loaders
+
+
+    def __iter__(self):
+        return iter(self.category_loaders)
+
+
+    def __len__(self):
+        return len(self.category_loaders)
+
+
+    def freeze(self):
+        with self.lock:
+            self.frozen = True
+            for model in list(self.pinned_models.values()) + list(self.loaded_models.values()):
+                if hasattr(model, 'freeze'):
+                    model.freeze()
+        return self
+
+
+    def get_cache_info(self):
+        with self.lock:
+            return {
+                'num_categories': len(self.category_loaders)
+                , 'num_loaded_models': len(self.loaded_models) + len(self.pinned_models)
+                , 'loaded_mb': self.loaded_mb
+                , 'num_hits': self.num_hits
+                , 'num_misses': self.num_misses
+                , 'num_evictions': self.num_evictions
+            }
 
 
 # Remove nans from our categorical ensemble column
@@ -85,6 +273,9 @@ def clean_categorical_definitions(df, categorical_column):
         print('We will default to making these values a string "nan" instead, since that can be used as a key')
         print('If this is not the behavior you want, consider changing these categorical_column values yourself')
 
+        # A pandas categorical column can only be filled with one of its existing categories
+        if df[categorical_column].dtype.name == 'category':
+            df[categorical_column] = df[categorical_column].astype(object)
         df[categorical_column].fillna('nan', inplace=True)
 
     return df
@@ -0,0 +1,95 @@
+# Split-conformal prediction intervals
+# Rather than training one quantile regressor per percentile, we look at how far off the base model's predictions were on data it was not trained on, and keep the quantiles of those residuals
+# At prediction time, each interval is just the base prediction plus the stored residual quantile, so getting intervals costs almost nothing beyond getting the prediction itself
+# Residuals can optionally be kept separately for several bins, either by predicted value, or by the uncertainty_model's predicted probability that a prediction is uncertain. That lets intervals be wider where the model tends to be less accurate
+import math
+
+import numpy as np
+
+
+# We never make a bin so small that its residual quantiles are mostly noise
+min_rows_per_bin = 50
+
+
+def get_interval_name(percentile):
+    return 'interval_{}'.format(percentile)
+
+
+# The residual at this percentile, with the usual finite-sample correction for split-conformal calibration
+# With n residuals, we take the ceil((n + 1) * percentile)-th smallest for upper bounds (and the floor for lower bounds), which makes the intervals slightly conservative rather than slightly too narrow
+def get_conformal_quantile(sorted_residuals, percentile):
+    num_residuals = len(sorted_residuals)
+    if percentile >= 0.5:
+        rank = int(math.ceil((num_residuals + 1) * percentile))
+    else:
+        rank = int(math.floor((num_residuals + 1) * percentile))
+    rank = min(max(rank, 1), num_residuals)
+    return float(sorted_residuals[rank - 1])
+
+
+def get_bin_edges(bin_values, num_bins):
+    num_bins = max(1, min(num_bins, len(bin_values) // min_rows_per_bin))
+    if num_bins == 1:
+        return []
+
+    # The edges between bins are quantiles of bin_values, so each bin holds roughly the same number of rows
+    edges = np.percentile(bin_values, np.linspace(0, 100, num_bins + 1)[1:-1])
+    return np.unique(edges).tolist()
+
+
+def get_bin_indices(bin_edges, bin_values):
+    return np.searchsorted(np.asarray(bin_edges, dtype=float), np.asarray(bin_values, dtype=float), side='right')
+
+
+# Returns everything we need to predict intervals later, as plain lists, so it can be saved along with the rest of the model
+def fit_conformal_intervals(predictions, y, percentiles, bin_values=None, num_bins=1, bin_by='prediction'):
+    predictions = np.asarray(predictions, dtype=float).reshape(-1)
+    residuals = np.asarray(y, dtype=float).reshape(-1) - predictions
+
+    if bin_values is None:
+        bin_values = predictions
+    bin_edges = get_bin_edges(np.asarray(bin_values, dtype=float).reshape(-1), num_bins)
+    bin_indices = get_bin_indices(bin_edges, bin_values)
+
+    sorted_residuals = np.sort(residuals)
+    offsets = []
+    for percentile in percentiles:
+        percentile_offsets = []
+        for bin_idx in range(len(bin_edges) + 1):
+            bin_residuals = np.sort(residuals[bin_indices == bin_idx])
+            # Heavily tied bin_values can leave a bin empty, in which case it just uses the residuals from every bin
+            if len(bin_residuals) == 0:
+                bin_residuals = sorted_residuals
+            percentile_offsets.append(get_conformal_quantile(bin_residuals, percentile))
+        offsets.append(percentile_offsets)
+
+    return {
+        'percentiles': list(percentiles)
+        , 'interval_names': [get_interval_name(percentile) for percentile in percentiles]
+        , 'bin_by': bin_by
+        , 'bin_edges': bin_edges
+        , 'offsets': offsets
+        , 'num_calibration_rows': len(residuals)
+    }
+
+
+# Returns a list of (interval_name, interval_values) tuples, in the same order as the percentiles the user asked for
+def predict_conformal_intervals(conformal_intervals, predictions, bin_values=None):
+    predictions = np.asarray(predictions, dtype=float).reshape(-1)
+    if bin_values is None:
+        bin_values = predictions
+    bin_indices = get_bin_indices(conformal_intervals['bin_edges'], np.asarray(bin_values, dtype=float).reshape(-1))
+
+    results = []
+    for interval_name, percentile_offsets in zip(conformal_intervals['interval_names'], conformal_intervals['offsets']):
+        results.append((interval_name, predictions + np.asarray(percentile_offsets, dtype=float)[bin_indices]))
+    return results
+
+
+def print_conformal_intervals(conformal_intervals):
+    print('Calibrated split-conformal prediction intervals on {} held-out rows'.format(conformal_intervals['num_calibration_rows']))
+    num_bins = len(conformal_intervals['bin_edges']) + 1
+    if num_bins > 1:
+        print('Residuals were binned into {} bins by {}'.format(num_bins, conformal_intervals['bin_by']))
+    for interval_name, percentile_offsets in zip(conformal_intervals['interval_names'], conformal_intervals['offsets']):
+        print('{}: offsets from the base prediction of {}'.format(interval_name, [round(offset, 4) for offset in percentile_offsets]))
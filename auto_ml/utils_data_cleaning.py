@@ -5,7 +5,6 @@ import dateutil
 import numpy as np
 import pandas as pd
 from pandas import __version__ as pandas_version
-import pathos
 from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.feature_extraction.text import TfidfVectorizer
 
@@ -34,6 +33,26 @@ def clean_val(val):
                 return None
         return float_val
 
+# Vectorized version of clean_val, for an entire column (or our y values) at once
+# Returns an array of floats, with nan for every value we could not turn into a float, or that is a bad val
+def clean_vals(vals):
+    if not isinstance(vals, pd.Series):
+        vals = pd.Series(np.asarray(vals))
+
+    if vals.dtype.kind in ('b', 'i', 'u', 'f'):
+        float_vals = vals.values.astype(float)
+    else:
+        float_vals = pd.to_numeric(vals, errors='coerce')
+        # Strings like '1,000' only turn into floats once we remove their commas
+        needs_commas_removed = float_vals.isnull() & vals.notnull()
+        if needs_commas_removed.any():
+            float_vals[needs_commas_removed] = pd.to_numeric(vals[needs_commas_removed].astype(str).str.replace(',', ''), errors='coerce')
+        float_vals = float_vals.values.astype(float)
+
+    float_vals[~np.isfinite(float_vals)] = np.nan
+    return float_vals
+
+
 # Same as above, except this version returns float('nan') when it fails
 # This plays more nicely with df.apply, and assumes we will be handling nans appropriately when doing DataFrameVectorizer later.
 def clean_val_nan_version(key, val, replacement_val=np.nan):
@@ -187,7 +206,10 @@ class BasicDataCleaning(BaseEstimator, TransformerMixin):
         # Convert input to DataFrame if we were given a list of dictionaries
         if isinstance(X, list):
             X = pd.DataFrame(X)
-        X = X.copy()
+
+        # We only ever read from dictionaries, so a frozen pipeline can skip copying them for every single prediction
+        if not (isinstance(X, dict) and self.get('frozen', False) == True):
+            X = X.copy()
 
 
         # All of these are values we will not want to keep for training this particular estimator.
@@ -260,9 +282,12 @@ class BasicDataCleaning(BaseEstimator, TransformerMixin):
 
 
 
-                if df_to_clean.shape[0] > 100000 or os.environ.get('is_test_suite', 0) == 'True':
+                # Spinning up a process pool costs far more than cleaning a small batch of rows (like the micro-batches from our prediction server), so we only parallelize mid-sized datasets
+                if df_to_clean.shape[0] > 100000 or df_to_clean.shape[0] < 1000 or os.environ.get('is_test_suite', 0) == 'True':
                     results = list(map(lambda col: self.process_one_column(col_vals=df_to_clean[col], col_name=col), df_to_clean.columns))
                 else:
+                    # Only imported when we actually need a process pool, since prediction-only processes rarely do
+                    import pathos
                     pool = pathos.multiprocessing.ProcessPool()
                     try:
                         pool.restart()
@@ -287,6 +312,11 @@ class BasicDataCleaning(BaseEstimator, TransformerMixin):
             return X
 
 
+    def freeze(self):
+        self.frozen = True
+        return self
+
+
     def process_one_column(self, col_vals, col_name):
         ignore_none_fields = False
         if self.get('transformed_column_descriptions', None) is not None:
@@ -2,7 +2,6 @@ import os
 
 import numpy as np
 import pandas as pd
-import pathos
 from sklearn.base import BaseEstimator, TransformerMixin
 
 
@@ -36,6 +35,14 @@ class Ensembler(BaseEstimator, TransformerMixin):
             return_obj = {estimator_name: predictions}
             return return_obj
 
+        instrumentation = getattr(self, 'instrumentation', None)
+        if instrumentation is not None:
+            untimed_get_predictions = get_predictions_for_one_estimator
+            method_name = 'predict' if self.type_of_estimator == 'regressor' else 'predict_proba'
+
+            def get_predictions_for_one_estimator(estimator, X):
+                return instrumentation.time_call(self.instrumentation_prefix + str(estimator.name), method_name, lambda: untimed_get_predictions(estimator, X), X)
+
 
         # Don't bother parallelizing if this is a single dictionary
         if X.shape[0] == 1:
@@ -45,11 +52,13 @@ class Ensembler(BaseEstimator, TransformerMixin):
 
             # Pathos doesn't like datasets beyond a certain size. So fall back on single, non-parallel predictions instead.
             # try:
-            if os.environ.get('is_test_suite', False) == 'True':
+            # Frozen pipelines are typically shared across threads, where spinning up a new process pool on every call is not what we want
+            if os.environ.get('is_test_suite', False) == 'True' or getattr(self, 'frozen', False) == True:
                 predictions_from_all_estimators = map(lambda predictor: get_predictions_for_one_estimator(predictor, X), self.ensemble_predictors)
 
             else:
                 # Open a new multiprocessing pool
+                import pathos
                 pool = pathos.multiprocessing.ProcessPool()
 
                 # Since we may have already closed the pool, try to restart it
@@ -86,6 +95,38 @@ class Ensembler(BaseEstimator, TransformerMixin):
         return self
 
 
+    # Times each of our subpredictors. Note that when we get predictions from a process pool, the timings are recorded in those other processes, and will not show up here
+    def enable_instrumentation(self, callback=None, instrumentation=None, prefix=''):
+        from auto_ml.utils_instrumentation import PipelineInstrumentation
+
+        if instrumentation is None:
+            instrumentation = PipelineInstrumentation(callback=callback)
+        self.instrumentation = instrumentation
+        self.instrumentation_prefix = prefix
+        return self
+
+
+    def disable_instrumentation(self):
+        self.instrumentation = None
+        return self
+
+
+    def get_stats(self):
+        instrumentation = getattr(self, 'instrumentation', None)
+        if instrumentation is None:
+            return {}
+        return instrumentation.get_stats()
+
+
+    def freeze(self):
+        for predictor in self.ensemble_predictors:
+            if hasattr(predictor, 'freeze'):
+                predictor.freeze()
+
+        self.frozen = True
+        return self
+
+
     # ################################
     # Public API to get a single prediction from each row, where that single prediction is somehow an ensemble of all our trained subpredictors
     # ################################
@@ -1,7 +1,9 @@
 from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.model_selection import train_test_split
 
 
+import numpy as np
 import scipy
 import itertools
 from sklearn.feature_selection import GenericUnivariateSelect, RFECV, SelectFromModel
@@ -29,11 +31,18 @@ def get_feature_selection_model_from_name(type_of_estimator, model_name):
 class FeatureSelectionTransformer(BaseEstimator, TransformerMixin):
 
 
-    def __init__(self, type_of_estimator, column_descriptions, feature_selection_model='SelectFromModel'):
+    def __init__(self, type_of_estimator, column_descriptions, feature_selection_model='SelectFromModel', max_rows=200000, importance_backend='RandomForest', importance_type='gain', random_state=0):
 
         self.column_descriptions = column_descriptions
         self.type_of_estimator = type_of_estimator
         self.feature_selection_model = feature_selection_model
+        # Feature importances settle down long before we have seen every row, so we only look at (a stratified sample of) this many rows. None uses every row
+        self.max_rows = max_rows
+        # 'RandomForest', or 'LightGBM', which is much faster on large or sparse data
+        self.importance_backend = importance_backend
+        # Only used by the LightGBM backend: 'split' (how many times a feature is used) or 'gain' (how much it improved the model)
+        self.importance_type = importance_type
+        self.random_state = random_state
 
 
     def get(self, prop_name, default=None):
@@ -43,31 +52,81 @@ class FeatureSelectionTransformer(BaseEstimator, TransformerMixin):
             return default
 
 
-    def fit(self, X, y=None):
+    # Returns the sorted indices of the rows we should fit on, or None if we should use every row
+    # Classifiers get a stratified sample, so rare classes are still represented
+    def get_sample_indices(self, num_rows, y=None):
+        if self.max_rows is None or num_rows <= self.max_rows:
+            return None
+
+        all_indices = np.arange(num_rows)
+        if self.type_of_estimator == 'classifier' and y is not None:
+            try:
+                sample_indices, ignored_indices = train_test_split(all_indices, train_size=self.max_rows, stratify=np.asarray(y), random_state=self.random_state)
+                return np.sort(sample_indices)
+            except ValueError:
+                # Classes with only a single row cannot be stratified, so we fall back to a plain random sample
+                pass
+
+        return np.sort(np.random.RandomState(self.random_state).choice(num_rows, size=self.max_rows, replace=False))
+
+
+    def get_importance_estimator(self):
+        if self.importance_backend == 'LightGBM':
+            try:
+                from lightgbm import LGBMRegressor, LGBMClassifier
+            except ImportError:
+                print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+                print('The LightGBM importance_backend for feature selection requires lightgbm, which is not installed')
+                print('Please run "pip install lightgbm", or use importance_backend="RandomForest" instead')
+                print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+                raise
+
+            # LightGBM works on sparse matrices directly, without densifying them
+            if self.type_of_estimator == 'regressor':
+                return LGBMRegressor(n_estimators=50, num_leaves=31, importance_type=self.importance_type, random_state=self.random_state, verbose=-1)
+            else:
+                return LGBMClassifier(n_estimators=50, num_leaves=31, importance_type=self.importance_type, random_state=self.random_state, verbose=-1)
+
+        elif self.importance_backend == 'RandomForest':
+            if self.type_of_estimator == 'regressor':
+                return RandomForestRegressor(n_jobs=-1, max_depth=10, n_estimators=15)
+            else:
+                return RandomForestClassifier(n_jobs=-1, max_depth=10, n_estimators=15)
+
+        print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+        print('importance_backend must be one of "RandomForest" or "LightGBM". We received:')
+        print(self.importance_backend)
+        print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+        raise ValueError('Invalid value for importance_backend')
+
+
+    # num_training_rows is for when X is already a sample of the training data
+    def fit(self, X, y=None, num_training_rows=None):
         print('Performing feature selection')
 
+        # The limit on how many features we keep depends on how many rows the final model gets to train on, not on the size of our sample
+        num_rows = num_training_rows if num_training_rows is not None else X.shape[0]
+        sample_indices = self.get_sample_indices(X.shape[0], y)
+        if sample_indices is not None:
+            print('Performing feature selection on a sample of {} of our {} rows'.format(len(sample_indices), X.shape[0]))
+            X = X.iloc[sample_indices] if hasattr(X, 'iloc') else X[sample_indices]
+            y = np.asarray(y)[sample_indices]
+
 
         self.selector = get_feature_selection_model_from_name(self.type_of_estimator, self.feature_selection_model)
 
         if self.selector == 'KeepAll':
-            if scipy.sparse.issparse(X):
-                num_cols = X.shape[0]
-            else:
-                num_cols = len(X[0])
+            num_cols = X.shape[1]
 
             self.support_mask = [True for col_idx in range(num_cols) ]
         else:
             if self.feature_selection_model == 'SelectFromModel':
                 num_cols = X.shape[1]
-                num_rows = X.shape[0]
-                if self.type_of_estimator == 'regressor':
-                    self.estimator = RandomForestRegressor(n_jobs=-1, max_depth=10, n_estimators=15)
-                else:
-                    self.estimator = RandomForestClassifier(n_jobs=-1, max_depth=10, n_estimators=15)
+                self.estimator = self.get_importance_estimator()
 
                 self.estimator.fit(X, y)
 
-                feature_importances = self.estimator.feature_importances_
+                feature_importances = np.asarray(self.estimator.feature_importances_, dtype=float)
 
                 # Two ways of doing feature selection
 
@@ -100,16 +159,10 @@ class FeatureSelectionTransformer(BaseEstimator, TransformerMixin):
         if self.selector == 'KeepAll':
             return X
 
+        # Within our own pipelines, we never get here: the support_mask is applied through DataFrameVectorizer.restrict instead, so the vectorizer only ever builds the columns we keep
         if scipy.sparse.issparse(X):
-            if X.getformat() == 'csr':
-                # convert to a csc (column) matrix, rather than a csr (row) matrix
-                X = X.tocsc()
-
-            # Slice that column matrix to only get the relevant columns that we already calculated in fit:
-            X = X[:, self.index_mask]
-
-            # convert back to a csr matrix
-            return X.tocsr()
+            # scipy slices the columns of a csr matrix directly, without a round trip through a csc matrix
+            return X.tocsr()[:, self.index_mask]
 
         # If this is a dense matrix:
         else:
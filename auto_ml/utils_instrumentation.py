@@ -0,0 +1,165 @@
+# Optional timing for each step of a trained pipeline, so that when predictions are slow, we can see which step is the bottleneck
+# Nothing here runs unless enable_instrumentation() has been called on a pipeline. A pipeline without instrumentation only pays for a single attribute lookup per call
+import threading
+import time
+
+import scipy.sparse
+
+
+# Upper bounds (in milliseconds) for each of our latency histogram buckets
+latency_buckets_ms = [0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000, float('inf')]
+
+
+def get_bucket_idx(buckets, val):
+    for idx, upper_bound in enumerate(buckets):
+        if val <= upper_bound:
+            return idx
+    return len(buckets) - 1
+
+
+# Returns the upper bound of the bucket that contains the requested percentile
+def get_histogram_percentile(buckets, counts, percentile):
+    total_count = sum(counts)
+    if total_count == 0:
+        return None
+
+    running_count = 0
+    for upper_bound, count in zip(buckets, counts):
+        running_count += count
+        if running_count >= percentile * total_count:
+            return upper_bound if upper_bound != float('inf') else None
+
+
+def format_histogram(buckets, counts):
+    return [['<=' + str(upper_bound) if upper_bound != float('inf') else 'more', count] for upper_bound, count in zip(buckets, counts)]
+
+
+def get_num_rows(data):
+    if isinstance(data, dict):
+        return 1
+    elif hasattr(data, 'shape') and len(data.shape) > 0:
+        return data.shape[0]
+    try:
+        return len(data)
+    except TypeError:
+        return 1
+
+
+# Describes the output of a step: its shape, and, for sparse matrices, how many values are actually stored
+def get_output_summary(output):
+    summary = {}
+    if isinstance(output, dict):
+        summary['num_cols'] = len(output)
+    elif hasattr(output, 'shape'):
+        summary['shape'] = list(output.shape)
+        if scipy.sparse.issparse(output):
+            summary['nnz'] = output.nnz
+    return summary
+
+
+class StepStats(object):
+
+    def __init__(self):
+        self.num_calls = 0
+        self.num_rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.total_nnz = 0
+        self.num_sparse_outputs = 0
+        self.last_output = {}
+        self.latency_counts = [0 for bucket in latency_buckets_ms]
+
+
+    def record(self, duration_ms, num_rows, output_summary):
+        self.num_calls += 1
+        self.num_rows += num_rows
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.latency_counts[get_bucket_idx(latency_buckets_ms, duration_ms)] += 1
+        if 'nnz' in output_summary:
+            self.total_nnz += output_summary['nnz']
+            self.num_sparse_outputs += 1
+        self.last_output = output_summary
+
+
+    def get_stats(self):
+        num_calls = max(self.num_calls, 1)
+        total_seconds = self.total_ms / 1000.0
+
+        stats = {
+            'num_calls': self.num_calls
+            , 'num_rows': self.num_rows
+            , 'total_ms': self.total_ms
+            , 'avg_ms': self.total_ms / num_calls
+            , 'max_ms': self.max_ms
+            , 'p50_ms': get_histogram_percentile(latency_buckets_ms, self.latency_counts, 0.5)
+            , 'p95_ms': get_histogram_percentile(latency_buckets_ms, self.latency_counts, 0.95)
+            , 'p99_ms': get_histogram_percentile(latency_buckets_ms, self.latency_counts, 0.99)
+            , 'latency_histogram_ms': format_histogram(latency_buckets_ms, self.latency_counts)
+            , 'rows_per_second': self.num_rows / total_seconds if total_seconds > 0 else None
+            , 'last_output': self.last_output
+        }
+        if self.num_sparse_outputs > 0:
+            stats['avg_nnz'] = float(self.total_nnz) / self.num_sparse_outputs
+
+        return stats
+
+
+# Collects timing for every step of a pipeline (and of any nested pipelines or ensembles), keyed by step name
+# callback, if provided, is called with a dictionary describing each step as it finishes, which is handy for pushing these numbers to a metrics agent
+class PipelineInstrumentation(object):
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.lock = threading.Lock()
+        self.step_stats = {}
+
+
+    def record(self, step_name, method_name, duration_ms, X, output, extra_info=None):
+        num_rows = get_num_rows(X)
+        output_summary = get_output_summary(output)
+
+        with self.lock:
+            if step_name not in self.step_stats:
+                self.step_stats[step_name] = StepStats()
+            self.step_stats[step_name].record(duration_ms, num_rows, output_summary)
+
+        if self.callback is not None:
+            event = {
+                'step': step_name
+                , 'method': method_name
+                , 'duration_ms': duration_ms
+                , 'num_rows': num_rows
+            }
+            event.update(output_summary)
+            if extra_info is not None:
+                event.update(extra_info)
+            self.callback(event)
+
+
+    def time_call(self, step_name, method_name, func, X, extra_info=None):
+        start_time = time.time()
+        output = func()
+        self.record(step_name, method_name, (time.time() - start_time) * 1000, X, output, extra_info=extra_info)
+        return output
+
+
+    def get_stats(self):
+        with self.lock:
+            return dict((step_name, stats.get_stats()) for step_name, stats in self.step_stats.items())
+
+
+    def reset(self):
+        with self.lock:
+            self.step_stats = {}
+
+
+    # Locks (and most callbacks) cannot be pickled, and timings from one process do not mean much in another
+    def __getstate__(self):
+        return {}
+
+
+    def __setstate__(self, state):
+        self.callback = None
+        self.lock = threading.Lock()
+        self.step_stats = {}
@@ -0,0 +1,1062 @@
+# Saves trained pipelines as a versioned directory of plain files, rather than as a single dill pickle
+# Every component (a pipeline step, a trained model, a nested pipeline) gets its own directory. That directory holds a component.json file describing the component, plus any .npy arrays and native model files it needs.
+# Loading rebuilds each component from those files. This is fast, it never unpickles training-time leftovers, and it does not require the exact same Python and library versions the way unpickling does.
+from collections import OrderedDict
+import datetime
+import hashlib
+import importlib
+import json
+from operator import itemgetter
+import os
+import random
+import shutil
+import warnings
+
+import numpy as np
+import scipy.sparse
+
+from auto_ml._version import __version__ as auto_ml_version
+
+artifact_format_name = 'auto_ml_artifact'
+# Bump this whenever we make a change that older versions of auto_ml will not be able to read
+artifact_format_version = 1
+manifest_file_name = 'manifest.json'
+component_file_name = 'component.json'
+
+try:
+    string_types = (str, unicode)
+except NameError:
+    string_types = (str,)
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+
+class UnserializableValue(Exception):
+    pass
+
+
+def make_json_safe(val):
+    if isinstance(val, np.ndarray):
+        return make_json_safe(val.tolist())
+    elif isinstance(val, np.generic):
+        return val.item()
+    elif isinstance(val, (list, tuple, set)):
+        return [make_json_safe(item) for item in val]
+    elif isinstance(val, dict):
+        return dict((str(k), make_json_safe(v)) for k, v in val.items())
+    elif val is None or isinstance(val, (bool, int, float) + string_types):
+        return val
+    # Values like datetimes do not have a JSON representation, so we store their string representation instead
+    return str(val)
+
+
+def write_json(file_path, obj):
+    with open(file_path, 'w') as write_file:
+        json.dump(make_json_safe(obj), write_file, indent=1, sort_keys=True)
+
+
+def read_json(file_path):
+    with open(file_path, 'r') as read_file:
+        return json.load(read_file)
+
+
+# Column names are not always strings (think of a DataFrame with integer column names), and JSON objects only allow string keys
+# So any dictionary that is keyed by column name (or category) gets stored as a list of [key, value] pairs instead
+def dict_to_pairs(dictionary):
+    if dictionary is None:
+        return None
+    return [[k, v] for k, v in dictionary.items()]
+
+
+def pairs_to_dict(pairs):
+    if pairs is None:
+        return None
+    return dict((k, v) for k, v in pairs)
+
+
+def save_array(component_dir, name, arr):
+    file_name = name + '.npy'
+    np.save(os.path.join(component_dir, file_name), np.asarray(arr), allow_pickle=False)
+    return file_name
+
+
+# With mmap_mode='r', the array stays on disk and is paged in by the OS as needed, so every process that loads the same artifact shares the same physical memory
+def load_array(component_dir, file_name, mmap_mode=None):
+    return np.load(os.path.join(component_dir, file_name), mmap_mode=mmap_mode, allow_pickle=False)
+
+
+# Feature names, vocabularies, and class labels are usually all strings, in which case we store them as a compact .npy array
+# If there are any non-string values (integer column names, numeric class labels), we keep them in the JSON so their types survive the round trip
+def save_labels(component_dir, name, labels):
+    if labels is None:
+        return None
+    labels = list(labels)
+    if all(isinstance(label, string_types) for label in labels):
+        return {'npy': save_array(component_dir, name, np.array(labels, dtype='U'))}
+    return {'json': make_json_safe(labels)}
+
+
+def load_labels(component_dir, label_info):
+    if label_info is None:
+        return None
+    if 'npy' in label_info:
+        return load_array(component_dir, label_info['npy']).tolist()
+    return label_info['json']
+
+
+# A stable 64-bit hash of a string. Python's own hash() is randomized per process, so we cannot store it on disk
+def hash_key(key):
+    return np.frombuffer(hashlib.md5(key.encode('utf-8')).digest()[:8], dtype=np.uint64)[0]
+
+
+# A read-only dictionary from each name to its position in names, built entirely out of (optionally memory-mapped) numpy arrays
+# A regular dictionary with hundreds of thousands of string keys takes up a lot of memory in every single process that loads it
+# Here, we binary search a sorted array of hashes instead, and then check the name itself to rule out hash collisions
+class MmapVocabulary(Mapping):
+
+    def __init__(self, names, sorted_hashes, sorted_positions):
+        self.names = names
+        self.sorted_hashes = sorted_hashes
+        self.sorted_positions = sorted_positions
+
+
+    def _find(self, key):
+        if not isinstance(key, string_types):
+            return None
+
+        key_hash = hash_key(key)
+        idx = int(np.searchsorted(self.sorted_hashes, key_hash))
+        while idx < len(self.sorted_hashes) and self.sorted_hashes[idx] == key_hash:
+            position = int(self.sorted_positions[idx])
+            if self.names[position] == key:
+                return position
+            idx += 1
+
+        return None
+
+
+    def __getitem__(self, key):
+        position = self._find(key)
+        if position is None:
+            raise KeyError(key)
+        return position
+
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+
+    def __iter__(self):
+        return iter(self.names)
+
+
+    def __len__(self):
+        return len(self.names)
+
+
+    # Every name maps to its own position, so we do not need any lookups to iterate through the items
+    def items(self):
+        return zip(self.names, range(len(self.names)))
+
+
+def save_vocabulary(component_dir, name, names):
+    vocabulary_info = save_labels(component_dir, name, names)
+
+    if 'npy' in vocabulary_info:
+        hashes = np.array([hash_key(vocab_name) for vocab_name in names], dtype=np.uint64)
+        sorted_positions = np.argsort(hashes, kind='mergesort').astype(np.int64)
+        vocabulary_info['hashes'] = save_array(component_dir, name + '_hashes', hashes[sorted_positions])
+        vocabulary_info['positions'] = save_array(component_dir, name + '_positions', sorted_positions)
+
+    return vocabulary_info
+
+
+# Returns the list of names, along with a vocabulary mapping each name to its position in that list
+# When memory-mapping, both of these stay on disk, so every process on this machine shares a single copy of them
+def load_vocabulary(component_dir, vocabulary_info, mmap_mode=None):
+    if mmap_mode is not None and 'hashes' in vocabulary_info:
+        names = load_array(component_dir, vocabulary_info['npy'], mmap_mode=mmap_mode)
+        sorted_hashes = load_array(component_dir, vocabulary_info['hashes'], mmap_mode=mmap_mode)
+        sorted_positions = load_array(component_dir, vocabulary_info['positions'], mmap_mode=mmap_mode)
+        return names, MmapVocabulary(names, sorted_hashes, sorted_positions)
+
+    names = load_labels(component_dir, vocabulary_info)
+    return names, dict((vocab_name, idx) for idx, vocab_name in enumerate(names))
+
+
+def get_class_path(obj_or_class):
+    if not isinstance(obj_or_class, type):
+        obj_or_class = type(obj_or_class)
+    return obj_or_class.__module__ + '.' + obj_or_class.__name__
+
+
+def import_from_path(class_path):
+    module_name, class_name = class_path.rsplit('.', 1)
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def is_sklearn_tree(val):
+    return type(val).__name__ == 'Tree' and type(val).__module__.startswith('sklearn.tree')
+
+
+# Turns the state of a fitted model into JSON plus .npy arrays
+# This handles anything made up of numpy arrays, plain Python values, and nested estimators (including the Cython Tree objects behind scikit-learn's tree models)
+# Anything else (random number generators, Cython loss functions, etc.) raises UnserializableValue, and the caller falls back to pickling the whole model
+def serialize_value(val, component_dir, name):
+    if val is None or isinstance(val, (bool, int, float) + string_types):
+        return {'value': val}
+
+    elif isinstance(val, np.generic):
+        return {'value': val.item()}
+
+    elif isinstance(val, np.ndarray):
+        if val.dtype == object:
+            items = [serialize_value(item, component_dir, '{}_{}'.format(name, idx)) for idx, item in enumerate(val.ravel())]
+            return {'object_array': list(val.shape), 'items': items}
+        return {'npy': save_array(component_dir, name, val)}
+
+    elif isinstance(val, list):
+        return {'list': [serialize_value(item, component_dir, '{}_{}'.format(name, idx)) for idx, item in enumerate(val)]}
+
+    elif isinstance(val, tuple):
+        return {'tuple': [serialize_value(item, component_dir, '{}_{}'.format(name, idx)) for idx, item in enumerate(val)]}
+
+    elif isinstance(val, dict) and all(isinstance(k, string_types) for k in val.keys()):
+        return {'dict': dict((k, serialize_value(v, component_dir, '{}_{}'.format(name, k))) for k, v in val.items())}
+
+    elif is_sklearn_tree(val):
+        tree_class, tree_args, tree_state = val.__reduce__()
+        return {
+            'sklearn_tree': get_class_path(tree_class)
+            , 'args': serialize_value(list(tree_args), component_dir, name + '_args')
+            , 'state': serialize_value(tree_state, component_dir, name + '_state')
+        }
+
+    elif hasattr(val, 'get_params') and hasattr(val, '__dict__'):
+        return {
+            'object': get_class_path(val)
+            , 'attributes': serialize_value(val.__dict__, component_dir, name)
+        }
+
+    raise UnserializableValue('Cannot serialize a value of type {}'.format(type(val)))
+
+
+def deserialize_value(info, component_dir, mmap_mode=None):
+    if 'value' in info:
+        return info['value']
+
+    elif 'npy' in info:
+        return load_array(component_dir, info['npy'], mmap_mode=mmap_mode)
+
+    elif 'object_array' in info:
+        items = [deserialize_value(item, component_dir, mmap_mode=mmap_mode) for item in info['items']]
+        arr = np.empty(len(items), dtype=object)
+        for idx, item in enumerate(items):
+            arr[idx] = item
+        return arr.reshape(info['object_array'])
+
+    elif 'list' in info:
+        return [deserialize_value(item, component_dir, mmap_mode=mmap_mode) for item in info['list']]
+
+    elif 'tuple' in info:
+        return tuple(deserialize_value(item, component_dir, mmap_mode=mmap_mode) for item in info['tuple'])
+
+    elif 'dict' in info:
+        return dict((k, deserialize_value(v, component_dir, mmap_mode=mmap_mode)) for k, v in info['dict'].items())
+
+    elif 'sklearn_tree' in info:
+        tree_class = import_from_path(info['sklearn_tree'])
+        n_features, n_classes, n_outputs = deserialize_value(info['args'], component_dir)
+        tree = tree_class(n_features, np.asarray(n_classes, dtype=np.intp), n_outputs)
+        # scikit-learn copies the node arrays into memory it owns, so there is nothing to gain from memory-mapping them
+        tree_state = deserialize_value(info['state'], component_dir)
+
+        # Newer versions of scikit-learn add fields to each node. Copy over the fields we have, and leave any new ones at their default of 0
+        expected_dtype = tree.__getstate__()['nodes'].dtype
+        nodes = tree_state['nodes']
+        if nodes.dtype != expected_dtype:
+            converted_nodes = np.zeros(nodes.shape, dtype=expected_dtype)
+            for field_name in expected_dtype.names:
+                if field_name in nodes.dtype.names:
+                    converted_nodes[field_name] = nodes[field_name]
+            tree_state['nodes'] = converted_nodes
+
+        tree.__setstate__(tree_state)
+        return tree
+
+    elif 'object' in info:
+        obj_class = import_from_path(info['object'])
+        obj = obj_class.__new__(obj_class)
+        obj.__dict__.update(deserialize_value(info['attributes'], component_dir, mmap_mode=mmap_mode))
+        return obj
+
+    raise ValueError('Found a value in this artifact that we do not know how to load: {}'.format(info))
+
+
+# Anything we do not have a dedicated format for (user-provided functions, calibrated models, etc.) is pickled with dill, just like our default save format
+def save_pickled(obj, file_path):
+    import dill
+    with open(file_path, 'wb') as write_file:
+        dill.dump(obj, write_file)
+
+
+def load_pickled(file_path):
+    import dill
+    with open(file_path, 'rb') as read_file:
+        return dill.load(read_file)
+
+
+# ################################
+# Native formats for the trained models themselves
+# ################################
+
+# The hyperparameters a model was trained with, limited to the ones that survive a round trip through JSON
+# We keep these next to the native model files, so that warm-starting from an artifact can reuse them
+def get_json_params(model):
+    try:
+        params = model.get_params()
+    except AttributeError:
+        return {}
+
+    json_params = {}
+    for param_name, param_val in params.items():
+        try:
+            if json.loads(json.dumps(param_val)) == param_val:
+                json_params[param_name] = param_val
+        except (TypeError, ValueError):
+            # Values like a RandomState or a custom objective function do not survive the trip through JSON, so we leave them out
+            pass
+    return json_params
+
+
+# Stands in for a LightGBM sklearn model, once we have loaded its Booster back in from LightGBM's own text format
+class LightGBMBoosterModel(object):
+
+    def __init__(self, booster, classes=None, best_iteration=None, model_name=None, params=None):
+        self.booster = booster
+        self.classes_ = None if classes is None else np.array(classes)
+        self.best_iteration_ = best_iteration
+        self.model_name = model_name
+        self.params = params or {}
+
+
+    # The same attribute a trained LGBMRegressor or LGBMClassifier has, so that we can keep boosting from this model by passing it in as init_model
+    @property
+    def booster_(self):
+        return self.booster
+
+
+    def get_params(self, deep=True):
+        return dict(self.params)
+
+
+    @property
+    def feature_importances_(self):
+        return self.booster.feature_importance()
+
+
+    def predict_proba(self, X, num_iteration=None):
+        raw_predictions = self.booster.predict(X, num_iteration=num_iteration)
+        if raw_predictions.ndim == 1:
+            return np.column_stack([1 - raw_predictions, raw_predictions])
+        return raw_predictions
+
+
+    def predict(self, X, num_iteration=None):
+        if self.classes_ is None:
+            return self.booster.predict(X, num_iteration=num_iteration)
+        return self.classes_[np.argmax(self.predict_proba(X, num_iteration=num_iteration), axis=1)]
+
+
+# Stands in for an XGBoost sklearn model, once we have loaded its Booster back in from XGBoost's own format
+class XGBoostBoosterModel(object):
+
+    def __init__(self, booster, classes=None, model_name=None, params=None):
+        self.booster = booster
+        self.classes_ = None if classes is None else np.array(classes)
+        self.model_name = model_name
+        self.params = params or {}
+
+
+    # The same method a trained XGBRegressor or XGBClassifier has, so that we can keep boosting from this model by passing it in as xgb_model
+    def get_booster(self):
+        return self.booster
+
+
+    def get_params(self, deep=True):
+        return dict(self.params)
+
+
+    @property
+    def feature_importances_(self):
+        scores = self.booster.get_fscore()
+        num_features = max([int(feature_name[1:]) for feature_name in scores.keys()] + [-1]) + 1
+        importances = np.zeros(num_features)
+        for feature_name, score in scores.items():
+            importances[int(feature_name[1:])] = score
+        return importances / max(importances.sum(), 1)
+
+
+    def predict_proba(self, X):
+        import xgboost as xgb
+        raw_predictions = self.booster.predict(xgb.DMatrix(X))
+        if raw_predictions.ndim == 1:
+            return np.column_stack([1 - raw_predictions, raw_predictions])
+        return raw_predictions
+
+
+    def predict(self, X):
+        import xgboost as xgb
+        if self.classes_ is None:
+            return self.booster.predict(xgb.DMatrix(X))
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def save_model(model, model_name, model_dir):
+    os.makedirs(model_dir)
+    model_name = model_name or ''
+    classes = getattr(model, 'classes_', None)
+
+    if model_name[:4] == 'LGBM' and hasattr(model, 'booster_'):
+        model.booster_.save_model(os.path.join(model_dir, 'lightgbm_model.txt'))
+        return {
+            'format': 'lightgbm'
+            , 'file': 'lightgbm_model.txt'
+            , 'best_iteration': getattr(model, 'best_iteration_', None)
+            , 'classes': save_labels(model_dir, 'classes', classes)
+            , 'model_name': model_name
+            , 'params': get_json_params(model)
+        }
+
+    elif model_name[:3] == 'XGB' and hasattr(model, 'get_booster'):
+        model.get_booster().save_model(os.path.join(model_dir, 'xgboost_model.json'))
+        return {
+            'format': 'xgboost'
+            , 'file': 'xgboost_model.json'
+            , 'classes': save_labels(model_dir, 'classes', classes)
+            , 'model_name': model_name
+            , 'params': get_json_params(model)
+        }
+
+    elif model_name[:12] == 'DeepLearning':
+        # Just like in Predictor.save, sometimes the Keras model is wrapped in a KerasRegressor or KerasClassifier, and sometimes it is not
+        try:
+            model.save(os.path.join(model_dir, 'keras_model.h5'))
+        except AttributeError:
+            model.model.save(os.path.join(model_dir, 'keras_model.h5'))
+        return {
+            'format': 'keras'
+            , 'file': 'keras_model.h5'
+        }
+
+    elif model_name[:8] == 'CatBoost' and hasattr(model, 'save_model'):
+        model.save_model(os.path.join(model_dir, 'catboost_model.cbm'))
+        return {
+            'format': 'catboost'
+            , 'file': 'catboost_model.cbm'
+            , 'model_class': get_class_path(model)
+        }
+
+    try:
+        return {
+            'format': 'arrays'
+            , 'state': serialize_value(model, model_dir, 'model')
+        }
+    except UnserializableValue:
+        # Clean up any arrays we wrote before we hit the value we could not handle
+        shutil.rmtree(model_dir)
+        os.makedirs(model_dir)
+        save_pickled(model, os.path.join(model_dir, 'model.dill'))
+        return {
+            'format': 'dill'
+            , 'file': 'model.dill'
+        }
+
+
+def load_model(model_info, model_dir, mmap_mode=None):
+    model_format = model_info['format']
+
+    if model_format == 'lightgbm':
+        import lightgbm as lgb
+        booster = lgb.Booster(model_file=os.path.join(model_dir, model_info['file']))
+        return LightGBMBoosterModel(booster, classes=load_labels(model_dir, model_info['classes']), best_iteration=model_info['best_iteration'], model_name=model_info.get('model_name'), params=model_info.get('params'))
+
+    elif model_format == 'xgboost':
+        import xgboost as xgb
+        booster = xgb.Booster()
+        booster.load_model(os.path.join(model_dir, model_info['file']))
+        return XGBoostBoosterModel(booster, classes=load_labels(model_dir, model_info['classes']), model_name=model_info.get('model_name'), params=model_info.get('params'))
+
+    elif model_format == 'keras':
+        from keras.models import load_model as keras_load_model
+        return keras_load_model(os.path.join(model_dir, model_info['file']))
+
+    elif model_format == 'catboost':
+        model = import_from_path(model_info['model_class'])()
+        model.load_model(os.path.join(model_dir, model_info['file']))
+        return model
+
+    elif model_format == 'arrays':
+        return deserialize_value(model_info['state'], model_dir, mmap_mode=mmap_mode)
+
+    elif model_format == 'dill':
+        return load_pickled(os.path.join(model_dir, model_info['file']))
+
+    raise ValueError('This artifact contains a model saved in a format we do not recognize: {}'.format(model_format))
+
+
+# ################################
+# Each type of component we know how to save
+# ################################
+
+# Values like a FinalModelATC's uncertainty_model can either be a plain value (a boolean flag), or a full component of their own
+def save_child(val, component_dir, name):
+    if val is None or isinstance(val, (bool, int, float) + string_types):
+        return {'value': val}
+    save_component(val, os.path.join(component_dir, name))
+    return {'component': name}
+
+
+def load_child(info, component_dir, mmap_mode=None):
+    if info is None:
+        return None
+    if 'component' in info:
+        return load_component(os.path.join(component_dir, info['component']), mmap_mode=mmap_mode)
+    return info['value']
+
+
+def save_scorer(scorer):
+    if scorer is None:
+        return None
+
+    scoring_method = scorer.get('scoring_method')
+    if callable(scoring_method):
+        if getattr(scoring_method, '__name__', '<lambda>') == '<lambda>':
+            warnings.warn('We cannot save a custom scoring lambda into this artifact. The loaded pipeline will use the default scoring method in .score()')
+            scoring_method = None
+        else:
+            scoring_method = {'function': scoring_method.__module__ + '.' + scoring_method.__name__}
+
+    return {
+        'scorer_class': type(scorer).__name__
+        , 'scoring_method': scoring_method
+    }
+
+
+def load_scorer(scorer_info):
+    if scorer_info is None:
+        return None
+
+    from auto_ml import utils_scoring
+    scoring_method = scorer_info['scoring_method']
+    if isinstance(scoring_method, dict):
+        scoring_method = import_from_path(scoring_method['function'])
+
+    return getattr(utils_scoring, scorer_info['scorer_class'])(scoring_method)
+
+
+def save_extended_pipeline(pipeline, component_dir):
+    steps = []
+    for idx, (step_name, step) in enumerate(pipeline.steps):
+        step_dir_name = 'step_{}_{}'.format(idx, step_name)
+        save_component(step, os.path.join(component_dir, step_dir_name))
+        steps.append([step_name, step_dir_name])
+
+    return {
+        'steps': steps
+        , 'keep_cat_features': pipeline.keep_cat_features
+        , 'name': getattr(pipeline, 'name', None)
+        , 'training_features': save_labels(component_dir, 'training_features', getattr(pipeline, 'training_features', None))
+        , 'versions': getattr(pipeline, '__versions__', None)
+        , 'feature_importances': dict_to_pairs(getattr(pipeline, 'feature_importances_', None))
+    }
+
+
+def load_extended_pipeline(component, component_dir, mmap_mode=None):
+    from auto_ml import utils
+
+    steps = [(step_name, load_component(os.path.join(component_dir, step_dir_name), mmap_mode=mmap_mode)) for step_name, step_dir_name in component['steps']]
+    pipeline = utils.ExtendedPipeline._from_saved_steps(steps, keep_cat_features=component['keep_cat_features'], name=component['name'], training_features=load_labels(component_dir, component['training_features']), versions=component['versions'])
+    pipeline.feature_importances_ = pairs_to_dict(component['feature_importances'])
+
+    return pipeline
+
+
+def save_basic_data_cleaning(transformer, component_dir):
+    text_columns = []
+    for idx, (col_name, tfidf) in enumerate(transformer.text_columns.items()):
+        # Text columns that were described but never showed up in the training data were never fit
+        if not hasattr(tfidf, 'vocabulary_'):
+            continue
+        terms = [term for term, term_idx in sorted(tfidf.vocabulary_.items(), key=itemgetter(1))]
+        text_columns.append({
+            'column': col_name
+            , 'vocabulary': save_vocabulary(component_dir, 'text_{}_vocabulary'.format(idx), terms)
+            , 'idf': save_array(component_dir, 'text_{}_idf'.format(idx), tfidf.idf_)
+            , 'cleaned_feature_names': save_labels(component_dir, 'text_{}_feature_names'.format(idx), tfidf.cleaned_feature_names)
+        })
+
+    return {
+        'column_descriptions': dict_to_pairs(transformer.column_descriptions)
+        , 'transformed_column_descriptions': dict_to_pairs(transformer.get('transformed_column_descriptions'))
+        , 'vals_to_drop': sorted(transformer.get('vals_to_drop', []))
+        , 'text_columns': text_columns
+    }
+
+
+def set_tfidf_state(tfidf, vocabulary, idf):
+    tfidf.vocabulary_ = vocabulary
+    tfidf.fixed_vocabulary_ = False
+    try:
+        tfidf.idf_ = idf
+    except AttributeError:
+        # Older versions of scikit-learn do not let us set idf_ directly
+        num_terms = len(idf)
+        tfidf._tfidf._idf_diag = scipy.sparse.spdiags(idf, diags=0, m=num_terms, n=num_terms, format='csr')
+
+
+def load_basic_data_cleaning(component, component_dir, mmap_mode=None):
+    from auto_ml.utils_data_cleaning import BasicDataCleaning
+
+    transformer = BasicDataCleaning(column_descriptions=pairs_to_dict(component['column_descriptions']))
+    transformer.transformed_column_descriptions = pairs_to_dict(component['transformed_column_descriptions'])
+    transformer.vals_to_drop = set(component['vals_to_drop'])
+
+    for text_column in component['text_columns']:
+        tfidf = transformer.text_columns[text_column['column']]
+        terms, vocabulary = load_vocabulary(component_dir, text_column['vocabulary'], mmap_mode=mmap_mode)
+        set_tfidf_state(tfidf, vocabulary, load_array(component_dir, text_column['idf'], mmap_mode=mmap_mode))
+        tfidf.cleaned_feature_names = load_labels(component_dir, text_column['cleaned_feature_names'])
+
+    return transformer
+
+
+def save_custom_sparse_scaler(scaler, component_dir):
+    range_columns = list(scaler.get('column_ranges', {}).keys())
+
+    return {
+        'column_descriptions': dict_to_pairs(scaler.column_descriptions)
+        , 'truncate_large_values': scaler.truncate_large_values
+        , 'perform_feature_scaling': scaler.perform_feature_scaling
+        , 'min_percentile': scaler.min_percentile
+        , 'max_percentile': scaler.max_percentile
+        , 'cols_to_ignore': save_labels(component_dir, 'cols_to_ignore', scaler.get('cols_to_ignore', []))
+        , 'range_columns': save_labels(component_dir, 'range_columns', range_columns)
+        , 'min_vals': save_array(component_dir, 'min_vals', np.array([scaler.column_ranges[col]['min_val'] for col in range_columns], dtype=np.float64))
+        , 'max_vals': save_array(component_dir, 'max_vals', np.array([scaler.column_ranges[col]['max_val'] for col in range_columns], dtype=np.float64))
+        , 'inner_ranges': save_array(component_dir, 'inner_ranges', np.array([scaler.column_ranges[col]['inner_range'] for col in range_columns], dtype=np.float64))
+    }
+
+
+def load_custom_sparse_scaler(component, component_dir, mmap_mode=None):
+    from auto_ml.utils_scaling import CustomSparseScaler
+
+    scaler = CustomSparseScaler(pairs_to_dict(component['column_descriptions']), truncate_large_values=component['truncate_large_values'], perform_feature_scaling=component['perform_feature_scaling'], min_percentile=component['min_percentile'], max_percentile=component['max_percentile'])
+    scaler.cols_to_ignore = load_labels(component_dir, component['cols_to_ignore'])
+
+    range_columns = load_labels(component_dir, component['range_columns'])
+    min_vals = load_array(component_dir, component['min_vals']).tolist()
+    max_vals = load_array(component_dir, component['max_vals']).tolist()
+    inner_ranges = load_array(component_dir, component['inner_ranges']).tolist()
+
+    scaler.column_ranges = {}
+    for col, min_val, max_val, inner_range in zip(range_columns, min_vals, max_vals, inner_ranges):
+        scaler.column_ranges[col] = {
+            'min_val': min_val
+            , 'max_val': max_val
+            , 'inner_range': inner_range
+        }
+
+    return scaler
+
+
+def save_target_encoder(target_encoder, component_dir):
+    encodings = []
+    for idx, (col_name, encoded_col_names) in enumerate(target_encoder.encoded_columns.items()):
+        encodings.append({
+            'column': col_name
+            , 'encoded_columns': make_json_safe(encoded_col_names)
+            , 'keys': save_labels(component_dir, 'target_encoding_{}_keys'.format(idx), target_encoder.encodings[col_name]['keys'])
+            , 'values': save_array(component_dir, 'target_encoding_{}_values'.format(idx), target_encoder.encodings[col_name]['values'])
+        })
+
+    return {
+        'column_descriptions': dict_to_pairs(target_encoder.column_descriptions)
+        , 'cols_to_encode': make_json_safe(target_encoder.cols_to_encode)
+        , 'type_of_estimator': target_encoder.type_of_estimator
+        , 'smoothing': target_encoder.smoothing
+        , 'num_folds': target_encoder.num_folds
+        , 'min_categories_for_auto': target_encoder.min_categories_for_auto
+        , 'random_state': target_encoder.random_state
+        , 'target_names': make_json_safe(target_encoder.target_names)
+        , 'priors': make_json_safe(target_encoder.priors)
+        , 'encodings': encodings
+    }
+
+
+def load_target_encoder(component, component_dir, mmap_mode=None):
+    from auto_ml.utils_target_encoding import TargetEncoder
+
+    target_encoder = TargetEncoder(pairs_to_dict(component['column_descriptions']), cols_to_encode=component['cols_to_encode'], type_of_estimator=component['type_of_estimator'], smoothing=component['smoothing'], num_folds=component['num_folds'], min_categories_for_auto=component['min_categories_for_auto'], random_state=component['random_state'])
+    target_encoder.target_names = component['target_names']
+    target_encoder.priors = np.array(component['priors'], dtype=np.float64)
+
+    target_encoder.encoded_columns = {}
+    target_encoder.encodings = {}
+    for encoding_info in component['encodings']:
+        col_name = encoding_info['column']
+        target_encoder.encoded_columns[col_name] = encoding_info['encoded_columns']
+        target_encoder.encodings[col_name] = {
+            'keys': load_labels(component_dir, encoding_info['keys'])
+            , 'values': load_array(component_dir, encoding_info['values'], mmap_mode=mmap_mode)
+        }
+
+    return target_encoder
+
+
+def save_dataframe_vectorizer(vectorizer, component_dir):
+    label_encoders = []
+    for idx, (col_name, label_encoder) in enumerate(vectorizer.get('label_encoders', {}).items()):
+        labels = list(label_encoder.label_map.keys())
+        label_encoders.append({
+            'column': col_name
+            , 'labels': make_json_safe(labels)
+            , 'indices': save_array(component_dir, 'label_encoder_{}_indices'.format(idx), np.array([label_encoder.label_map[label] for label in labels], dtype=np.int64))
+            , 'other_index': getattr(label_encoder, 'other_index', None)
+        })
+
+    return {
+        'column_descriptions': dict_to_pairs(vectorizer.column_descriptions)
+        , 'dtype': np.dtype(vectorizer.dtype).name
+        , 'separator': vectorizer.separator
+        , 'sparse': vectorizer.sparse
+        , 'keep_cat_features': vectorizer.get('keep_cat_features', False)
+        , 'has_been_restricted': vectorizer.get('has_been_restricted', False)
+        , 'num_numerical_cols': vectorizer.get('num_numerical_cols')
+        , 'numerical_columns': save_labels(component_dir, 'numerical_columns', vectorizer.numerical_columns)
+        , 'categorical_columns': save_labels(component_dir, 'categorical_columns', vectorizer.categorical_columns)
+        , 'additional_numerical_cols': save_labels(component_dir, 'additional_numerical_cols', vectorizer.get('additional_numerical_cols', []))
+        , 'feature_names': save_vocabulary(component_dir, 'feature_names', vectorizer.feature_names_)
+        , 'label_encoders': label_encoders
+        , 'min_category_frequency': vectorizer.get('min_category_frequency')
+        , 'max_categories_per_column': vectorizer.get('max_categories_per_column')
+        , 'other_feature_names': dict_to_pairs(vectorizer.get('other_feature_names', {}))
+        , 'num_hash_buckets': vectorizer.get('num_hash_buckets')
+    }
+
+
+def load_dataframe_vectorizer(component, component_dir, mmap_mode=None):
+    from auto_ml.DataFrameVectorizer import DataFrameVectorizer
+    from auto_ml.utils import CustomLabelEncoder
+
+    vectorizer = DataFrameVectorizer(column_descriptions=pairs_to_dict(component['column_descriptions']), dtype=np.dtype(component['dtype']).type, separator=component['separator'], sparse=component['sparse'], keep_cat_features=component['keep_cat_features'], min_category_frequency=component.get('min_category_frequency'), max_categories_per_column=component.get('max_categories_per_column'), num_hash_buckets=component.get('num_hash_buckets'))
+    vectorizer.other_feature_names = pairs_to_dict(component.get('other_feature_names')) or {}
+    vectorizer.has_been_restricted = component['has_been_restricted']
+    vectorizer.num_numerical_cols = component['num_numerical_cols']
+    vectorizer.numerical_columns = load_labels(component_dir, component['numerical_columns'])
+    vectorizer.categorical_columns = load_labels(component_dir, component['categorical_columns'])
+    vectorizer.additional_numerical_cols = load_labels(component_dir, component['additional_numerical_cols'])
+
+    # Our vocabulary_ is always just each feature name mapped to its position in feature_names_
+    vectorizer.feature_names_, vectorizer.vocabulary_ = load_vocabulary(component_dir, component['feature_names'], mmap_mode=mmap_mode)
+
+    for label_encoder_info in component['label_encoders']:
+        label_encoder = CustomLabelEncoder()
+        indices = load_array(component_dir, label_encoder_info['indices']).tolist()
+        label_encoder.label_map = dict(zip(label_encoder_info['labels'], indices))
+        label_encoder.other_index = label_encoder_info.get('other_index')
+        vectorizer.label_encoders[label_encoder_info['column']] = label_encoder
+
+    return vectorizer
+
+
+def save_final_model_atc(final_model, component_dir):
+    interval_predictors = final_model.get('interval_predictors')
+    if interval_predictors is not None:
+        interval_predictors = [[predictor_name, save_child(predictor, component_dir, 'interval_predictor_{}'.format(idx))] for idx, (predictor_name, predictor) in enumerate(interval_predictors)]
+
+    return {
+        'model': save_model(final_model.model, final_model.get('model_name'), os.path.join(component_dir, 'model'))
+        , 'model_name': final_model.get('model_name')
+        , 'type_of_estimator': final_model.type_of_estimator
+        , 'ml_for_analytics': final_model.get('ml_for_analytics', False)
+        , 'name': final_model.get('name')
+        , 'scorer': save_scorer(final_model.get('_scorer'))
+        , 'training_features': save_labels(component_dir, 'training_features', final_model.get('training_features'))
+        , 'column_descriptions': dict_to_pairs(final_model.get('column_descriptions'))
+        , 'feature_learning': final_model.get('feature_learning', False)
+        , 'uncertainty_model': save_child(final_model.get('uncertainty_model'), component_dir, 'uncertainty_model')
+        , 'uc_results': dict_to_pairs(final_model.get('uc_results'))
+        , 'training_prediction_intervals': final_model.get('training_prediction_intervals', False)
+        , 'min_step_improvement': final_model.get('min_step_improvement')
+        , 'interval_predictors': interval_predictors
+        , 'conformal_intervals': final_model.get('conformal_intervals')
+        , 'keep_cat_features': final_model.get('keep_cat_features', False)
+        , 'is_hp_search': final_model.get('is_hp_search')
+    }
+
+
+def load_final_model_atc(component, component_dir, mmap_mode=None):
+    from auto_ml.utils_model_training import FinalModelATC
+
+    interval_predictors = component['interval_predictors']
+    if interval_predictors is not None:
+        interval_predictors = [(predictor_name, load_child(predictor_info, component_dir, mmap_mode=mmap_mode)) for predictor_name, predictor_info in interval_predictors]
+
+    uc_results = component['uc_results']
+    if uc_results is not None:
+        uc_results = OrderedDict((bucket_num, bucket_result) for bucket_num, bucket_result in uc_results)
+
+    return FinalModelATC(
+        model=load_model(component['model'], os.path.join(component_dir, 'model'), mmap_mode=mmap_mode)
+        , model_name=component['model_name']
+        , ml_for_analytics=component['ml_for_analytics']
+        , type_of_estimator=component['type_of_estimator']
+        , name=component['name']
+        , _scorer=load_scorer(component['scorer'])
+        , training_features=load_labels(component_dir, component['training_features'])
+        , column_descriptions=pairs_to_dict(component['column_descriptions'])
+        , feature_learning=component['feature_learning']
+        , uncertainty_model=load_child(component['uncertainty_model'], component_dir, mmap_mode=mmap_mode)
+        , uc_results=uc_results
+        , training_prediction_intervals=component['training_prediction_intervals']
+        , min_step_improvement=component['min_step_improvement']
+        , interval_predictors=interval_predictors
+        , conformal_intervals=component.get('conformal_intervals')
+        , keep_cat_features=component['keep_cat_features']
+        , is_hp_search=component['is_hp_search']
+    )
+
+
+def save_ensembler(ensembler, component_dir):
+    ensemble_predictors = []
+    for idx, predictor in enumerate(ensembler.ensemble_predictors):
+        predictor_dir_name = 'ensemble_predictor_{}'.format(idx)
+        save_component(predictor, os.path.join(component_dir, predictor_dir_name))
+        ensemble_predictors.append(predictor_dir_name)
+
+    return {
+        'ensemble_predictors': ensemble_predictors
+        , 'type_of_estimator': ensembler.type_of_estimator
+        , 'ensemble_method': ensembler.ensemble_method
+        , 'num_classes': ensembler.num_classes
+    }
+
+
+def load_ensembler(component, component_dir, mmap_mode=None):
+    from auto_ml.utils_ensembling import Ensembler
+
+    ensemble_predictors = [load_component(os.path.join(component_dir, predictor_dir_name), mmap_mode=mmap_mode) for predictor_dir_name in component['ensemble_predictors']]
+    return Ensembler(ensemble_predictors=ensemble_predictors, type_of_estimator=component['type_of_estimator'], ensemble_method=component['ensemble_method'], num_classes=component['num_classes'])
+
+
+def save_categorical_ensembler(categorical_ensembler, component_dir):
+    save_component(categorical_ensembler.transformation_pipeline, os.path.join(component_dir, 'transformation_pipeline'))
+
+    categories = []
+    for idx, (category, model) in enumerate(categorical_ensembler.trained_models.items()):
+        category_dir_name = 'category_{}'.format(idx)
+        save_component(model, os.path.join(component_dir, category_dir_name))
+        categories.append([category, category_dir_name])
+
+    return {
+        'transformation_pipeline': 'transformation_pipeline'
+        , 'categorical_column': categorical_ensembler.categorical_column
+        , 'default_category': categorical_ensembler.default_category
+        , 'categories': categories
+    }
+
+
+def get_dir_size_mb(dir_name):
+    total_bytes = 0
+    for dir_path, dir_names, file_names in os.walk(dir_name):
+        for file_name in file_names:
+            total_bytes += os.path.getsize(os.path.join(dir_path, file_name))
+    return total_bytes / (1024.0 * 1024.0)
+
+
+def make_component_loader(component_dir, mmap_mode=None):
+    def load_one_component():
+        return load_component(component_dir, mmap_mode=mmap_mode)
+    return load_one_component
+
+
+def load_categorical_ensembler(component, component_dir, mmap_mode=None, lazy_categories=False, max_loaded_categories=None, max_loaded_category_mb=None):
+    from auto_ml.utils_categorical_ensembling import CategoricalEnsembler, LazyCategoryModels
+
+    transformation_pipeline = load_component(os.path.join(component_dir, component['transformation_pipeline']), mmap_mode=mmap_mode)
+
+    if lazy_categories == True:
+        category_loaders = {}
+        category_sizes = {}
+        for category, category_dir_name in component['categories']:
+            category_loaders[category] = make_component_loader(os.path.join(component_dir, category_dir_name), mmap_mode=mmap_mode)
+            if max_loaded_category_mb is not None:
+                category_sizes[category] = get_dir_size_mb(os.path.join(component_dir, category_dir_name))
+
+        trained_models = LazyCategoryModels(category_loaders, max_loaded_models=max_loaded_categories, max_loaded_mb=max_loaded_category_mb, pinned_categories=[component['default_category']], category_sizes=category_sizes)
+    else:
+        trained_models = {}
+        for category, category_dir_name in component['categories']:
+            trained_models[category] = load_component(os.path.join(component_dir, category_dir_name), mmap_mode=mmap_mode)
+
+    return CategoricalEnsembler(trained_models, transformation_pipeline, component['categorical_column'], component['default_category'])
+
+
+def save_multi_target_pipeline(multi_target_pipeline, component_dir):
+    save_component(multi_target_pipeline.transformation_pipeline, os.path.join(component_dir, 'transformation_pipeline'))
+
+    targets = []
+    for idx, (output_column, model) in enumerate(multi_target_pipeline.trained_models.items()):
+        target_dir_name = 'target_{}'.format(idx)
+        save_component(model, os.path.join(component_dir, target_dir_name))
+        targets.append([output_column, target_dir_name, multi_target_pipeline.type_of_estimators[output_column]])
+
+    return {
+        'transformation_pipeline': 'transformation_pipeline'
+        , 'targets': targets
+    }
+
+
+def load_multi_target_pipeline(component, component_dir, mmap_mode=None):
+    from auto_ml.utils_multi_target import MultiTargetPipeline
+
+    transformation_pipeline = load_component(os.path.join(component_dir, component['transformation_pipeline']), mmap_mode=mmap_mode)
+
+    trained_models = OrderedDict()
+    type_of_estimators = {}
+    for output_column, target_dir_name, type_of_estimator in component['targets']:
+        trained_models[output_column] = load_component(os.path.join(component_dir, target_dir_name), mmap_mode=mmap_mode)
+        type_of_estimators[output_column] = type_of_estimator
+
+    return MultiTargetPipeline(trained_models, transformation_pipeline, type_of_estimators)
+
+
+def save_pickled_component(obj, component_dir):
+    save_pickled(obj, os.path.join(component_dir, 'component.dill'))
+    return {
+        'file': 'component.dill'
+    }
+
+
+def load_pickled_component(component, component_dir, mmap_mode=None):
+    return load_pickled(os.path.join(component_dir, component['file']))
+
+
+component_savers = {
+    'ExtendedPipeline': save_extended_pipeline
+    , 'BasicDataCleaning': save_basic_data_cleaning
+    , 'CustomSparseScaler': save_custom_sparse_scaler
+    , 'TargetEncoder': save_target_encoder
+    , 'DataFrameVectorizer': save_dataframe_vectorizer
+    , 'FinalModelATC': save_final_model_atc
+    , 'Ensembler': save_ensembler
+    , 'CategoricalEnsembler': save_categorical_ensembler
+    , 'MultiTargetPipeline': save_multi_target_pipeline
+}
+
+component_loaders = {
+    'ExtendedPipeline': load_extended_pipeline
+    , 'BasicDataCleaning': load_basic_data_cleaning
+    , 'CustomSparseScaler': load_custom_sparse_scaler
+    , 'TargetEncoder': load_target_encoder
+    , 'DataFrameVectorizer': load_dataframe_vectorizer
+    , 'FinalModelATC': load_final_model_atc
+    , 'Ensembler': load_ensembler
+    , 'CategoricalEnsembler': load_categorical_ensembler
+    , 'MultiTargetPipeline': load_multi_target_pipeline
+    , 'pickle': load_pickled_component
+}
+
+
+def save_component(obj, component_dir):
+    os.makedirs(component_dir)
+
+    component_type = type(obj).__name__
+    if component_type in component_savers:
+        component = component_savers[component_type](obj, component_dir)
+    else:
+        component_type = 'pickle'
+        component = save_pickled_component(obj, component_dir)
+
+    component['type'] = component_type
+    write_json(os.path.join(component_dir, component_file_name), component)
+
+
+def load_component(component_dir, mmap_mode=None):
+    component = read_json(os.path.join(component_dir, component_file_name))
+    component_type = component['type']
+    if component_type not in component_loaders:
+        raise ValueError('This artifact contains a component type that this version of auto_ml does not know how to load: {}'.format(component_type))
+
+    return component_loaders[component_type](component, component_dir, mmap_mode=mmap_mode)
+
+
+# ################################
+# Public API
+# ################################
+
+def is_artifact(file_name):
+    return os.path.isdir(file_name) and os.path.exists(os.path.join(file_name, manifest_file_name))
+
+
+def save_artifact(trained_pipeline, dir_name):
+    if os.path.exists(dir_name) and not is_artifact(dir_name):
+        print('There is already a file or directory at ' + dir_name + ' that is not an auto_ml artifact.')
+        print('To avoid deleting anything we should not, we will not overwrite it. Please choose a different file_name.')
+        raise ValueError('Cannot overwrite a non-artifact path with an auto_ml artifact: ' + dir_name)
+
+    # Write everything into a temporary directory first, so that anyone loading from dir_name never sees a half-written artifact
+    temp_dir_name = dir_name.rstrip(os.sep) + '_tmp_' + str(random.random())[2:]
+    os.makedirs(temp_dir_name)
+
+    try:
+        save_component(trained_pipeline, os.path.join(temp_dir_name, 'pipeline'))
+
+        manifest = {
+            'format': artifact_format_name
+            , 'format_version': artifact_format_version
+            , 'auto_ml_version': auto_ml_version
+            , 'created_at': datetime.datetime.now().isoformat()
+            , 'training_versions': getattr(trained_pipeline, '__versions__', None)
+            , 'root': 'pipeline'
+        }
+        write_json(os.path.join(temp_dir_name, manifest_file_name), manifest)
+    except Exception:
+        shutil.rmtree(temp_dir_name)
+        raise
+
+    if os.path.exists(dir_name):
+        shutil.rmtree(dir_name)
+    os.rename(temp_dir_name, dir_name)
+
+    return dir_name
+
+
+# With mmap=True, large arrays and vocabularies are memory-mapped rather than read into memory
+# This lets many worker processes on the same machine share a single physical copy of the model
+# With lazy_categories=True, a categorical ensemble only loads each category's model the first time that category is requested. See LazyCategoryModels for how max_loaded_categories and max_loaded_category_mb are used
+def load_artifact(dir_name, mmap=False, lazy_categories=False, max_loaded_categories=None, max_loaded_category_mb=None):
+    manifest = read_json(os.path.join(dir_name, manifest_file_name))
+
+    if manifest.get('format') != artifact_format_name:
+        raise ValueError('The directory at ' + dir_name + ' is not an auto_ml artifact')
+
+    if manifest['format_version'] > artifact_format_version:
+        print('This artifact was saved by auto_ml version ' + str(manifest['auto_ml_version']) + ', which uses a newer artifact format than this version of auto_ml can read.')
+        print('Please upgrade auto_ml to load it.')
+        raise ValueError('Unsupported auto_ml artifact format_version: ' + str(manifest['format_version']))
+
+    mmap_mode = 'r' if mmap else None
+    root_dir = os.path.join(dir_name, manifest['root'])
+
+    if lazy_categories == True:
+        component = read_json(os.path.join(root_dir, component_file_name))
+        if component['type'] == 'CategoricalEnsembler':
+            return load_categorical_ensembler(component, root_dir, mmap_mode=mmap_mode, lazy_categories=True, max_loaded_categories=max_loaded_categories, max_loaded_category_mb=max_loaded_category_mb)
+        warnings.warn('lazy_categories=True only applies to pipelines trained with categorical_column. We are loading this pipeline as usual.')
+
+    return load_component(root_dir, mmap_mode=mmap_mode)
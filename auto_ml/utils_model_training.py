@@ -1,22 +1,102 @@
-from collections import Iterable
+from collections import Iterable, OrderedDict
 from copy import deepcopy
 import datetime
 import gc
+import math
 import os
 import random
+import time
 import warnings
 
 import numpy as np
 import pandas as pd
 import scipy
 from sklearn.base import BaseEstimator, TransformerMixin
-from sklearn.model_selection import train_test_split
 from sklearn import __version__ as sklearn_version
 
-from auto_ml import utils_models
-from auto_ml.utils_models import get_name_from_model
+from auto_ml import utils_conformal
+from auto_ml import utils_search_journal
+from auto_ml import utils_telemetry
+
 keras_imported = False
 
+# Densifying a wide one-hot-encoded matrix all at once can take orders of magnitude more memory than the sparse matrix itself.
+# For the models that need dense input (Keras), we only ever densify a limited number of cells at a time.
+max_cells_per_dense_batch = 2 ** 24
+
+
+def get_dense_batch_size(num_cols, max_batch_size=10000):
+    return int(max(1, min(max_batch_size, max_cells_per_dense_batch // max(num_cols, 1))))
+
+
+def get_dense_rows(X, rows):
+    if scipy.sparse.issparse(X):
+        return X[rows].toarray()
+    elif isinstance(X, pd.DataFrame):
+        return X.iloc[rows].values
+    else:
+        return np.asarray(X[rows])
+
+
+# Keras' fit_generator expects a generator that loops over the data indefinitely
+# Each batch slices just the rows it needs out of the (typically CSR) matrix, and densifies only those rows
+def sparse_batch_generator(X, y=None, batch_size=50, shuffle=True):
+    num_rows = X.shape[0]
+    if y is not None:
+        y = np.asarray(y)
+
+    while True:
+        if shuffle == True:
+            row_order = np.random.permutation(num_rows)
+        else:
+            row_order = np.arange(num_rows)
+
+        for start_idx in range(0, num_rows, batch_size):
+            batch_rows = row_order[start_idx:start_idx + batch_size]
+            X_batch = get_dense_rows(X, batch_rows)
+
+            if y is None:
+                yield X_batch
+            else:
+                yield X_batch, y[batch_rows]
+
+# When training on a time budget, stops training a Keras model once the deadline passes
+# Our ModelCheckpoint callback then loads the best model we have seen so far
+def make_keras_deadline_callback(training_deadline):
+    from keras.callbacks import Callback
+
+    class KerasDeadlineCallback(Callback):
+
+        def on_batch_end(self, batch, logs=None):
+            if time.time() >= training_deadline:
+                self.model.stop_training = True
+
+    return KerasDeadlineCallback()
+
+
+# When training on a time budget, stops adding trees to a LightGBM model once the deadline passes, and keeps the trees up to the best iteration we have seen so far
+def make_lightgbm_deadline_callback(training_deadline):
+    import lightgbm as lgb
+
+    best_score = [None]
+    best_iteration = [0]
+    best_score_list = [None]
+
+    def lightgbm_deadline_callback(env):
+        if len(env.evaluation_result_list) > 0:
+            # We track the first metric on the first eval set, the same way LightGBM's own early stopping does
+            data_name, metric_name, score, is_higher_better = env.evaluation_result_list[0][:4]
+            if best_score[0] is None or (is_higher_better and score > best_score[0]) or (not is_higher_better and score < best_score[0]):
+                best_score[0] = score
+                best_iteration[0] = env.iteration
+                best_score_list[0] = env.evaluation_result_list
+
+        if time.time() >= training_deadline:
+            print('Ran out of time to train this model, so we are stopping early, and using the best iteration we have found so far')
+            raise lgb.callback.EarlyStopException(best_iteration[0], best_score_list[0])
+
+    return lightgbm_deadline_callback
+
 # This is the Air Traffic Controller (ATC) that is a wrapper around sklearn estimators.
 # In short, it wraps all the methods the pipeline will look for (fit, score, predict, predict_proba, etc.)
 # However, it also gives us the ability to optimize this stage in conjunction with the rest of the pipeline.
@@ -25,7 +105,7 @@ keras_imported = False
 class FinalModelATC(BaseEstimator, TransformerMixin):
 
 
-    def __init__(self, model, model_name=None, ml_for_analytics=False, type_of_estimator='classifier', output_column=None, name=None, _scorer=None, training_features=None, column_descriptions=None, feature_learning=False, uncertainty_model=None, uc_results = None, training_prediction_intervals=False, min_step_improvement=0.0001, interval_predictors=None, keep_cat_features=False, is_hp_search=None, X_test=None, y_test=None):
+    def __init__(self, model, model_name=None, ml_for_analytics=False, type_of_estimator='classifier', output_column=None, name=None, _scorer=None, training_features=None, column_descriptions=None, feature_learning=False, uncertainty_model=None, uc_results = None, training_prediction_intervals=False, min_step_improvement=0.0001, interval_predictors=None, keep_cat_features=False, is_hp_search=None, X_test=None, y_test=None, training_deadline=None, conformal_intervals=None, warm_start_model=None, search_journal=None):
 
         self.model = model
         self.model_name = model_name
@@ -40,10 +120,18 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
         self.training_prediction_intervals = training_prediction_intervals
         self.min_step_improvement = min_step_improvement
         self.interval_predictors = interval_predictors
+        # Residual quantiles from split-conformal calibration. When present, we use these rather than interval_predictors
+        self.conformal_intervals = conformal_intervals
         self.is_hp_search = is_hp_search
         self.keep_cat_features = keep_cat_features
         self.X_test = X_test
         self.y_test = y_test
+        # A time.time() timestamp. If set, early stopping loops stop at this point, and keep the best model they have found so far
+        self.training_deadline = training_deadline
+        # A previously trained model of the same type, trained on exactly the same features. Boosted models keep adding trees to it, rather than starting over
+        self.warm_start_model = warm_start_model
+        # The file name of a SearchJournal. During hyperparameter searches, we skip fitting any candidate that is already in it
+        self.search_journal = search_journal
         self.memory_optimized = False
 
 
@@ -63,7 +151,27 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
     def fit(self, X, y):
 
         global keras_imported, KerasRegressor, KerasClassifier, EarlyStopping, ModelCheckpoint, TerminateOnNaN, keras_load_model
-        self.model_name = get_name_from_model(self.model)
+        # utils_models imports every estimator we know how to train, which predictions never need, so we only import it once we are training
+        from auto_ml import utils_models
+        self.model_name = utils_models.get_name_from_model(self.model)
+
+        # If we already scored this candidate on exactly this data, the journal has its score, and we do not need to fit it at all
+        self.journal_key = None
+        self.journal_score = None
+        if self.get('search_journal') is not None and self.is_hp_search == True:
+            journal_settings = {
+                'scorer': utils_search_journal.get_scorer_description(self.get('_scorer'))
+                , 'type_of_estimator': self.type_of_estimator
+                , 'min_step_improvement': self.get('min_step_improvement')
+                , 'training_prediction_intervals': self.get('training_prediction_intervals')
+                , 'early_stopping_data': None
+            }
+            if self.get('X_test') is not None:
+                journal_settings['early_stopping_data'] = utils_search_journal.get_data_fingerprint(self.X_test, self.y_test)
+            self.journal_key = utils_search_journal.get_journal_key(X, y, self.model_name, self.model, settings=journal_settings)
+            self.journal_score = utils_search_journal.get_search_journal(self.search_journal).lookup(self.journal_key)
+            if self.journal_score is not None:
+                return self
 
         X_fit = X
 
@@ -74,7 +182,7 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
                 # Trying to force XGBoost to play nice with sparse matrices
                 X_fit = scipy.sparse.hstack((X, ones))
 
-            elif scipy.sparse.issparse(X_fit):
+            elif scipy.sparse.issparse(X_fit) and self.model_name[:12] != 'DeepLearning':
                 X_fit = X_fit.todense()
 
             if self.model_name[:12] == 'DeepLearning':
@@ -118,14 +226,8 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
                     patience = 25
                     verbose = 2
 
+                # Both the training data and the validation data stay sparse here. They are only densified one mini-batch at a time
                 X_fit, y, X_test, y_test = self.get_X_test(X_fit, y)
-                if isinstance(X_test, pd.DataFrame):
-                    X_test = X_test.values
-                else:
-                    try:
-                        X_test = X_test.toarray()
-                    except AttributeError as e:
-                        pass
 
                 if not self.is_hp_search:
                     print('\nWe will stop training early if we have not seen an improvement in validation accuracy in {} epochs'.format(patience))
@@ -145,7 +247,14 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
                 if not self.is_hp_search:
                     callbacks.append(model_checkpoint)
 
-                self.model.fit(X_fit, y, callbacks=callbacks, validation_data=(X_test, y_test), verbose=verbose)
+                telemetry = self.get_telemetry()
+                if telemetry is not None:
+                    callbacks.append(utils_telemetry.make_keras_telemetry_callback(telemetry, self.model_name))
+
+                if self.get('training_deadline') is not None:
+                    callbacks.append(make_keras_deadline_callback(self.training_deadline))
+
+                self.fit_keras_in_batches(X_fit, y, X_test, y_test, callbacks=callbacks, verbose=verbose)
 
                 # TODO: give some kind of logging on how the model did here! best epoch, best accuracy, etc.
 
@@ -209,21 +318,35 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
                     else:
                         eval_metric = 'binary_logloss'
 
+                lgbm_callbacks = []
+                telemetry = self.get_telemetry()
+                if telemetry is not None:
+                    lgbm_callbacks.append(utils_telemetry.make_lightgbm_telemetry_callback(telemetry, self.model_name))
+                if self.get('training_deadline') is not None:
+                    lgbm_callbacks.append(make_lightgbm_deadline_callback(self.training_deadline))
+                if len(lgbm_callbacks) == 0:
+                    lgbm_callbacks = None
+
             cat_feature_indices = self.get_categorical_feature_indices()
             if self.memory_optimized == True:
                 X_fit.to_csv('_lgbm_dataset.csv')
                 del X_fit
 
+            lgbm_fit_kwargs = {}
+            if self.get('warm_start_model') is not None:
+                print('Continuing to boost from the {} trees in the model we are warm-starting from'.format(self.warm_start_model.booster_.current_iteration()))
+                lgbm_fit_kwargs['init_model'] = self.warm_start_model.booster_
+
             if cat_feature_indices is None:
                 if train_dynamic_n_estimators:
-                    self.model.fit(X_fit, y, eval_set=[(X_test, y_test)], early_stopping_rounds=100, eval_metric=eval_metric, eval_names=[eval_name], verbose=verbose)
+                    self.model.fit(X_fit, y, eval_set=[(X_test, y_test)], early_stopping_rounds=100, eval_metric=eval_metric, eval_names=[eval_name], verbose=verbose, callbacks=lgbm_callbacks, **lgbm_fit_kwargs)
                 else:
-                    self.model.fit(X_fit, y, verbose=verbose)
+                    self.model.fit(X_fit, y, verbose=verbose, **lgbm_fit_kwargs)
             else:
                 if train_dynamic_n_estimators:
-                    self.model.fit(X_fit, y, eval_set=[(X_test, y_test)], early_stopping_rounds=100, eval_metric=eval_metric, eval_names=[eval_name], categorical_feature=cat_feature_indices, verbose=verbose)
+                    self.model.fit(X_fit, y, eval_set=[(X_test, y_test)], early_stopping_rounds=100, eval_metric=eval_metric, eval_names=[eval_name], categorical_feature=cat_feature_indices, verbose=verbose, callbacks=lgbm_callbacks, **lgbm_fit_kwargs)
                 else:
-                    self.model.fit(X_fit, y, categorical_feature=cat_feature_indices, verbose=verbose)
+                    self.model.fit(X_fit, y, categorical_feature=cat_feature_indices, verbose=verbose, **lgbm_fit_kwargs)
 
         elif self.model_name[:8] == 'CatBoost':
             if isinstance(X_fit, pd.DataFrame):
@@ -251,6 +374,24 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
             num_worse_rounds = 0
             best_model = deepcopy(self.model)
             X_fit, y, X_test, y_test = self.get_X_test(X_fit, y)
+            telemetry = self.get_telemetry()
+
+            # When warm-starting, we keep adding trees to the old model, and only keep the new trees if they beat the old model on our holdout set
+            num_warm_start_trees = 0
+            if self.get('warm_start_model') is not None:
+                # Any hyperparameters we were given apply to the trees we are about to add
+                new_params = self.model.get_params()
+                del new_params['n_estimators']
+                del new_params['warm_start']
+                self.model = deepcopy(self.warm_start_model)
+                self.model.set_params(**new_params)
+                num_warm_start_trees = self.model.get_params()['n_estimators']
+                best_model = deepcopy(self.model)
+                try:
+                    best_val_loss = self._scorer.score(self, X_test, y_test)
+                except Exception as e:
+                    best_val_loss = self.model.score(X_test, y_test)
+                print('Continuing to boost from the {} trees in the model we are warm-starting from, which scored {} on our holdout set'.format(num_warm_start_trees, round(best_val_loss, 3)))
 
             # Add a variable number of trees each time, depending how far into the process we are
             if os.environ.get('is_test_suite', False) == 'True':
@@ -262,8 +403,9 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
             try:
                 for num_iter in num_iters:
                     warm_start = True
-                    if num_iter == 1:
+                    if num_iter == 1 and num_warm_start_trees == 0:
                         warm_start = False
+                    num_iter += num_warm_start_trees
 
                     self.model.set_params(n_estimators=num_iter, warm_start=warm_start)
                     self.model.fit(X_fit, y)
@@ -282,16 +424,31 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
                         best_model = deepcopy(self.model)
                     else:
                         num_worse_rounds += 1
-                    print('[' + str(num_iter) + '] random_holdout_set_from_training_data\'s score is: ' + str(round(val_loss, 3)))
+                    # With verbose=True, the telemetry's print_progress listener prints each round's score
+                    if telemetry is not None:
+                        telemetry.emit('early_stopping_round', model_name=self.model_name, iteration=num_iter, holdout_set='random_holdout_set_from_training_data', scores={'random_holdout_set_from_training_data': val_loss}, best_score=best_val_loss, num_worse_rounds=num_worse_rounds)
+                    else:
+                        # Fits during a hyperparameter search (or outside of Predictor.train) have no telemetry to report to
+                        print('[' + str(num_iter) + '] random_holdout_set_from_training_data\'s score is: ' + str(round(val_loss, 3)))
                     if num_worse_rounds >= patience:
                         break
+                    if self.is_past_deadline():
+                        print('Ran out of time to train this model, so we are stopping early, and using the best model we have found so far')
+                        break
             except KeyboardInterrupt:
                 print('Heard KeyboardInterrupt. Stopping training, and using the best checkpointed GradientBoosting model')
                 pass
 
             self.model = best_model
-            print('The number of estimators that were the best for this training dataset: ' + str(self.model.get_params()['n_estimators']))
-            print('The best score on the holdout set: ' + str(best_val_loss))
+            if telemetry is not None:
+                telemetry.emit('early_stopping_finished', model_name=self.model_name, best_iteration=self.model.get_params()['n_estimators'], best_score=best_val_loss)
+            else:
+                print('The number of estimators that were the best for this training dataset: ' + str(self.model.get_params()['n_estimators']))
+                print('The best score on the holdout set: ' + str(best_val_loss))
+
+        elif self.model_name[:3] == 'XGB' and self.get('warm_start_model') is not None:
+            print('Continuing to boost from the model we are warm-starting from')
+            self.model.fit(X_fit, y, xgb_model=self.warm_start_model.get_booster())
 
         else:
             self.model.fit(X_fit, y)
@@ -299,9 +456,82 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
         if self.X_test is not None:
             del self.X_test
             del self.y_test
+        # We do not need to keep the old model around (or save it along with this one)
+        self.warm_start_model = None
         gc.collect()
         return self
 
+    # Keeps training the model we already have on a few more rows. Only models with a partial_fit method (the SGD family, PassiveAggressive, and Perceptron) support this
+    def partial_fit(self, X, y):
+        if self.type_of_estimator == 'classifier':
+            # Every class has to be one the model already knows about
+            self.model.partial_fit(X, y, classes=self.model.classes_)
+        else:
+            self.model.partial_fit(X, y)
+        return self
+
+    def is_past_deadline(self):
+        return self.get('training_deadline') is not None and time.time() >= self.training_deadline
+
+    # Every fit during a hyperparameter search would report its own early stopping rounds, which are summarized by the search itself instead
+    def get_telemetry(self):
+        if self.is_hp_search == True:
+            return None
+        return utils_telemetry.get_current_telemetry()
+
+    # The Keras sklearn wrappers only accept in-memory (dense) arrays, so we build the underlying Keras model ourselves, and train it from our mini-batch generator
+    def fit_keras_in_batches(self, X_fit, y, X_test, y_test, callbacks, verbose):
+        keras_wrapper = self.model
+
+        batch_size = keras_wrapper.sk_params.get('batch_size', 32)
+        epochs = keras_wrapper.sk_params.get('epochs', 1)
+
+        y = np.array(y)
+        y_test = np.array(y_test)
+        if self.type_of_estimator == 'classifier':
+            # Mirror the label encoding that KerasClassifier.fit would otherwise handle for us
+            keras_wrapper.classes_ = np.unique(y)
+            keras_wrapper.n_classes_ = len(keras_wrapper.classes_)
+            y = np.searchsorted(keras_wrapper.classes_, y)
+            y_test = np.searchsorted(keras_wrapper.classes_, y_test)
+
+        keras_wrapper.model = keras_wrapper.build_fn(**keras_wrapper.filter_sk_params(keras_wrapper.build_fn))
+
+        steps_per_epoch = int(math.ceil(X_fit.shape[0] / float(batch_size)))
+        validation_steps = int(math.ceil(X_test.shape[0] / float(batch_size)))
+
+        train_generator = sparse_batch_generator(X_fit, y, batch_size=batch_size, shuffle=True)
+        validation_generator = sparse_batch_generator(X_test, y_test, batch_size=batch_size, shuffle=False)
+
+        keras_wrapper.model.fit_generator(train_generator, steps_per_epoch=steps_per_epoch, epochs=epochs, callbacks=callbacks, validation_data=validation_generator, validation_steps=validation_steps, verbose=verbose)
+
+        return keras_wrapper
+
+
+    # Gets predictions from models that need dense input (Keras), without ever densifying the entire prediction matrix at once
+    def predict_in_batches(self, predict_method, X, batch_size=None):
+        num_rows = X.shape[0]
+        if batch_size is None:
+            batch_size = get_dense_batch_size(X.shape[1])
+
+        predictions = []
+        for start_idx in range(0, num_rows, batch_size):
+            X_batch = get_dense_rows(X, slice(start_idx, min(start_idx + batch_size, num_rows)))
+            batch_predictions = np.asarray(predict_method(X_batch))
+            # The sklearn wrappers squeeze their output, which turns the predictions for a batch of a single row into a scalar (or, for models with several outputs, into a single row of shape (num_outputs,))
+            if batch_predictions.ndim < 2 and batch_predictions.size != X_batch.shape[0]:
+                batch_predictions = batch_predictions.reshape(X_batch.shape[0], -1)
+            elif batch_predictions.ndim == 0:
+                batch_predictions = batch_predictions.reshape(1)
+            predictions.append(batch_predictions)
+
+        # If any batch has several outputs per row, every batch needs to be 2-D before we can stitch them back together
+        if any(batch_predictions.ndim > 1 for batch_predictions in predictions):
+            predictions = [batch_predictions.reshape(batch_predictions.shape[0], -1) for batch_predictions in predictions]
+
+        return np.concatenate(predictions)
+
+
     def remove_categorical_values(self, features):
         clean_features = set([])
         for feature in features:
@@ -459,7 +689,7 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
 
         X_predict = X
 
-        if (self.model_name[:16] == 'GradientBoosting' or self.model_name[:12] == 'DeepLearning' or self.model_name in ['BayesianRidge', 'LassoLars', 'OrthogonalMatchingPursuit', 'ARDRegression']):
+        if (self.model_name[:16] == 'GradientBoosting' or self.model_name in ['BayesianRidge', 'LassoLars', 'OrthogonalMatchingPursuit', 'ARDRegression']):
             if scipy.sparse.issparse(X):
                 X = X.todense()
             elif isinstance(X, pd.DataFrame):
@@ -471,7 +701,9 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
                 X = X.values
 
         try:
-            if self.model_name[:4] == 'LGBM':
+            if self.model_name[:12] == 'DeepLearning':
+                predictions = self.predict_in_batches(self.model.predict_proba, X)
+            elif self.model_name[:4] == 'LGBM':
                 try:
                     best_iteration = self.model.best_iteration
                 except AttributeError:
@@ -530,7 +762,7 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
 
         X_predict = X
 
-        if (self.model_name[:16] == 'GradientBoosting' or self.model_name[:12] == 'DeepLearning' or self.model_name in ['BayesianRidge', 'LassoLars', 'OrthogonalMatchingPursuit', 'ARDRegression']):
+        if (self.model_name[:16] == 'GradientBoosting' or self.model_name in ['BayesianRidge', 'LassoLars', 'OrthogonalMatchingPursuit', 'ARDRegression']):
             if scipy.sparse.issparse(X):
                 X_predict = X.todense()
             elif isinstance(X, pd.DataFrame):
@@ -544,7 +776,9 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
             X_predict = X
 
 
-        if self.model_name[:4] == 'LGBM':
+        if self.model_name[:12] == 'DeepLearning':
+            predictions = self.predict_in_batches(self.model.predict, X)
+        elif self.model_name[:4] == 'LGBM':
             best_iteration = 0
             try:
                 best_iteration = self.model.best_iteration_
@@ -573,7 +807,7 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
 
     def predict_intervals(self, X, return_type=None):
 
-        if self.interval_predictors is None:
+        if self.interval_predictors is None and self.get('conformal_intervals') is None:
             print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
             print('This model was not trained to predict intervals')
             print('Please follow the documentation to tell this model at training time to learn how to predict intervals')
@@ -582,19 +816,29 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
 
         base_prediction = self.predict(X)
 
-        result = {
-            'prediction': base_prediction
-        }
-        for tup in self.interval_predictors:
-            predictor_name = tup[0]
-            predictor = tup[1]
-            result[predictor_name] = predictor.predict(X)
-
         if scipy.sparse.issparse(X):
             len_input = X.shape[0]
         else:
             len_input = len(X)
 
+        result = {
+            'prediction': base_prediction
+        }
+        interval_names = []
+        if self.get('conformal_intervals') is not None:
+            for predictor_name, interval_values in self.get_conformal_intervals(X, base_prediction):
+                if len_input == 1:
+                    result[predictor_name] = interval_values[0]
+                else:
+                    result[predictor_name] = interval_values.tolist()
+                interval_names.append(predictor_name)
+        else:
+            for tup in self.interval_predictors:
+                predictor_name = tup[0]
+                predictor = tup[1]
+                result[predictor_name] = predictor.predict(X)
+                interval_names.append(predictor_name)
+
         if (len_input == 1 and return_type is None) or return_type == 'dict':
             return result
 
@@ -604,14 +848,14 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
         elif return_type == 'list':
             if len_input == 1:
                 list_result = [base_prediction]
-                for tup in self.interval_predictors:
-                    list_result.append(result[tup[0]])
+                for predictor_name in interval_names:
+                    list_result.append(result[predictor_name])
             else:
                 list_result = []
                 for idx in range(len_input):
                     row_result = [base_prediction[idx]]
-                    for tup in self.interval_predictors:
-                        row_result.append(result[tup[0]][idx])
+                    for predictor_name in interval_names:
+                        row_result.append(result[predictor_name][idx])
                     list_result.append(row_result)
 
             return list_result
@@ -621,6 +865,22 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
             raise(ValueError('Please pass in a return_type value of one of the following: ["dict", "dataframe", "df", "list"]'))
 
 
+    # Split-conformal intervals are just the base prediction, plus the residual quantile for whichever bin that prediction falls into
+    def get_conformal_intervals(self, X, base_prediction):
+        bin_values = None
+        if self.conformal_intervals['bin_by'] == 'uncertainty':
+            bin_values = self.get_uncertainty_probas(X, base_prediction)
+        return utils_conformal.predict_conformal_intervals(self.conformal_intervals, base_prediction, bin_values=bin_values)
+
+
+    # The uncertainty_model's predicted probability that each prediction is uncertain
+    def get_uncertainty_probas(self, X, base_prediction):
+        base_predictions_col = np.asarray(base_prediction, dtype=float).reshape(-1, 1)
+        X_combined = scipy.sparse.hstack([X, base_predictions_col], format='csr')
+        uncertainty_predictions = np.asarray(self.uncertainty_model.predict_proba(X_combined))
+        return uncertainty_predictions.reshape(base_predictions_col.shape[0], -1)[:, -1]
+
+
     # transform is initially designed to be used with feature_learning
     def transform(self, X):
         predicted_features = self.predict(X)
@@ -644,8 +904,7 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
         base_predictions = self.predict(X)
 
         if isinstance(base_predictions, Iterable):
-            base_predictions_col = [[val] for val in base_predictions]
-            base_predictions_col = np.array(base_predictions_col)
+            base_predictions_col = np.asarray(base_predictions, dtype=float).reshape(-1, 1)
         else:
             base_predictions_col = [base_predictions]
 
@@ -662,40 +921,20 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
 
         if isinstance(base_predictions, Iterable):
 
-            results['uncertainty_prediction'] = [row[1] for row in results['uncertainty_prediction']]
+            results['uncertainty_prediction'] = np.asarray(results['uncertainty_prediction'])[:, 1]
 
             results = pd.DataFrame.from_dict(results, orient='columns')
 
             if self.uc_results is not None:
-                calibration_results = {}
-                # grab the relevant properties from our uc_results, and make them each their own list in calibration_results
-                for key, value in self.uc_results[1].items():
-                    calibration_results[key] = []
-
-                for proba in results['uncertainty_prediction']:
-                    max_bucket_proba = 0
-                    bucket_num = 1
-                    while proba > max_bucket_proba:
-                        calibration_result = self.uc_results[bucket_num]
-                        max_bucket_proba = self.uc_results[bucket_num]['max_proba']
-                        bucket_num += 1
-
-                    for key, value in calibration_result.items():
-                        calibration_results[key].append(value)
-                # TODO: grab the uncertainty_calibration data for DataFrames
-                df_calibration_results = pd.DataFrame.from_dict(calibration_results, orient='columns')
-                del df_calibration_results['max_proba']
+                df_calibration_results = pd.DataFrame.from_dict(self.get_uncertainty_calibration(results['uncertainty_prediction'].values), orient='columns')
 
                 results = pd.concat([results, df_calibration_results], axis=1)
 
         else:
             if self.uc_results is not None:
-                # TODO: grab the uncertainty_calibration data for dictionaries
-                for bucket_name, bucket_result in self.uc_results.items():
-                    if proba > bucket_result['max_proba']:
-                        break
-                    results.update(bucket_result)
-                    del results['max_proba']
+                proba = np.asarray(uncertainty_predictions).reshape(-1)[-1]
+                for key, values in self.get_uncertainty_calibration([proba]).items():
+                    results[key] = values[0]
 
 
 
@@ -703,6 +942,23 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
         return results
 
 
+    # Looks up the calibration results (the deltas at each percentile, etc.) for the bucket each predicted probability falls into
+    # Each bucket covers predicted probabilities up to and including its max_proba. Anything above the last bucket's max_proba falls into the last bucket
+    def get_uncertainty_calibration(self, probas):
+        buckets = list(self.uc_results.values())
+        max_probas = np.array([bucket['max_proba'] for bucket in buckets], dtype=float)
+        bucket_indices = np.minimum(np.searchsorted(max_probas, np.asarray(probas, dtype=float), side='left'), len(buckets) - 1)
+
+        calibration_results = OrderedDict()
+        for key in buckets[0]:
+            if key == 'max_proba':
+                continue
+            bucket_values = np.array([bucket[key] for bucket in buckets])
+            calibration_results[key] = bucket_values[bucket_indices]
+
+        return calibration_results
+
+
     def score_uncertainty(self, X, y, verbose=False):
         return self.uncertainty_model.score(X, y, verbose=False)
 
@@ -721,6 +977,7 @@ class FinalModelATC(BaseEstimator, TransformerMixin):
         if self.X_test is not None:
             return X_fit, y, self.X_test, self.y_test
         else:
+            from sklearn.model_selection import train_test_split
             X_fit, X_test, y, y_test = train_test_split(X_fit, y, test_size=0.15)
             return X_fit, y, X_test, y_test
 
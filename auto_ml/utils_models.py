@@ -1,10 +1,12 @@
-import dill
 import os
 import random
 import sys
 
 from auto_ml import utils
 from auto_ml import utils_categorical_ensembling
+from auto_ml.utils_search import Conditional, Integer, Real
+# Loading lives in auto_ml.serving, so that prediction-only processes do not need to import everything in this module. We import it here so existing code can keep using utils_models.load_ml_model
+from auto_ml.serving import insert_deep_learning_model, load_ml_model
 
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor, ExtraTreesRegressor, AdaBoostRegressor, GradientBoostingRegressor, GradientBoostingClassifier, ExtraTreesClassifier, AdaBoostClassifier
 
@@ -302,6 +304,11 @@ def get_name_from_model(model):
         if isinstance(model, CatBoostRegressor):
             return 'CatBoostRegressor'
 
+    # LightGBM and XGBoost models loaded back in from an artifact directory remember which model they stand in for
+    from auto_ml.utils_model_artifacts import LightGBMBoosterModel, XGBoostBoosterModel
+    if isinstance(model, (LightGBMBoosterModel, XGBoostBoosterModel)):
+        return model.model_name
+
 # Hyperparameter search spaces for each model
 def get_search_params(model_name):
     grid_search_params = {
@@ -585,52 +592,104 @@ def get_search_params(model_name):
     return params
 
 
-def insert_deep_learning_model(pipeline_step, file_name):
-    # This is where we saved the random_name for this model
-    random_name = pipeline_step.model
-    # Load the Keras model here
-    keras_file_name = file_name[:-5] + random_name + '_keras_deep_learning_model.h5'
-
-    model = keras_load_model(keras_file_name)
-
-    # Put the model back in place so that we can still use it to get predictions without having to load it back in from disk
-    return model
-
-def load_ml_model(file_name):
-
-    with open(file_name, 'rb') as read_file:
-        base_pipeline = dill.load(read_file)
+# Continuous (and conditional) versions of some of the params from get_search_params, for searches that can make use of them (search_strategy='tpe')
+# Any param not listed here keeps its list of values from get_search_params
+def get_search_distributions(model_name):
+    lgbm_distributions = {
+        'learning_rate': Real(0.005, 0.3, log=True)
+        , 'num_leaves': Integer(2, 256, log=True)
+        , 'min_child_samples': Integer(1, 1000, log=True)
+        , 'colsample_bytree': Real(0.5, 1.0)
+        , 'subsample': Real(0.5, 1.0)
+        , 'drop_rate': Conditional(Real(0.01, 0.5), 'boosting_type', ['dart'])
+    }
 
-    if isinstance(base_pipeline, utils_categorical_ensembling.CategoricalEnsembler):
-        for step in base_pipeline.transformation_pipeline.named_steps:
-            pipeline_step = base_pipeline.transformation_pipeline.named_steps[step]
+    gradient_boosting_distributions = {
+        'learning_rate': Real(0.001, 0.3, log=True)
+        , 'max_depth': Integer(1, 15)
+        , 'subsample': Real(0.5, 1.0)
+    }
 
-            try:
-                if pipeline_step.get('model_name', 'reallylongnonsensicalstring')[:12] == 'DeepLearning':
-                    pipeline_step.model = insert_deep_learning_model(pipeline_step, file_name)
-            except AttributeError:
-                pass
+    sgd_distributions = {
+        'alpha': Real(.0000001, .01, log=True)
+        , 'l1_ratio': Conditional(Real(0.0, 1.0), 'penalty', ['elasticnet'])
+        , 'eta0': Conditional(Real(.0001, 0.1, log=True), 'learning_rate', ['constant', 'invscaling'])
+    }
 
-        for step in base_pipeline.trained_models:
-            pipeline_step = base_pipeline.trained_models[step]
+    search_distributions = {
+        'LGBMRegressor': lgbm_distributions
+        , 'LGBMClassifier': lgbm_distributions
+        , 'GradientBoostingRegressor': dict(gradient_boosting_distributions, alpha=Conditional(Real(0.5, 0.99), 'loss', ['huber']))
+        , 'GradientBoostingClassifier': gradient_boosting_distributions
+        , 'XGBClassifier': {
+            'learning_rate': Real(0.01, 0.3, log=True)
+            , 'max_depth': Integer(1, 15)
+            , 'min_child_weight': Real(1, 50, log=True)
+            , 'subsample': Real(0.5, 1.0)
+            , 'colsample_bytree': Real(0.5, 1.0)
+        }
+        , 'XGBRegressor': {
+            'max_depth': Integer(1, 25)
+            , 'subsample': Real(0.5, 1.0)
+        }
+        , 'CatBoostRegressor': {
+            'learning_rate': Real(0.01, 0.3, log=True)
+            , 'l2_leaf_reg': Real(.0000001, 10, log=True)
+        }
+        , 'CatBoostClassifier': {
+            'learning_rate': Real(0.01, 0.3, log=True)
+            , 'l2_leaf_reg': Real(.0000001, 10, log=True)
+        }
+        , 'RandomForestRegressor': {
+            'min_samples_split': Integer(2, 100, log=True)
+            , 'min_samples_leaf': Integer(1, 100, log=True)
+        }
+        , 'RandomForestClassifier': {
+            'min_samples_split': Integer(2, 100, log=True)
+            , 'min_samples_leaf': Integer(1, 100, log=True)
+        }
+        , 'LogisticRegression': {
+            'C': Real(.0001, 1000, log=True)
+        }
+        , 'Ridge': {
+            'alpha': Real(.0001, 1000, log=True)
+        }
+        , 'RidgeClassifier': {
+            'alpha': Real(.0001, 1000, log=True)
+        }
+        , 'SGDRegressor': sgd_distributions
+        , 'SGDClassifier': sgd_distributions
+    }
 
+    search_params = dict(get_search_params(model_name))
+    search_params.update(search_distributions.get(model_name, {}))
+    return search_params
+
+
+# Narrows each list of values in search_params down to the value in center_params, and its num_neighbors nearest neighbors on either side
+# Used when warm-starting, so we search around the hyperparameters that worked best last time, rather than across the whole space again
+def center_search_params(search_params, center_params, num_neighbors=1):
+    centered_params = {}
+    for param_name, param_vals in search_params.items():
+        # Continuous params keep their whole range
+        if param_name not in center_params or not isinstance(param_vals, list):
+            centered_params[param_name] = param_vals
+            continue
+
+        center_val = center_params[param_name]
+        param_vals = list(param_vals)
+        if center_val not in param_vals:
+            param_vals.append(center_val)
             try:
-                if pipeline_step.get('model_name', 'reallylongnonsensicalstring')[:12] == 'DeepLearning':
-                    pipeline_step.model = insert_deep_learning_model(pipeline_step, file_name)
-            except AttributeError:
+                param_vals = sorted(param_vals)
+            except TypeError:
                 pass
 
-    else:
+        center_idx = param_vals.index(center_val)
+        centered_params[param_name] = param_vals[max(0, center_idx - num_neighbors):center_idx + num_neighbors + 1]
 
-        for step in base_pipeline.named_steps:
-            pipeline_step = base_pipeline.named_steps[step]
-            try:
-                if pipeline_step.get('model_name', 'reallylongnonsensicalstring')[:12] == 'DeepLearning':
-                    pipeline_step.model = insert_deep_learning_model(pipeline_step, file_name)
-            except AttributeError:
-                pass
+    return centered_params
 
-    return base_pipeline
 
 # Keeping this here for legacy support
 def load_keras_model(file_name):
@@ -0,0 +1,114 @@
+# Serves predictions for several output columns that were all trained on the same features
+# Every target's model was trained on the output of one shared transformation_pipeline, so each request only gets transformed once, no matter how many targets we are predicting
+from collections import OrderedDict
+
+
+class MultiTargetPipeline(object):
+
+    def __init__(self, trained_models, transformation_pipeline, type_of_estimators):
+        # An OrderedDict from each output column to the FinalModelATC trained to predict it
+        self.trained_models = trained_models
+        self.transformation_pipeline = transformation_pipeline
+        # Maps each output column to either 'regressor' or 'classifier'
+        self.type_of_estimators = type_of_estimators
+        self.is_multi_target_pipeline = True
+
+
+    def get(self, prop_name, default=None):
+        try:
+            return getattr(self, prop_name)
+        except AttributeError:
+            return default
+
+
+    def get_output_columns(self):
+        return list(self.trained_models.keys())
+
+
+    def freeze(self):
+        self.transformation_pipeline.freeze()
+        for output_column, model in self.trained_models.items():
+            if hasattr(model, 'freeze'):
+                model.freeze()
+
+        self.frozen = True
+        return self
+
+
+    # Caches every target's prediction for a row together, since they all come from the same transformed row
+    def enable_prediction_cache(self, max_size=10000, ttl_seconds=None):
+        from auto_ml.utils_prediction_cache import PredictionCache, get_used_raw_columns
+
+        self.prediction_cache = PredictionCache(max_size=max_size, ttl_seconds=ttl_seconds, used_raw_columns=get_used_raw_columns(self.transformation_pipeline))
+        return self
+
+
+    def disable_prediction_cache(self):
+        self.prediction_cache = None
+        return self
+
+
+    # Times the shared transformation_pipeline step by step, along with each target's model
+    def enable_instrumentation(self, callback=None, instrumentation=None, prefix=''):
+        from auto_ml.utils_instrumentation import PipelineInstrumentation
+
+        if instrumentation is None:
+            instrumentation = PipelineInstrumentation(callback=callback)
+        self.instrumentation = instrumentation
+        self.transformation_pipeline.enable_instrumentation(instrumentation=instrumentation, prefix='transformation_pipeline.')
+        return self
+
+
+    def disable_instrumentation(self):
+        self.instrumentation = None
+        self.transformation_pipeline.disable_instrumentation()
+        return self
+
+
+    def get_stats(self):
+        instrumentation = getattr(self, 'instrumentation', None)
+        if instrumentation is None:
+            return {}
+        return instrumentation.get_stats()
+
+
+    def transform(self, data):
+        return self.transformation_pipeline.transform(data)
+
+
+    def _predict_transformed(self, X_transformed, method_name):
+        instrumentation = getattr(self, 'instrumentation', None)
+
+        predictions = OrderedDict()
+        for output_column, model in self.trained_models.items():
+            # Regressors do not have any probabilities to give us, so predict_proba only covers our classifiers
+            if method_name == 'predict_proba' and self.type_of_estimators[output_column] != 'classifier':
+                continue
+
+            if instrumentation is None:
+                predictions[output_column] = getattr(model, method_name)(X_transformed)
+            else:
+                predictions[output_column] = instrumentation.time_call('target_model.' + str(output_column), method_name, lambda: getattr(model, method_name)(X_transformed), X_transformed)
+
+        return predictions
+
+
+    def _transform_and_predict(self, data, method_name):
+        return self._predict_transformed(self.transform(data), method_name)
+
+
+    # Returns an OrderedDict from each output column to its predictions. For a single dictionary, each value is a single prediction
+    def _predict(self, data, method_name):
+        prediction_cache = getattr(self, 'prediction_cache', None)
+        if prediction_cache is None or not isinstance(data, dict):
+            return self._transform_and_predict(data, method_name)
+
+        return prediction_cache.get_or_compute(data, method_name, lambda: self._transform_and_predict(data, method_name))
+
+
+    def predict(self, data):
+        return self._predict(data, 'predict')
+
+
+    def predict_proba(self, data):
+        return self._predict(data, 'predict_proba')
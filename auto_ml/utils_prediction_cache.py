@@ -0,0 +1,177 @@
+# An opt-in cache of prediction results, for when the same rows get scored over and over again (the same listing being re-scored on every page view, for instance)
+# A cache hit skips the entire transformation pipeline and the model, so it is only ever used for single dictionaries, which is where that per-row work dominates
+from collections import OrderedDict
+import copy
+import threading
+import time
+
+
+# Returns the raw input columns that can actually change this pipeline's predictions, or None if we cannot tell
+# Two rows that agree on all of these columns are guaranteed to get the same prediction, so these are the only columns we use to build the cache key
+def get_used_raw_columns(transformation_pipeline, extra_columns=None):
+    named_steps = transformation_pipeline.named_steps
+
+    # A user_input_func can create features out of any column at all
+    if named_steps.get('user_func') is not None:
+        return None
+
+    vectorizer = named_steps.get('dv')
+    if vectorizer is None or vectorizer.get('numerical_columns') is None:
+        return None
+
+    feature_columns = set(vectorizer.numerical_columns) | set(vectorizer.categorical_columns) | set(vectorizer.get('additional_numerical_cols', []))
+
+    used_raw_columns = set(feature_columns)
+
+    basic_transform = named_steps.get('basic_transform')
+    if basic_transform is not None:
+        for col_name, col_desc in basic_transform.column_descriptions.items():
+            # Date and text columns are expanded into several features during data cleaning, each of which is prefixed with the original column name
+            if col_desc == 'date':
+                prefix = str(col_name) + '_'
+            elif col_desc in basic_transform.text_col_indicators:
+                prefix = 'nlp_' + str(col_name) + '_'
+            else:
+                continue
+
+            for feature_column in feature_columns:
+                if str(feature_column).startswith(prefix):
+                    used_raw_columns.add(col_name)
+                    break
+
+    # Target encoded columns are replaced by their encodings before they ever reach the vectorizer
+    target_encoder = named_steps.get('target_encoder')
+    if target_encoder is not None:
+        for col_name, encoded_col_names in target_encoder.encoded_columns.items():
+            if any(encoded_col_name in feature_columns for encoded_col_name in encoded_col_names):
+                used_raw_columns.add(col_name)
+
+    if extra_columns is not None:
+        used_raw_columns.update(extra_columns)
+
+    return sorted(used_raw_columns, key=str)
+
+
+# Builds a hashable key out of a single row. Returns None if the row holds values we cannot hash (lists, for instance), in which case we skip the cache for that row
+def make_cache_key(row, used_raw_columns, method_name, method_kwargs=None):
+    if used_raw_columns is None:
+        row_key = tuple(sorted(row.items(), key=lambda item: str(item[0])))
+    else:
+        # We keep missing columns distinct from columns that are present with a value of None
+        row_key = tuple((col_name, row[col_name]) if col_name in row else (col_name, ) for col_name in used_raw_columns)
+
+    if method_kwargs:
+        kwargs_key = tuple(sorted(method_kwargs.items()))
+    else:
+        kwargs_key = ()
+
+    cache_key = (method_name, kwargs_key, row_key)
+    try:
+        hash(cache_key)
+    except TypeError:
+        return None
+
+    return cache_key
+
+
+class PredictionCache(object):
+
+    def __init__(self, max_size=10000, ttl_seconds=None, used_raw_columns=None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.used_raw_columns = used_raw_columns
+        self._reset()
+
+
+    def _reset(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.num_hits = 0
+        self.num_misses = 0
+        self.num_evictions = 0
+        self.num_expirations = 0
+
+
+    # Returns (True, result) on a hit, and (False, None) on a miss
+    def lookup(self, cache_key):
+        with self.lock:
+            if cache_key not in self.entries:
+                self.num_misses += 1
+                return False, None
+
+            expires_at, result = self.entries.pop(cache_key)
+            if expires_at is not None and expires_at < time.time():
+                self.num_expirations += 1
+                self.num_misses += 1
+                return False, None
+
+            # Move this entry to the end, so it is the last to be evicted
+            self.entries[cache_key] = (expires_at, result)
+            self.num_hits += 1
+
+        # Hand back a copy, so a caller that modifies its predictions cannot modify what we have cached
+        return True, copy.deepcopy(result)
+
+
+    def store(self, cache_key, result):
+        expires_at = None
+        if self.ttl_seconds is not None:
+            expires_at = time.time() + self.ttl_seconds
+
+        result = copy.deepcopy(result)
+        with self.lock:
+            self.entries.pop(cache_key, None)
+            self.entries[cache_key] = (expires_at, result)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.num_evictions += 1
+
+
+    # Runs predict_func on a cache miss, and caches its result
+    def get_or_compute(self, row, method_name, predict_func, method_kwargs=None):
+        cache_key = make_cache_key(row, self.used_raw_columns, method_name, method_kwargs=method_kwargs)
+        if cache_key is None:
+            return predict_func()
+
+        is_hit, result = self.lookup(cache_key)
+        if is_hit:
+            return result
+
+        result = predict_func()
+        self.store(cache_key, result)
+        return result
+
+
+    # Every cached result is stale once the model itself changes (after partial_fit, for instance)
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+    def get_cache_info(self):
+        with self.lock:
+            num_lookups = max(self.num_hits + self.num_misses, 1)
+            return {
+                'size': len(self.entries)
+                , 'max_size': self.max_size
+                , 'ttl_seconds': self.ttl_seconds
+                , 'num_hits': self.num_hits
+                , 'num_misses': self.num_misses
+                , 'hit_rate': float(self.num_hits) / num_lookups
+                , 'num_evictions': self.num_evictions
+                , 'num_expirations': self.num_expirations
+            }
+
+
+    # Locks cannot be pickled, and cached predictions should not be saved along with the pipeline anyways
+    def __getstate__(self):
+        return {
+            'max_size': self.max_size
+            , 'ttl_seconds': self.ttl_seconds
+            , 'used_raw_columns': self.used_raw_columns
+        }
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset()
@@ -3,40 +3,36 @@ import math
 
 from auto_ml import utils
 import pandas as pd
-from sklearn.ensemble import GradientBoostingRegressor, GradientBoostingClassifier
 from sklearn.metrics import mean_squared_error, make_scorer, brier_score_loss, accuracy_score, explained_variance_score, mean_absolute_error, median_absolute_error, r2_score, log_loss, roc_auc_score
 import numpy as np
-from tabulate import tabulate
 
 bad_vals_as_strings = set([str(float('nan')), str(float('inf')), str(float('-inf')), 'None', 'none', 'NaN', 'NAN', 'nan', 'NULL', 'null', '', 'inf', '-inf', 'np.nan', 'numpy.nan'])
 
+def get_positive_class_probas(probas):
+    # Sometimes we will be given "flattened" probabilities (only the probability of our positive label), while other times we might be given "nested" probabilities (probabilities of both positive and negative, in a list, for each item).
+    probas = np.asarray(probas, dtype=float)
+    if probas.ndim == 2:
+        probas = probas[:, 1]
+    return probas
+
+
 def advanced_scoring_classifiers(probas, actuals, name=None):
-    # pandas Series don't play nice here. Make sure our actuals list is indeed a list
-    actuals = list(actuals)
-    predictions = list(probas)
+    # pandas Series don't play nice here. Make sure our actuals are a plain array
+    actuals = np.asarray(actuals)
 
     print('Here is our brier-score-loss, which is the default value we optimized for while training, and is the value returned from .score() unless you requested a custom scoring metric')
     print('It is a measure of how close the PROBABILITY predictions are.')
     if name != None:
         print(name)
 
-    # Sometimes we will be given "flattened" probabilities (only the probability of our positive label), while other times we might be given "nested" probabilities (probabilities of both positive and negative, in a list, for each item).
-    try:
-        probas = [proba[1] for proba in probas]
-    except:
-        pass
+    probas = get_positive_class_probas(probas)
 
     brier_score = brier_score_loss(actuals, probas)
     print(format(brier_score, '.4f'))
 
 
     print('\nHere is the trained estimator\'s overall accuracy (when it predicts a label, how frequently is that the correct label?)')
-    predicted_labels = []
-    for pred in probas:
-        if pred >= 0.5:
-            predicted_labels.append(1)
-        else:
-            predicted_labels.append(0)
+    predicted_labels = (probas >= 0.5).astype(int)
     print(format(accuracy_score(y_true=actuals, y_pred=predicted_labels) * 100, '.1f') + '%')
 
 
@@ -50,12 +46,11 @@ def advanced_scoring_classifiers(probas, actuals, name=None):
     #For example, if it is predicting 100% of observations to one class just because it is the majority
     #Wikipedia seems to call that Positive/negative predictive value
     print('\nHere is predictive value by class:')
-    df = pd.concat([pd.Series(actuals,name='actuals'),pd.Series(predicted_labels,name='predicted')],axis=1)
-    targets = list(df.predicted.unique())
-    for i in range(0,len(targets)):
-        tot_count = len(df[df.predicted==targets[i]])
-        true_count = len(df[(df.predicted==targets[i]) & (df.actuals == targets[i])])
-        print('Class: ',targets[i],'=',float(true_count)/tot_count)
+    for target in pd.unique(predicted_labels):
+        is_predicted_target = predicted_labels == target
+        tot_count = np.sum(is_predicted_target)
+        true_count = np.sum(is_predicted_target & (actuals == target))
+        print('Class: ',target,'=',float(true_count)/tot_count)
 
 
     # qcut is super fickle. so, try to use 10 buckets first, then 5 if that fails, then nothing
@@ -70,6 +65,7 @@ def advanced_scoring_classifiers(probas, actuals, name=None):
         df_probas['Bucket Edges'] = bucket_results
 
         df_buckets = df_probas.groupby(df_probas['Bucket Edges'])
+        from tabulate import tabulate
         try:
             print(tabulate(df_buckets.mean(), headers='keys', floatfmt='.4f', tablefmt='psql', showindex='always'))
         except TypeError:
@@ -87,34 +83,33 @@ def advanced_scoring_classifiers(probas, actuals, name=None):
 
 
 def calculate_and_print_differences(predictions, actuals, name=None):
-    pos_differences = []
-    neg_differences = []
+    differences = np.asarray(predictions, dtype=float) - np.asarray(actuals, dtype=float)
     # Technically, we're ignoring cases where we are spot on
-    for idx, pred in enumerate(predictions):
-        difference = pred - actuals[idx]
-        if difference > 0:
-            pos_differences.append(difference)
-        elif difference < 0:
-            neg_differences.append(difference)
+    pos_differences = differences[differences > 0]
+    neg_differences = differences[differences < 0]
+
+    print_differences(len(pos_differences), np.sum(pos_differences), len(neg_differences), np.sum(neg_differences), name=name)
 
+
+def print_differences(num_pos_differences, sum_pos_differences, num_neg_differences, sum_neg_differences, name=None):
     if name != None:
         print(name)
     print('Count of positive differences (prediction > actual):')
-    print(len(pos_differences))
+    print(num_pos_differences)
     print('Count of negative differences:')
-    print(len(neg_differences))
-    if len(pos_differences) > 0:
+    print(num_neg_differences)
+    if num_pos_differences > 0:
         print('Average positive difference:')
-        print(sum(pos_differences) * 1.0 / len(pos_differences))
-    if len(neg_differences) > 0:
+        print(sum_pos_differences * 1.0 / num_pos_differences)
+    if num_neg_differences > 0:
         print('Average negative difference:')
-        print(sum(neg_differences) * 1.0 / len(neg_differences))
+        print(sum_neg_differences * 1.0 / num_neg_differences)
 
 
 def advanced_scoring_regressors(predictions, actuals, verbose=2, name=None):
-    # pandas Series don't play nice here. Make sure our actuals list is indeed a list
-    actuals = list(actuals)
-    predictions = list(predictions)
+    # pandas Series don't play nice here. Make sure our actuals are a plain array
+    actuals = np.asarray(actuals, dtype=float)
+    predictions = np.asarray(predictions, dtype=float)
 
     print('\n\n***********************************************')
     if name != None:
@@ -128,11 +123,11 @@ def advanced_scoring_regressors(predictions, actuals, verbose=2, name=None):
 
     # 2. overall avg predictions
     print('\nHere is the average of the predictions:')
-    print(sum(predictions) * 1.0 / len(predictions))
+    print(np.mean(predictions))
 
     # 3. overall avg actuals
     print('\nHere is the average actual value on this validation set:')
-    print(sum(actuals) * 1.0 / len(actuals))
+    print(np.mean(actuals))
 
     # 2(a). median predictions
     print('\nHere is the median prediction:')
@@ -158,11 +153,10 @@ def advanced_scoring_regressors(predictions, actuals, verbose=2, name=None):
     # 5. pos and neg differences
     calculate_and_print_differences(predictions=predictions, actuals=actuals, name=name)
 
-    actuals_preds = list(zip(actuals, predictions))
     # Sort by PREDICTED value, since this is what what we will know at the time we make a prediction
-    actuals_preds.sort(key=lambda pair: pair[1])
-    actuals_sorted = [act for act, pred in actuals_preds]
-    predictions_sorted = [pred for act, pred in actuals_preds]
+    sorted_indices = np.argsort(predictions, kind='mergesort')
+    actuals_sorted = actuals[sorted_indices]
+    predictions_sorted = predictions[sorted_indices]
 
     if verbose > 2:
         print('Here\'s how the trained predictor did on each successive decile (ten percent chunk) of the predictions:')
@@ -177,9 +171,9 @@ def advanced_scoring_regressors(predictions, actuals, verbose=2, name=None):
             predictions_for_this_decile = predictions_sorted[min_idx:max_idx]
 
             print('Avg predicted val in this bucket')
-            print(sum(predictions_for_this_decile) * 1.0 / len(predictions_for_this_decile))
+            print(np.mean(predictions_for_this_decile))
             print('Avg actual val in this bucket')
-            print(sum(actuals_for_this_decile) * 1.0 / len(actuals_for_this_decile))
+            print(np.mean(actuals_for_this_decile))
             print('RMSE for this bucket')
             print(mean_squared_error(actuals_for_this_decile, predictions_for_this_decile)**0.5)
             calculate_and_print_differences(predictions_for_this_decile, actuals_for_this_decile)
@@ -231,6 +225,8 @@ class RegressionScorer(object):
 
 
     def score(self, estimator, X, y, took_log_of_y=False, advanced_scoring=False, verbose=2, name=None):
+        from sklearn.ensemble import GradientBoostingRegressor
+
         X, y = utils.drop_missing_y_vals(X, y, output_column=None)
 
         if isinstance(estimator, GradientBoostingRegressor):
@@ -309,6 +305,8 @@ class ClassificationScorer(object):
 
     def score(self, estimator, X, y, advanced_scoring=False):
 
+        from sklearn.ensemble import GradientBoostingClassifier
+
         X, y = utils.drop_missing_y_vals(X, y, output_column=None)
 
         if isinstance(estimator, GradientBoostingClassifier):
@@ -346,3 +344,412 @@ class ClassificationScorer(object):
             return (-1 * score, predictions)
         else:
             return -1 * score
+
+
+# A mergeable, fixed-size summary of a stream of values, sorted by a key
+# Every row carries a set of additive stats (its weight is always the first stat). Once we have seen more than 2 * max_size rows, we collapse neighboring rows (sorted by key) into max_size equal-weight centroids, summing their stats
+# This lets us approximate quantiles, and stats for quantile-based buckets (deciles, for instance), over far more rows than we could hold in memory. Each centroid holds at most 1 / max_size of the total weight, which bounds our error in rank
+class QuantileSketch(object):
+
+    # num_stats is the number of stats each row carries, on top of its weight
+    def __init__(self, num_stats=0, max_size=5000):
+        self.num_stats = num_stats
+        self.max_size = max_size
+        self.keys = np.zeros(0)
+        # Columns: weight, each of our stats, then the sum of the keys
+        self.stats = np.zeros((0, num_stats + 2))
+        self.pending_keys = []
+        self.pending_stats = []
+        self.num_pending = 0
+
+
+    # keys is a 1D array. stats, if provided, is a 2D array with one row per key, and one column per stat
+    def update(self, keys, stats=None):
+        keys = np.asarray(keys, dtype=float)
+        if len(keys) == 0:
+            return
+
+        weights = np.ones((len(keys), 1))
+        if stats is None:
+            stats = weights
+        else:
+            stats = np.hstack([weights, np.asarray(stats, dtype=float).reshape(len(keys), -1)])
+
+        # Each centroid's key is the weighted average of the keys that went into it, so we track the sum of the keys as one more stat
+        self.pending_keys.append(keys)
+        self.pending_stats.append(np.hstack([stats, keys.reshape(-1, 1)]))
+        self.num_pending += len(keys)
+
+        if self.num_pending + len(self.keys) > 2 * self.max_size:
+            self._compress()
+
+
+    def _flush(self):
+        if self.num_pending == 0:
+            return
+
+        all_stats = np.vstack([self.stats] + self.pending_stats)
+        self.keys = all_stats[:, -1] / all_stats[:, 0]
+        self.stats = all_stats
+        self.pending_keys = []
+        self.pending_stats = []
+        self.num_pending = 0
+
+        sorted_indices = np.argsort(self.keys, kind='mergesort')
+        self.keys = self.keys[sorted_indices]
+        self.stats = self.stats[sorted_indices]
+
+
+    def _compress(self):
+        self._flush()
+        if len(self.keys) <= self.max_size:
+            return
+
+        weights = self.stats[:, 0]
+        total_weight = np.sum(weights)
+        # Assign each row to one of max_size equal-weight bins, based on where it falls in the cumulative weight
+        cumulative_weights = np.cumsum(weights) - weights
+        bin_indices = np.minimum((cumulative_weights / total_weight * self.max_size).astype(int), self.max_size - 1)
+
+        merged_stats = np.zeros((self.max_size, self.stats.shape[1]))
+        for stat_idx in range(self.stats.shape[1]):
+            merged_stats[:, stat_idx] = np.bincount(bin_indices, weights=self.stats[:, stat_idx], minlength=self.max_size)
+
+        merged_stats = merged_stats[merged_stats[:, 0] > 0]
+        self.stats = merged_stats
+        self.keys = merged_stats[:, -1] / merged_stats[:, 0]
+
+
+    def get_count(self):
+        return np.sum(self.stats[:, 0]) + self.num_pending
+
+
+    def get_quantile(self, quantile):
+        self._flush()
+        if len(self.keys) == 0:
+            return None
+
+        weights = self.stats[:, 0]
+        cumulative_weights = np.cumsum(weights)
+        idx = np.searchsorted(cumulative_weights, quantile * cumulative_weights[-1], side='left')
+        return self.keys[min(idx, len(self.keys) - 1)]
+
+
+    # Splits all the rows we have seen into num_buckets equal-weight buckets (sorted by key), and returns the summed stats for each bucket
+    def get_bucket_stats(self, num_buckets=10):
+        self._flush()
+        if len(self.keys) == 0:
+            return np.zeros((0, self.stats.shape[1] - 1))
+
+        weights = self.stats[:, 0]
+        # Place each centroid by its midpoint, so a centroid that straddles a boundary lands in whichever bucket holds most of it
+        midpoints = np.cumsum(weights) - weights / 2.0
+        bucket_indices = np.minimum((midpoints / np.sum(weights) * num_buckets).astype(int), num_buckets - 1)
+
+        bucket_stats = np.zeros((num_buckets, self.stats.shape[1] - 1))
+        for stat_idx in range(self.stats.shape[1] - 1):
+            bucket_stats[:, stat_idx] = np.bincount(bucket_indices, weights=self.stats[:, stat_idx], minlength=num_buckets)
+
+        return bucket_stats[bucket_stats[:, 0] > 0]
+
+
+# Running (Chan et al.'s parallel algorithm) mean and sum of squared deviations, which stay numerically stable over hundreds of millions of rows
+class RunningMoments(object):
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        if len(values) == 0:
+            return
+
+        chunk_count = len(values)
+        chunk_mean = np.mean(values)
+        chunk_m2 = np.sum((values - chunk_mean) ** 2)
+
+        total_count = self.count + chunk_count
+        delta = chunk_mean - self.mean
+        self.mean += delta * chunk_count / total_count
+        self.m2 += chunk_m2 + delta ** 2 * self.count * chunk_count / total_count
+        self.count = total_count
+
+
+    def get_variance(self):
+        if self.count == 0:
+            return None
+        return self.m2 / self.count
+
+
+# Accumulates everything advanced_scoring_regressors reports, one chunk of predictions at a time
+class RegressionScoreAccumulator(object):
+
+    def __init__(self, sketch_size=5000):
+        self.actual_moments = RunningMoments()
+        self.error_moments = RunningMoments()
+        self.prediction_moments = RunningMoments()
+        self.sum_squared_error = 0.0
+        self.sum_absolute_error = 0.0
+        self.num_pos_differences = 0
+        self.sum_pos_differences = 0.0
+        self.num_neg_differences = 0
+        self.sum_neg_differences = 0.0
+        self.absolute_error_sketch = QuantileSketch(max_size=sketch_size)
+        self.prediction_sketch = QuantileSketch(max_size=sketch_size)
+        self.actual_sketch = QuantileSketch(max_size=sketch_size)
+        # Sorted by predicted value. Stats: sum of predictions, sum of actuals, sum of squared errors, count and sum of positive differences, count and sum of negative differences
+        self.decile_sketch = QuantileSketch(num_stats=7, max_size=sketch_size)
+
+
+    def update(self, predictions, actuals):
+        predictions = np.asarray(predictions, dtype=float)
+        actuals = np.asarray(actuals, dtype=float)
+
+        is_valid = np.isfinite(predictions) & np.isfinite(actuals)
+        if not np.all(is_valid):
+            print('Found ' + str(np.sum(~is_valid)) + ' null or infinity values in the predicted or y values. We will ignore these, and report the score on the rest of the dataset')
+            predictions = predictions[is_valid]
+            actuals = actuals[is_valid]
+
+        differences = predictions - actuals
+        absolute_errors = np.abs(differences)
+        squared_errors = differences ** 2
+        is_pos = differences > 0
+        is_neg = differences < 0
+
+        self.actual_moments.update(actuals)
+        self.error_moments.update(differences)
+        self.prediction_moments.update(predictions)
+        self.sum_squared_error += np.sum(squared_errors)
+        self.sum_absolute_error += np.sum(absolute_errors)
+        self.num_pos_differences += np.sum(is_pos)
+        self.sum_pos_differences += np.sum(differences[is_pos])
+        self.num_neg_differences += np.sum(is_neg)
+        self.sum_neg_differences += np.sum(differences[is_neg])
+
+        self.absolute_error_sketch.update(absolute_errors)
+        self.prediction_sketch.update(predictions)
+        self.actual_sketch.update(actuals)
+        self.decile_sketch.update(predictions, np.column_stack([predictions, actuals, squared_errors, is_pos, np.where(is_pos, differences, 0), is_neg, np.where(is_neg, differences, 0)]))
+
+
+    def get_count(self):
+        return self.actual_moments.count
+
+
+    def get_results(self):
+        count = self.get_count()
+        if count == 0:
+            return None
+
+        actual_variance = self.actual_moments.get_variance()
+        error_variance = self.error_moments.get_variance()
+        mean_squared_error = self.sum_squared_error / count
+
+        results = OrderedDict()
+        results['count'] = count
+        results['rmse'] = mean_squared_error ** 0.5
+        results['mean_absolute_error'] = self.sum_absolute_error / count
+        results['median_absolute_error'] = self.absolute_error_sketch.get_quantile(0.5)
+        results['r2'] = 1 - mean_squared_error / actual_variance if actual_variance > 0 else 0.0
+        results['explained_variance'] = 1 - error_variance / actual_variance if actual_variance > 0 else 0.0
+        results['mean_prediction'] = self.prediction_moments.mean
+        results['mean_actual'] = self.actual_moments.mean
+        results['median_prediction'] = self.prediction_sketch.get_quantile(0.5)
+        results['median_actual'] = self.actual_sketch.get_quantile(0.5)
+        results['num_pos_differences'] = self.num_pos_differences
+        results['sum_pos_differences'] = self.sum_pos_differences
+        results['num_neg_differences'] = self.num_neg_differences
+        results['sum_neg_differences'] = self.sum_neg_differences
+
+        deciles = []
+        for bucket in self.decile_sketch.get_bucket_stats(num_buckets=10):
+            bucket_count, sum_predictions, sum_actuals, sum_squared_errors, num_pos, sum_pos, num_neg, sum_neg = bucket
+            deciles.append(OrderedDict([
+                ('count', int(bucket_count))
+                , ('avg_prediction', sum_predictions / bucket_count)
+                , ('avg_actual', sum_actuals / bucket_count)
+                , ('rmse', (sum_squared_errors / bucket_count) ** 0.5)
+                , ('num_pos_differences', int(num_pos))
+                , ('sum_pos_differences', sum_pos)
+                , ('num_neg_differences', int(num_neg))
+                , ('sum_neg_differences', sum_neg)
+            ]))
+        results['deciles'] = deciles
+
+        return results
+
+
+    def print_results(self, verbose=2, name=None):
+        results = self.get_results()
+
+        print('\n\n***********************************************')
+        if name != None:
+            print(name)
+        print('Advanced scoring metrics for the trained regression model on this particular dataset (accumulated across ' + str(results['count']) + ' rows):\n')
+
+        print('Here is the overall RMSE for these predictions:')
+        print(results['rmse'])
+        print('\nHere is the average of the predictions:')
+        print(results['mean_prediction'])
+        print('\nHere is the average actual value on this validation set:')
+        print(results['mean_actual'])
+        print('\nHere is the median prediction (approximate):')
+        print(results['median_prediction'])
+        print('\nHere is the median actual value (approximate):')
+        print(results['median_actual'])
+        print('\nHere is the mean absolute error:')
+        print(results['mean_absolute_error'])
+        print('\nHere is the median absolute error (robust to outliers, approximate):')
+        print(results['median_absolute_error'])
+        print('\nHere is the explained variance:')
+        print(results['explained_variance'])
+        print('\nHere is the R-squared value:')
+        print(results['r2'])
+
+        print_differences(results['num_pos_differences'], results['sum_pos_differences'], results['num_neg_differences'], results['sum_neg_differences'], name=name)
+
+        if verbose > 2:
+            print('Here\'s how the trained predictor did on each successive decile (ten percent chunk) of the predictions:')
+            for idx, decile in enumerate(results['deciles']):
+                print('\n**************')
+                print('Bucket number:')
+                print(idx + 1)
+                print('Avg predicted val in this bucket')
+                print(decile['avg_prediction'])
+                print('Avg actual val in this bucket')
+                print(decile['avg_actual'])
+                print('RMSE for this bucket')
+                print(decile['rmse'])
+                print_differences(decile['num_pos_differences'], decile['sum_pos_differences'], decile['num_neg_differences'], decile['sum_neg_differences'])
+
+        print('')
+        print('\n***********************************************\n\n')
+        return results['rmse']
+
+
+# Accumulates everything advanced_scoring_classifiers reports for binary classifiers, one chunk of predicted probabilities at a time
+class ClassificationScoreAccumulator(object):
+
+    def __init__(self, sketch_size=5000):
+        self.count = 0
+        self.sum_squared_error = 0.0
+        self.sum_log_loss = 0.0
+        self.num_correct = 0
+        # Maps (actual label, predicted label) to the number of rows
+        self.confusion_counts = {}
+        # Sorted by predicted probability. Stats: sum of predicted probabilities, sum of actuals
+        self.proba_sketch = QuantileSketch(num_stats=2, max_size=sketch_size)
+
+
+    def update(self, probas, actuals):
+        probas = get_positive_class_probas(probas)
+        actuals = np.asarray(actuals)
+
+        is_valid = np.array([str(val) not in bad_vals_as_strings for val in actuals], dtype=bool)
+        if not np.all(is_valid):
+            print('Found ' + str(np.sum(~is_valid)) + ' null or infinity values in the y values. We will ignore these, and report the score on the rest of the dataset')
+            probas = probas[is_valid]
+            actuals = actuals[is_valid]
+
+        # At the moment, Microsoft's LightGBM returns probabilities > 1 and < 0, so we cap them here, the same way ClassificationScorer does
+        probas = np.clip(np.nan_to_num(probas), 0, 1)
+        actuals = actuals.astype(float)
+        predicted_labels = (probas >= 0.5).astype(int)
+
+        self.count += len(actuals)
+        self.sum_squared_error += np.sum((probas - actuals) ** 2)
+        clipped_probas = np.clip(probas, 1e-15, 1 - 1e-15)
+        self.sum_log_loss -= np.sum(actuals * np.log(clipped_probas) + (1 - actuals) * np.log(1 - clipped_probas))
+        self.num_correct += np.sum(predicted_labels == actuals)
+
+        pairs, pair_counts = np.unique(np.column_stack([actuals, predicted_labels]), axis=0, return_counts=True)
+        for (actual, predicted), pair_count in zip(pairs, pair_counts):
+            key = (int(actual), int(predicted))
+            self.confusion_counts[key] = self.confusion_counts.get(key, 0) + pair_count
+
+        self.proba_sketch.update(probas, np.column_stack([probas, actuals]))
+
+
+    def get_count(self):
+        return self.count
+
+
+    def get_results(self):
+        if self.count == 0:
+            return None
+
+        results = OrderedDict()
+        results['count'] = self.count
+        results['brier_score_loss'] = self.sum_squared_error / self.count
+        results['log_loss'] = self.sum_log_loss / self.count
+        results['accuracy'] = float(self.num_correct) / self.count
+        results['confusion_counts'] = dict(self.confusion_counts)
+
+        predictive_values = OrderedDict()
+        for predicted_label in sorted(set(predicted for actual, predicted in self.confusion_counts)):
+            total_count = sum(pair_count for (actual, predicted), pair_count in self.confusion_counts.items() if predicted == predicted_label)
+            true_count = self.confusion_counts.get((predicted_label, predicted_label), 0)
+            predictive_values[predicted_label] = float(true_count) / total_count
+        results['predictive_value_by_class'] = predictive_values
+
+        calibration_buckets = []
+        for bucket_count, sum_probas, sum_actuals in self.proba_sketch.get_bucket_stats(num_buckets=10):
+            calibration_buckets.append(OrderedDict([
+                ('count', int(bucket_count))
+                , ('Predicted Probability Of Bucket', sum_probas / bucket_count)
+                , ('Actual Probability of Bucket', sum_actuals / bucket_count)
+            ]))
+        results['calibration_buckets'] = calibration_buckets
+
+        return results
+
+
+    def print_results(self, name=None):
+        results = self.get_results()
+
+        print('Here is our brier-score-loss, which is the default value we optimized for while training, and is the value returned from .score() unless you requested a custom scoring metric')
+        print('It is a measure of how close the PROBABILITY predictions are.')
+        if name != None:
+            print(name)
+        print(format(results['brier_score_loss'], '.4f'))
+
+        print('\nHere is the trained estimator\'s overall accuracy (when it predicts a label, how frequently is that the correct label?)')
+        print(format(results['accuracy'] * 100, '.1f') + '%')
+
+        print('\nHere is a confusion matrix showing predictions vs. actuals by label:')
+        df_confusion = pd.Series(results['confusion_counts']).unstack(fill_value=0)
+        df_confusion.index.name = 'v Actual v'
+        df_confusion.columns.name = 'Predicted >'
+        print(df_confusion)
+
+        print('\nHere is predictive value by class:')
+        for predicted_label, predictive_value in results['predictive_value_by_class'].items():
+            print('Class: ', predicted_label, '=', predictive_value)
+
+        from tabulate import tabulate
+        df_buckets = pd.DataFrame(results['calibration_buckets'])
+        print(tabulate(df_buckets, headers='keys', floatfmt='.4f', tablefmt='psql'))
+        print('\nHere is the accuracy of our trained estimator at each level of predicted probabilities')
+        print('For a verbose description of what this means, please visit the docs:')
+        print('http://auto-ml.readthedocs.io/en/latest/analytics.html#interpreting-predicted-probability-buckets-for-classifiers')
+
+        print('\n\n')
+        return results['brier_score_loss']
+
+
+# The scoring methods we can calculate from the accumulators above, and the name each accumulator gives them
+streaming_scoring_methods = {
+    'rmse': 'rmse'
+    , 'mean_absolute_error': 'mean_absolute_error'
+    , 'median_absolute_error': 'median_absolute_error'
+    , 'r2': 'r2'
+    , 'r-squared': 'r2'
+    , 'brier_score_loss': 'brier_score_loss'
+    , 'log_loss': 'log_loss'
+    , 'accuracy': 'accuracy'
+    , 'accuracy_score': 'accuracy'
+}
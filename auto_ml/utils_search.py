@@ -0,0 +1,499 @@
+# Tools for fitting within a fixed amount of wall-clock time
+# TimeBudget keeps track of a deadline, and splits whatever time is left across the work that has not started yet
+# TimeBudgetedSearchCV is an anytime replacement for GridSearchCV: it tries parameter combinations in a random order until its time runs out, and always has the best combination found so far ready to go
+# TPESearchCV is a Bayesian (Tree-structured Parzen Estimator) search, which learns from every candidate it has tried to pick the next one, and supports continuous and conditional params
+import math
+import random
+import time
+
+import numpy as np
+from sklearn.base import clone, is_classifier
+from sklearn.model_selection import ParameterGrid, check_cv
+
+
+class TimeBudget(object):
+
+    def __init__(self, total_seconds, reserve_fraction=0.0):
+        self.total_seconds = float(total_seconds)
+        self.start_time = time.time()
+        self.deadline = self.start_time + self.total_seconds
+        # Time we hold back for the work that has to happen once the search is over (refitting the best model on all the data, for instance)
+        self.reserve_seconds = self.total_seconds * reserve_fraction
+
+
+    def get_remaining_seconds(self):
+        return max(0.0, self.deadline - time.time())
+
+
+    def is_expired(self):
+        return time.time() >= self.deadline
+
+
+    # Splits the time that is left (minus our reserve) evenly across the tasks that have not started yet
+    # Because we recalculate this as each task starts, any time that a fast task did not use rolls over to the tasks after it
+    def get_slice(self, num_remaining_tasks):
+        usable_seconds = max(0.0, self.get_remaining_seconds() - self.reserve_seconds)
+        return TimeBudget(usable_seconds / max(num_remaining_tasks, 1))
+
+
+    def __str__(self):
+        return 'TimeBudget({} of {} seconds remaining)'.format(round(self.get_remaining_seconds(), 1), round(self.total_seconds, 1))
+
+
+def get_rows(data, indices):
+    if hasattr(data, 'iloc'):
+        return data.iloc[indices]
+    elif isinstance(data, list):
+        return [data[idx] for idx in indices]
+    return data[indices]
+
+
+class TimeBudgetedSearchCV(object):
+
+    def __init__(self, estimator, param_grid, time_budget, scoring, cv=2, refit=False, refit_deadline=None, error_score=-1000000000, random_state=None, verbose=0):
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.time_budget = time_budget
+        self.scoring = scoring
+        self.cv = cv
+        self.refit = refit
+        self.refit_deadline = refit_deadline
+        self.error_score = error_score
+        self.random_state = random_state
+        self.verbose = verbose
+
+
+    def get_candidates(self):
+        candidates = list(ParameterGrid(self.param_grid))
+        # A random order means that if we run out of time partway through, we have run a random search over the whole space, rather than a grid search over just the start of it
+        random.Random(self.random_state).shuffle(candidates)
+        return candidates
+
+
+    def _fit_and_score(self, params, X, y, splits, deadline):
+        fit_times = []
+        score_times = []
+        scores = []
+
+        for train_indices, test_indices in splits:
+            estimator = clone(self.estimator)
+            # Clone the params too, so that every fold trains its own copy of the model, rather than all refitting the same one
+            estimator.set_params(**dict((k, clone(v, safe=False)) for k, v in params.items()))
+            # Early stopping loops inside the estimator stop once this candidate's time is up
+            estimator.set_params(training_deadline=deadline)
+
+            start_time = time.time()
+            try:
+                estimator.fit(get_rows(X, train_indices), get_rows(y, train_indices))
+                fit_times.append(time.time() - start_time)
+
+                start_time = time.time()
+                scores.append(self.scoring(estimator, get_rows(X, test_indices), get_rows(y, test_indices)))
+                score_times.append(time.time() - start_time)
+            except KeyboardInterrupt:
+                raise
+            except Exception as e:
+                print('Failed to fit a model with these params, so we are giving it a score of ' + str(self.error_score))
+                print(params)
+                print(e)
+                fit_times.append(time.time() - start_time)
+                scores.append(self.error_score)
+
+        return scores, fit_times, score_times
+
+
+    def get_splits(self, X, y):
+        return list(check_cv(self.cv, y, classifier=is_classifier(self.estimator)).split(X, y))
+
+
+    def _init_results(self):
+        return {
+            'params': []
+            , 'mean_test_score': []
+            , 'std_test_score': []
+            , 'mean_fit_time': []
+            , 'mean_score_time': []
+        }
+
+
+    # Returns the index of this candidate within results
+    def _record_result(self, results, params, scores, fit_times, score_times):
+        results['params'].append(params)
+        results['mean_test_score'].append(np.mean(scores))
+        results['std_test_score'].append(np.std(scores))
+        results['mean_fit_time'].append(np.mean(fit_times))
+        results['mean_score_time'].append(np.mean(score_times) if len(score_times) > 0 else np.nan)
+        return len(results['params']) - 1
+
+
+    def _finish(self, X, y, results):
+        best_idx = int(np.argmax(results['mean_test_score']))
+
+        for result_key in results:
+            if result_key != 'params':
+                results[result_key] = np.array(results[result_key])
+        results['rank_test_score'] = np.argsort(np.argsort(-results['mean_test_score'])) + 1
+
+        self.cv_results_ = results
+        self.n_candidates_tried_ = len(results['params'])
+        self.best_index_ = best_idx
+        self.best_params_ = results['params'][best_idx]
+        self.best_score_ = results['mean_test_score'][best_idx]
+
+        if self.refit == True:
+            self.best_estimator_ = clone(self.estimator)
+            self.best_estimator_.set_params(**dict((k, clone(v, safe=False)) for k, v in self.best_params_.items()))
+            self.best_estimator_.set_params(training_deadline=self.refit_deadline)
+            self.best_estimator_.fit(X, y)
+
+        return self
+
+
+    def fit(self, X, y):
+        candidates = self.get_candidates()
+        splits = self.get_splits(X, y)
+
+        results = self._init_results()
+        for candidate_idx, params in enumerate(candidates):
+            # We always try at least one candidate, so we have a model to hand back no matter how little time we were given
+            if candidate_idx > 0 and self.time_budget.is_expired():
+                print('Ran out of time for this hyperparameter search after trying {} of {} parameter combinations'.format(candidate_idx, len(candidates)))
+                break
+
+            # Each candidate may use whatever time is left in the search, but no more
+            scores, fit_times, score_times = self._fit_and_score(params, X, y, splits, deadline=self.time_budget.deadline)
+            self._record_result(results, params, scores, fit_times, score_times)
+
+            if self.verbose:
+                print('[{}/{}] score: {}, params: {}'.format(candidate_idx + 1, len(candidates), results['mean_test_score'][-1], params))
+
+        return self._finish(X, y, results)
+
+
+# Search spaces for TPESearchCV. A plain list is a set of choices, just like for GridSearchCV. Real and Integer cover a continuous range, optionally on a log scale
+class Real(object):
+
+    def __init__(self, low, high, log=False):
+        self.low = low
+        self.high = high
+        self.log = log
+
+
+    # TPE works in this internal space, where the range is spread out evenly
+    def get_bounds(self):
+        if self.log:
+            return math.log(self.low), math.log(self.high)
+        return float(self.low), float(self.high)
+
+
+    def from_internal(self, internal_val):
+        if self.log:
+            return math.exp(internal_val)
+        return internal_val
+
+
+    def to_internal(self, val):
+        if self.log:
+            return math.log(val)
+        return float(val)
+
+
+    def __repr__(self):
+        return '{}({}, {}, log={})'.format(self.__class__.__name__, self.low, self.high, self.log)
+
+
+class Integer(Real):
+
+    def from_internal(self, internal_val):
+        return int(round(Real.from_internal(self, internal_val)))
+
+
+# A param that only means something for some values of another param (l1_ratio only matters when penalty='elasticnet', for instance)
+# When the parent param takes on any other value, we leave this param at the model's default, and TPE only learns about it from the candidates where it was used
+class Conditional(object):
+
+    def __init__(self, space, parent, parent_values):
+        self.space = space
+        self.parent = parent
+        self.parent_values = parent_values
+
+
+    def __repr__(self):
+        return 'Conditional({}, {}={})'.format(self.space, self.parent, self.parent_values)
+
+
+def is_search_distribution(param_vals):
+    return isinstance(param_vals, (Real, Conditional))
+
+
+# How many parameter combinations a search space holds, which is infinite as soon as any param is continuous
+def count_combinations(param_grid):
+    total_combinations = 1
+    for param_name, param_vals in param_grid.items():
+        if isinstance(param_vals, Conditional):
+            param_vals = param_vals.space
+        if isinstance(param_vals, Real):
+            return float('inf')
+        total_combinations *= len(param_vals)
+    return total_combinations
+
+
+def get_normal_cdf(x):
+    return 0.5 * (1 + math.erf(x / math.sqrt(2)))
+
+
+# A Tree-structured Parzen Estimator: once we have a few random candidates, we split everything we have tried into the best gamma fraction and the rest
+# For each param, we fit one density to the values the good candidates used, and another to the values the rest used, and try whichever of n_ei_candidates samples from the good density is most likely under it relative to the other
+# Candidates are evaluated asynchronously on n_jobs workers. Whenever a worker frees up, it gets a new candidate based on every result we have so far
+class TPESearchCV(TimeBudgetedSearchCV):
+
+    def __init__(self, estimator, param_distributions, scoring, n_iter=20, n_initial_points=None, gamma=0.25, n_ei_candidates=24, n_jobs=1, cv=2, refit=False, time_budget=None, refit_deadline=None, error_score=-1000000000, random_state=None, verbose=0):
+        TimeBudgetedSearchCV.__init__(self, estimator, param_distributions, time_budget, scoring, cv=cv, refit=refit, refit_deadline=refit_deadline, error_score=error_score, random_state=random_state, verbose=verbose)
+        self.param_distributions = param_distributions
+        self.n_iter = n_iter
+        # Before this many candidates have finished, we do not know enough to do better than sampling at random
+        if n_initial_points is None:
+            n_initial_points = max(2, min(10, n_iter // 3))
+        self.n_initial_points = n_initial_points
+        self.gamma = gamma
+        self.n_ei_candidates = n_ei_candidates
+        self.n_jobs = n_jobs
+
+
+    # Parents are always sampled before the params that depend on them
+    def get_param_order(self):
+        param_order = [param_name for param_name, param_vals in self.param_distributions.items() if not isinstance(param_vals, Conditional)]
+        conditional_params = [param_name for param_name in self.param_distributions if param_name not in param_order]
+
+        while len(conditional_params) > 0:
+            num_remaining = len(conditional_params)
+            for param_name in list(conditional_params):
+                parent_name = self.get_parent_name(param_name)
+                if parent_name in param_order:
+                    param_order.append(param_name)
+                    conditional_params.remove(param_name)
+            if len(conditional_params) == num_remaining:
+                print('Could not find the parent params for these conditional params:')
+                print(conditional_params)
+                raise ValueError('Every Conditional param needs a parent param in the search space')
+
+        return param_order
+
+
+    # Our params are usually prefixed with where they get set ("model__num_leaves"), while a Conditional names its parent the way the model does ("boosting_type")
+    def get_parent_name(self, param_name):
+        parent = self.param_distributions[param_name].parent
+        if parent in self.param_distributions:
+            return parent
+        for candidate_name in self.param_distributions:
+            if candidate_name.endswith('__' + parent):
+                return candidate_name
+        return None
+
+
+    # Returns the space for this param, or None if this param is not used for this candidate
+    def get_active_space(self, param_name, internal_params):
+        space = self.param_distributions[param_name]
+        if not isinstance(space, Conditional):
+            return space
+
+        parent_name = self.get_parent_name(param_name)
+        if parent_name not in internal_params:
+            return None
+        parent_val = self.to_external(parent_name, self.param_distributions[parent_name], internal_params[parent_name])
+        if parent_val not in space.parent_values:
+            return None
+        return space.space
+
+
+    def to_external(self, param_name, space, internal_val):
+        if isinstance(space, Conditional):
+            space = space.space
+        if isinstance(space, Real):
+            return space.from_internal(internal_val)
+        # Choices are stored by their index, since they might be lists, or even estimators
+        return space[internal_val]
+
+
+    def sample_random(self, space):
+        if isinstance(space, Real):
+            low, high = space.get_bounds()
+            return self.rng.uniform(low, high)
+        return int(self.rng.randint(len(space)))
+
+
+    def get_parzen_estimator(self, observed_vals, low, high):
+        observed_vals = np.asarray(observed_vals, dtype=float)
+        # The last component is a wide prior over the whole range, so we keep exploring values far from anything we have tried
+        mus = np.append(observed_vals, (low + high) / 2.0)
+
+        sorted_vals = np.sort(observed_vals)
+        with_bounds = np.concatenate([[low], sorted_vals, [high]])
+        sorted_sigmas = np.maximum(with_bounds[1:-1] - with_bounds[:-2], with_bounds[2:] - with_bounds[1:-1])
+        sigmas = np.empty(len(observed_vals))
+        sigmas[np.argsort(observed_vals)] = sorted_sigmas
+        sigmas = np.clip(sigmas, (high - low) / min(100.0, len(observed_vals) + 1.0), high - low)
+        sigmas = np.append(sigmas, high - low)
+
+        return mus, sigmas
+
+
+    def get_log_density(self, vals, mus, sigmas, low, high):
+        vals = np.asarray(vals, dtype=float).reshape(-1, 1)
+        # Each component is truncated to [low, high], so we renormalize by how much of it falls inside that range
+        truncated_mass = np.array([get_normal_cdf((high - mu) / sigma) - get_normal_cdf((low - mu) / sigma) for mu, sigma in zip(mus, sigmas)])
+        densities = np.exp(-0.5 * ((vals - mus) / sigmas) ** 2) / (sigmas * math.sqrt(2 * math.pi) * np.maximum(truncated_mass, 1e-12))
+        return np.log(np.maximum(densities.mean(axis=1), 1e-300))
+
+
+    def sample_from_parzen(self, mus, sigmas, low, high):
+        samples = []
+        for component_idx in self.rng.randint(len(mus), size=self.n_ei_candidates):
+            sample = self.rng.normal(mus[component_idx], sigmas[component_idx])
+            # Resampling a few times keeps the truncated shape, without ever getting stuck on a component far outside the range
+            num_tries = 0
+            while (sample < low or sample > high) and num_tries < 10:
+                sample = self.rng.normal(mus[component_idx], sigmas[component_idx])
+                num_tries += 1
+            samples.append(min(max(sample, low), high))
+        return np.array(samples)
+
+
+    def sample_tpe(self, space, good_vals, bad_vals):
+        if isinstance(space, Real):
+            low, high = space.get_bounds()
+            good_mus, good_sigmas = self.get_parzen_estimator(good_vals, low, high)
+            bad_mus, bad_sigmas = self.get_parzen_estimator(bad_vals, low, high)
+
+            samples = self.sample_from_parzen(good_mus, good_sigmas, low, high)
+            improvement = self.get_log_density(samples, good_mus, good_sigmas, low, high) - self.get_log_density(samples, bad_mus, bad_sigmas, low, high)
+            return float(samples[int(np.argmax(improvement))])
+
+        # For choices, each density is just how often each choice shows up, plus one of each so no choice is ever ruled out entirely
+        good_weights = np.bincount(np.asarray(good_vals, dtype=int), minlength=len(space)) + 1.0
+        bad_weights = np.bincount(np.asarray(bad_vals, dtype=int), minlength=len(space)) + 1.0
+        good_probs = good_weights / good_weights.sum()
+        bad_probs = bad_weights / bad_weights.sum()
+
+        samples = self.rng.choice(len(space), size=self.n_ei_candidates, p=good_probs)
+        improvement = good_probs[samples] / bad_probs[samples]
+        return int(samples[int(np.argmax(improvement))])
+
+
+    # Returns a new candidate as (internal_params, params). internal_params is what TPE learns from, and params is what gets set on the estimator
+    def suggest(self, seen_keys):
+        finished_trials = self.trials
+        use_tpe = len(finished_trials) >= self.n_initial_points
+
+        if use_tpe:
+            sorted_trials = sorted(finished_trials, key=lambda trial: trial['score'], reverse=True)
+            num_good = max(1, int(math.ceil(self.gamma * len(sorted_trials))))
+            good_trials = sorted_trials[:num_good]
+            bad_trials = sorted_trials[num_good:]
+
+        # A search space made up entirely of choices can run out of new combinations, so we only try so many times to find one we have not already tried
+        for attempt_idx in range(20):
+            internal_params = {}
+            for param_name in self.param_order:
+                space = self.get_active_space(param_name, internal_params)
+                if space is None:
+                    continue
+
+                good_vals = []
+                bad_vals = []
+                if use_tpe:
+                    good_vals = [trial['internal_params'][param_name] for trial in good_trials if param_name in trial['internal_params']]
+                    bad_vals = [trial['internal_params'][param_name] for trial in bad_trials if param_name in trial['internal_params']]
+
+                if use_tpe and attempt_idx < 10 and len(good_vals) > 0:
+                    internal_params[param_name] = self.sample_tpe(space, good_vals, bad_vals)
+                else:
+                    internal_params[param_name] = self.sample_random(space)
+
+            key = tuple(sorted(internal_params.items()))
+            if key not in seen_keys:
+                break
+
+        params = dict((param_name, self.to_external(param_name, self.param_distributions[param_name], internal_val)) for param_name, internal_val in internal_params.items())
+        return internal_params, params, key
+
+
+    def _record_trial(self, results, internal_params, params, scores, fit_times, score_times):
+        self._record_result(results, params, scores, fit_times, score_times)
+        self.trials.append({
+            'internal_params': internal_params
+            , 'score': results['mean_test_score'][-1]
+        })
+
+        if self.verbose:
+            print('[{}/{}] score: {}, params: {}'.format(len(self.trials), self.num_candidates, results['mean_test_score'][-1], params))
+
+
+    def is_out_of_time(self, num_started):
+        # We always try at least one candidate, so we have a model to hand back no matter how little time we were given
+        return self.time_budget is not None and num_started > 0 and self.time_budget.is_expired()
+
+
+    def fit(self, X, y):
+        self.rng = np.random.RandomState(self.random_state)
+        self.param_order = self.get_param_order()
+        self.trials = []
+        splits = self.get_splits(X, y)
+        deadline = None if self.time_budget is None else self.time_budget.deadline
+
+        # There is no point in trying more candidates than a search space made up entirely of choices holds
+        self.num_candidates = int(min(self.n_iter, count_combinations(self.param_distributions)))
+
+        results = self._init_results()
+        seen_keys = set()
+        num_started = 0
+
+        if self.n_jobs == 1:
+            while num_started < self.num_candidates and not self.is_out_of_time(num_started):
+                internal_params, params, key = self.suggest(seen_keys)
+                seen_keys.add(key)
+                num_started += 1
+
+                scores, fit_times, score_times = self._fit_and_score(params, X, y, splits, deadline=deadline)
+                self._record_trial(results, internal_params, params, scores, fit_times, score_times)
+
+        else:
+            import pathos
+
+            pool = pathos.multiprocessing.ProcessPool(nodes=self.n_jobs)
+            # Since we may have already closed the pool, try to restart it
+            try:
+                pool.restart()
+            except AssertionError:
+                pass
+
+            pending = []
+            while len(pending) > 0 or (num_started < self.num_candidates and not self.is_out_of_time(num_started)):
+                # Keep every worker busy. Each new candidate is based on every result that has come back so far
+                while len(pending) < self.n_jobs and num_started < self.num_candidates and not self.is_out_of_time(num_started):
+                    internal_params, params, key = self.suggest(seen_keys)
+                    seen_keys.add(key)
+                    num_started += 1
+                    pending.append((internal_params, params, pool.apipe(self._fit_and_score, params, X, y, splits, deadline)))
+
+                finished = [candidate for candidate in pending if candidate[2].ready()]
+                if len(finished) == 0:
+                    time.sleep(0.01)
+                    continue
+
+                for candidate in finished:
+                    internal_params, params, async_result = candidate
+                    scores, fit_times, score_times = async_result.get()
+                    self._record_trial(results, internal_params, params, scores, fit_times, score_times)
+                    pending.remove(candidate)
+
+            pool.close()
+            try:
+                pool.join()
+            except AssertionError:
+                pass
+
+        if num_started < self.num_candidates:
+            print('Ran out of time for this hyperparameter search after trying {} of {} candidates'.format(num_started, self.num_candidates))
+
+        return self._finish(X, y, results)
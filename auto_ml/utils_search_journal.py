@@ -0,0 +1,212 @@
+# A journal of every hyperparameter search candidate we have already scored, so a search that gets killed partway through (a spot instance preemption, or running out of memory) picks up where it left off when we run it again
+# Each line of the journal file is a JSON object holding one candidate's score on one cross-validation fold. It is keyed by a fingerprint of that fold's training data, and a hash of the model and all of its params
+# Before fitting a candidate on a fold, FinalModelATC looks it up in the journal. If we already have a score for it, we skip fitting entirely, and JournaledScorer hands back the journaled score
+# That also means a candidate that shows up more than once in the same search (which happens a lot with EvolutionaryAlgorithmSearchCV) only ever gets fit once
+import datetime
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import scipy.sparse
+
+
+def update_hash_with_array(hasher, arr):
+    arr = np.asarray(arr)
+    hasher.update(str((arr.dtype.str, arr.shape)).encode('utf-8'))
+    if arr.dtype == object:
+        arr = pd.util.hash_pandas_object(pd.Series(arr.ravel()), index=False).values
+    hasher.update(np.ascontiguousarray(arr).tobytes())
+
+
+def get_data_fingerprint(X, y):
+    hasher = hashlib.sha1()
+    if scipy.sparse.issparse(X):
+        X = X.tocsr()
+        hasher.update(str(X.shape).encode('utf-8'))
+        for arr in [X.data, X.indices, X.indptr]:
+            update_hash_with_array(hasher, arr)
+    elif isinstance(X, pd.DataFrame):
+        hasher.update(str(list(X.columns)).encode('utf-8'))
+        hasher.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+    else:
+        update_hash_with_array(hasher, X)
+
+    update_hash_with_array(hasher, y)
+    return hasher.hexdigest()
+
+
+def get_model_params(model):
+    try:
+        return model.get_params()
+    except AttributeError:
+        return {}
+
+
+# Scores from different scoring methods are in different units, so a score only counts as a journal hit if it was measured the same way
+def get_scorer_description(scorer):
+    if scorer is None:
+        return None
+
+    scoring_method = getattr(scorer, 'scoring_method', None)
+    if callable(scoring_method):
+        method_description = [getattr(scoring_method, '__module__', None), getattr(scoring_method, '__name__', None)]
+        # Every lambda has the same name, so we tell them apart by their code
+        code = getattr(scoring_method, '__code__', None)
+        if code is not None:
+            method_description.append(hashlib.sha1(code.co_code).hexdigest())
+    else:
+        method_description = scoring_method
+
+    return [type(scorer).__name__, method_description]
+
+
+# settings holds everything besides the model's own params that changes how a candidate scores: the scorer, and the data used for early stopping, for instance
+def get_param_hash(model_name, model, settings=None):
+    params = sorted((str(k), repr(v)) for k, v in get_model_params(model).items())
+    settings = sorted((str(k), repr(v)) for k, v in (settings or {}).items())
+    return hashlib.sha1(json.dumps([model_name, params, settings]).encode('utf-8')).hexdigest()
+
+
+def get_journal_key(X, y, model_name, model, settings=None):
+    return (get_data_fingerprint(X, y), get_param_hash(model_name, model, settings=settings))
+
+
+class SearchJournal(object):
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.lock = threading.Lock()
+        self.entries = {}
+        # How far into the file we have read. Other processes (the workers of a parallel search, for instance) may have appended to it since
+        self.read_offset = 0
+        self.checked_file_ending = False
+        # The (device, inode) of the file we have read so far, so that we notice when it has been deleted and written again
+        self.file_id = None
+
+
+    # Forgets everything we have read, for when the journal file has been deleted or truncated (to start a search fresh, for instance)
+    def _reset(self):
+        self.entries = {}
+        self.read_offset = 0
+        self.checked_file_ending = False
+        self.file_id = None
+
+
+    def _refresh(self):
+        try:
+            file_stat = os.stat(self.file_name)
+        except OSError:
+            # The journal file is gone, so none of the scores we read from it count anymore
+            if self.read_offset > 0 or len(self.entries) > 0:
+                self._reset()
+            return
+
+        file_id = (file_stat.st_dev, file_stat.st_ino)
+        if (self.file_id is not None and file_id != self.file_id) or file_stat.st_size < self.read_offset:
+            self._reset()
+        self.file_id = file_id
+
+        if file_stat.st_size <= self.read_offset:
+            return
+
+        with open(self.file_name, 'rb') as read_file:
+            read_file.seek(self.read_offset)
+            for line in read_file:
+                # A line that another process is partway through writing, or that got cut off when a previous search was killed
+                if not line.endswith(b'\n'):
+                    break
+                self.read_offset += len(line)
+
+                try:
+                    entry = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    continue
+                self.entries[(entry['data_fingerprint'], entry['param_hash'])] = entry['score']
+
+
+    def get_num_entries(self):
+        with self.lock:
+            self._refresh()
+            return len(self.entries)
+
+
+    # Returns the journaled score for this key, or None if we have not scored it yet
+    # We check the file every time, since a score we read earlier no longer counts if the journal has since been deleted or truncated
+    def lookup(self, journal_key):
+        with self.lock:
+            self._refresh()
+            return self.entries.get(journal_key)
+
+
+    def record(self, journal_key, score, model_name=None, params=None):
+        entry = {
+            'data_fingerprint': journal_key[0]
+            , 'param_hash': journal_key[1]
+            , 'score': float(score)
+            , 'model_name': model_name
+            , 'params': params
+            , 'created_at': datetime.datetime.now().isoformat()
+        }
+        line = (json.dumps(entry) + '\n').encode('utf-8')
+
+        with self.lock:
+            # Picks up on the journal file having been deleted or truncated, so we do not keep scores that are no longer in it
+            self._refresh()
+
+            # If a previous search was killed partway through writing a line, start on a fresh line, so that we only lose that one entry
+            prefix = b''
+            if self.checked_file_ending == False:
+                self.checked_file_ending = True
+                if os.path.exists(self.file_name) and os.path.getsize(self.file_name) > 0:
+                    with open(self.file_name, 'rb') as read_file:
+                        read_file.seek(-1, os.SEEK_END)
+                        if read_file.read(1) != b'\n':
+                            prefix = b'\n'
+
+            # Each entry goes out in a single write to a file opened for appending, so entries from several processes do not get interleaved
+            with open(self.file_name, 'ab') as append_file:
+                append_file.write(prefix + line)
+
+            # Reading our own entry back in (rather than just adding it to entries) keeps entries and read_offset in step with what is actually in the file
+            self._refresh()
+
+
+# One SearchJournal per file per process, shared by every candidate we fit in that process
+search_journals = {}
+search_journals_lock = threading.Lock()
+
+
+def get_search_journal(file_name):
+    file_name = os.path.abspath(file_name)
+    with search_journals_lock:
+        if file_name not in search_journals:
+            search_journals[file_name] = SearchJournal(file_name)
+        return search_journals[file_name]
+
+
+# Wraps the scoring function our hyperparameter searches use
+# Candidates that FinalModelATC found in the journal get their journaled score back without ever being fit. Every other candidate gets scored as usual, and then added to the journal
+class JournaledScorer(object):
+
+    def __init__(self, score_func):
+        self.score_func = score_func
+
+
+    def __call__(self, estimator, X, y):
+        journal_score = getattr(estimator, 'journal_score', None)
+        if journal_score is not None:
+            return journal_score
+
+        score = self.score_func(estimator, X, y)
+
+        journal_key = getattr(estimator, 'journal_key', None)
+        if journal_key is not None:
+            params = dict((str(k), repr(v)) for k, v in get_model_params(estimator.model).items())
+            get_search_journal(estimator.search_journal).record(journal_key, score, model_name=estimator.model_name, params=params)
+            # Older versions of scikit-learn also score each candidate on its training data, which we never want to end up in the journal
+            estimator.journal_score = score
+
+        return score
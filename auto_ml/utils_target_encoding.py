@@ -0,0 +1,186 @@
+# Target encoding for high-cardinality categorical columns
+# Rather than one-hot encoding a column with 100k distinct values (or label encoding it into arbitrary integers), each value is replaced by a smoothed average of the output for that value
+# During training, every row's encoding is calculated out of fold, from the rows in the other folds only. Otherwise, the model would learn to trust encodings that already include the very row it is predicting
+# At prediction time, we only need a compact table of value -> encoding for each column. Values we never saw during training get the prior (the overall average of the output)
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.model_selection import KFold
+
+from auto_ml import utils
+
+
+encoded_col_suffix = '_target_encoded'
+
+
+class TargetEncoder(BaseEstimator, TransformerMixin):
+
+    def __init__(self, column_descriptions, cols_to_encode='auto', type_of_estimator='regressor', smoothing=20, num_folds=5, min_categories_for_auto=100, random_state=0):
+        self.column_descriptions = column_descriptions
+        # Either a list of categorical columns, or 'auto' to encode every categorical column with at least min_categories_for_auto distinct values
+        self.cols_to_encode = cols_to_encode
+        self.type_of_estimator = type_of_estimator
+        # How many rows' worth of weight the prior gets. Values seen in only a handful of rows stay close to the prior, while common values get close to their own average
+        self.smoothing = smoothing
+        self.num_folds = num_folds
+        self.min_categories_for_auto = min_categories_for_auto
+        self.random_state = random_state
+
+
+    def get(self, prop_name, default=None):
+        try:
+            return getattr(self, prop_name)
+        except AttributeError:
+            return default
+
+
+    # Each column of the result is one thing we encode: the output for regressors, the positive class for binary classifiers, and each class for multiclass classifiers
+    def get_targets(self, y):
+        if self.type_of_estimator == 'regressor':
+            self.target_names = ['']
+            return np.asarray(y, dtype=float).reshape(-1, 1)
+
+        y = np.asarray(y)
+        classes = np.unique(y)
+        if len(classes) <= 2:
+            classes = classes[-1:]
+            self.target_names = ['']
+        else:
+            self.target_names = ['_' + str(class_name) for class_name in classes]
+        return (y.reshape(-1, 1) == classes.reshape(1, -1)).astype(float)
+
+
+    def get_cols_to_encode(self, X):
+        categorical_cols = [col for col in X.columns if self.column_descriptions.get(col) == 'categorical']
+        if self.cols_to_encode != 'auto':
+            return [col for col in self.cols_to_encode if col in categorical_cols]
+        return [col for col in categorical_cols if X[col].nunique(dropna=False) >= self.min_categories_for_auto]
+
+
+    # The same string keys DataFrameVectorizer uses for categorical values
+    def get_keys(self, col_vals):
+        return col_vals.astype(object).astype(str).values
+
+
+    # Returns the smoothed encodings for every key, as an (encodings, unique_keys) tuple
+    def calculate_encodings(self, keys, targets, priors):
+        df = pd.DataFrame(targets)
+        df['key'] = keys
+        grouped = df.groupby('key', sort=False)
+        sums = grouped.sum()
+        counts = grouped.size().values.reshape(-1, 1)
+
+        encodings = (sums.values + priors.reshape(1, -1) * self.smoothing) / (counts + self.smoothing)
+        return encodings, list(sums.index)
+
+
+    def lookup_encodings(self, keys, encodings, unique_keys, priors):
+        key_indices = pd.Series(np.arange(len(unique_keys)), index=unique_keys)
+        row_indices = key_indices.reindex(keys).values
+        is_unseen = np.isnan(row_indices)
+
+        result = np.tile(priors.reshape(1, -1), (len(keys), 1))
+        if not is_unseen.all():
+            result[~is_unseen] = encodings[row_indices[~is_unseen].astype(int)]
+        return result
+
+
+    def fit(self, X, y=None):
+        self._fit(X, y)
+        return self
+
+
+    def _fit(self, X, y):
+        print('Fitting target encodings')
+        targets = self.get_targets(y)
+        self.priors = targets.mean(axis=0)
+
+        self.encoded_columns = {}
+        self.encodings = {}
+        for col in self.get_cols_to_encode(X):
+            keys = self.get_keys(X[col])
+            encodings, unique_keys = self.calculate_encodings(keys, targets, self.priors)
+            self.encodings[col] = {
+                'keys': unique_keys
+                , 'values': encodings.astype(np.float32)
+            }
+            self.encoded_columns[col] = [col + encoded_col_suffix + target_name for target_name in self.target_names]
+
+        return targets
+
+
+    # At training time, every row is encoded using only the rows from the other folds
+    def fit_transform(self, X, y=None):
+        targets = self._fit(X, y)
+        if len(self.encoded_columns) == 0:
+            return X
+
+        folds = list(KFold(n_splits=self.num_folds, shuffle=True, random_state=self.random_state).split(np.arange(len(X))))
+
+        for col, encoded_col_names in self.encoded_columns.items():
+            keys = self.get_keys(X[col])
+            out_of_fold_encodings = np.zeros((len(X), len(encoded_col_names)), dtype=np.float32)
+
+            for fit_indices, encode_indices in folds:
+                fold_priors = targets[fit_indices].mean(axis=0)
+                encodings, unique_keys = self.calculate_encodings(keys[fit_indices], targets[fit_indices], fold_priors)
+                out_of_fold_encodings[encode_indices] = self.lookup_encodings(keys[encode_indices], encodings, unique_keys, fold_priors)
+
+            for idx, encoded_col_name in enumerate(encoded_col_names):
+                X[encoded_col_name] = out_of_fold_encodings[:, idx]
+            X.drop(col, axis=1, inplace=True)
+
+        return X
+
+
+    def transform(self, X, y=None):
+        if len(self.encoded_columns) == 0:
+            return X
+
+        if isinstance(X, dict):
+            # A frozen pipeline never modifies the dictionary it was handed
+            if self.get('frozen', False) == True:
+                X = dict(X)
+
+            for col, encoded_col_names in self.encoded_columns.items():
+                key_map = self.get_key_map(col)
+                row_idx = key_map.get(utils.get_category_key(X.pop(col, None)))
+                for idx, encoded_col_name in enumerate(encoded_col_names):
+                    if row_idx is None:
+                        X[encoded_col_name] = float(self.priors[idx])
+                    else:
+                        X[encoded_col_name] = float(self.encodings[col]['values'][row_idx, idx])
+            return X
+
+        for col, encoded_col_names in self.encoded_columns.items():
+            if col in X.columns:
+                keys = self.get_keys(X[col])
+            else:
+                keys = np.array(['None'] * len(X), dtype=object)
+            encoded_vals = self.lookup_encodings(keys, self.encodings[col]['values'], self.encodings[col]['keys'], self.priors)
+
+            # drop hands us a new DataFrame, so we never modify the one we were handed
+            X = X.drop([col], axis=1) if col in X.columns else X.copy(deep=False)
+            for idx, encoded_col_name in enumerate(encoded_col_names):
+                X[encoded_col_name] = encoded_vals[:, idx]
+
+        return X
+
+
+    # Built lazily, since only single-dictionary predictions need it
+    def get_key_map(self, col):
+        key_maps = self.get('key_maps')
+        if key_maps is None:
+            key_maps = {}
+            self.key_maps = key_maps
+        if col not in key_maps:
+            key_maps[col] = dict((key, idx) for idx, key in enumerate(self.encodings[col]['keys']))
+        return key_maps[col]
+
+
+    def freeze(self):
+        # Build every lookup table now, so transform is read-only once we are frozen
+        for col in self.encoded_columns:
+            self.get_key_map(col)
+        self.frozen = True
+        return self
@@ -0,0 +1,259 @@
+# Structured events describing each phase of training, so that training runs can be profiled and compared systematically
+# Every event is a flat dictionary. Events are handed to a user-provided callback, and/or written to a file as JSON lines
+# Phases (data cleaning, fitting each transformation step, fitting each model, hyperparameter searches, etc.) report their duration, how much they raised the peak memory usage of this process, and the number of rows and columns they worked on
+from contextlib import contextmanager
+import datetime
+import json
+import sys
+import threading
+import time
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:
+    # resource is not available on Windows
+    resource = None
+
+
+# The telemetry for whichever Predictor is currently training. Code deep inside training (early stopping within a single model's fit, for instance) reports through this, rather than having a telemetry object threaded all the way through to it
+current_telemetry = None
+
+
+def get_current_telemetry():
+    return current_telemetry
+
+
+def set_current_telemetry(telemetry):
+    global current_telemetry
+    previous_telemetry = current_telemetry
+    current_telemetry = telemetry
+    return previous_telemetry
+
+
+# Makes telemetry the current telemetry inside this block, and always puts back whichever telemetry was current before, even if training raises
+@contextmanager
+def use_telemetry(telemetry):
+    previous_telemetry = set_current_telemetry(telemetry)
+    try:
+        yield telemetry
+    finally:
+        set_current_telemetry(previous_telemetry)
+
+
+# Returns the peak resident set size of this process so far, in megabytes, or None if we cannot measure it
+def get_peak_rss_mb():
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports this in kilobytes, while macOS reports it in bytes
+    if sys.platform == 'darwin':
+        return peak_rss / (1024.0 * 1024.0)
+    return peak_rss / 1024.0
+
+
+def get_data_shape(data):
+    if data is None:
+        return {}
+    if hasattr(data, 'shape') and len(data.shape) == 2:
+        return {'num_rows': data.shape[0], 'num_cols': data.shape[1]}
+    try:
+        return {'num_rows': len(data)}
+    except TypeError:
+        return {}
+
+
+def make_json_safe(val):
+    if isinstance(val, np.ndarray):
+        return val.tolist()
+    elif isinstance(val, np.generic):
+        return val.item()
+    elif isinstance(val, (list, tuple)):
+        return [make_json_safe(item) for item in val]
+    elif isinstance(val, dict):
+        return dict((str(k), make_json_safe(v)) for k, v in val.items())
+    elif val is None or isinstance(val, (bool, int, float, str)):
+        return val
+    # Values like trained models do not have a JSON representation
+    return str(val)
+
+
+# The progress messages we print while training with verbose=True. These are driven by the same events that go to the training_callback and telemetry_file
+def print_progress(event):
+    event_type = event['event']
+
+    if event_type == 'phase_start' and event['phase'] == 'fit_model' and not event.get('conformal_holdout'):
+        print('\n\n********************************************************************************************')
+        if event.get('name') is not None:
+            print(event['name'])
+        if event.get('prediction_interval') not in [None, False]:
+            print('About to fit a {} quantile regressor to predict the prediction_interval for the {}th percentile'.format(event['model_name'], int(event['prediction_interval'] * 100)))
+        else:
+            print('About to fit the pipeline for the model ' + event['model_name'] + ' to predict ' + str(event.get('output_column')))
+        print('Started at:')
+        print(datetime.datetime.now().replace(microsecond=0))
+
+    elif event_type == 'phase_end' and event['phase'] == 'fit_model' and not event.get('conformal_holdout') and event['status'] == 'ok':
+        print('Finished training the pipeline!')
+        print('Total training time:')
+        print(datetime.timedelta(seconds=round(event['duration_seconds'])))
+
+    elif event_type == 'phase_start' and event['phase'] == 'hyperparameter_search':
+        model_name = event['model_name']
+        output_column = str(event.get('output_column'))
+        search_method = event['search_method']
+        print('\n\n********************************************************************************************')
+        if event.get('optimize_final_model') == True:
+            print('Optimizing the hyperparameters for your model now')
+            if search_method == 'TPESearchCV':
+                print('About to run a Bayesian (TPE) search to find the optimal hyperparameters for the model ' + model_name + ' to predict ' + output_column)
+                print('Number of candidates to try: ' + str(event['n_iter']))
+            elif search_method == 'TimeBudgetedSearchCV':
+                print('About to search for the optimal hyperparameters for the model ' + model_name + ' to predict ' + output_column + ', for up to ' + str(round(event['time_budget_seconds'], 1)) + ' seconds')
+            elif search_method == 'EvolutionaryAlgorithmSearchCV':
+                print('About to run EvolutionaryAlgorithmSearchCV to find the optimal hyperparameters for the model ' + model_name + ' to predict ' + output_column)
+                print('Population size each generation: ' + str(event['population_size']))
+                print('Number of generations: ' + str(event['generations_number']))
+            else:
+                print('About to run GridSearchCV to find the optimal hyperparameters for the model ' + model_name + ' to predict ' + output_column)
+        else:
+            print('About to run GridSearchCV on the pipeline for several models to predict ' + output_column)
+            # Note that we will only report analytics results on the final model that ultimately gets selected, and trained on the entire dataset
+
+    # LightGBM and Keras print their own early stopping rounds, so we only print the rounds from our own early stopping loop, which tell us which holdout set they scored on
+    elif event_type == 'early_stopping_round' and event.get('holdout_set') is not None:
+        print('[' + str(event['iteration']) + '] ' + event['holdout_set'] + '\'s score is: ' + str(round(event['scores'][event['holdout_set']], 3)))
+
+    elif event_type == 'early_stopping_finished':
+        print('The number of estimators that were the best for this training dataset: ' + str(event['best_iteration']))
+        print('The best score on the holdout set: ' + str(event['best_score']))
+
+
+class TrainingTelemetry(object):
+
+    # verbose=True adds print_progress as a listener, which prints our progress through training from these same events
+    def __init__(self, callback=None, telemetry_file=None, name=None, verbose=False):
+        self.callback = callback
+        self.telemetry_file = telemetry_file
+        self.name = name
+        self.listeners = []
+        if verbose == True:
+            self.listeners.append(print_progress)
+        self.start_time = time.time()
+        self.run_id = datetime.datetime.now().strftime('%Y%m%d_%H%M%S_') + str(int(self.start_time * 1000000) % 1000000)
+        self.lock = threading.Lock()
+
+
+    def emit(self, event_type, **info):
+        event = {
+            'event': event_type
+            , 'run_id': self.run_id
+            , 'timestamp': datetime.datetime.now().isoformat()
+            , 'elapsed_seconds': time.time() - self.start_time
+        }
+        if self.name is not None:
+            event['name'] = self.name
+        event.update(info)
+
+        for listener in self.listeners:
+            listener(event)
+
+        if self.callback is not None:
+            self.callback(event)
+
+        if self.telemetry_file is not None:
+            with self.lock:
+                with open(self.telemetry_file, 'a') as telemetry_file:
+                    telemetry_file.write(json.dumps(make_json_safe(event)) + '\n')
+
+        return event
+
+
+    def start_phase(self, phase_name, **info):
+        phase_info = dict(info)
+        phase_info['phase'] = phase_name
+        phase_info['start_time'] = time.time()
+        phase_info['start_peak_rss_mb'] = get_peak_rss_mb()
+        self.emit('phase_start', **dict((k, v) for k, v in phase_info.items() if k not in ['start_time', 'start_peak_rss_mb']))
+        return phase_info
+
+
+    # Anything added to phase_info while the phase was running (num_rows, num_cols, etc.) is included in the phase_end event
+    def end_phase(self, phase_info, status='ok'):
+        phase_info['duration_seconds'] = time.time() - phase_info.pop('start_time')
+
+        start_peak_rss_mb = phase_info.pop('start_peak_rss_mb')
+        end_peak_rss_mb = get_peak_rss_mb()
+        if end_peak_rss_mb is not None and start_peak_rss_mb is not None:
+            phase_info['peak_rss_mb'] = end_peak_rss_mb
+            phase_info['peak_rss_delta_mb'] = end_peak_rss_mb - start_peak_rss_mb
+
+        phase_info['status'] = status
+        return self.emit('phase_end', **phase_info)
+
+
+    @contextmanager
+    def phase(self, phase_name, **info):
+        phase_info = self.start_phase(phase_name, **info)
+        try:
+            yield phase_info
+        except BaseException:
+            self.end_phase(phase_info, status='error')
+            raise
+        self.end_phase(phase_info)
+
+
+    # Reports every parameter combination a GridSearchCV (or EvolutionaryAlgorithmSearchCV) tried, along with how well it scored
+    def emit_search_candidates(self, search_cv, model_name=None):
+        cv_results = getattr(search_cv, 'cv_results_', None)
+        if cv_results is None:
+            return
+
+        params = cv_results.get('params', [])
+        for idx, candidate_params in enumerate(params):
+            candidate_info = {
+                'model_name': model_name
+                , 'candidate_idx': idx
+                , 'params': dict((k, v) for k, v in candidate_params.items() if k not in ['_scorer', 'model'])
+            }
+            for result_key in ['mean_test_score', 'std_test_score', 'mean_fit_time', 'mean_score_time', 'rank_test_score']:
+                if result_key in cv_results:
+                    candidate_info[result_key] = cv_results[result_key][idx]
+
+            self.emit('search_candidate', **candidate_info)
+
+
+    # Locks (and most callbacks) cannot be pickled
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['callback'] = None
+        del state['lock']
+        return state
+
+
+    def __setstate__(self, state):
+        state.setdefault('listeners', [])
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+
+# Keras callbacks have to subclass keras' own Callback class, which we only want to import once we know we are training a deep learning model
+def make_keras_telemetry_callback(telemetry, model_name):
+    from keras.callbacks import Callback
+
+    class KerasTelemetryCallback(Callback):
+
+        def on_epoch_end(self, epoch, logs=None):
+            telemetry.emit('early_stopping_round', model_name=model_name, iteration=epoch + 1, scores=dict(logs or {}))
+
+    return KerasTelemetryCallback()
+
+
+def make_lightgbm_telemetry_callback(telemetry, model_name):
+
+    def lightgbm_telemetry_callback(env):
+        scores = dict((data_name + '_' + metric_name, score) for data_name, metric_name, score, is_higher_better in [result[:4] for result in env.evaluation_result_list])
+        telemetry.emit('early_stopping_round', model_name=model_name, iteration=env.iteration + 1, scores=scores)
+
+    return lightgbm_telemetry_callback
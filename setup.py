@@ -78,6 +78,12 @@ setup(
         'tabulate>=0.7.5, <1.0',
     ],
 
+    entry_points={
+        'console_scripts': [
+            'auto_ml_serve=auto_ml.prediction_server:main',
+        ],
+    },
+
     test_suite='nose.collector',
     tests_require=['nose', 'coveralls']
 )
@@ -0,0 +1,218 @@
+# Times the hot paths of training and getting predictions, on synthetic datasets of different shapes and sizes
+# Usage:
+#   python tests/benchmarks/run_benchmarks.py --output benchmark_results.json
+#   python tests/benchmarks/run_benchmarks.py --datasets wide_numeric,text --sizes 10000,1000000 --output benchmark_results.json --baseline baseline_results.json
+#   python tests/benchmarks/run_benchmarks.py --compare benchmark_results.json --baseline baseline_results.json
+# When a baseline is given, any metric that got more than --threshold slower (or used that much more memory) than in the baseline is flagged as a regression, and we exit with a non-zero status code
+from __future__ import print_function
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path = [os.path.abspath(os.path.dirname(__file__))] + sys.path
+sys.path = [os.path.abspath(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))] + sys.path
+
+import numpy as np
+
+from auto_ml import Predictor
+from auto_ml._version import __version__ as auto_ml_version
+
+import synthetic_data
+
+
+default_datasets = ['wide_numeric', 'high_cardinality', 'text', 'date']
+default_sizes = [10000, 100000]
+
+# The training phases we report on. See utils_telemetry for the full list of phases
+benchmarked_phases = ['clean_data', 'fit_transform_basic_transform', 'fit_transform_scaler', 'fit_transform_dv', 'fit_model', 'train']
+
+# Tiny durations are mostly noise, so we do not flag regressions on metrics smaller than these
+min_seconds_for_regression = 0.01
+min_mb_for_regression = 5
+
+
+def get_percentile_ms(durations, percentile):
+    return float(np.percentile(durations, percentile)) * 1000
+
+
+def benchmark_one_dataset(dataset_name, num_rows, model_names, num_single_predictions, seed):
+    print('\n\n********************************************************************************************')
+    print('Benchmarking the {} dataset with {} rows'.format(dataset_name, num_rows))
+
+    start_time = time.time()
+    df, column_descriptions = synthetic_data.get_dataset(dataset_name, num_rows, seed=seed)
+    generation_seconds = time.time() - start_time
+
+    num_test_rows = max(1, min(num_rows // 5, 100000))
+    df_train = df.iloc[num_test_rows:]
+    df_test = df.iloc[:num_test_rows].drop('output', axis=1)
+    del df
+
+    events = []
+    ml_predictor = Predictor(type_of_estimator='regressor', column_descriptions=column_descriptions, verbose=False)
+    ml_predictor.train(df_train, model_names=model_names, verbose=False, training_callback=events.append)
+
+    results = {'generate_data_seconds': generation_seconds}
+    for event in events:
+        if event['event'] == 'phase_end' and event['phase'] in benchmarked_phases:
+            results[event['phase'] + '_seconds'] = event['duration_seconds']
+            if 'peak_rss_delta_mb' in event:
+                results[event['phase'] + '_peak_rss_delta_mb'] = event['peak_rss_delta_mb']
+
+    # Batch predictions on the whole test set at once
+    start_time = time.time()
+    ml_predictor.predict(df_test)
+    results['batch_predict_seconds'] = time.time() - start_time
+    results['batch_predict_rows'] = len(df_test)
+
+    # Single-row predictions, the way a production API would get them, one dictionary at a time
+    test_rows = df_test.head(num_single_predictions).to_dict('records')
+
+    # Warm up any lazy imports or caches, so they do not show up as our worst latencies
+    ml_predictor.predict(test_rows[0])
+
+    durations = []
+    for row in test_rows:
+        start_time = time.time()
+        ml_predictor.predict(row)
+        durations.append(time.time() - start_time)
+
+    results['single_predict_p50_ms'] = get_percentile_ms(durations, 50)
+    results['single_predict_p99_ms'] = get_percentile_ms(durations, 99)
+
+    for metric_name in sorted(results):
+        print('{}: {}'.format(metric_name, results[metric_name]))
+
+    return results
+
+
+def run_benchmarks(datasets, sizes, model_names, num_single_predictions, seed):
+    results = {}
+    for dataset_name in datasets:
+        for num_rows in sizes:
+            dataset_results = benchmark_one_dataset(dataset_name, num_rows, model_names, num_single_predictions, seed)
+            for metric_name, val in dataset_results.items():
+                results['{}/{}/{}'.format(dataset_name, num_rows, metric_name)] = val
+
+    return {
+        'auto_ml_version': auto_ml_version
+        , 'python_version': platform.python_version()
+        , 'platform': platform.platform()
+        , 'created_at': datetime.datetime.now().isoformat()
+        , 'settings': {
+            'datasets': datasets
+            , 'sizes': sizes
+            , 'model_names': model_names
+            , 'num_single_predictions': num_single_predictions
+            , 'seed': seed
+        }
+        , 'results': results
+    }
+
+
+def is_comparable_metric(metric_name):
+    return metric_name.endswith('_seconds') or metric_name.endswith('_ms') or metric_name.endswith('_mb')
+
+
+def get_min_delta_for_regression(metric_name):
+    if metric_name.endswith('_ms'):
+        return min_seconds_for_regression * 1000
+    elif metric_name.endswith('_mb'):
+        return min_mb_for_regression
+    return min_seconds_for_regression
+
+
+# Returns a list of every metric that got worse by more than threshold (0.2 means 20% slower) compared to the baseline
+def compare_to_baseline(benchmark_results, baseline_results, threshold=0.2):
+    regressions = []
+    results = benchmark_results['results']
+    baseline = baseline_results['results']
+
+    for metric_name in sorted(results):
+        if not is_comparable_metric(metric_name) or metric_name not in baseline:
+            continue
+
+        new_val = results[metric_name]
+        baseline_val = baseline[metric_name]
+        if new_val is None or baseline_val is None:
+            continue
+
+        delta = new_val - baseline_val
+        if delta > get_min_delta_for_regression(metric_name) and new_val > baseline_val * (1 + threshold):
+            regressions.append({
+                'metric': metric_name
+                , 'baseline': baseline_val
+                , 'new': new_val
+                , 'percent_change': delta / baseline_val * 100 if baseline_val > 0 else None
+            })
+
+    return regressions
+
+
+def print_regressions(regressions, threshold):
+    if len(regressions) == 0:
+        print('\nNo metrics regressed by more than {}% compared to the baseline'.format(int(threshold * 100)))
+        return
+
+    print('\n!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+    print('Found {} metrics that regressed by more than {}% compared to the baseline:'.format(len(regressions), int(threshold * 100)))
+    for regression in regressions:
+        percent_change = regression['percent_change']
+        if percent_change is not None:
+            percent_change = '{:.1f}%'.format(percent_change)
+        print('{}: {} -> {} ({})'.format(regression['metric'], regression['baseline'], regression['new'], percent_change))
+    print('!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+
+
+def read_results(file_name):
+    with open(file_name, 'r') as read_file:
+        return json.load(read_file)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Benchmark the training and prediction hot paths of auto_ml on synthetic data')
+    parser.add_argument('--datasets', default=','.join(default_datasets), help='Comma-separated list of datasets to generate. Options: ' + ', '.join(sorted(synthetic_data.dataset_generators)))
+    parser.add_argument('--sizes', default=','.join(str(size) for size in default_sizes), help='Comma-separated list of row counts to benchmark each dataset at (for example, 10000,100000,1000000,10000000)')
+    parser.add_argument('--model_names', default='GradientBoostingRegressor', help='Comma-separated list of models to train')
+    parser.add_argument('--num_single_predictions', type=int, default=1000, help='How many single-dictionary predictions to time')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='File to write the benchmark results to, as JSON')
+    parser.add_argument('--baseline', default=None, help='Benchmark results to compare against')
+    parser.add_argument('--compare', default=None, help='Compare these existing benchmark results to --baseline, without running any benchmarks')
+    parser.add_argument('--threshold', type=float, default=0.2, help='How much worse (0.2 means 20%% worse) a metric has to get before we flag it as a regression')
+    args = parser.parse_args(args)
+
+    if args.compare is not None:
+        if args.baseline is None:
+            raise ValueError('Please pass in a --baseline to compare against when using --compare')
+        benchmark_results = read_results(args.compare)
+    else:
+        benchmark_results = run_benchmarks(
+            datasets=args.datasets.split(',')
+            , sizes=[int(size) for size in args.sizes.split(',')]
+            , model_names=args.model_names.split(',')
+            , num_single_predictions=args.num_single_predictions
+            , seed=args.seed
+        )
+
+        if args.output is not None:
+            with open(args.output, 'w') as write_file:
+                json.dump(benchmark_results, write_file, indent=2, sort_keys=True)
+            print('\nWrote the benchmark results to ' + args.output)
+
+    if args.baseline is not None:
+        regressions = compare_to_baseline(benchmark_results, read_results(args.baseline), threshold=args.threshold)
+        print_regressions(regressions, args.threshold)
+        if len(regressions) > 0:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# Synthetic datasets for benchmarking, each built to stress a different part of the training and prediction pipeline
+# Every generator takes the number of rows to create (and a random seed), and returns a DataFrame along with the column_descriptions to train on it
+import datetime
+import string
+
+import numpy as np
+import pandas as pd
+
+
+def make_output_column(df, numeric_cols, random_state):
+    # Give the models some actual signal to find, plus some noise
+    output = np.zeros(len(df))
+    for idx, col_name in enumerate(numeric_cols[:10]):
+        output += (idx + 1) * df[col_name].values
+    output += random_state.normal(scale=0.5, size=len(df))
+    return output
+
+
+# Lots of numeric columns: stresses the scaler, and the width of the vectorized matrix
+def make_wide_numeric_dataset(num_rows, num_cols=200, seed=0):
+    random_state = np.random.RandomState(seed)
+
+    numeric_cols = ['num_' + str(idx) for idx in range(num_cols)]
+    df = pd.DataFrame(random_state.normal(size=(num_rows, num_cols)), columns=numeric_cols)
+
+    # Sprinkle in some missing values, which data cleaning has to handle
+    missing_mask = random_state.rand(num_rows, num_cols) < 0.02
+    df = df.mask(missing_mask)
+
+    df['output'] = make_output_column(df.fillna(0), numeric_cols, random_state)
+
+    column_descriptions = {'output': 'output'}
+    return df, column_descriptions
+
+
+# A few categorical columns with a very large number of distinct values: stresses label encoding, and the size of the DataFrameVectorizer's vocabulary
+def make_high_cardinality_dataset(num_rows, num_categorical_cols=5, max_categories=100000, num_numeric_cols=10, seed=0):
+    random_state = np.random.RandomState(seed)
+
+    numeric_cols = ['num_' + str(idx) for idx in range(num_numeric_cols)]
+    df = pd.DataFrame(random_state.normal(size=(num_rows, num_numeric_cols)), columns=numeric_cols)
+
+    column_descriptions = {'output': 'output'}
+    num_categories = max(10, min(max_categories, num_rows // 10))
+    category_effects = random_state.normal(size=num_categories)
+    output = make_output_column(df, numeric_cols, random_state)
+
+    for idx in range(num_categorical_cols):
+        col_name = 'cat_' + str(idx)
+        # A skewed distribution, so there are a few very common categories, and a very long tail of rare ones
+        category_idxs = np.minimum(random_state.zipf(1.3, size=num_rows) - 1, num_categories - 1)
+        df[col_name] = np.array(['category_' + str(val) for val in range(num_categories)], dtype=object)[category_idxs]
+        output += category_effects[category_idxs]
+        column_descriptions[col_name] = 'categorical'
+
+    df['output'] = output
+    return df, column_descriptions
+
+
+def make_vocabulary(vocab_size, random_state):
+    letters = np.array(list(string.ascii_lowercase))
+    words = set()
+    while len(words) < vocab_size:
+        word_length = random_state.randint(3, 10)
+        words.add(''.join(random_state.choice(letters, size=word_length)))
+    return sorted(words)
+
+
+# Free-form text columns: stresses tfidf vectorization during data cleaning
+def make_text_dataset(num_rows, num_text_cols=2, vocab_size=5000, words_per_row=20, num_numeric_cols=5, seed=0):
+    random_state = np.random.RandomState(seed)
+
+    numeric_cols = ['num_' + str(idx) for idx in range(num_numeric_cols)]
+    df = pd.DataFrame(random_state.normal(size=(num_rows, num_numeric_cols)), columns=numeric_cols)
+    output = make_output_column(df, numeric_cols, random_state)
+
+    vocabulary = np.array(make_vocabulary(vocab_size, random_state), dtype=object)
+    word_effects = random_state.normal(scale=0.1, size=vocab_size)
+
+    column_descriptions = {'output': 'output'}
+    for idx in range(num_text_cols):
+        col_name = 'text_' + str(idx)
+        # Word frequencies in real text roughly follow Zipf's law
+        word_idxs = np.minimum(random_state.zipf(1.2, size=(num_rows, words_per_row)) - 1, vocab_size - 1)
+        df[col_name] = [' '.join(vocabulary[row]) for row in word_idxs]
+        output += word_effects[word_idxs].sum(axis=1)
+        column_descriptions[col_name] = 'nlp'
+
+    df['output'] = output
+    return df, column_descriptions
+
+
+# Date columns: stresses the date feature engineering in data cleaning
+def make_date_dataset(num_rows, num_date_cols=3, num_numeric_cols=5, seed=0):
+    random_state = np.random.RandomState(seed)
+
+    numeric_cols = ['num_' + str(idx) for idx in range(num_numeric_cols)]
+    df = pd.DataFrame(random_state.normal(size=(num_rows, num_numeric_cols)), columns=numeric_cols)
+    output = make_output_column(df, numeric_cols, random_state)
+
+    start_date = datetime.datetime(2015, 1, 1)
+    three_years_in_seconds = 3 * 365 * 24 * 60 * 60
+
+    column_descriptions = {'output': 'output'}
+    for idx in range(num_date_cols):
+        col_name = 'date_' + str(idx)
+        seconds_offsets = random_state.randint(0, three_years_in_seconds, size=num_rows)
+        df[col_name] = pd.to_datetime(start_date) + pd.to_timedelta(seconds_offsets, unit='s')
+        # Give the models a weekly pattern to find
+        output += (df[col_name].dt.dayofweek.values >= 5) * 1.0
+        column_descriptions[col_name] = 'date'
+
+    df['output'] = output
+    return df, column_descriptions
+
+
+dataset_generators = {
+    'wide_numeric': make_wide_numeric_dataset
+    , 'high_cardinality': make_high_cardinality_dataset
+    , 'text': make_text_dataset
+    , 'date': make_date_dataset
+}
+
+
+def get_dataset(dataset_name, num_rows, seed=0):
+    if dataset_name not in dataset_generators:
+        print('Here are the datasets we know how to generate:')
+        print(sorted(dataset_generators.keys()))
+        raise ValueError('Unknown dataset_name: ' + str(dataset_name))
+
+    return dataset_generators[dataset_name](num_rows, seed=seed)
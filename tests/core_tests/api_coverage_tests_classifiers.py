@@ -99,6 +99,34 @@ def test_perform_feature_selection_true_classification():
     assert -0.16 < test_score < -0.124
 
 
+def test_perform_feature_selection_on_a_row_sample_classification():
+    np.random.seed(0)
+
+    df_titanic_train, df_titanic_test = utils.get_titanic_binary_classification_dataset()
+
+    column_descriptions = {
+        'survived': 'output'
+        , 'sex': 'categorical'
+        , 'embarked': 'categorical'
+        , 'pclass': 'categorical'
+    }
+
+    ml_predictor = Predictor(type_of_estimator='classifier', column_descriptions=column_descriptions)
+
+    ml_predictor.train(df_titanic_train, perform_feature_selection=True, feature_selection_params={'max_rows': 500})
+
+    # Feature selection is folded into dv, rather than staying around as its own step
+    assert 'feature_selection' not in ml_predictor.trained_pipeline.named_steps
+    assert ml_predictor.trained_pipeline.named_steps['dv'].has_been_restricted == True
+
+    test_score = ml_predictor.score(df_titanic_test, df_titanic_test.survived)
+
+    print('test_score')
+    print(test_score)
+
+    assert -0.16 < test_score < -0.124
+
+
 def test_perform_feature_scaling_true_classification():
     np.random.seed(0)
 
@@ -4,6 +4,7 @@
 import datetime
 import os
 import random
+import shutil
 import sys
 sys.path = [os.path.abspath(os.path.dirname(__file__))] + sys.path
 sys.path = [os.path.abspath(os.path.dirname(os.path.dirname(__file__)))] + sys.path
@@ -11,6 +12,7 @@ sys.path = [os.path.abspath(os.path.dirname(os.path.dirname(__file__)))] + sys.p
 os.environ['is_test_suite'] = 'True'
 
 from auto_ml import Predictor
+from auto_ml import utils_scoring
 from auto_ml.utils_models import load_ml_model
 
 import dill
@@ -143,3 +145,301 @@ def test_compare_all_models_regression():
     assert -3.6 < test_score < -2.8
 
 
+
+
+def test_time_budget_stops_hyperparameter_search_regression():
+    np.random.seed(0)
+
+    df_boston_train, df_boston_test = utils.get_boston_regression_dataset()
+
+    column_descriptions = {
+        'MEDV': 'output'
+        , 'CHAS': 'categorical'
+    }
+
+    ml_predictor = Predictor(type_of_estimator='regressor', column_descriptions=column_descriptions)
+
+    time_budget = 20
+    start_time = datetime.datetime.now()
+    ml_predictor.train(df_boston_train, optimize_final_model=True, model_names=['GradientBoostingRegressor', 'RandomForestRegressor'], time_budget=time_budget)
+    duration = datetime.datetime.now() - start_time
+
+    print('duration.total_seconds()')
+    print(duration.total_seconds())
+
+    # We only stop between parameter combinations and boosting rounds, so we allow for some overrun
+    assert duration.total_seconds() < time_budget * 2
+
+    test_score = ml_predictor.score(df_boston_test, df_boston_test.MEDV)
+
+    print('test_score')
+    print(test_score)
+
+    assert -4.5 < test_score < -2.5
+
+
+def test_tpe_search_strategy_regression():
+    np.random.seed(0)
+
+    df_boston_train, df_boston_test = utils.get_boston_regression_dataset()
+
+    column_descriptions = {
+        'MEDV': 'output'
+        , 'CHAS': 'categorical'
+    }
+
+    ml_predictor = Predictor(type_of_estimator='regressor', column_descriptions=column_descriptions)
+    ml_predictor.train(df_boston_train, optimize_final_model=True, model_names=['GradientBoostingRegressor'], search_strategy='tpe', search_strategy_params={'n_iter': 8, 'n_initial_points': 4, 'random_state': 0})
+
+    test_score = ml_predictor.score(df_boston_test, df_boston_test.MEDV)
+
+    print('test_score')
+    print(test_score)
+
+    assert -4.5 < test_score < -2.5
+
+    # learning_rate is searched over a continuous range, rather than just the handful of values in our grid
+    learning_rate = ml_predictor.trained_pipeline.named_steps['final_model'].model.learning_rate
+    assert 0.001 <= learning_rate <= 0.3
+
+
+def test_train_and_predict_from_parquet_regression():
+    try:
+        import pyarrow
+    except ImportError:
+        from nose.plugins.skip import SkipTest
+        raise SkipTest('pyarrow is not installed')
+    import tempfile
+
+    from auto_ml import utils_arrow
+
+    np.random.seed(0)
+
+    df_boston_train, df_boston_test = utils.get_boston_regression_dataset()
+
+    column_descriptions = {
+        'MEDV': 'output'
+        , 'CHAS': 'categorical'
+        , 'ZN': 'ignore'
+    }
+
+    temp_dir = tempfile.mkdtemp()
+    train_file_name = os.path.join(temp_dir, 'boston_train.parquet')
+    test_file_name = os.path.join(temp_dir, 'boston_test.parquet')
+    df_boston_train.to_parquet(train_file_name)
+    df_boston_test.to_parquet(test_file_name)
+
+    ml_predictor = Predictor(type_of_estimator='regressor', column_descriptions=column_descriptions)
+    ml_predictor.train(train_file_name)
+
+    # We only read the columns our trained pipeline uses
+    columns_to_read = utils_arrow.get_columns_for_pipeline(ml_predictor.trained_pipeline)
+    assert 'ZN' not in columns_to_read
+    assert 'MEDV' not in columns_to_read
+
+    parquet_predictions = ml_predictor.predict(test_file_name)
+    df_predictions = ml_predictor.predict(df_boston_test)
+    assert np.allclose(parquet_predictions, df_predictions)
+
+    test_score = ml_predictor.score(test_file_name)
+
+    print('test_score')
+    print(test_score)
+
+    assert -4.5 < test_score < -2.5
+
+    chunked_score = ml_predictor.score_chunks(test_file_name, batch_size=25)
+    assert abs(chunked_score - test_score) < 0.001
+
+
+def test_warm_start_from_a_saved_model_regression():
+    np.random.seed(0)
+
+    df_boston_train, df_boston_test = utils.get_boston_regression_dataset()
+    df_older_train, df_newer_train = train_test_split(df_boston_train, test_size=0.5, random_state=0)
+
+    column_descriptions = {
+        'MEDV': 'output'
+        , 'CHAS': 'categorical'
+    }
+
+    ml_predictor = Predictor(type_of_estimator='regressor', column_descriptions=column_descriptions)
+    ml_predictor.train(df_older_train)
+    file_name = ml_predictor.save(str(random.random()))
+
+    warm_predictor = Predictor(type_of_estimator='regressor', column_descriptions=column_descriptions)
+    warm_predictor.train(df_newer_train, warm_start_from=file_name)
+
+    os.remove(file_name)
+
+    # We reuse the fitted scaler, rather than refitting it on the newer data
+    old_scaler = ml_predictor.trained_pipeline.named_steps.get('scaler')
+    new_scaler = warm_predictor.trained_pipeline.named_steps.get('scaler')
+    if old_scaler is not None:
+        assert old_scaler.column_ranges == new_scaler.column_ranges
+
+    # We kept boosting from the old model's trees, so we have at least as many trees as it did
+    old_model = ml_predictor.trained_pipeline.named_steps['final_model'].model
+    new_model = warm_predictor.trained_pipeline.named_steps['final_model'].model
+    assert new_model.n_estimators >= old_model.n_estimators
+
+    test_score = warm_predictor.score(df_boston_test, df_boston_test.MEDV)
+
+    print('test_score')
+    print(test_score)
+
+    assert -4.5 < test_score < -2.5
+
+
+def test_partial_fit_updates_an_sgd_model_regression():
+    np.random.seed(0)
+
+    df_boston_train, df_boston_test = utils.get_boston_regression_dataset()
+    df_initial_train, df_stream = train_test_split(df_boston_train, test_size=0.5, random_state=0)
+
+    column_descriptions = {
+        'MEDV': 'output'
+        , 'CHAS': 'categorical'
+    }
+
+    ml_predictor = Predictor(type_of_estimator='regressor', column_descriptions=column_descriptions)
+    ml_predictor.train(df_initial_train, model_names=['SGDRegressor'], categorical_hash_buckets=4)
+
+    # Unseen categorical values go into one of the hashed slots, rather than being dropped
+    feature_names = ml_predictor.trained_pipeline.named_steps['dv'].feature_names_
+    assert len([feature_name for feature_name in feature_names if feature_name.startswith('CHAS=__hash_')]) == 4
+
+    coef_before = ml_predictor.trained_pipeline.named_steps['final_model'].model.coef_.copy()
+
+    df_stream = df_stream.copy()
+    df_stream['CHAS'] = df_stream['CHAS'].astype(str) + '_new'
+    for start_idx in range(0, len(df_stream), 50):
+        ml_predictor.partial_fit(df_stream.iloc[start_idx:start_idx + 50])
+
+    coef_after = ml_predictor.trained_pipeline.named_steps['final_model'].model.coef_
+    assert not np.allclose(coef_before, coef_after)
+
+    test_score = ml_predictor.score(df_boston_test, df_boston_test.MEDV)
+
+    print('test_score')
+    print(test_score)
+
+    assert -7 < test_score < -2.5
+
+    # The updated model can be saved and loaded like any other
+    file_name = ml_predictor.save(str(random.random()))
+    saved_ml_pipeline = load_ml_model(file_name)
+    os.remove(file_name)
+
+    assert np.allclose(saved_ml_pipeline.predict(df_boston_test), ml_predictor.predict(df_boston_test))
+
+
+def test_train_multi_shares_one_transformation_pipeline_regression():
+    np.random.seed(0)
+
+    df_boston_train, df_boston_test = utils.get_boston_regression_dataset()
+
+    column_descriptions = {
+        'MEDV': 'output'
+        , 'CHAS': 'categorical'
+    }
+
+    # time_budget is a valid param for .train(), but not for train_multi, and we say so clearly
+    ml_predictor = Predictor(type_of_estimator='regressor', column_descriptions=column_descriptions)
+    try:
+        ml_predictor.train_multi(df_boston_train, outputs={'CRIM': 'regressor'}, time_budget=60)
+        assert False
+    except ValueError:
+        pass
+
+    ml_predictor = Predictor(type_of_estimator='regressor', column_descriptions=column_descriptions)
+    ml_predictor.train_multi(df_boston_train, outputs={'CRIM': 'regressor', 'CHAS': 'classifier'})
+
+    # The column_descriptions we passed in are left alone, and the predictor is back to scoring its own output column
+    assert column_descriptions == {'MEDV': 'output', 'CHAS': 'categorical'}
+    assert ml_predictor.output_column == 'MEDV'
+    assert isinstance(ml_predictor._scorer, utils_scoring.RegressionScorer)
+
+    trained_pipeline = ml_predictor.trained_pipeline
+    assert trained_pipeline.get_output_columns() == ['MEDV', 'CRIM', 'CHAS']
+
+    # None of our output columns were used as features for the others
+    feature_names = trained_pipeline.transformation_pipeline.named_steps['dv'].feature_names_
+    assert len([feature_name for feature_name in feature_names if feature_name.split('=')[0] in ['MEDV', 'CRIM', 'CHAS']]) == 0
+
+    predictions = ml_predictor.predict(df_boston_test)
+    for output_column in ['MEDV', 'CRIM', 'CHAS']:
+        assert len(predictions[output_column]) == len(df_boston_test)
+
+    medv_rmse = np.sqrt(np.mean((np.array(predictions['MEDV']) - df_boston_test.MEDV.values) ** 2))
+    print('medv_rmse')
+    print(medv_rmse)
+    assert medv_rmse < 4.5
+
+    # Only the classifier has probabilities to give
+    probabilities = ml_predictor.predict_proba(df_boston_test)
+    assert list(probabilities.keys()) == ['CHAS']
+
+    # A single row gets one prediction per output column, from a single pass through the transformation pipeline
+    row = df_boston_test.iloc[0].to_dict()
+    row_predictions = ml_predictor.predict(row)
+    assert abs(row_predictions['MEDV'] - predictions['MEDV'][0]) < 0.0001
+
+    file_name = ml_predictor.save(str(random.random()), file_format='artifact')
+    saved_ml_pipeline = load_ml_model(file_name)
+    shutil.rmtree(file_name)
+
+    saved_predictions = saved_ml_pipeline.predict(df_boston_test)
+    for output_column in ['MEDV', 'CRIM', 'CHAS']:
+        assert np.allclose(saved_predictions[output_column], predictions[output_column])
+
+
+def test_search_journal_resumes_hyperparameter_search_regression():
+    np.random.seed(0)
+
+    df_boston_train, df_boston_test = utils.get_boston_regression_dataset()
+
+    column_descriptions = {
+        'MEDV': 'output'
+        , 'CHAS': 'categorical'
+    }
+
+    journal_file_name = str(random.random()) + '_search_journal.jsonl'
+
+    ml_predictor = Predictor(type_of_estimator='regressor', column_descriptions=column_descriptions)
+    ml_predictor.train(df_boston_train, optimize_final_model=True, model_names=['Ridge'], search_journal=journal_file_name)
+
+    with open(journal_file_name) as journal_file:
+        num_journal_entries = len(journal_file.readlines())
+    assert num_journal_entries > 0
+
+    # Running the same search again serves every candidate from the journal, rather than fitting it again
+    resumed_ml_predictor = Predictor(type_of_estimator='regressor', column_descriptions=column_descriptions)
+    resumed_ml_predictor.train(df_boston_train, optimize_final_model=True, model_names=['Ridge'], search_journal=journal_file_name)
+
+    with open(journal_file_name) as journal_file:
+        assert len(journal_file.readlines()) == num_journal_entries
+
+    # The same search with a different scoring method measures every candidate in different units, so none of the journaled scores apply
+    mae_ml_predictor = Predictor(type_of_estimator='regressor', column_descriptions=column_descriptions)
+    mae_ml_predictor.train(df_boston_train, optimize_final_model=True, model_names=['Ridge'], search_journal=journal_file_name, scoring='mean_absolute_error')
+
+    with open(journal_file_name) as journal_file:
+        assert len(journal_file.readlines()) == 2 * num_journal_entries
+
+    # Deleting the journal starts the search fresh, even in the same process that read the old journal
+    os.remove(journal_file_name)
+    fresh_ml_predictor = Predictor(type_of_estimator='regressor', column_descriptions=column_descriptions)
+    fresh_ml_predictor.train(df_boston_train, optimize_final_model=True, model_names=['Ridge'], search_journal=journal_file_name)
+
+    with open(journal_file_name) as journal_file:
+        assert len(journal_file.readlines()) == num_journal_entries
+    os.remove(journal_file_name)
+
+    first_score = ml_predictor.score(df_boston_test, df_boston_test.MEDV)
+    resumed_score = resumed_ml_predictor.score(df_boston_test, df_boston_test.MEDV)
+
+    print('first_score, resumed_score')
+    print(first_score, resumed_score)
+
+    assert abs(first_score - resumed_score) < 0.0001
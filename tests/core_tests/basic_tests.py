@@ -46,6 +46,76 @@ def test_linear_model_analytics_classification(model_name=None):
 
     assert -0.21 < test_score < -0.131
 
+def test_rare_categories_share_an_other_feature():
+    np.random.seed(0)
+
+    df_titanic_train, df_titanic_test = utils.get_titanic_binary_classification_dataset(basic=False)
+
+    column_descriptions = {
+        'survived': 'output'
+        , 'sex': 'categorical'
+        , 'embarked': 'categorical'
+        , 'pclass': 'categorical'
+        , 'home.dest': 'categorical'
+        , 'name': 'ignore'
+        , 'ticket': 'ignore'
+        , 'cabin': 'ignore'
+    }
+
+    ml_predictor = Predictor(type_of_estimator='classifier', column_descriptions=column_descriptions)
+
+    ml_predictor.train(df_titanic_train, min_category_frequency=5, max_categories_per_column=20, perform_feature_selection=False)
+
+    feature_names = ml_predictor.trained_pipeline.named_steps['dv'].feature_names_
+    home_dest_features = [feature_name for feature_name in feature_names if feature_name.startswith('home.dest=')]
+    assert 'home.dest=__other__' in home_dest_features
+    assert len(home_dest_features) <= 21
+
+    test_score = ml_predictor.score(df_titanic_test, df_titanic_test.survived)
+
+    print('test_score')
+    print(test_score)
+
+    assert -0.21 < test_score < -0.11
+
+
+def test_target_encoding_replaces_high_cardinality_categoricals():
+    np.random.seed(0)
+
+    df_titanic_train, df_titanic_test = utils.get_titanic_binary_classification_dataset(basic=False)
+
+    column_descriptions = {
+        'survived': 'output'
+        , 'sex': 'categorical'
+        , 'embarked': 'categorical'
+        , 'pclass': 'categorical'
+        , 'home.dest': 'categorical'
+        , 'name': 'ignore'
+        , 'ticket': 'ignore'
+        , 'cabin': 'ignore'
+    }
+
+    ml_predictor = Predictor(type_of_estimator='classifier', column_descriptions=column_descriptions)
+
+    ml_predictor.train(df_titanic_train, target_encode_columns=['home.dest'], perform_feature_selection=False)
+
+    feature_names = ml_predictor.trained_pipeline.named_steps['dv'].feature_names_
+    assert 'home.dest_target_encoded' in feature_names
+    assert len([feature_name for feature_name in feature_names if feature_name.startswith('home.dest=')]) == 0
+
+    # Values we never saw during training get the prior, rather than raising an error
+    row = df_titanic_test.iloc[0].to_dict()
+    row['home.dest'] = 'a place we have never seen before'
+    ml_predictor.predict_proba(row)
+
+    test_score = ml_predictor.score(df_titanic_test, df_titanic_test.survived)
+
+    print('test_score')
+    print(test_score)
+
+    assert -0.21 < test_score < -0.11
+
+
 def test_input_df_unmodified():
     np.random.seed(42)
 
@@ -73,6 +143,40 @@ def test_input_df_unmodified():
 
     assert -3.35 < test_score < -2.8
 
+def test_drops_bad_y_values_and_keeps_input_df_unmodified():
+    np.random.seed(42)
+
+    df_boston_train, df_boston_test = utils.get_boston_regression_dataset()
+    df_boston_train = df_boston_train.copy()
+    df_boston_train['CHAS'] = df_boston_train['CHAS'].astype(str)
+
+    # Mix in missing values, and values that can only be turned into floats once we clean them
+    df_boston_train['MEDV'] = df_boston_train['MEDV'].astype(object)
+    df_boston_train.iloc[0, df_boston_train.columns.get_loc('MEDV')] = None
+    df_boston_train.iloc[1, df_boston_train.columns.get_loc('MEDV')] = 'NULL'
+    df_boston_train.iloc[2, df_boston_train.columns.get_loc('MEDV')] = 'not_a_number'
+    df_boston_train.iloc[3, df_boston_train.columns.get_loc('MEDV')] = '1,000'
+
+    column_descriptions = {
+        'MEDV': 'output'
+        , 'CHAS': 'categorical'
+    }
+
+    ml_predictor = Predictor(type_of_estimator='regressor', column_descriptions=column_descriptions)
+    ml_predictor.write_gs_param_results_to_file = False
+
+    X_df, y = ml_predictor._prepare_for_training(df_boston_train)
+
+    assert len(X_df) == len(df_boston_train) - 3
+    assert len(y) == len(X_df)
+    assert 1000.0 in list(y)
+    assert str(X_df['CRIM'].dtype) == 'float32'
+    assert str(X_df['CHAS'].dtype) == 'category'
+    # We never modify the user's data
+    assert df_boston_train['MEDV'].iloc[1] == 'NULL'
+    assert 'MEDV' in df_boston_train.columns
+
+
 def test_model_uses_user_provided_training_params(model_name=None):
     np.random.seed(0)
 
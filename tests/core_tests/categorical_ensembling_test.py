@@ -1,4 +1,6 @@
 import os
+import random
+import shutil
 import sys
 sys.path = [os.path.abspath(os.path.dirname(__file__))] + sys.path
 sys.path = [os.path.abspath(os.path.dirname(os.path.dirname(__file__)))] + sys.path
@@ -6,6 +8,7 @@ sys.path = [os.path.abspath(os.path.dirname(os.path.dirname(__file__)))] + sys.p
 os.environ['is_test_suite'] = 'True'
 
 from auto_ml import Predictor
+from auto_ml.utils_models import load_ml_model
 
 import dill
 import numpy as np
@@ -64,3 +67,84 @@ def test_categorical_ensembling_regression(model_name=None):
     assert lower_bound < test_score < -2.8
 
 
+
+
+def test_lazy_category_loading_matches_eager_predictions():
+    np.random.seed(0)
+
+    df_titanic_train, df_titanic_test = utils.get_titanic_binary_classification_dataset()
+
+    column_descriptions = {
+        'survived': 'output'
+        , 'pclass': 'categorical'
+        , 'embarked': 'categorical'
+        , 'sex': 'categorical'
+    }
+
+    ml_predictor = Predictor(type_of_estimator='classifier', column_descriptions=column_descriptions)
+
+    ml_predictor.train_categorical_ensemble(df_titanic_train, categorical_column='pclass', optimize_final_model=False)
+
+    artifact_dir_name = ml_predictor.save(str(random.random()), file_format='artifact')
+    eager_pipeline = load_ml_model(artifact_dir_name)
+    lazy_pipeline = load_ml_model(artifact_dir_name, lazy_categories=True, max_loaded_categories=1)
+
+    df_titanic_test_dictionaries = df_titanic_test.to_dict('records')
+    eager_predictions = eager_pipeline.predict_proba(df_titanic_test_dictionaries)
+    lazy_predictions = lazy_pipeline.predict_proba(df_titanic_test_dictionaries)
+    shutil.rmtree(artifact_dir_name)
+
+    assert np.allclose(eager_predictions, lazy_predictions)
+
+    cache_info = lazy_pipeline.trained_models.get_cache_info()
+    # Only the pinned default_category and the single most recently used category should still be in memory
+    assert cache_info['num_loaded_models'] <= 2
+    assert cache_info['num_evictions'] > 0
+
+
+def test_lazy_category_load_does_not_block_loaded_categories():
+    import threading
+    import time
+    from auto_ml.utils_categorical_ensembling import LazyCategoryModels
+
+    slow_load_started = threading.Event()
+    finish_slow_load = threading.Event()
+    num_slow_loads = []
+
+    def load_fast_model():
+        return 'fast_model'
+
+    def load_slow_model():
+        num_slow_loads.append(1)
+        slow_load_started.set()
+        finish_slow_load.wait(10)
+        return 'slow_model'
+
+    lazy_models = LazyCategoryModels({'fast': load_fast_model, 'slow': load_slow_model})
+    assert lazy_models['fast'] == 'fast_model'
+
+    results = {}
+    def get_slow_model(thread_idx):
+        results[thread_idx] = lazy_models['slow']
+
+    slow_threads = [threading.Thread(target=get_slow_model, args=(thread_idx,)) for thread_idx in range(3)]
+    for thread in slow_threads:
+        thread.start()
+    assert slow_load_started.wait(10)
+
+    # While the slow category is loading from disk, requests for a category we already have loaded still go straight through
+    start_time = time.time()
+    assert lazy_models['fast'] == 'fast_model'
+    assert time.time() - start_time < 1
+
+    finish_slow_load.set()
+    for thread in slow_threads:
+        thread.join()
+
+    # Every thread that asked for the slow category while it was loading got the same model, from a single load
+    assert results == {0: 'slow_model', 1: 'slow_model', 2: 'slow_model'}
+    assert len(num_slow_loads) == 1
+
+    cache_info = lazy_models.get_cache_info()
+    assert cache_info['num_misses'] == 2
+    assert cache_info['num_hits'] == 3
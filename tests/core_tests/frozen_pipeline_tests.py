@@ -0,0 +1,61 @@
+"""
+To get standard out, run nosetests as follows:
+nosetests -sv tests
+"""
+import os
+import random
+import sys
+sys.path = [os.path.abspath(os.path.dirname(__file__))] + sys.path
+sys.path = [os.path.abspath(os.path.dirname(os.path.dirname(__file__)))] + sys.path
+
+os.environ['is_test_suite'] = 'True'
+
+from multiprocessing.pool import ThreadPool
+
+from auto_ml import Predictor
+from auto_ml.utils_models import load_ml_model
+
+import numpy as np
+import utils_testing as utils
+
+
+def test_frozen_pipeline_does_not_learn_new_labels():
+    np.random.seed(0)
+
+    df_titanic_train, df_titanic_test = utils.get_titanic_binary_classification_dataset()
+
+    column_descriptions = {
+        'survived': 'output'
+        , 'sex': 'categorical'
+        , 'embarked': 'categorical'
+        , 'pclass': 'categorical'
+    }
+
+    ml_predictor = Predictor(type_of_estimator='classifier', column_descriptions=column_descriptions)
+    ml_predictor.train(df_titanic_train, model_names='LGBMClassifier')
+
+    file_name = ml_predictor.save(str(random.random()))
+    saved_ml_pipeline = load_ml_model(file_name)
+    os.remove(file_name)
+
+    saved_ml_pipeline.freeze()
+
+    label_encoders = saved_ml_pipeline.named_steps['dv'].label_encoders
+    label_map_sizes = dict((col_name, len(encoder.label_map)) for col_name, encoder in label_encoders.items())
+
+    df_titanic_test_dictionaries = df_titanic_test.to_dict('records')
+    for row in df_titanic_test_dictionaries:
+        row['embarked'] = 'a_port_we_have_never_seen_before'
+
+    serial_predictions = [saved_ml_pipeline.predict_proba(row) for row in df_titanic_test_dictionaries]
+
+    pool = ThreadPool(4)
+    threaded_predictions = pool.map(saved_ml_pipeline.predict_proba, df_titanic_test_dictionaries)
+    pool.close()
+    pool.join()
+
+    for col_name, encoder in label_encoders.items():
+        assert len(encoder.label_map) == label_map_sizes[col_name]
+
+    for serial_prediction, threaded_prediction in zip(serial_predictions, threaded_predictions):
+        assert np.allclose(serial_prediction, threaded_prediction)
@@ -0,0 +1,160 @@
+"""
+To get standard out, run nosetests as follows:
+nosetests -sv tests
+"""
+import os
+import random
+import shutil
+import sys
+sys.path = [os.path.abspath(os.path.dirname(__file__))] + sys.path
+sys.path = [os.path.abspath(os.path.dirname(os.path.dirname(__file__)))] + sys.path
+
+os.environ['is_test_suite'] = 'True'
+
+from auto_ml import Predictor
+from auto_ml import utils_models
+from auto_ml.utils_models import load_ml_model
+
+import numpy as np
+import utils_testing as utils
+
+
+def test_artifact_matches_dill_predictions():
+    np.random.seed(0)
+
+    df_titanic_train, df_titanic_test = utils.get_titanic_binary_classification_dataset()
+
+    column_descriptions = {
+        'survived': 'output'
+        , 'sex': 'categorical'
+        , 'embarked': 'categorical'
+        , 'pclass': 'categorical'
+    }
+
+    ml_predictor = Predictor(type_of_estimator='classifier', column_descriptions=column_descriptions)
+    ml_predictor.train(df_titanic_train, model_names='LGBMClassifier')
+
+    dill_file_name = ml_predictor.save(str(random.random()))
+    artifact_dir_name = ml_predictor.save(str(random.random()), file_format='artifact')
+
+    dill_pipeline = load_ml_model(dill_file_name)
+    artifact_pipeline = load_ml_model(artifact_dir_name)
+    os.remove(dill_file_name)
+    shutil.rmtree(artifact_dir_name)
+
+    dill_predictions = dill_pipeline.predict_proba(df_titanic_test)
+    artifact_predictions = artifact_pipeline.predict_proba(df_titanic_test)
+    assert np.allclose(dill_predictions, artifact_predictions)
+
+    df_titanic_test_dictionaries = df_titanic_test.to_dict('records')
+    for row in df_titanic_test_dictionaries[:20]:
+        assert np.allclose(dill_pipeline.predict_proba(row), artifact_pipeline.predict_proba(row))
+
+
+
+def test_warm_start_from_an_artifact_directory():
+    np.random.seed(0)
+
+    df_boston_train, df_boston_test = utils.get_boston_regression_dataset()
+    df_older_train = df_boston_train.iloc[:len(df_boston_train) // 2]
+    df_newer_train = df_boston_train.iloc[len(df_boston_train) // 2:]
+
+    column_descriptions = {
+        'MEDV': 'output'
+        , 'CHAS': 'categorical'
+    }
+
+    ml_predictor = Predictor(type_of_estimator='regressor', column_descriptions=column_descriptions)
+    ml_predictor.train(df_older_train, model_names='LGBMRegressor', training_params={'num_leaves': 12})
+    artifact_dir_name = ml_predictor.save(str(random.random()), file_format='artifact')
+
+    # The LightGBM model loads back in as a stand-in for the original LGBMRegressor, which still knows its name and hyperparameters
+    artifact_model = load_ml_model(artifact_dir_name).named_steps['final_model'].model
+    assert utils_models.get_name_from_model(artifact_model) == 'LGBMRegressor'
+    assert artifact_model.get_params()['num_leaves'] == 12
+
+    warm_predictor = Predictor(type_of_estimator='regressor', column_descriptions=column_descriptions)
+    warm_predictor.train(df_newer_train, warm_start_from=artifact_dir_name)
+    shutil.rmtree(artifact_dir_name)
+
+    new_model = warm_predictor.trained_pipeline.named_steps['final_model'].model
+    assert utils_models.get_name_from_model(new_model) == 'LGBMRegressor'
+    assert new_model.get_params()['num_leaves'] == 12
+    # We kept boosting from the old model's trees, rather than starting over
+    assert new_model.booster_.current_iteration() >= artifact_model.booster_.current_iteration()
+
+    test_score = warm_predictor.score(df_boston_test, df_boston_test.MEDV)
+
+    print('test_score')
+    print(test_score)
+
+    assert -4.5 < test_score < -2.5
+
+
+def test_mmap_artifact_matches_in_memory_predictions():
+    from auto_ml.utils_model_artifacts import MmapVocabulary, hash_key
+
+    np.random.seed(0)
+
+    df_titanic_train, df_titanic_test = utils.get_titanic_binary_classification_dataset(basic=False)
+
+    column_descriptions = {
+        'survived': 'output'
+        , 'sex': 'categorical'
+        , 'embarked': 'categorical'
+        , 'pclass': 'categorical'
+        , 'name': 'nlp'
+        , 'ticket': 'ignore'
+        , 'cabin': 'ignore'
+        , 'home.dest': 'ignore'
+    }
+
+    ml_predictor = Predictor(type_of_estimator='classifier', column_descriptions=column_descriptions)
+    ml_predictor.train(df_titanic_train, model_names='LGBMClassifier')
+
+    artifact_dir_name = ml_predictor.save(str(random.random()), file_format='artifact')
+    mmap_pipeline = load_ml_model(artifact_dir_name, mmap=True)
+
+    # Both the DataFrameVectorizer's vocabulary and the TF-IDF vocabulary stay on disk
+    dv = mmap_pipeline.named_steps['dv']
+    assert isinstance(dv.vocabulary_, MmapVocabulary)
+    tfidf = mmap_pipeline.named_steps['basic_transform'].text_columns['name']
+    assert isinstance(tfidf.vocabulary_, MmapVocabulary)
+
+    in_memory_predictions = ml_predictor.trained_pipeline.predict_proba(df_titanic_test)
+    mmap_predictions = mmap_pipeline.predict_proba(df_titanic_test)
+    assert np.allclose(in_memory_predictions, mmap_predictions)
+
+    df_titanic_test_dictionaries = df_titanic_test.to_dict('records')
+    for row in df_titanic_test_dictionaries[:20]:
+        assert np.allclose(ml_predictor.trained_pipeline.predict_proba(row), mmap_pipeline.predict_proba(row))
+
+    # Values we never saw during training are simply missing, just like they would be from a regular dictionary
+    row = dict(df_titanic_test_dictionaries[0])
+    row['embarked'] = 'a port we have never heard of'
+    row['name'] = 'zzyzx qwxvb'
+    assert np.allclose(ml_predictor.trained_pipeline.predict_proba(row), mmap_pipeline.predict_proba(row))
+
+    for vocabulary in [dv.vocabulary_, tfidf.vocabulary_]:
+        assert 'a key we never saw' not in vocabulary
+        assert vocabulary.get('a key we never saw') is None
+        assert 12345 not in vocabulary
+        try:
+            vocabulary['a key we never saw']
+            assert False
+        except KeyError:
+            pass
+
+        first_name = vocabulary.names[0]
+        assert vocabulary[first_name] == 0
+
+    shutil.rmtree(artifact_dir_name)
+
+    # When two names share a hash, we check the names themselves to find the right one
+    names = np.array(['first_name', 'second_name'])
+    colliding_hash = hash_key('second_name')
+    vocabulary = MmapVocabulary(names, np.array([colliding_hash, colliding_hash], dtype=np.uint64), np.array([0, 1], dtype=np.int64))
+    assert vocabulary['second_name'] == 1
+    # A name whose hash matches, but that is not actually in the vocabulary, is still missing
+    vocabulary = MmapVocabulary(names, np.array([hash_key('third_name'), hash_key('third_name')], dtype=np.uint64), np.array([0, 1], dtype=np.int64))
+    assert 'third_name' not in vocabulary
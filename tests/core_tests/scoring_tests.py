@@ -37,5 +37,57 @@ def test_binary_classification():
     assert test_score == -10000
 
 
+def test_score_chunks_matches_score_regression():
+    np.random.seed(0)
+
+    df_boston_train, df_boston_test = utils.get_boston_regression_dataset()
+
+    column_descriptions = {
+        'MEDV': 'output'
+        , 'CHAS': 'categorical'
+    }
+
+    ml_predictor = Predictor(type_of_estimator='regressor', column_descriptions=column_descriptions)
+
+    ml_predictor.train(df_boston_train)
+
+    test_score = ml_predictor.score(df_boston_test, df_boston_test.MEDV)
+
+    chunks = [df_boston_test.iloc[idx:idx + 50] for idx in range(0, len(df_boston_test), 50)]
+    chunked_score = ml_predictor.score_chunks(chunks, verbose=3)
 
+    print('test_score')
+    print(test_score)
+    print('chunked_score')
+    print(chunked_score)
+
+    assert abs(test_score - chunked_score) < 0.0001
+
+
+def test_score_chunks_matches_score_binary_classification():
+    np.random.seed(0)
+
+    df_titanic_train, df_titanic_test = utils.get_titanic_binary_classification_dataset()
+
+    column_descriptions = {
+        'survived': 'output'
+        , 'sex': 'categorical'
+        , 'embarked': 'categorical'
+        , 'pclass': 'categorical'
+    }
+
+    ml_predictor = Predictor(type_of_estimator='classifier', column_descriptions=column_descriptions)
+
+    ml_predictor.train(df_titanic_train)
+
+    test_score = ml_predictor.score(df_titanic_test, df_titanic_test.survived)
+
+    chunks = [(df_titanic_test.iloc[idx:idx + 50], df_titanic_test.survived.iloc[idx:idx + 50]) for idx in range(0, len(df_titanic_test), 50)]
+    chunked_score = ml_predictor.score_chunks(chunks)
+
+    print('test_score')
+    print(test_score)
+    print('chunked_score')
+    print(chunked_score)
 
+    assert abs(test_score - chunked_score) < 0.0001
@@ -0,0 +1,200 @@
+"""
+To get standard out, run nosetests as follows:
+nosetests -sv tests
+"""
+import os
+import subprocess
+import sys
+sys.path = [os.path.abspath(os.path.dirname(__file__))] + sys.path
+sys.path = [os.path.abspath(os.path.dirname(os.path.dirname(__file__)))] + sys.path
+
+os.environ['is_test_suite'] = 'True'
+
+from auto_ml import Predictor
+
+import numpy as np
+import utils_testing as utils
+
+
+def test_serving_import_skips_training_dependencies():
+    if sys.version_info < (3, 7):
+        # Older versions of Python do not support lazy module attributes, so importing auto_ml still imports Predictor
+        return
+
+    # Run this in a fresh process, since the test suite itself has already imported everything
+    check_imports = 'import sys; import auto_ml.serving; print(",".join(sorted(sys.modules.keys())))'
+    repo_dir = os.path.abspath(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+    output = subprocess.check_output([sys.executable, '-c', check_imports], cwd=repo_dir)
+    imported_modules = set(output.decode('utf-8').strip().split(','))
+
+    for module_name in ['auto_ml.predictor', 'auto_ml.utils_models', 'deap', 'evolutionary_search', 'pathos', 'tabulate', 'pkg_resources']:
+        assert module_name not in imported_modules
+
+
+def test_prediction_cache_returns_same_predictions():
+    np.random.seed(0)
+
+    df_titanic_train, df_titanic_test = utils.get_titanic_binary_classification_dataset()
+
+    column_descriptions = {
+        'survived': 'output'
+        , 'sex': 'categorical'
+        , 'embarked': 'categorical'
+        , 'pclass': 'categorical'
+    }
+
+    ml_predictor = Predictor(type_of_estimator='classifier', column_descriptions=column_descriptions)
+    ml_predictor.train(df_titanic_train, model_names='LGBMClassifier')
+
+    trained_pipeline = ml_predictor.trained_pipeline
+    df_titanic_test_dictionaries = df_titanic_test.to_dict('records')
+    uncached_predictions = [trained_pipeline.predict_proba(row) for row in df_titanic_test_dictionaries]
+
+    trained_pipeline.enable_prediction_cache(max_size=1000)
+    first_pass_predictions = [trained_pipeline.predict_proba(row) for row in df_titanic_test_dictionaries]
+    second_pass_predictions = [trained_pipeline.predict_proba(row) for row in df_titanic_test_dictionaries]
+
+    for uncached_prediction, first_pass_prediction, second_pass_prediction in zip(uncached_predictions, first_pass_predictions, second_pass_predictions):
+        assert np.allclose(uncached_prediction, first_pass_prediction)
+        assert np.allclose(uncached_prediction, second_pass_prediction)
+
+    cache_info = trained_pipeline.prediction_cache.get_cache_info()
+    assert cache_info['num_hits'] >= len(df_titanic_test_dictionaries)
+
+    # Columns the pipeline never uses should not be part of the cache key
+    row = dict(df_titanic_test_dictionaries[0])
+    trained_pipeline.predict_proba(row)
+    num_hits = trained_pipeline.prediction_cache.get_cache_info()['num_hits']
+    row['a_column_we_never_trained_on'] = 'some new value'
+    trained_pipeline.predict_proba(row)
+    assert trained_pipeline.prediction_cache.get_cache_info()['num_hits'] == num_hits + 1
+
+
+def test_instrumentation_records_every_step():
+    np.random.seed(0)
+
+    df_titanic_train, df_titanic_test = utils.get_titanic_binary_classification_dataset()
+
+    column_descriptions = {
+        'survived': 'output'
+        , 'sex': 'categorical'
+        , 'embarked': 'categorical'
+        , 'pclass': 'categorical'
+    }
+
+    ml_predictor = Predictor(type_of_estimator='classifier', column_descriptions=column_descriptions)
+    ml_predictor.train(df_titanic_train, model_names='LGBMClassifier')
+
+    trained_pipeline = ml_predictor.trained_pipeline
+    events = []
+    trained_pipeline.enable_instrumentation(callback=events.append)
+
+    df_titanic_test_dictionaries = df_titanic_test.to_dict('records')
+    for row in df_titanic_test_dictionaries[:50]:
+        trained_pipeline.predict_proba(row)
+    trained_pipeline.predict_proba(df_titanic_test)
+
+    stats = trained_pipeline.get_stats()
+    for step_name in ['basic_transform', 'dv', 'final_model']:
+        assert stats[step_name]['num_calls'] == 51
+        assert stats[step_name]['num_rows'] == 50 + df_titanic_test.shape[0]
+
+    assert len(events) > 0
+    assert set(['step', 'method', 'duration_ms', 'num_rows']) <= set(events[0].keys())
+
+    trained_pipeline.disable_instrumentation()
+    trained_pipeline.predict_proba(df_titanic_test_dictionaries[0])
+    assert trained_pipeline.get_stats() == {}
+
+
+# Doubles each row's value, and fails any batch that has a row with a value it cannot double
+class DoublingPipeline(object):
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict(self, df):
+        self.batch_sizes.append(df.shape[0])
+        predictions = [float(val) * 2 for val in df['val']]
+        if df.shape[0] == 1:
+            return predictions[0]
+        return predictions
+
+
+def test_micro_batcher_returns_each_callers_own_row_and_isolates_bad_rows():
+    import threading
+    from auto_ml.prediction_server import MicroBatcher
+
+    trained_pipeline = DoublingPipeline()
+    # A generous wait, so that the rows from all of our threads end up sharing batches
+    batcher = MicroBatcher(trained_pipeline, max_batch_size=64, max_wait_ms=200).start()
+
+    num_threads = 20
+    bad_idx = 7
+    results = {}
+    errors = {}
+
+    def submit_row(idx):
+        val = 'not a number' if idx == bad_idx else idx
+        try:
+            results[idx] = batcher.submit({'val': val})
+        except Exception as e:
+            errors[idx] = e
+
+    threads = [threading.Thread(target=submit_row, args=(idx,)) for idx in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # The bad row shared a batch with other rows, and only the bad row got an error back
+    assert max(trained_pipeline.batch_sizes) > 1
+    assert list(errors.keys()) == [bad_idx]
+    for idx in range(num_threads):
+        if idx != bad_idx:
+            assert results[idx] == idx * 2
+
+    metrics = batcher.metrics.get_metrics()
+    assert metrics['num_rows'] == num_threads
+    assert metrics['num_batches'] < num_threads
+    assert metrics['avg_batch_size'] > 1
+    assert sum(count for bucket, count in metrics['batch_size_histogram']) == metrics['num_batches']
+
+
+def test_prediction_server_serves_predictions_and_metrics_over_http():
+    import json
+    import threading
+    try:
+        from urllib.request import Request, urlopen
+    except ImportError:
+        from urllib2 import Request, urlopen
+    from auto_ml.prediction_server import make_server
+
+    server = make_server(DoublingPipeline(), host='127.0.0.1', port=0)
+    server_thread = threading.Thread(target=server.serve_forever)
+    server_thread.daemon = True
+    server_thread.start()
+    base_url = 'http://127.0.0.1:{}'.format(server.server_address[1])
+
+    try:
+        def post(path, request_obj):
+            request = Request(base_url + path, data=json.dumps(request_obj).encode('utf-8'), headers={'Content-Type': 'application/json'})
+            return json.loads(urlopen(request).read().decode('utf-8'))
+
+        assert post('/predict', {'val': 3})['prediction'] == 6
+        assert post('/predict', [{'val': 1}, {'val': 2}])['predictions'] == [2, 4]
+
+        # Requests to paths we do not serve still count, as errors
+        try:
+            post('/not_a_real_path', {'val': 3})
+            assert False
+        except Exception as e:
+            assert getattr(e, 'code', None) == 404
+
+        metrics = json.loads(urlopen(base_url + '/metrics').read().decode('utf-8'))
+        assert metrics['num_requests'] == 3
+        assert metrics['num_errors'] == 1
+        assert metrics['num_rows'] == 3
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,71 @@
+"""
+To get standard out, run nosetests as follows:
+nosetests -sv tests
+"""
+import os
+import sys
+sys.path = [os.path.abspath(os.path.dirname(__file__))] + sys.path
+sys.path = [os.path.abspath(os.path.dirname(os.path.dirname(__file__)))] + sys.path
+
+os.environ['is_test_suite'] = 'True'
+
+from auto_ml.utils_model_training import FinalModelATC, get_dense_rows, sparse_batch_generator
+
+import numpy as np
+import pandas as pd
+import scipy.sparse
+
+
+def test_sparse_batch_generator_slices_the_right_rows():
+    np.random.seed(0)
+
+    X_dense = np.random.rand(23, 5)
+    X_dense[X_dense < 0.5] = 0
+    y = np.arange(23)
+
+    for X in [scipy.sparse.csr_matrix(X_dense), pd.DataFrame(X_dense), X_dense]:
+        assert np.allclose(get_dense_rows(X, slice(3, 9)), X_dense[3:9])
+        assert np.allclose(get_dense_rows(X, [7, 2, 11]), X_dense[[7, 2, 11]])
+
+        # Without shuffling, one pass over the data gives us every row in order, with a smaller final batch
+        generator = sparse_batch_generator(X, y, batch_size=10, shuffle=False)
+        batches = [next(generator) for batch_num in range(3)]
+        assert [X_batch.shape[0] for X_batch, y_batch in batches] == [10, 10, 3]
+        assert np.allclose(np.vstack([X_batch for X_batch, y_batch in batches]), X_dense)
+        assert list(np.concatenate([y_batch for X_batch, y_batch in batches])) == list(y)
+
+        # Shuffled batches still keep each row lined up with its own y value
+        generator = sparse_batch_generator(X, y, batch_size=10, shuffle=True)
+        for batch_num in range(3):
+            X_batch, y_batch = next(generator)
+            assert np.allclose(X_batch, X_dense[y_batch])
+
+
+def test_predict_in_batches_handles_a_trailing_single_row_batch():
+    np.random.seed(0)
+
+    # 21 rows in batches of 10 leaves a final batch of just one row
+    X_dense = np.random.rand(21, 4)
+    X = scipy.sparse.csr_matrix(X_dense)
+    weights = np.random.rand(4, 3)
+
+    # Just like the Keras sklearn wrappers, these squeeze their output
+    def predict_one_output(X_batch):
+        return np.squeeze(X_batch.dot(weights[:, :1]))
+
+    def predict_several_outputs(X_batch):
+        return np.squeeze(X_batch.dot(weights))
+
+    final_model = FinalModelATC(model=None)
+
+    predictions = final_model.predict_in_batches(predict_one_output, X, batch_size=10)
+    assert predictions.shape == (21,)
+    assert np.allclose(predictions, X_dense.dot(weights[:, 0]))
+
+    predictions = final_model.predict_in_batches(predict_several_outputs, X, batch_size=10)
+    assert predictions.shape == (21, 3)
+    assert np.allclose(predictions, X_dense.dot(weights))
+
+    # A single row on its own still comes back as one row of predictions
+    predictions = final_model.predict_in_batches(predict_several_outputs, X[:1], batch_size=10)
+    assert predictions.shape == (1, 3)
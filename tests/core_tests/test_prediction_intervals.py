@@ -7,6 +7,7 @@ sys.path = [os.path.abspath(os.path.dirname(os.path.dirname(__file__)))] + sys.p
 os.environ['is_test_suite'] = 'True'
 
 from auto_ml import Predictor
+from auto_ml import utils_search
 
 import dill
 from nose.tools import assert_equal, assert_not_equal, with_setup
@@ -212,3 +213,41 @@ def test_predict_intervals_takes_in_custom_intervals():
             num_failures += 1
 
     assert num_failures < 0.18 * len_intervals
+
+
+def test_conformal_prediction_intervals_actually_work():
+    np.random.seed(0)
+
+    df_boston_train, df_boston_test = utils.get_boston_regression_dataset()
+
+    column_descriptions = {
+        'MEDV': 'output'
+        , 'CHAS': 'categorical'
+    }
+
+    ml_predictor = Predictor(type_of_estimator='regressor', column_descriptions=column_descriptions)
+
+    ml_predictor.train(df_boston_train, predict_intervals=[0.05, 0.95], prediction_interval_method='conformal', prediction_interval_params={'num_bins': 2})
+
+    # No extra models are trained for conformal intervals
+    assert ml_predictor.trained_final_model.interval_predictors is None
+
+    df_boston_test = df_boston_test.reset_index(drop=True)
+    intervals = ml_predictor.predict_intervals(df_boston_test)
+    actuals = df_boston_test.MEDV
+
+    assert (intervals['interval_0.05'] <= intervals['prediction']).all()
+    assert (intervals['interval_0.95'] >= intervals['prediction']).all()
+
+    pct_under = np.mean(actuals < intervals['interval_0.05'])
+    pct_over = np.mean(actuals > intervals['interval_0.95'])
+    # There's a decent bit of noise since this is such a small dataset
+    assert pct_under < 0.15
+    assert pct_over < 0.15
+
+    single_row_intervals = ml_predictor.predict_intervals(df_boston_test.iloc[0].to_dict(), return_type='list')
+    assert len(single_row_intervals) == 3
+
+    # Once our time_budget has run out, we skip the conformal intervals, rather than calibrating them on a holdout model that early stopping cut short
+    ml_predictor.time_budget = utils_search.TimeBudget(0)
+    assert ml_predictor._fit_conformal_intervals(None, None) is None
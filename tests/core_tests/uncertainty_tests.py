@@ -115,6 +115,50 @@ def test_calibrate_uncertainty():
     assert 'bucket_num' in list(uncertainty_score.columns)
 
 
+def test_calibrate_uncertainty_for_one_value():
+    np.random.seed(0)
+
+    df_boston_train, df_boston_test = utils.get_boston_regression_dataset()
+
+    column_descriptions = {
+        'MEDV': 'output'
+        , 'CHAS': 'categorical'
+    }
+
+    df_boston_train, uncertainty_data = train_test_split(df_boston_train, test_size=0.5)
+    uncertainty_data, uncertainty_calibration_data = train_test_split(uncertainty_data, test_size=0.5)
+
+    ml_predictor = Predictor(type_of_estimator='regressor', column_descriptions=column_descriptions)
+
+    uncertainty_calibration_settings = {
+        'num_buckets': 3
+        , 'percentiles': [25, 50, 75]
+    }
+    ml_predictor.train(df_boston_train, perform_feature_selection=True, train_uncertainty_model=True, uncertainty_data=uncertainty_data, calibrate_uncertainty=True, uncertainty_calibration_settings=uncertainty_calibration_settings, uncertainty_calibration_data=uncertainty_calibration_data)
+
+    uc_results = ml_predictor.trained_final_model.uc_results
+    buckets = list(uc_results.values())
+
+    test_list = df_boston_test.to_dict('records')
+
+    for item in test_list:
+        prediction = ml_predictor.predict_uncertainty(item)
+        assert isinstance(prediction, dict)
+
+        proba = np.asarray(prediction['uncertainty_prediction']).reshape(-1)[-1]
+
+        # Each bucket covers the probabilities up to and including its max_proba
+        expected_bucket = buckets[-1]
+        for bucket in buckets:
+            if proba <= bucket['max_proba']:
+                expected_bucket = bucket
+                break
+
+        for key in ['bucket_num', 'percentile_25_delta', 'percentile_50_delta', 'percentile_75_delta']:
+            assert key in prediction
+            assert prediction[key] == expected_bucket[key]
+
+
     # API:
     # calibrate_uncertainty=False
     # uncertainty_calibration_settings = {
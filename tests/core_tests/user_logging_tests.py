@@ -271,3 +271,112 @@ def test_unmarked_categorical_column_throws_warning():
 
 
 
+
+
+def test_training_callback_receives_phase_events():
+    np.random.seed(0)
+
+    df_titanic_train, df_titanic_test = utils.get_titanic_binary_classification_dataset()
+
+    column_descriptions = {
+        'survived': 'output'
+        , 'sex': 'categorical'
+        , 'embarked': 'categorical'
+        , 'pclass': 'categorical'
+    }
+
+    events = []
+    ml_predictor = Predictor(type_of_estimator='classifier', column_descriptions=column_descriptions)
+    ml_predictor.train(df_titanic_train, training_callback=events.append)
+
+    phase_ends = dict((event['phase'], event) for event in events if event['event'] == 'phase_end')
+
+    for phase_name in ['train', 'clean_data', 'fit_transform_basic_transform', 'fit_transform_dv', 'fit_model']:
+        assert phase_name in phase_ends
+        assert phase_ends[phase_name]['status'] == 'ok'
+        assert phase_ends[phase_name]['duration_seconds'] >= 0
+
+    assert phase_ends['clean_data']['num_rows'] == len(df_titanic_train)
+    assert phase_ends['fit_transform_dv']['output_num_rows'] == phase_ends['fit_model']['num_rows']
+
+    # The default GradientBoosting model reports each round of early stopping
+    assert len([event for event in events if event['event'] == 'early_stopping_round']) > 0
+
+
+def test_failed_training_restores_previous_telemetry():
+    from auto_ml import utils_telemetry
+
+    np.random.seed(0)
+
+    df_titanic_train, df_titanic_test = utils.get_titanic_binary_classification_dataset()
+
+    column_descriptions = {
+        'survived': 'output'
+        , 'sex': 'categorical'
+        , 'embarked': 'categorical'
+        , 'pclass': 'categorical'
+    }
+
+    def broken_feature_engineering(df):
+        raise ValueError('This user_input_func always fails')
+
+    previous_telemetry = utils_telemetry.get_current_telemetry()
+
+    events = []
+    ml_predictor = Predictor(type_of_estimator='classifier', column_descriptions=column_descriptions)
+    try:
+        ml_predictor.train(df_titanic_train, user_input_func=broken_feature_engineering, training_callback=events.append)
+        assert False
+    except ValueError:
+        pass
+
+    # The next Predictor to train should not report to this Predictor's callback
+    assert utils_telemetry.get_current_telemetry() is previous_telemetry
+
+    train_phase_ends = [event for event in events if event['event'] == 'phase_end' and event['phase'] == 'train']
+    assert len(train_phase_ends) == 1
+    assert train_phase_ends[0]['status'] == 'error'
+
+
+def test_verbose_progress_is_printed_from_telemetry_events():
+    from auto_ml import utils_telemetry
+    try:
+        from StringIO import StringIO
+    except ImportError:
+        from io import StringIO
+
+    np.random.seed(0)
+
+    df_titanic_train, df_titanic_test = utils.get_titanic_binary_classification_dataset()
+
+    column_descriptions = {
+        'survived': 'output'
+        , 'sex': 'categorical'
+        , 'embarked': 'categorical'
+        , 'pclass': 'categorical'
+    }
+
+    events = []
+    ml_predictor = Predictor(type_of_estimator='classifier', column_descriptions=column_descriptions)
+    ml_predictor.train(df_titanic_train, training_callback=events.append)
+    assert ml_predictor.telemetry.listeners == [utils_telemetry.print_progress]
+
+    # Replaying the events we were sent prints the same progress messages training printed
+    printed_progress = StringIO()
+    real_stdout = sys.stdout
+    sys.stdout = printed_progress
+    try:
+        for event in events:
+            utils_telemetry.print_progress(event)
+    finally:
+        sys.stdout = real_stdout
+    printed_progress = printed_progress.getvalue()
+
+    assert 'About to fit the pipeline for the model GradientBoostingClassifier to predict survived' in printed_progress
+    assert 'Finished training the pipeline!' in printed_progress
+    assert 'random_holdout_set_from_training_data\'s score is: ' in printed_progress
+    assert 'The number of estimators that were the best for this training dataset: ' in printed_progress
+
+    ml_predictor = Predictor(type_of_estimator='classifier', column_descriptions=column_descriptions)
+    ml_predictor.train(df_titanic_train, verbose=False)
+    assert ml_predictor.telemetry.listeners == []